@@ -4,3 +4,6 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
     verbose_name = 'Homly Core'
+
+    def ready(self):
+        from . import signals  # noqa: F401 — registra invalidación del cache de resultados
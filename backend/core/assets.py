@@ -0,0 +1,89 @@
+"""
+Homly — Caché de recursos para PDFs
+===================================
+Recursos que los generadores de PDF (recibos, planes de pago, estados de
+cuenta) reconstruían en cada documento y que no cambian entre llamadas.
+Viven en memoria del proceso, así sirven igual en gunicorn, en el worker de
+ReportJob y en los procesos del ZIP masivo.
+
+- tenant_logo(tenant): logo del condominio leído de logo_file
+  (core/base64_files.py) y reducido a LOGO_MAX_PX, en PNG. La entrada se identifica
+  por tenant.updated_at: otro worker que guarde el condominio cambia la
+  versión aunque la señal post_save solo llegue a su propio proceso
+  (core/signals.py llama a invalidate_tenant para liberar la entrada).
+- pdf_style(name, **attrs): ParagraphStyle compartido. Los estilos son
+  inmutables una vez creados; los generadores no deben modificarlos.
+"""
+import functools
+import io
+import logging
+import threading
+
+from . import base64_files
+
+logger = logging.getLogger(__name__)
+
+# Lado mayor del logo en píxeles: 4.5 cm a 300 dpi ≈ 530 px
+LOGO_MAX_PX = 600
+
+_logos = {}
+_logos_lock = threading.Lock()
+
+
+def _decode_logo(tenant):
+    raw = base64_files.read_bytes(tenant, 'logo')
+    if not raw:
+        return None
+
+    from PIL import Image
+    img = Image.open(io.BytesIO(raw))
+    img.load()
+    if max(img.size) > LOGO_MAX_PX:
+        img.thumbnail((LOGO_MAX_PX, LOGO_MAX_PX))
+    if img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        img = img.convert('RGBA')
+    out = io.BytesIO()
+    img.save(out, format='PNG', optimize=True)
+    return out.getvalue()
+
+
+def tenant_logo(tenant):
+    """PNG reducido del logo del condominio, o None si no tiene (o no se puede leer)."""
+    version = getattr(tenant, 'updated_at', None)
+    key = str(tenant.id)
+    with _logos_lock:
+        cached = _logos.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    try:
+        logo = _decode_logo(tenant)
+    except Exception:
+        logger.warning('No se pudo leer el logo del condominio %s', key, exc_info=True)
+        logo = None
+    with _logos_lock:
+        _logos[key] = (version, logo)
+    return logo
+
+
+def preload_tenant_logo(tenant, logo):
+    """Guarda *logo* (de tenant_logo en otro proceso) como el logo actual de *tenant*."""
+    with _logos_lock:
+        _logos[str(tenant.id)] = (getattr(tenant, 'updated_at', None), logo)
+
+
+def invalidate_tenant(tenant_id):
+    with _logos_lock:
+        _logos.pop(str(tenant_id), None)
+
+
+def clear():
+    with _logos_lock:
+        _logos.clear()
+    pdf_style.cache_clear()
+
+
+@functools.lru_cache(maxsize=512)
+def pdf_style(name, **attrs):
+    """ParagraphStyle(name, **attrs) construido una sola vez por proceso."""
+    from reportlab.lib.styles import ParagraphStyle
+    return ParagraphStyle(name, **attrs)
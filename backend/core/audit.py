@@ -0,0 +1,241 @@
+"""
+Homly — Buffer de AuditLog
+==========================
+_audit_log (core/views.py) ya no crea un hilo y tres consultas por evento:
+solo agrega el registro a un buffer en memoria del proceso. El buffer se
+vacía con un único bulk_create cuando:
+
+- alcanza AUDIT_LOG_BUFFER_SIZE registros (en el hilo que agrega el último),
+- han pasado AUDIT_LOG_FLUSH_SECONDS desde el primer registro pendiente
+  (hilo de fondo, uno por proceso),
+- el worker de gunicorn termina (hook worker_exit de gunicorn.conf.py) o
+  cualquier otro proceso sale (atexit).
+
+Si el INSERT por lote falla se reintenta registro por registro: una FK
+colgante (usuario o condominio borrado entre el evento y el vaciado) se
+guarda sin la FK — los nombres ya van copiados en el registro — y solo se
+pierde el registro que siga fallando.
+
+El nombre del condominio y el rol del usuario se resuelven al vaciar, en
+una consulta por lote para los que no estén en un LRU pequeño con TTL. Si
+el request ya resolvió el rol (request.membership, core/membership.py),
+_audit_log lo pasa en 'tenant_role' y no se vuelve a consultar. Las
+señales de Tenant/TenantUser (core/signals.py) invalidan las entradas
+afectadas.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .models import AuditLog, Tenant, TenantUser, User
+
+logger = logging.getLogger(__name__)
+
+
+class _LRUCache:
+    """LRU acotado con expiración; seguro entre hilos."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Devuelve (encontrado, valor)."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return False, None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# tenant_id → nombre (None si el condominio ya no existe)
+tenant_names = _LRUCache(maxsize=256, ttl=300)
+# (tenant_id, user_id) → rol en el condominio (None si no es miembro)
+tenant_roles = _LRUCache(maxsize=2048, ttl=300)
+
+
+class AuditBuffer:
+
+    def __init__(self):
+        self._entries = []
+        self._first_at = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher = None
+
+    def add(self, entry):
+        """
+        entry: kwargs de AuditLog (tenant_id y user_id como str) más
+        'is_super_admin'; tenant_name y user_role se completan al vaciar.
+        """
+        with self._lock:
+            self._entries.append(entry)
+            if self._first_at is None:
+                self._first_at = time.monotonic()
+            full = len(self._entries) >= settings.AUDIT_LOG_BUFFER_SIZE
+        self._ensure_flusher()
+        if full:
+            self.flush()
+
+    def pending(self):
+        with self._lock:
+            return len(self._entries)
+
+    def flush(self):
+        """Escribe los registros pendientes. Nunca lanza excepciones."""
+        with self._lock:
+            entries, self._entries = self._entries, []
+            self._first_at = None
+        if not entries:
+            return 0
+        with self._flush_lock:
+            try:
+                rows = self._build_rows(entries)
+            except Exception:
+                logger.exception('No se pudieron guardar %s registros de auditoría', len(entries))
+                return 0
+            try:
+                with transaction.atomic():
+                    AuditLog.objects.bulk_create(rows)
+                return len(rows)
+            except Exception:
+                logger.warning('Falló el lote de %s registros de auditoría; se guardan uno por uno',
+                               len(rows), exc_info=True)
+            return self._save_each(rows)
+
+    def _save_each(self, rows):
+        saved = 0
+        for row in rows:
+            for retry in (False, True):
+                if retry:
+                    # Segundo intento sin FKs: los nombres ya están copiados en el registro
+                    row.tenant_id = row.user_id = None
+                try:
+                    with transaction.atomic():
+                        row.save(force_insert=True)
+                    saved += 1
+                    break
+                except Exception:
+                    if retry:
+                        logger.exception('Registro de auditoría descartado: %s', row.description[:200])
+        return saved
+
+    def _build_rows(self, entries):
+        names = {}
+        missing = set()
+        for tenant_id in {e['tenant_id'] for e in entries if e['tenant_id']}:
+            hit, name = tenant_names.get(tenant_id)
+            if hit:
+                names[tenant_id] = name
+            else:
+                missing.add(tenant_id)
+        if missing:
+            found = {
+                str(tenant_id): name
+                for tenant_id, name in Tenant.objects.filter(id__in=missing).values_list('id', 'name')
+            }
+            for tenant_id in missing:
+                names[tenant_id] = found.get(tenant_id)
+                tenant_names.set(tenant_id, names[tenant_id])
+
+        roles = {
+            (e['tenant_id'], e['user_id']): e['tenant_role']
+            for e in entries if e['tenant_id'] and e['user_id'] and 'tenant_role' in e
+        }
+        missing = set()
+        for pair in {(e['tenant_id'], e['user_id']) for e in entries if e['tenant_id'] and e['user_id']}:
+            if pair in roles:
+                continue
+            hit, role = tenant_roles.get(pair)
+            if hit:
+                roles[pair] = role
+            else:
+                missing.add(pair)
+        if missing:
+            found = {
+                (str(tenant_id), str(user_id)): role
+                for tenant_id, user_id, role in TenantUser.objects.filter(
+                    tenant_id__in={t for t, _ in missing},
+                    user_id__in={u for _, u in missing},
+                ).values_list('tenant_id', 'user_id', 'role')
+            }
+            for pair in missing:
+                roles[pair] = found.get(pair)
+                tenant_roles.set(pair, roles[pair])
+
+        # Usuarios sin rol conocido: pudieron borrarse después del evento
+        unknown = {e['user_id'] for e in entries if e['user_id']} - {u for (_t, u), r in roles.items() if r}
+        deleted_users = set(unknown)
+        if unknown:
+            deleted_users -= {str(pk) for pk in User.objects.filter(id__in=unknown).values_list('id', flat=True)}
+
+        rows = []
+        for entry in entries:
+            entry = dict(entry)
+            is_super_admin = entry.pop('is_super_admin', False)
+            entry.pop('tenant_role', None)
+            tenant_id = entry['tenant_id']
+            tenant_name = names.get(tenant_id) if tenant_id else None
+            if tenant_id and tenant_name is None:
+                # El condominio ya no existe: guardar el log sin FK
+                entry['tenant_id'] = None
+            if entry['user_id'] in deleted_users:
+                entry['user_id'] = None
+            user_role = ''
+            if entry['user_id']:
+                if tenant_id:
+                    user_role = roles.get((tenant_id, entry['user_id'])) or ('superadmin' if is_super_admin else '')
+                elif is_super_admin:
+                    user_role = 'superadmin'
+            rows.append(AuditLog(tenant_name=tenant_name or '', user_role=user_role, **entry))
+        return rows
+
+    def _ensure_flusher(self):
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name='audit-log-flusher', daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            interval = settings.AUDIT_LOG_FLUSH_SECONDS
+            time.sleep(min(interval, 1.0))
+            with self._lock:
+                due = self._first_at is not None and time.monotonic() - self._first_at >= interval
+            if due:
+                close_old_connections()
+                self.flush()
+
+
+audit_buffer = AuditBuffer()
+atexit.register(audit_buffer.flush)
@@ -0,0 +1,247 @@
+"""
+Homly — Contenido Base64 respaldado por FileField
+=================================================
+Logo del condominio, evidencias de unidades, pagos, gastos y caja chica y
+estados bancarios se guardaban como Base64 en columnas TEXT de tablas muy
+consultadas (TOAST de varios MB por fila). La API sigue recibiendo y
+devolviendo el mismo texto, pero el contenido vive en el FileField
+declarado en LEGACY_BASE64_FIELDS de cada modelo:
+
+    LEGACY_BASE64_FIELDS = {'logo': ('logo_file', 'data_url')}
+
+Formatos:
+- 'data_url': data:<mime>;base64,… (logo). El archivo guarda los bytes.
+- 'base64':   Base64 sin prefijo (PDFs de evidencia, estado bancario). El
+              archivo guarda los bytes.
+- 'text':     texto tal cual (listas JSON [{data, mime, name}] de
+              evidencias), en un .json.
+
+Las escrituras usan solo el archivo; la columna Base64 se deja vacía al
+escribir y el manager del modelo la difiere (LegacyBase64Manager). Los datos
+anteriores se copian con `python manage.py migrate_base64_to_files` después
+de `migrate` (0057 crea las columnas *_file). Mientras queden filas sin
+copiar, las lecturas de un registro sin archivo caen a la columna Base64
+(legacy_pending comprueba una vez por minuto si aún queda alguna).
+
+write_upload() guarda archivos subidos por multipart (core/uploads.py) sin
+pasar el contenido completo por memoria.
+"""
+import base64
+import binascii
+import json
+import logging
+import mimetypes
+import tempfile
+import time
+import uuid
+
+from django.core.files.base import ContentFile, File
+from django.db import transaction
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+
+def spec(model, legacy_field):
+    """(nombre del FileField, formato) de una columna Base64 deprecada."""
+    return model.LEGACY_BASE64_FIELDS[legacy_field]
+
+
+MIME_TYPES = {
+    '.pdf': 'application/pdf',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+}
+
+# Trozo de lectura al codificar subidas: múltiplo de 3 para que el Base64 de
+# cada trozo se pueda concatenar sin relleno intermedio
+ENCODE_CHUNK = 3 * 64 * 1024
+
+
+def guess_extension(raw, default='.bin'):
+    """Extensión por magic bytes."""
+    if raw[:4] == b'%PDF':
+        return '.pdf'
+    if raw[:8] == b'\x89PNG\r\n\x1a\n':
+        return '.png'
+    if raw[:3] == b'\xff\xd8\xff':
+        return '.jpg'
+    if raw[:6] in (b'GIF87a', b'GIF89a'):
+        return '.gif'
+    if raw[:4] == b'RIFF' and raw[8:12] == b'WEBP':
+        return '.webp'
+    return default
+
+
+def decode(value, fmt):
+    """
+    Texto de la API → (bytes, extensión) a guardar, o (None, '') si está vacío.
+    Lanza ValueError si el Base64 no es válido.
+    """
+    value = (value or '').strip()
+    if not value:
+        return None, ''
+    if fmt == 'text':
+        return value.encode('utf-8'), '.json' if value.startswith('[') else '.txt'
+    if value.startswith('data:') and ',' in value:
+        value = value.split(',', 1)[1]
+    try:
+        raw = base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f'Base64 inválido: {e}') from None
+    return raw, guess_extension(raw)
+
+
+def encode(raw, fmt, name=''):
+    """Bytes del archivo → texto de la API."""
+    if fmt == 'text':
+        try:
+            return raw.decode('utf-8')
+        except UnicodeDecodeError:
+            # Imagen/PDF suelto (ImageField anterior a 0057 o la versión previa
+            # del comando de migración): se devuelve como lista de un elemento
+            ext = guess_extension(raw)
+            return json.dumps([{
+                'data': base64.b64encode(raw).decode('ascii'),
+                'mime': MIME_TYPES.get(ext, 'application/octet-stream'),
+                'name': name.rsplit('/', 1)[-1] or 'Evidencia adjunta',
+            }])
+    b64 = base64.b64encode(raw).decode('ascii')
+    if fmt == 'data_url':
+        mime = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        return f'data:{mime};base64,{b64}'
+    return b64
+
+
+# Segundos entre comprobaciones de filas pendientes de migrar por columna
+LEGACY_CHECK_SECONDS = 60
+
+# (modelo, columna) → (pendientes, monotonic de la comprobación); False es definitivo
+_legacy_pending = {}
+
+
+def legacy_pending(model, legacy_field):
+    """True si alguna fila tiene la columna Base64 llena y el archivo vacío."""
+    key = (model, legacy_field)
+    pending, checked = _legacy_pending.get(key, (True, None))
+    if not pending:
+        return False
+    if checked is None or time.monotonic() - checked > LEGACY_CHECK_SECONDS:
+        file_field, _fmt = spec(model, legacy_field)
+        pending = model._base_manager.filter(
+            Q(**{f'{file_field}__isnull': True}) | Q(**{file_field: ''}),
+            **{f'{legacy_field}__gt': ''},
+        ).exists()
+        _legacy_pending[key] = (pending, time.monotonic())
+    return pending
+
+
+def read_legacy(instance, legacy_field):
+    """Texto de la columna Base64 de un registro aún sin migrar ('' si no hay)."""
+    model = type(instance)
+    if instance.pk is None or not legacy_pending(model, legacy_field):
+        return ''
+    if legacy_field not in instance.get_deferred_fields():
+        return getattr(instance, legacy_field) or ''
+    value = model._base_manager.filter(pk=instance.pk).values_list(legacy_field, flat=True).first()
+    return value or ''
+
+
+def has(instance, legacy_field):
+    file_field, _fmt = spec(type(instance), legacy_field)
+    return bool(getattr(instance, file_field)) or bool(read_legacy(instance, legacy_field))
+
+
+def read_bytes(instance, legacy_field):
+    """Bytes guardados, o None si no hay archivo (o no se puede leer)."""
+    file_field, fmt = spec(type(instance), legacy_field)
+    field_file = getattr(instance, file_field)
+    if not field_file:
+        try:
+            raw, _ext = decode(read_legacy(instance, legacy_field), fmt)
+        except ValueError:
+            return None
+        return raw
+    try:
+        with field_file.open('rb') as fh:
+            return fh.read()
+    except (FileNotFoundError, OSError):
+        logger.warning('Archivo %s de %s %s no encontrado', field_file.name, type(instance).__name__, instance.pk)
+        return None
+
+
+def read(instance, legacy_field):
+    """Texto para la API ('' si no hay archivo)."""
+    file_field, fmt = spec(type(instance), legacy_field)
+    field_file = getattr(instance, file_field)
+    if not field_file:
+        # La columna Base64 guarda el texto de la API tal cual
+        return read_legacy(instance, legacy_field)
+    raw = read_bytes(instance, legacy_field)
+    if raw is None:
+        return ''
+    return encode(raw, fmt, field_file.name)
+
+
+def _store(instance, legacy_field, content, ext):
+    file_field, _fmt = spec(type(instance), legacy_field)
+    field_file = getattr(instance, file_field)
+    old_name = field_file.name if field_file else ''
+    if content is None:
+        setattr(instance, file_field, None)
+    else:
+        prefix = type(instance).__name__.lower()
+        field_file.save(f'{prefix}_{instance.pk}_{uuid.uuid4().hex[:8]}{ext}', content, save=False)
+    setattr(instance, legacy_field, '')
+    if old_name:
+        storage = field_file.storage
+        transaction.on_commit(lambda: storage.delete(old_name))
+    return [file_field, legacy_field]
+
+
+def write(instance, legacy_field, value):
+    """
+    Guarda *value* (texto de la API) en el FileField sin guardar la instancia
+    y vacía la columna Base64. El archivo anterior se elimina al confirmar la
+    transacción. Devuelve los campos modificados (para update_fields).
+    """
+    _file_field, fmt = spec(type(instance), legacy_field)
+    raw, ext = decode(value, fmt)
+    return _store(instance, legacy_field, None if raw is None else ContentFile(raw), ext)
+
+
+def _evidence_list_file(uploads):
+    """Lista JSON [{data, mime, name}] de *uploads*, codificada por trozos en un temporal."""
+    out = tempfile.SpooledTemporaryFile(max_size=ENCODE_CHUNK * 4)
+    out.write(b'[')
+    for i, (upload, ext) in enumerate(uploads):
+        if i:
+            out.write(b', ')
+        out.write(b'{"data": "')
+        upload.seek(0)
+        while True:
+            chunk = upload.read(ENCODE_CHUNK)
+            if not chunk:
+                break
+            out.write(base64.b64encode(chunk))
+        meta = {'mime': MIME_TYPES.get(ext, 'application/octet-stream'), 'name': upload.name}
+        out.write(('", ' + json.dumps(meta)[1:]).encode('ascii'))
+    out.write(b']')
+    out.seek(0)
+    return File(out)
+
+
+def write_upload(instance, legacy_field, uploads):
+    """
+    Como write(), pero con archivos subidos por multipart: [(UploadedFile, ext)]
+    ya validados. En formato 'text' reemplaza la lista de evidencias con los
+    archivos subidos; en los demás formatos guarda el único archivo tal cual.
+    """
+    _file_field, fmt = spec(type(instance), legacy_field)
+    if fmt == 'text':
+        return _store(instance, legacy_field, _evidence_list_file(uploads), '.json')
+    upload, ext = uploads[0]
+    upload.seek(0)
+    return _store(instance, legacy_field, upload, ext)
@@ -0,0 +1,151 @@
+"""
+Homly — Cola persistente de correos salientes (OutboundEmail)
+=============================================================
+Las notificaciones ya no se envían desde un hilo por evento: se guardan
+renderizadas en outbound_emails dentro del mismo request y el worker
+`python manage.py send_outbound_emails` las envía por lotes, una conexión
+SMTP por lote (get_connection + send_messages).
+
+- Un correo que falla vuelve a 'pending' con next_attempt_at exponencial
+  (OUTBOUND_EMAIL_BACKOFF_SECONDS · 2^(intentos-1), máx. 1 h) hasta
+  OUTBOUND_EMAIL_MAX_ATTEMPTS; después queda 'failed'.
+- Los lotes se toman con SELECT … FOR UPDATE SKIP LOCKED: varios workers
+  pueden drenar la cola sin enviar dos veces el mismo correo.
+- throughput_by_tenant() resume enviados/fallidos/pendientes y la demora
+  media por condominio (`send_outbound_emails --stats`).
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+# Un lote 'sending' más antiguo que esto pertenece a un worker caído
+STALE_SENDING_SECONDS = 600
+MAX_BACKOFF_SECONDS = 3600
+
+
+def queue_notification_emails(tenant, recipients, notif_type, title, message=''):
+    """
+    Encola el correo de una notificación para cada (email, user_name) de
+    *recipients*. Devuelve cuántos correos se encolaron.
+    """
+    from .email_service import build_notification_email
+    tenant_name = tenant.name if tenant else ''
+    rows = []
+    for email, user_name in recipients:
+        subject, plain, html = build_notification_email(user_name, notif_type, title, message, tenant_name)
+        rows.append(OutboundEmail(
+            tenant=tenant,
+            category=notif_type,
+            to_email=email,
+            subject=subject[:300],
+            plain_body=plain,
+            html_body=html,
+        ))
+    OutboundEmail.objects.bulk_create(rows)
+    return len(rows)
+
+
+def claim_email_batch(limit=None):
+    """Toma hasta *limit* correos vencidos y los marca 'sending'."""
+    limit = limit or settings.OUTBOUND_EMAIL_BATCH_SIZE
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        OutboundEmail.objects.filter(id__in=ids).update(
+            status='sending', locked_at=now, attempts=F('attempts') + 1,
+        )
+    return list(OutboundEmail.objects.filter(id__in=ids).order_by('next_attempt_at'))
+
+
+def send_email_batch(batch):
+    """Envía un lote tomado con claim_email_batch. Devuelve (enviados, reintentos, fallidos)."""
+    from .email_service import send_branded_batch
+    if not batch:
+        return 0, 0, 0
+    results = send_branded_batch([
+        {
+            'subject': mail.subject,
+            'plain': mail.plain_body,
+            'html': mail.html_body,
+            'to_emails': [mail.to_email],
+        }
+        for mail in batch
+    ])
+
+    now = timezone.now()
+    sent_ids, retry, failed = [], [], []
+    for mail, (ok, error) in zip(batch, results):
+        if ok:
+            sent_ids.append(mail.id)
+            continue
+        mail.last_error = error[:2000]
+        mail.locked_at = None
+        if mail.attempts >= settings.OUTBOUND_EMAIL_MAX_ATTEMPTS:
+            mail.status = 'failed'
+            failed.append(mail)
+        else:
+            delay = min(settings.OUTBOUND_EMAIL_BACKOFF_SECONDS * 2 ** (mail.attempts - 1), MAX_BACKOFF_SECONDS)
+            mail.status = 'pending'
+            mail.next_attempt_at = now + timedelta(seconds=delay)
+            retry.append(mail)
+
+    if sent_ids:
+        OutboundEmail.objects.filter(id__in=sent_ids).update(
+            status='sent', sent_at=now, locked_at=None, last_error='',
+        )
+    if retry or failed:
+        OutboundEmail.objects.bulk_update(
+            retry + failed, ['status', 'next_attempt_at', 'locked_at', 'last_error'],
+        )
+    return len(sent_ids), len(retry), len(failed)
+
+
+def requeue_stale_emails():
+    """Devuelve a 'pending' los correos 'sending' de un worker que murió a mitad de lote."""
+    limit = timezone.now() - timedelta(seconds=STALE_SENDING_SECONDS)
+    return OutboundEmail.objects.filter(status='sending', locked_at__lt=limit).update(
+        status='pending', locked_at=None,
+    )
+
+
+def purge_sent_emails():
+    """Elimina correos enviados más antiguos que OUTBOUND_EMAIL_RETENTION_DAYS."""
+    limit = timezone.now() - timedelta(days=settings.OUTBOUND_EMAIL_RETENTION_DAYS)
+    deleted, _ = OutboundEmail.objects.filter(status='sent', sent_at__lt=limit).delete()
+    return deleted
+
+
+def throughput_by_tenant(since):
+    """
+    Métricas por condominio de los correos creados desde *since*:
+    [{tenant_id, tenant__name, sent, pending, failed, avg_delay}], avg_delay
+    = demora media entre encolar y enviar.
+    """
+    delay = ExpressionWrapper(F('sent_at') - F('created_at'), output_field=DurationField())
+    return list(
+        OutboundEmail.objects.filter(created_at__gte=since)
+        .values('tenant_id', 'tenant__name')
+        .annotate(
+            sent=Count('id', filter=Q(status='sent')),
+            pending=Count('id', filter=Q(status__in=['pending', 'sending'])),
+            failed=Count('id', filter=Q(status='failed')),
+            avg_delay=Avg(delay, filter=Q(status='sent')),
+        )
+        .order_by('-sent')
+    )
@@ -5,6 +5,8 @@ Styled HTML email with Homly logo (Homly_Full.png) and brand colors (naranja, cr
 Logo is attached as inline MIME (cid:) inside a multipart/related container so it
 displays correctly in ALL major clients: Gmail, Outlook, Hotmail, Yahoo, AOL, etc.
 """
+import base64
+import functools
 import logging
 import os
 
@@ -39,8 +41,9 @@ EMAIL_ASSETS_DIR = os.path.join(os.path.dirname(__file__), 'email_assets')
 LOGO_CID = 'homlylogo'
 
 
+@functools.lru_cache(maxsize=8)
 def _read_logo_bytes(filename: str) -> bytes | None:
-    """Read logo file from email_assets. Returns None if missing."""
+    """Read logo file from email_assets (once per process). Returns None if missing."""
     path = os.path.join(EMAIL_ASSETS_DIR, filename)
     if not os.path.isfile(path):
         return None
@@ -439,6 +442,18 @@ def _fmt_amount(amount, symbol='$') -> str:
     return f'{symbol}{n:,.0f}'
 
 
+@functools.lru_cache(maxsize=8)
+def _base64_body(data: bytes) -> str:
+    return base64.encodebytes(data).decode('ascii')
+
+
+def _encode_base64_cached(data, part):
+    """MIME encoder for the inline logo: the same bytes are encoded once per process,
+    not once per message (bulk sends attach the logo to every email)."""
+    part.set_payload(_base64_body(data))
+    part['Content-Transfer-Encoding'] = 'base64'
+
+
 def _make_mime_message(
     subject: str,
     plain: str,
@@ -487,7 +502,7 @@ def _make_mime_message(
     if logo_data:
         related = SafeMIMEMultipart('related')
         related.attach(alt)
-        logo_part = MIMEImage(logo_data, 'png')
+        logo_part = MIMEImage(logo_data, 'png', _encoder=functools.partial(_encode_base64_cached, logo_data))
         logo_part.add_header('Content-Disposition', 'inline', filename='homly-full.png')
         logo_part.add_header('Content-ID', f'<{LOGO_CID}>')
         related.attach(logo_part)
@@ -524,21 +539,79 @@ def _make_mime_message(
     return payload
 
 
+class _RawMIMEWrapper(EmailMessage):
+    """Thin EmailMessage subclass that returns a pre-built MIME object."""
+    def __init__(self, raw_mime, from_addr, recipients, connection=None):
+        super().__init__(from_email=from_addr, to=recipients, connection=connection)
+        self._raw_mime = raw_mime
+
+    def message(self):
+        return self._raw_mime
+
+
 def _dispatch_mime(mime_msg, from_email: str, all_recipients: list[str]) -> bool:
     """Send a pre-built MIME message through Django's configured email backend.
     Works with any backend: SMTP, console, locmem, etc."""
+    wrapper = _RawMIMEWrapper(mime_msg, from_email, all_recipients)
+    return bool(wrapper.send(fail_silently=False))
 
-    class _RawMIMEWrapper(EmailMessage):
-        """Thin EmailMessage subclass that returns a pre-built MIME object."""
-        def __init__(self, raw_mime, from_addr, recipients):
-            super().__init__(from_email=from_addr, to=recipients)
-            self._raw_mime = raw_mime
 
-        def message(self):
-            return self._raw_mime
+def send_branded_batch(messages: list[dict], connection=None) -> list[tuple[bool, str]]:
+    """Send several branded emails over a single backend connection.
 
-    wrapper = _RawMIMEWrapper(mime_msg, from_email, all_recipients)
-    return bool(wrapper.send(fail_silently=False))
+    Each item: {'subject', 'plain', 'html', 'to_emails', 'from_email' (optional),
+    'pdf_attachment' (optional, (filename, bytes, mimetype))}.
+    Returns one (ok, error) tuple per item, in order. A failed message does not
+    abort the batch: the connection is reopened and the next message is tried.
+    Pass an open *connection* to reuse it across batches (the caller closes it).
+    Used by the outbound email queue (core/email_queue.py) and the statement
+    campaigns (core/jobs.py).
+    """
+    logo_data = _read_logo_bytes('homly-full.png')
+    results = []
+    owns_connection = connection is None
+    if owns_connection:
+        connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        for item in messages:
+            from_email = item.get('from_email') or _get_noreply()
+            try:
+                mime = _make_mime_message(
+                    subject=item['subject'],
+                    plain=item['plain'],
+                    html=item['html'],
+                    from_email=from_email,
+                    to_emails=item['to_emails'],
+                    logo_data=logo_data,
+                    pdf_attachment=item.get('pdf_attachment'),
+                )
+                wrapper = _RawMIMEWrapper(mime, from_email, list(item['to_emails']), connection=connection)
+                sent = connection.send_messages([wrapper])
+                results.append((bool(sent), '' if sent else 'El backend no envió el mensaje.'))
+            except Exception as e:
+                logger.warning('Error sending queued email to %s: %s', item.get('to_emails'), e)
+                results.append((False, f'{type(e).__name__}: {e}'))
+                # La conexión puede haber quedado inutilizable: reabrir para el resto del lote
+                try:
+                    connection.close()
+                    connection.open()
+                except Exception as reopen_error:
+                    error = f'{type(reopen_error).__name__}: {reopen_error}'
+                    results.extend((False, error) for _ in messages[len(results):])
+                    break
+    except Exception as e:
+        # No se pudo abrir la conexión: todo el lote queda pendiente de reintento
+        logger.warning('Error opening email connection: %s', e)
+        error = f'{type(e).__name__}: {e}'
+        results.extend((False, error) for _ in messages[len(results):])
+    finally:
+        if owns_connection:
+            try:
+                connection.close()
+            except Exception:
+                pass
+    return results
 
 
 def _get_noreply() -> str:
@@ -815,6 +888,32 @@ def send_unit_statement_email(
     pdf_attachment: tuple | None = None,   # (filename, bytes, 'application/pdf')
 ) -> bool:
     """Send a branded unit estado de cuenta email, optionally with a PDF attachment."""
+    subject, plain, html = build_unit_statement_email(
+        tenant_name, unit_code, unit_name, responsible, period_from, period_to,
+        rows, total_charges, total_paid, balance,
+    )
+    return _send_branded_email(
+        subject=subject,
+        plain=plain,
+        html=html,
+        to_emails=emails,
+        pdf_attachment=pdf_attachment,
+    )
+
+
+def build_unit_statement_email(
+    tenant_name: str,
+    unit_code: str,
+    unit_name: str,
+    responsible: str,
+    period_from: str,
+    period_to: str,
+    rows: list[dict],   # [{period, charges, paid, balance, status}]
+    total_charges: float,
+    total_paid: float,
+    balance: float,
+) -> tuple[str, str, str]:
+    """Render the unit estado de cuenta email. Returns (subject, plain, html)."""
     c = COLORS
     logo_img = f'<img src="cid:{LOGO_CID}" alt="Homly" width="150" style="display:block;height:auto;max-width:150px;" />'
 
@@ -956,14 +1055,7 @@ def send_unit_statement_email(
         f'Saldo: {fmt(balance)}\n\n'
         f'© Homly — La administración que tu hogar se merece'
     )
-
-    return _send_branded_email(
-        subject=f'Estado de Cuenta — {unit_code} | {tenant_name}',
-        plain=plain,
-        html=html,
-        to_emails=emails,
-        pdf_attachment=pdf_attachment,
-    )
+    return f'Estado de Cuenta — {unit_code} | {tenant_name}', plain, html
 
 
 # ─── General Statement Email ────────────────────────────────────────────────
@@ -1258,6 +1350,18 @@ def send_notification_email(
 
     Returns True on success, False if the send failed.
     """
+    subject, plain, html = build_notification_email(user_name, notif_type, title, message, tenant_name)
+    return _send_branded_email(subject=subject, plain=plain, html=html, to_emails=[email])
+
+
+def build_notification_email(
+    user_name: str,
+    notif_type: str,
+    title: str,
+    message: str,
+    tenant_name: str = '',
+) -> tuple[str, str, str]:
+    """Render a notification alert email. Returns (subject, plain, html)."""
     app_url  = getattr(settings, 'HOMLY_APP_URL',      'https://homly.com.mx/login')
     _, type_label, _ = NOTIF_META.get(notif_type, NOTIF_META['general'])
     subject  = f'{type_label} — {title}'
@@ -1272,7 +1376,7 @@ def send_notification_email(
         f'© Homly — La administración que tu hogar se merece'
     )
     html = _build_notification_html(user_name, notif_type, title, message, tenant_name, app_url)
-    return _send_branded_email(subject=subject, plain=plain, html=html, to_emails=[email])
+    return subject, plain, html
 
 
 # ═══════════════════════════════════════════════════════════
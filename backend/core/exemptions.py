@@ -0,0 +1,64 @@
+"""
+Homly — Exenciones de mantenimiento por cargo de la mesa directiva
+==================================================================
+Un solo cálculo para estado de cuenta, dashboard, recibos, PDFs, correos y
+la API (PaymentSerializer.maintenance_exempt, payments/exempt-units/), para
+que el frontend no vuelva a deducir la exención de Unit.admin_exempt.
+"""
+from .models import AssemblyPosition, Unit
+
+
+class ExemptionCalendar:
+    """
+    Exenciones de mantenimiento por unidad y período (mesa directiva), resueltas
+    en memoria a partir de Unit.admin_exempt y los cargos vigentes de
+    AssemblyPosition (con su comité). Se construye una vez por request con
+    for_tenant() y la comparten estado de cuenta, dashboard, PDFs y correos.
+
+    Una unidad está exenta en un período cuando el tenant es mesa_directiva,
+    la unidad tiene admin_exempt y ocupa un cargo activo cuyo rango
+    start_date..end_date (YYYY-MM, vacío = abierto) incluye el período.
+    El comité del cargo no cambia el resultado: un cargo vigente exenta
+    con o sin comité marcado con `exemption`.
+    """
+
+    def __init__(self, enabled=False, positions=None):
+        self.enabled = enabled
+        self.positions = positions or {}    # unit_id → [(start_date, end_date)]
+
+    @classmethod
+    def for_tenant(cls, tenant, units=None):
+        """units: Unit ya cargadas del tenant (evita consultar admin_exempt)."""
+        if getattr(tenant, 'admin_type', None) != 'mesa_directiva':
+            return cls()
+        if units is None:
+            flagged = {
+                str(uid) for uid in
+                Unit.objects.filter(tenant_id=tenant.id, admin_exempt=True).values_list('id', flat=True)
+            }
+        else:
+            flagged = {str(u.id) for u in units if u.admin_exempt}
+        positions = {}
+        if flagged:
+            for pos in AssemblyPosition.objects.filter(
+                tenant_id=tenant.id, active=True, holder_unit_id__in=flagged,
+            ).values('holder_unit_id', 'start_date', 'end_date'):
+                positions.setdefault(str(pos['holder_unit_id']), []).append(
+                    (pos['start_date'], pos['end_date'])
+                )
+        return cls(enabled=True, positions=positions)
+
+    def is_exempt(self, unit_id, period):
+        if not self.enabled:
+            return False
+        for start_date, end_date in self.positions.get(str(unit_id), ()):
+            if start_date and period < start_date:
+                continue
+            if end_date and period > end_date:
+                continue
+            return True
+        return False
+
+    def exempt_unit_ids(self, period):
+        """IDs (str) de las unidades exentas en *period*."""
+        return {uid for uid in self.positions if self.is_exempt(uid, period)}
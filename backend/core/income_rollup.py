@@ -0,0 +1,318 @@
+"""
+Homly — Totales de ingresos y egresos por período
+=================================================
+El reporte general recorría cada pago del período con sus field_payments,
+adelantos, cobros de adeudo y el JSON additional_payments,
+separando centavos con ROUND_FLOOR monto por monto; el saldo inicial lo
+repetía para cada período abierto anterior. PeriodIncomeRollup guarda ese
+resultado por (condominio, período, concepto, conciliado):
+
+    mantenimiento · maint_adelanto · adeudo · referenciados
+    campo:<field_key>      campos de cobranza adicionales
+    no_identificados       UnrecognizedIncome
+    egresos                GastoEntry (conciliado = egreso, no = cheque en tránsito)
+    pagos                  total por pago (count = pagos); se escribe siempre
+                           y marca el período como calculado
+
+Los cobros de adeudo y los adelantos se leen por pago de AdeudoAllocation y
+AdelantoCredit (adeudo_by_payment, adelantos_by_payment) en lugar de recorrer
+los JSON adeudo_payments y adelanto_targets.
+
+Las escrituras de Payment, FieldPayment, GastoEntry y UnrecognizedIncome
+marcan su (condominio, período) en un único hook on_commit por transacción
+(core/signals.py) que borra las filas al confirmarla. La captura de un pago
+son varias escrituras (pago, cada campo, estatus), así que el período se
+borra una vez y se recalcula en la siguiente lectura (totals), no en cada
+escritura.
+
+Las lecturas no bloquean nada: si mientras se reconstruía un período se
+confirmó otra escritura del condominio (cambió su versión de datos,
+core/result_cache.py), las filas recién escritas se vuelven a borrar.
+Reconstrucciones simultáneas del mismo período chocan en la clave única de
+las filas y la segunda descarta las suyas.
+"""
+from collections import defaultdict
+from decimal import ROUND_FLOOR, Decimal
+
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q, Sum
+
+from .models import (
+    AdelantoCredit, AdeudoAllocation, FieldPayment, GastoEntry, Payment, PeriodIncomeRollup, UnrecognizedIncome,
+)
+from .result_cache import get_versions
+
+MANTENIMIENTO = 'mantenimiento'
+MAINT_ADELANTO = 'maint_adelanto'
+ADEUDO = 'adeudo'
+REFERENCIADOS = 'referenciados'
+NO_IDENTIFICADOS = 'no_identificados'
+EGRESOS = 'egresos'
+PAGOS = 'pagos'
+CAMPO = 'campo:'
+
+ZERO = Decimal('0')
+
+
+def _split_cents(amount):
+    """(parte entera, centavos) para los ingresos referenciados; (monto, 0) si no hay centavos."""
+    whole = amount.quantize(Decimal('1'), rounding=ROUND_FLOOR)
+    cents = amount - whole
+    if cents > Decimal('0.001'):
+        return whole, cents
+    return amount, ZERO
+
+
+def adeudo_by_payment(**filters):
+    """
+    {payment_id: (cobrado, total)} de AdeudoAllocation filtrado por *filters*:
+    cobrado suma solo los montos positivos (reporte), total todos.
+    """
+    rows = (
+        AdeudoAllocation.objects.filter(**filters)
+        .values('payment_id')
+        .annotate(received=Sum('amount', filter=Q(amount__gt=0)), total=Sum('amount'))
+        .order_by()
+    )
+    return {r['payment_id']: (r['received'] or ZERO, r['total'] or ZERO) for r in rows}
+
+
+def adelantos_by_payment(**filters):
+    """{payment_id: {field_key: [monto, ...]}} de AdelantoCredit filtrado por *filters*."""
+    out = {}
+    rows = AdelantoCredit.objects.filter(**filters).values_list('payment_id', 'field_key', 'amount')
+    for payment_id, field_key, amount in rows:
+        out.setdefault(payment_id, {}).setdefault(field_key, []).append(amount)
+    return out
+
+
+def field_payments_prefetch():
+    """field_payments sin el JSON adelanto_targets (los adelantos vienen de AdelantoCredit)."""
+    return Prefetch(
+        'field_payments',
+        queryset=FieldPayment.objects.only('id', 'payment_id', 'field_key', 'received'),
+    )
+
+
+def payment_total_income(pay, adeudo_total=ZERO, adelantos=None):
+    """Total income from payment (field_payments + adelantos + adeudos cobrados + additional_payments)."""
+    total = adeudo_total
+    for fp in pay.field_payments.all():
+        total += Decimal(str(fp.received or 0))
+    for amounts in (adelantos or {}).values():
+        total += sum(amounts, ZERO)
+    for ap_entry in (pay.additional_payments or []):
+        fp = ap_entry.get('field_payments') or ap_entry.get('fieldPayments') or {}
+        for v in fp.values():
+            rec = v.get('received', v) if isinstance(v, dict) else v
+            total += Decimal(str(rec or 0))
+    return total
+
+
+def payment_parts(pay, adeudo_received=ZERO, adelantos=None):
+    """
+    Ingresos de un pago por concepto (mismo desglose que el reporte general).
+    adelantos: {field_key: [monto, ...]} del pago (adelantos_by_payment).
+    """
+    parts = defaultdict(Decimal)
+
+    def _add_split(concept, amount):
+        whole, cents = _split_cents(amount)
+        parts[concept] += whole
+        if cents:
+            parts[REFERENCIADOS] += cents
+
+    fp_map = {fp.field_key: fp for fp in pay.field_payments.all()}
+    adelantos = adelantos or {}
+
+    # Mantenimiento y pagos adelantados de mantenimiento
+    maint = fp_map.get('maintenance')
+    if maint:
+        rec = Decimal(str(maint.received or 0))
+        if rec > 0:
+            _add_split(MANTENIMIENTO, rec)
+    for a in adelantos.get('maintenance', ()):
+        if a > 0:
+            _add_split(MAINT_ADELANTO, a)
+
+    # Campos de cobranza adicionales (sus adelantos no separan centavos)
+    for fk, fp in fp_map.items():
+        if fk == 'maintenance':
+            continue
+        rec = Decimal(str(fp.received or 0))
+        if rec > 0:
+            _add_split(CAMPO + fk, rec)
+    for fk, amounts in adelantos.items():
+        if fk == 'maintenance':
+            continue
+        for a in amounts:
+            if a > 0:
+                parts[CAMPO + fk] += a
+
+    # Cobros de adeudos de períodos anteriores (NO a mantenimiento)
+    if adeudo_received > 0:
+        parts[ADEUDO] += adeudo_received
+
+    # Pagos adicionales (igual que HTML: cuando main está conciliado, incluir adicionales)
+    for ap_entry in (pay.additional_payments or []):
+        if not pay.bank_reconciled and not ap_entry.get('bank_reconciled', True):
+            continue
+        fp_a = ap_entry.get('field_payments') or ap_entry.get('fieldPayments') or {}
+        for f_id, fd in fp_a.items():
+            a = Decimal(str((fd or {}).get('received', 0) or 0))
+            if a <= 0:
+                continue
+            if f_id == 'maintenance':
+                _add_split(MANTENIMIENTO, a)
+            else:
+                parts[CAMPO + f_id] += a
+    return parts
+
+
+def _build(tenant_id, periods):
+    """Filas de PeriodIncomeRollup de *periods* calculadas desde los movimientos."""
+    acc = {}
+    for period in periods:
+        acc[period] = defaultdict(lambda: [ZERO, 0])
+        # Siempre presentes: marcan el período como calculado (ver totals)
+        acc[period][(PAGOS, True)] = [ZERO, 0]
+        acc[period][(PAGOS, False)] = [ZERO, 0]
+
+    payments = (
+        Payment.objects.lean(
+            'id', 'period', 'bank_reconciled', 'additional_payments',
+        )
+        .filter(tenant_id=tenant_id, period__in=periods)
+        .prefetch_related(field_payments_prefetch())
+    )
+    adeudos = adeudo_by_payment(tenant_id=tenant_id, period__in=periods)
+    adelantos = adelantos_by_payment(tenant_id=tenant_id, period__in=periods)
+    for pay in payments:
+        flag = bool(pay.bank_reconciled)
+        totals = acc[pay.period]
+        adeudo_received, adeudo_total = adeudos.get(pay.id, (ZERO, ZERO))
+        pay_adelantos = adelantos.get(pay.id)
+        total = payment_total_income(pay, adeudo_total, pay_adelantos)
+        # Conciliados: todos los pagos; no conciliados: solo los que tienen ingreso
+        if flag or total > 0:
+            totals[(PAGOS, flag)][0] += total
+            totals[(PAGOS, flag)][1] += 1
+        for concept, amount in payment_parts(pay, adeudo_received, pay_adelantos).items():
+            totals[(concept, flag)][0] += amount
+            totals[(concept, flag)][1] += 1
+
+    for model, concept in ((GastoEntry, EGRESOS), (UnrecognizedIncome, NO_IDENTIFICADOS)):
+        rows = (
+            model.objects.filter(tenant_id=tenant_id, period__in=periods, amount__gt=0)
+            .values('period', 'bank_reconciled')
+            .annotate(total=Sum('amount'), n=Count('id'))
+        )
+        for row in rows:
+            acc[row['period']][(concept, row['bank_reconciled'])] = [row['total'], row['n']]
+
+    entries = []
+    for period, totals in acc.items():
+        for (concept, flag), (amount, count) in totals.items():
+            entries.append(PeriodIncomeRollup(
+                tenant_id=tenant_id, period=period, concept=concept,
+                bank_reconciled=flag, amount=amount, count=count,
+            ))
+    return entries
+
+
+def _discard_if_changed(tenant_id, periods, version):
+    # Una escritura confirmada durante el cálculo: las filas pueden ser anteriores a ella
+    if get_versions(tenant_id) != version:
+        _delete(tenant_id, periods)
+
+
+def rebuild(tenant_id, periods):
+    """Recalcula y guarda *periods*; devuelve las filas calculadas."""
+    periods = sorted(set(periods))
+    if not periods:
+        return []
+    version = get_versions(tenant_id)
+    with transaction.atomic():
+        entries = _build(tenant_id, periods)
+        PeriodIncomeRollup.objects.filter(tenant_id=tenant_id, period__in=periods).delete()
+        PeriodIncomeRollup.objects.bulk_create(entries, batch_size=1000, ignore_conflicts=True)
+    transaction.on_commit(lambda: _discard_if_changed(tenant_id, periods, version))
+    return entries
+
+
+def totals(tenant_id, periods):
+    """
+    {período: {(concepto, conciliado): (monto, count)}}. Los períodos sin
+    filas se calculan y guardan en esta misma lectura.
+    """
+    periods = list(periods)
+    out = {p: {} for p in periods}
+    rows = PeriodIncomeRollup.objects.filter(tenant_id=tenant_id, period__in=periods).values_list(
+        'period', 'concept', 'bank_reconciled', 'amount', 'count',
+    )
+    for period, concept, flag, amount, count in rows:
+        out[period][(concept, flag)] = (amount, count)
+    # 'pagos' se escribe siempre: sin esa fila el período no está calculado
+    missing = [p for p in periods if (PAGOS, True) not in out[p]]
+    for entry in rebuild(tenant_id, missing):
+        out[entry.period][(entry.concept, entry.bank_reconciled)] = (entry.amount, entry.count)
+    return out
+
+
+def reconciled_income(period_totals):
+    """Ingresos conciliados del período: lo que entra al banco en el reporte general."""
+    income = ZERO
+    for (concept, flag), (amount, _count) in period_totals.items():
+        if concept == NO_IDENTIFICADOS or (flag and concept not in (PAGOS, EGRESOS)):
+            income += amount
+    return income
+
+
+def bank_movements(tenant_id, periods):
+    """{período: (ingresos conciliados, egresos conciliados)} para la cadena de saldos."""
+    return {
+        period: (reconciled_income(t), t.get((EGRESOS, True), (ZERO, 0))[0])
+        for period, t in totals(tenant_id, periods).items()
+    }
+
+
+def _delete(tenant_id, periods):
+    PeriodIncomeRollup.objects.filter(tenant_id=tenant_id, period__in=periods).delete()
+
+
+class _PendingInvalidation:
+    """Hook on_commit de la transacción: borra los (condominio, período) marcados."""
+
+    def __init__(self):
+        self.periods = defaultdict(set)
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        for tenant_id, periods in self.periods.items():
+            _delete(tenant_id, periods)
+
+
+def _pending_hook(connection):
+    # Django descarta los hooks de una transacción (o savepoint) revertida
+    for _sids, func, _robust in connection.run_on_commit:
+        if isinstance(func, _PendingInvalidation) and not func.done:
+            return func
+    hook = _PendingInvalidation()
+    transaction.on_commit(hook)
+    return hook
+
+
+def invalidate(tenant_id, period):
+    """
+    Descarta los totales de *period* al confirmar la transacción del cambio
+    (de inmediato fuera de una transacción). Un solo hook por transacción
+    acumula todos los períodos tocados.
+    """
+    if not period:
+        return
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        _delete(tenant_id, [period])
+        return
+    _pending_hook(connection).periods[tenant_id].add(period)
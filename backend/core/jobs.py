@@ -0,0 +1,345 @@
+"""
+Homly — Cola de trabajos pesados (ReportJob)
+============================================
+PDFs de estados de cuenta, recibos y correos con estado de cuenta pueden
+tardar más de lo que conviene retener un worker de gunicorn. Las vistas
+validan la petición y, si se pide `async`, encolan un ReportJob; el comando
+`python manage.py run_report_jobs` los ejecuta.
+
+La cola es la propia tabla report_jobs en PostgreSQL: cada worker toma el
+trabajo pendiente más antiguo con SELECT … FOR UPDATE SKIP LOCKED, así
+varios workers pueden correr en paralelo sin broker.
+
+Cada tipo de trabajo (ReportJob.kind) tiene un handler registrado con
+@job_handler que recibe el ReportJob y devuelve un dict:
+    {'filename': …, 'content': bytes | File, 'content_type': …}  → se guarda en result_file
+    cualquier otra clave                                    → se guarda en result
+Si el handler lanza una excepción el trabajo se reintenta hasta
+REPORT_JOB_MAX_ATTEMPTS veces y después queda como 'failed'; JobError
+(dato faltante, reportlab no instalado) lo marca 'failed' sin reintentar.
+
+Un trabajo 'running' sin noticias en REPORT_JOB_STALE_SECONDS se considera
+huérfano y vuelve a la cola. Los handlers largos llaman a heartbeat(job)
+entre lotes para renovar started_at; si otro worker ya lo reencoló,
+heartbeat lanza JobLost y el trabajo se abandona sin guardar nada. Por lo
+mismo, run_job solo escribe el resultado (o el error) si el trabajo sigue
+'running' a nombre de este worker; si no, lo descarta.
+
+Los correos no se reintentan: un envío fallido puede haber llegado a parte
+de los destinatarios, así que se marca 'failed' (JobError) en lugar de
+reenviar a todos.
+"""
+import logging
+import os
+import socket
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ReportJob, Tenant, Unit, Payment
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {}
+
+# Unidades por bloque al completar el ledger (heartbeat entre bloques)
+LEDGER_REFRESH_CHUNK = 200
+
+
+class JobError(Exception):
+    """Error esperado (dato faltante, reportlab no instalado…): no se reintenta."""
+
+
+class JobLost(Exception):
+    """El trabajo se reencoló como huérfano mientras corría: otro worker es su dueño."""
+
+
+def job_handler(kind):
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+
+def default_worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def enqueue_job(tenant, user, kind, params):
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f'Tipo de trabajo desconocido: {kind}')
+    return ReportJob.objects.create(
+        tenant=tenant,
+        requested_by=user if getattr(user, 'is_authenticated', False) else None,
+        kind=kind,
+        params=params,
+    )
+
+
+def claim_next_job(worker_id=None):
+    """Toma el trabajo pendiente más antiguo y lo marca 'running'. None si la cola está vacía."""
+    with transaction.atomic():
+        job = (
+            ReportJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending')
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = 'running'
+        job.attempts += 1
+        job.worker = worker_id or default_worker_id()
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'attempts', 'worker', 'started_at'])
+    return job
+
+
+def heartbeat(job, force=False):
+    """
+    Renueva started_at del trabajo en curso para que requeue_stale_jobs no lo
+    tome por huérfano. Escribe como mucho cada REPORT_JOB_HEARTBEAT_SECONDS
+    (siempre con force=True). Lanza JobLost si el trabajo ya no es de este worker.
+    """
+    now = timezone.now()
+    last = getattr(job, '_heartbeat_at', None) or job.started_at
+    if not force and last and (now - last).total_seconds() < settings.REPORT_JOB_HEARTBEAT_SECONDS:
+        return
+    owned = ReportJob.objects.filter(pk=job.pk, status='running', worker=job.worker).update(started_at=now)
+    if not owned:
+        raise JobLost(f'ReportJob {job.id} ya no pertenece a {job.worker}')
+    job.started_at = job._heartbeat_at = now
+
+
+def requeue_stale_jobs():
+    """
+    Devuelve a la cola los trabajos 'running' cuyo worker murió (started_at más
+    antiguo que REPORT_JOB_STALE_SECONDS). Los que agotaron sus intentos se marcan 'failed'.
+    """
+    limit = timezone.now() - timedelta(seconds=settings.REPORT_JOB_STALE_SECONDS)
+    stale = ReportJob.objects.filter(status='running', started_at__lt=limit)
+    failed = stale.filter(attempts__gte=settings.REPORT_JOB_MAX_ATTEMPTS).update(
+        status='failed', error='El worker dejó de responder.', finished_at=timezone.now(),
+    )
+    requeued = stale.update(status='pending', worker='')
+    return requeued, failed
+
+
+def _finish(job, **fields):
+    """
+    Escribe el estado final del trabajo solo si sigue 'running' a nombre de
+    este worker. False si otro worker lo tomó (el resultado se descarta).
+    """
+    owned = ReportJob.objects.filter(pk=job.pk, status='running', worker=job.worker).update(**fields)
+    if not owned:
+        logger.warning('ReportJob %s (%s) ya no pertenece a %s; se descarta el resultado',
+                       job.id, job.kind, job.worker)
+        return False
+    for name, value in fields.items():
+        setattr(job, name, value)
+    return True
+
+
+def run_job(job):
+    """Ejecuta un trabajo ya tomado con claim_next_job y guarda su resultado."""
+    handler = JOB_HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f'Tipo de trabajo desconocido: {job.kind}')
+        outcome = dict(handler(job) or {})
+    except JobLost:
+        logger.warning('ReportJob %s (%s) reencolado por otro worker; se abandona', job.id, job.kind)
+        return job
+    except Exception as exc:
+        logger.exception('ReportJob %s (%s) falló en el intento %s', job.id, job.kind, job.attempts)
+        error = str(exc)[:2000]
+        retry = handler is not None and not isinstance(exc, JobError)
+        if retry and job.attempts < settings.REPORT_JOB_MAX_ATTEMPTS:
+            _finish(job, status='pending', error=error)
+        else:
+            _finish(job, status='failed', error=error, finished_at=timezone.now())
+        return job
+
+    content = outcome.pop('content', None)
+    filename = outcome.pop('filename', '')
+    content_type = outcome.pop('content_type', '')
+    fields = {'result': outcome, 'error': '', 'status': 'done', 'finished_at': timezone.now()}
+    if content is not None:
+        if not isinstance(content, File):
+            content = ContentFile(content)
+        job.result_file.save(f'{job.id}_{filename}', content, save=False)
+        content.close()
+        fields.update(
+            result_file=job.result_file.name,
+            result_filename=filename,
+            result_content_type=content_type or 'application/octet-stream',
+        )
+    if not _finish(job, **fields) and content is not None:
+        job.result_file.delete(save=False)
+    return job
+
+
+def purge_finished_jobs():
+    """Elimina trabajos terminados más antiguos que REPORT_JOB_RETENTION_DAYS (y sus archivos)."""
+    limit = timezone.now() - timedelta(days=settings.REPORT_JOB_RETENTION_DAYS)
+    old = ReportJob.objects.filter(status__in=['done', 'failed'], finished_at__lt=limit)
+    count = 0
+    for job in old.iterator():
+        if job.result_file:
+            job.result_file.delete(save=False)
+        job.delete()
+        count += 1
+    return count
+
+
+# ═══════════════════════════════════════════════════════════
+#  HANDLERS
+# ═══════════════════════════════════════════════════════════
+
+def _job_tenant(job):
+    return Tenant.objects.get(id=job.tenant_id)
+
+
+def _job_unit(job):
+    unit = Unit.objects.filter(id=job.params.get('unit_id'), tenant_id=job.tenant_id).first()
+    if unit is None:
+        raise JobError('Unidad no encontrada.')
+    return unit
+
+
+@job_handler('estado_por_unidad_pdf')
+def _estado_por_unidad_pdf(job):
+    from .views import _build_estado_por_unidad_pdf
+    cutoff = job.params['cutoff']
+    pdf_bytes = _build_estado_por_unidad_pdf(
+        _job_tenant(job), job.params['from_period'], cutoff, progress=lambda: heartbeat(job),
+    )
+    if pdf_bytes is None:
+        raise JobError('reportlab no instalado.')
+    return {
+        'filename': f'estado_por_unidad_{cutoff}.pdf',
+        'content': pdf_bytes,
+        'content_type': 'application/pdf',
+    }
+
+
+@job_handler('unit_statement_pdf')
+def _unit_statement_pdf(job):
+    from .views import _build_unit_statement_pdf, _unit_statement_pdf_filename
+    unit = _job_unit(job)
+    cutoff = job.params['cutoff']
+    pdf_bytes = _build_unit_statement_pdf(_job_tenant(job), unit, job.params['from_period'], cutoff)
+    if pdf_bytes is None:
+        raise JobError('reportlab no instalado.')
+    return {
+        'filename': _unit_statement_pdf_filename(unit, cutoff),
+        'content': pdf_bytes,
+        'content_type': 'application/pdf',
+    }
+
+
+@job_handler('statements_zip')
+def _statements_zip(job):
+    from .views import _iter_statements_zip, _statements_zip_filename
+    try:
+        import reportlab  # noqa: F401
+    except ImportError:
+        raise JobError('reportlab no instalado.')
+    tenant = _job_tenant(job)
+    cutoff = job.params['cutoff']
+    # El ZIP puede pesar cientos de MB: se escribe a disco, no a memoria
+    zip_file = tempfile.TemporaryFile()
+    for chunk in _iter_statements_zip(tenant, job.params['from_period'], cutoff, settings.STATEMENT_PDF_WORKERS):
+        zip_file.write(chunk)
+        heartbeat(job)
+    zip_file.seek(0)
+    return {
+        'filename': _statements_zip_filename(tenant, cutoff),
+        'content': File(zip_file),
+        'content_type': 'application/zip',
+    }
+
+
+@job_handler('receipts_batch')
+def _receipts_batch(job):
+    from .views import _iter_period_receipts_zip, _period_receipts_filename, _write_period_receipts_pdf
+    try:
+        import reportlab  # noqa: F401
+    except ImportError:
+        raise JobError('reportlab no instalado.')
+    tenant = _job_tenant(job)
+    period = job.params['period']
+    out = tempfile.TemporaryFile()
+    if job.params.get('output') == 'pdf':
+        _write_period_receipts_pdf(tenant, period, out, progress=lambda: heartbeat(job))
+        filename, content_type = _period_receipts_filename(tenant, period, 'pdf'), 'application/pdf'
+    else:
+        for chunk in _iter_period_receipts_zip(tenant, period, settings.STATEMENT_PDF_WORKERS):
+            out.write(chunk)
+            heartbeat(job)
+        filename, content_type = _period_receipts_filename(tenant, period, 'zip'), 'application/zip'
+    out.seek(0)
+    return {'filename': filename, 'content': File(out), 'content_type': content_type}
+
+
+@job_handler('receipt_pdf')
+def _receipt_pdf(job):
+    from .views import _build_receipt_pdf_file
+    payment = (
+        Payment.objects.select_related('unit')
+        .filter(id=job.params.get('payment_id'), tenant_id=job.tenant_id)
+        .first()
+    )
+    if payment is None:
+        raise JobError('Pago no encontrado.')
+    filename, pdf_bytes = _build_receipt_pdf_file(_job_tenant(job), payment)
+    if pdf_bytes is None:
+        raise JobError('reportlab no instalado.')
+    return {'filename': filename, 'content': pdf_bytes, 'content_type': 'application/pdf'}
+
+
+@job_handler('general_statement_email')
+def _general_statement_email(job):
+    from .views import _send_general_statement_email
+    emails = job.params['emails']
+    if not _send_general_statement_email(_job_tenant(job), emails, job.params['cutoff'], job=job):
+        raise JobError('Error al enviar el correo. Verifica la configuración SMTP.')
+    return {'detail': f'Estado general enviado a {", ".join(emails)}'}
+
+
+@job_handler('statement_campaign')
+def _statement_campaign(job):
+    from .views import _send_statement_campaign
+    # Solo procesa las unidades pendientes: un reintento no reenvía las ya enviadas
+    return _send_statement_campaign(_job_tenant(job), job)
+
+
+@job_handler('unit_ledger_refresh')
+def _unit_ledger_refresh(job):
+    from .views import _refresh_unit_ledger
+    tenant = _job_tenant(job)
+    scope = job.params['scope']
+    unit_ids = sorted(scope)
+    for start in range(0, len(unit_ids), LEDGER_REFRESH_CHUNK):
+        chunk = unit_ids[start:start + LEDGER_REFRESH_CHUNK]
+        _refresh_unit_ledger(tenant, {uid: scope[uid] for uid in chunk})
+        heartbeat(job)
+    return {'units': len(unit_ids)}
+
+
+@job_handler('vecino_statement_email')
+def _vecino_statement_email(job):
+    from .views import _send_vecino_statement_email
+    email = job.params['email']
+    ok = _send_vecino_statement_email(
+        _job_tenant(job), _job_unit(job), email,
+        job.params['from_period'], job.params['to_period'], job=job,
+    )
+    if not ok:
+        raise JobError('Error al enviar el correo. Verifica la configuración SMTP.')
+    return {'detail': f'Estado de cuenta enviado a {email}'}
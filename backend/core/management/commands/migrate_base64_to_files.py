@@ -1,49 +1,78 @@
 """
 Homly — Comando de migración de archivos Base64 a FileField
 ============================================================
-Convierte los datos binarios almacenados como Base64 en campos TextField
-a archivos reales en disco (o almacenamiento externo configurado en settings).
+Copia el contenido de las columnas Base64 deprecadas (LEGACY_BASE64_FIELDS
+de cada modelo) a su FileField (core/base64_files.py).
+
+ORDEN DE DESPLIEGUE:
+    1. python manage.py migrate   (0057 crea las columnas *_file)
+    2. python manage.py migrate_base64_to_files
+    Entre ambos pasos la aplicación lee la columna Base64 de los registros
+    que aún no tienen archivo, así que no hace falta detenerla.
 
 USO:
     # Ver cuántos registros necesitan migración (modo lectura, no modifica nada):
     python manage.py migrate_base64_to_files --dry-run
 
-    # Ejecutar migración completa:
-    python manage.py migrate_base64_to_files
+    # Ejecutar migración completa (reanuda donde se quedó si se interrumpió):
+    python manage.py migrate_base64_to_files --batch-size 500 --workers 8
 
     # Solo un modelo específico:
-    python manage.py migrate_base64_to_files --model tenant
-    python manage.py migrate_base64_to_files --model unit
     python manage.py migrate_base64_to_files --model payment
-    python manage.py migrate_base64_to_files --model gasto
-    python manage.py migrate_base64_to_files --model bankstatement
-
-PRECONDICIONES:
-    - La migración 0041_filefield_migration debe estar aplicada.
-    - El directorio MEDIA_ROOT debe ser accesible y tener espacio suficiente.
-    - Para almacenamiento externo (S3): configurar DEFAULT_FILE_STORAGE en settings.py.
-
-NOTAS:
-    - El comando es idempotente: omite registros que ya tienen el *_file poblado.
-    - Los campos Base64 originales NO se eliminan automáticamente (requiere otra migración).
-    - Después de verificar que la migración es correcta, los campos Base64 pueden
-      ser eliminados con: python manage.py makemigrations --name remove_base64_fields
-      (modificando models.py para quitar los campos TextField deprecados).
+
+    # Verificar que cada archivo coincide con su columna Base64; los que
+    # faltan o difieren se vuelven a escribir:
+    python manage.py migrate_base64_to_files --verify
+
+    # Verificar y vaciar la columna Base64 de los registros correctos:
+    python manage.py migrate_base64_to_files --verify --clear-legacy
+
+FUNCIONAMIENTO:
+    - Recorre cada tabla por lotes con paginación por clave (pk > último pk),
+      leyendo solo pk, la columna Base64 y el FileField.
+    - Decodificación y escritura en el storage corren en --workers hilos; la
+      base de datos se actualiza con un bulk_update por lote en el hilo
+      principal (sin tocar updated_at).
+    - El archivo se llama <modelo>_<pk><ext>: reintentar un lote sobrescribe
+      el mismo archivo en vez de dejar copias huérfanas.
+    - Tras cada lote se guarda el último pk en --state-file; al terminar una
+      tabla su punto de control se elimina. --restart lo ignora.
+    - Las listas JSON de evidencias ([{data, mime, name}]) se guardan tal cual
+      en un .json. La versión anterior de este comando las decodificaba como
+      un único Base64 y podía escribir archivos inválidos: --verify los
+      detecta y los reescribe.
 """
-import base64
-import uuid
+import json
 import logging
-from io import BytesIO
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from django.core.management.base import BaseCommand, CommandError
+from django.apps import apps
+from django.conf import settings
 from django.core.files.base import ContentFile
-from django.db import transaction
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from core import base64_files
 
 logger = logging.getLogger(__name__)
 
+# (opción --model, modelo, columna Base64)
+TARGETS = [
+    ('tenant', 'Tenant', 'logo'),
+    ('unit', 'Unit', 'previous_debt_evidence'),
+    ('unit', 'Unit', 'credit_balance_evidence'),
+    ('payment', 'Payment', 'evidence'),
+    ('gasto', 'GastoEntry', 'evidence'),
+    ('cajachica', 'CajaChicaEntry', 'evidence'),
+    ('bankstatement', 'BankStatement', 'file_data'),
+]
+
+MAX_ERRORS_LISTED = 50
+
 
 class Command(BaseCommand):
-    help = 'Migra archivos almacenados como Base64 (TextField) a FileField/ImageField'
+    help = 'Migra archivos almacenados como Base64 (TextField) a su FileField'
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -53,224 +82,213 @@ class Command(BaseCommand):
         )
         parser.add_argument(
             '--model',
-            choices=['tenant', 'unit', 'payment', 'gasto', 'bankstatement', 'all'],
+            choices=sorted({key for key, _model, _field in TARGETS}) + ['all'],
             default='all',
             help='Modelo a migrar. Default: all',
         )
         parser.add_argument(
             '--batch-size',
             type=int,
-            default=50,
-            help='Número de registros a procesar por lote. Default: 50',
+            default=200,
+            help='Número de registros a procesar por lote. Default: 200',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Hilos que decodifican y escriben archivos en paralelo. Default: 4',
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Compara cada archivo con su columna Base64 y reescribe los que faltan o difieren.',
+        )
+        parser.add_argument(
+            '--clear-legacy',
+            action='store_true',
+            help='Vacía la columna Base64 de los registros verificados (implica --verify).',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignora el punto de control guardado y empieza desde el inicio.',
+        )
+        parser.add_argument(
+            '--state-file',
+            default=str(settings.BASE_DIR / 'logs' / 'migrate_base64_to_files.json'),
+            help='Archivo del punto de control.',
         )
 
     def handle(self, *args, **options):
-        dry_run = options['dry_run']
-        model_filter = options['model']
-        batch_size = options['batch_size']
-
-        if dry_run:
+        if options['batch_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--batch-size y --workers deben ser mayores a 0.')
+        self.dry_run = options['dry_run']
+        self.verify = options['verify'] or options['clear_legacy']
+        self.clear_legacy = options['clear_legacy']
+        self.batch_size = options['batch_size']
+        self.state_file = options['state_file']
+        self.mode = 'verify' if self.verify else 'migrate'
+
+        if self.dry_run:
             self.stdout.write(self.style.WARNING('MODO DRY-RUN: no se modificará ningún registro.\n'))
 
-        total_ok = 0
-        total_skip = 0
-        total_err = 0
+        self.state = {} if options['restart'] else self._load_state()
+        targets = [t for t in TARGETS if options['model'] in ('all', t[0])]
 
-        tasks = {
-            'tenant':      self._migrate_tenant,
-            'unit':        self._migrate_unit,
-            'payment':     self._migrate_payment,
-            'gasto':       self._migrate_gasto,
-            'bankstatement': self._migrate_bankstatement,
-        }
+        totals = {'ok': 0, 'verified': 0, 'empty': 0, 'errors': 0}
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for _key, model_name, legacy_field in targets:
+                model = apps.get_model('core', model_name)
+                result = self._run_target(pool, model, legacy_field)
+                for k in totals:
+                    totals[k] += result.get(k, 0)
 
-        to_run = tasks if model_filter == 'all' else {model_filter: tasks[model_filter]}
-
-        for name, fn in to_run.items():
-            self.stdout.write(self.style.HTTP_INFO(f'\n── Migrando: {name.upper()} ──'))
-            ok, skip, err = fn(dry_run=dry_run, batch_size=batch_size)
-            total_ok += ok
-            total_skip += skip
-            total_err += err
+        if self.dry_run:
+            return
 
         self.stdout.write('\n' + '─' * 50)
-        self.stdout.write(self.style.SUCCESS(f'Migrados:  {total_ok}'))
-        self.stdout.write(self.style.WARNING(f'Omitidos:  {total_skip}  (ya tenían archivo)'))
-        if total_err:
-            self.stdout.write(self.style.ERROR(f'Errores:   {total_err}'))
-        else:
-            self.stdout.write(f'Errores:   {total_err}')
-
-        if not dry_run and total_ok > 0:
-            self.stdout.write(self.style.SUCCESS(
-                '\nMigración completada. Verifica que los archivos se subieron correctamente '
-                'antes de eliminar los campos Base64 originales.'
-            ))
-
-    # ── Helpers ──────────────────────────────────────────────────────────────
-
-    def _decode_base64(self, data: str) -> bytes | None:
-        """Decodifica Base64 quitando el prefijo data URI si existe."""
-        if not data:
-            return None
-        # Quitar prefijo tipo "data:image/png;base64," o "data:application/pdf;base64,"
-        if ',' in data:
-            data = data.split(',', 1)[1]
+        self.stdout.write(self.style.SUCCESS(f'Migrados:    {totals["ok"]}'))
+        if self.verify:
+            self.stdout.write(self.style.SUCCESS(f'Verificados: {totals["verified"]}'))
+        self.stdout.write(self.style.WARNING(f'Vacíos:      {totals["empty"]}'))
+        if totals['errors']:
+            self.stdout.write(self.style.ERROR(f'Errores:     {totals["errors"]}'))
+            raise CommandError(
+                f'{totals["errors"]} registros no se pudieron migrar (ver {self.state_file}). '
+                'Corrige los datos y vuelve a ejecutar el comando.'
+            )
+        self.stdout.write(f'Errores:     {totals["errors"]}')
+
+    # ── Punto de control ─────────────────────────────────────────────────────
+
+    def _load_state(self):
+        try:
+            with open(self.state_file) as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Punto de control ilegible ({self.state_file}): {e}. Usa --restart.')
+
+    def _save_state(self):
+        with open(self.state_file, 'w') as fh:
+            json.dump(self.state, fh, indent=2)
+
+    # ── Migración por columna ────────────────────────────────────────────────
+
+    def _queryset(self, model, legacy_field):
+        file_field, _fmt = base64_files.spec(model, legacy_field)
+        # defer(None): el manager difiere la columna Base64 y only() no la reincluiría
+        qs = model.objects.defer(None).only('pk', legacy_field, file_field).filter(**{f'{legacy_field}__gt': ''})
+        if not self.verify:
+            qs = qs.filter(Q(**{f'{file_field}__isnull': True}) | Q(**{file_field: ''}))
+        return qs.order_by('pk')
+
+    def _run_target(self, pool, model, legacy_field):
+        label = f'{model.__name__}.{legacy_field}'
+        key = f'{self.mode}:{label}'
+        file_field, _fmt = base64_files.spec(model, legacy_field)
+        qs = self._queryset(model, legacy_field)
+
+        self.stdout.write(self.style.HTTP_INFO(f'\n── {label} → {file_field} ──'))
+        progress = self.state.get(key) or {'last_pk': None, 'done': 0, 'ok': 0, 'verified': 0,
+                                           'empty': 0, 'errors': 0, 'error_pks': []}
+        pending = qs.filter(pk__gt=progress['last_pk']) if progress['last_pk'] else qs
+        remaining = pending.count()
+        total = progress['done'] + remaining
+        if self.dry_run:
+            self.stdout.write(f'  Pendientes: {remaining}')
+            return {}
+        if progress['last_pk']:
+            self.stdout.write(f'  Reanudando después de {progress["last_pk"]} ({progress["done"]}/{total})')
+        if not remaining:
+            self.stdout.write('  Nada pendiente.')
+
+        started = time.monotonic()
+        processed = 0
+        while True:
+            batch_qs = qs.filter(pk__gt=progress['last_pk']) if progress['last_pk'] else qs
+            rows = list(batch_qs[:self.batch_size])
+            if not rows:
+                break
+            results = list(pool.map(lambda row: self._process_row(row, legacy_field), rows))
+            self._apply_batch(model, legacy_field, rows, results, progress)
+
+            processed += len(rows)
+            progress['done'] += len(rows)
+            progress['last_pk'] = str(rows[-1].pk)
+            self.state[key] = progress
+            self._save_state()
+
+            elapsed = time.monotonic() - started
+            pct = progress['done'] * 100 / total if total else 100
+            self.stdout.write(
+                f'  {progress["done"]}/{total} ({pct:.1f}%) · {processed / elapsed if elapsed else 0:.0f} filas/s'
+                f' · ok {progress["ok"]} verificados {progress["verified"]}'
+                f' vacíos {progress["empty"]} errores {progress["errors"]}'
+            )
+
+        result = dict(progress)
+        if progress['error_pks']:
+            self.stdout.write(self.style.ERROR(f'  Con error: {", ".join(progress["error_pks"])}'))
+        # Tabla terminada: la próxima ejecución empieza de nuevo (la consulta ya excluye lo migrado)
+        self.state.pop(key, None)
+        self._save_state()
+        return result
+
+    def _process_row(self, row, legacy_field):
+        """
+        Decodifica y escribe el archivo de una fila (hilo del pool; sin acceso a la BD).
+        Devuelve (estado, nombre del archivo nuevo o None, error).
+        """
+        file_field, fmt = base64_files.spec(type(row), legacy_field)
         try:
-            return base64.b64decode(data)
+            raw, ext = base64_files.decode(getattr(row, legacy_field), fmt)
+            if raw is None:
+                return 'empty', None, None
+            field_file = getattr(row, file_field)
+            if self.verify and field_file and base64_files.read_bytes(row, legacy_field) == raw:
+                return 'verified', None, None
+            storage = field_file.storage
+            field = row._meta.get_field(file_field)
+            name = field.generate_filename(row, f'{type(row).__name__.lower()}_{row.pk}{ext}')
+            if storage.exists(name):
+                storage.delete(name)
+            return 'ok', storage.save(name, ContentFile(raw)), None
         except Exception as e:
-            logger.warning(f'Error decodificando Base64: {e}')
-            return None
-
-    def _guess_extension(self, raw: bytes, default: str = '.bin') -> str:
-        """Detecta extensión por magic bytes."""
-        if raw[:4] == b'%PDF':
-            return '.pdf'
-        if raw[:8] == b'\x89PNG\r\n\x1a\n':
-            return '.png'
-        if raw[:3] == b'\xff\xd8\xff':
-            return '.jpg'
-        if raw[:6] in (b'GIF87a', b'GIF89a'):
-            return '.gif'
-        if raw[:4] == b'RIFF' and raw[8:12] == b'WEBP':
-            return '.webp'
-        return default
-
-    def _save_file(self, field, raw: bytes, prefix: str, default_ext: str = '.bin') -> bool:
-        ext = self._guess_extension(raw, default=default_ext)
-        filename = f'{prefix}_{uuid.uuid4().hex}{ext}'
-        field.save(filename, ContentFile(raw), save=False)
-        return True
-
-    # ── Migraciones por modelo ────────────────────────────────────────────────
-
-    def _migrate_tenant(self, dry_run=False, batch_size=50):
-        from core.models import Tenant
-        ok, skip, err = 0, 0, 0
-        qs = Tenant.objects.filter(logo__gt='').exclude(logo_file__gt='')
-        total = qs.count()
-        self.stdout.write(f'  Tenants con logo Base64 pendiente: {total}')
-        if dry_run or total == 0:
-            return total if dry_run else ok, skip, err
-
-        for obj in qs.iterator(chunk_size=batch_size):
-            raw = self._decode_base64(obj.logo)
-            if not raw:
-                err += 1
-                self.stdout.write(self.style.ERROR(f'  ERROR decodificando tenant {obj.id}'))
+            logger.warning('No se pudo migrar %s.%s de %s', type(row).__name__, legacy_field, row.pk, exc_info=True)
+            return 'error', None, str(e)
+
+    def _apply_batch(self, model, legacy_field, rows, results, progress):
+        file_field, _fmt = base64_files.spec(model, legacy_field)
+        changed = []
+        stale = []
+        for row, (outcome, name, error) in zip(rows, results):
+            if outcome == 'error':
+                progress['errors'] += 1
+                if len(progress['error_pks']) < MAX_ERRORS_LISTED:
+                    progress['error_pks'].append(str(row.pk))
+                self.stdout.write(self.style.ERROR(f'  ERROR {model.__name__} {row.pk}: {error}'))
                 continue
-            try:
-                with transaction.atomic():
-                    self._save_file(obj.logo_file, raw, f'tenant_{obj.id}', '.png')
-                    obj.save(update_fields=['logo_file'])
-                ok += 1
-            except Exception as e:
-                err += 1
-                self.stdout.write(self.style.ERROR(f'  ERROR guardando tenant {obj.id}: {e}'))
-
-        self.stdout.write(f'  → OK: {ok}  Errores: {err}')
-        return ok, skip, err
-
-    def _migrate_unit(self, dry_run=False, batch_size=50):
-        from core.models import Unit
-        ok, skip, err = 0, 0, 0
-        qs = Unit.objects.filter(previous_debt_evidence__gt='').exclude(previous_debt_evidence_file__gt='')
-        total = qs.count()
-        self.stdout.write(f'  Units con evidencia Base64 pendiente: {total}')
-        if dry_run or total == 0:
-            return total if dry_run else ok, skip, err
-
-        for obj in qs.iterator(chunk_size=batch_size):
-            raw = self._decode_base64(obj.previous_debt_evidence)
-            if not raw:
-                err += 1
-                continue
-            try:
-                with transaction.atomic():
-                    self._save_file(obj.previous_debt_evidence_file, raw, f'unit_{obj.id}', '.pdf')
-                    obj.save(update_fields=['previous_debt_evidence_file'])
-                ok += 1
-            except Exception as e:
-                err += 1
-                self.stdout.write(self.style.ERROR(f'  ERROR unit {obj.id}: {e}'))
-
-        self.stdout.write(f'  → OK: {ok}  Errores: {err}')
-        return ok, skip, err
-
-    def _migrate_payment(self, dry_run=False, batch_size=50):
-        from core.models import Payment
-        ok, skip, err = 0, 0, 0
-        qs = Payment.objects.filter(evidence__gt='').exclude(evidence_file__gt='')
-        total = qs.count()
-        self.stdout.write(f'  Payments con evidencia Base64 pendiente: {total}')
-        if dry_run or total == 0:
-            return total if dry_run else ok, skip, err
-
-        for obj in qs.iterator(chunk_size=batch_size):
-            raw = self._decode_base64(obj.evidence)
-            if not raw:
-                err += 1
-                continue
-            try:
-                with transaction.atomic():
-                    self._save_file(obj.evidence_file, raw, f'payment_{obj.id}', '.jpg')
-                    obj.save(update_fields=['evidence_file'])
-                ok += 1
-            except Exception as e:
-                err += 1
-                self.stdout.write(self.style.ERROR(f'  ERROR payment {obj.id}: {e}'))
-
-        self.stdout.write(f'  → OK: {ok}  Errores: {err}')
-        return ok, skip, err
-
-    def _migrate_gasto(self, dry_run=False, batch_size=50):
-        from core.models import GastoEntry
-        ok, skip, err = 0, 0, 0
-        qs = GastoEntry.objects.filter(evidence__gt='').exclude(evidence_file__gt='')
-        total = qs.count()
-        self.stdout.write(f'  GastoEntries con evidencia Base64 pendiente: {total}')
-        if dry_run or total == 0:
-            return total if dry_run else ok, skip, err
-
-        for obj in qs.iterator(chunk_size=batch_size):
-            raw = self._decode_base64(obj.evidence)
-            if not raw:
-                err += 1
-                continue
-            try:
-                with transaction.atomic():
-                    self._save_file(obj.evidence_file, raw, f'gasto_{obj.id}', '.pdf')
-                    obj.save(update_fields=['evidence_file'])
-                ok += 1
-            except Exception as e:
-                err += 1
-                self.stdout.write(self.style.ERROR(f'  ERROR gasto {obj.id}: {e}'))
-
-        self.stdout.write(f'  → OK: {ok}  Errores: {err}')
-        return ok, skip, err
-
-    def _migrate_bankstatement(self, dry_run=False, batch_size=50):
-        from core.models import BankStatement
-        ok, skip, err = 0, 0, 0
-        qs = BankStatement.objects.filter(file_data__gt='').exclude(statement_file__gt='')
-        total = qs.count()
-        self.stdout.write(f'  BankStatements con PDF Base64 pendiente: {total}')
-        if dry_run or total == 0:
-            return total if dry_run else ok, skip, err
-
-        for obj in qs.iterator(chunk_size=batch_size):
-            raw = self._decode_base64(obj.file_data)
-            if not raw:
-                err += 1
+            progress[outcome] += 1
+            if outcome == 'empty':
                 continue
+            if name is not None:
+                old_name = getattr(row, file_field).name
+                if old_name and old_name != name:
+                    stale.append(old_name)
+                setattr(row, file_field, name)
+            if self.clear_legacy:
+                setattr(row, legacy_field, '')
+            if name is not None or self.clear_legacy:
+                changed.append(row)
+
+        fields = [file_field] + ([legacy_field] if self.clear_legacy else [])
+        if changed:
+            model.objects.bulk_update(changed, fields)
+        storage = model._meta.get_field(file_field).storage
+        for name in stale:
             try:
-                with transaction.atomic():
-                    self._save_file(obj.statement_file, raw, f'bank_{obj.tenant_id}_{obj.period}', '.pdf')
-                    obj.save(update_fields=['statement_file'])
-                ok += 1
-            except Exception as e:
-                err += 1
-                self.stdout.write(self.style.ERROR(f'  ERROR bankstatement {obj.id}: {e}'))
-
-        self.stdout.write(f'  → OK: {ok}  Errores: {err}')
-        return ok, skip, err
+                storage.delete(name)
+            except Exception:
+                logger.warning('No se pudo eliminar el archivo anterior %s', name, exc_info=True)
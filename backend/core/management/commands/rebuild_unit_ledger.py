@@ -0,0 +1,70 @@
+"""
+Homly — Reconstrucción / verificación del ledger por unidad y período
+=====================================================================
+El ledger (UnitPeriodLedger) materializa el estado de cuenta de cada unidad
+para que los reportes no tengan que recalcular todo el historial de pagos.
+Se mantiene de forma incremental desde las vistas; este comando lo
+reconstruye por completo o verifica que coincide con el cálculo directo.
+
+USO:
+    # Reconstruir el ledger de todos los condominios:
+    python manage.py rebuild_unit_ledger
+
+    # Solo un condominio:
+    python manage.py rebuild_unit_ledger --tenant <uuid>
+
+    # Verificar sin modificar (sale con error si hay diferencias):
+    python manage.py rebuild_unit_ledger --verify
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye o verifica el ledger materializado de estados de cuenta (UnitPeriodLedger)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            help='UUID del condominio a procesar. Default: todos.',
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Solo compara el ledger contra el cálculo completo, sin modificar nada.',
+        )
+
+    def handle(self, *args, **options):
+        from core.views import _rebuild_tenant_ledger, _verify_tenant_ledger
+
+        tenants = Tenant.objects.all().order_by('name')
+        if options['tenant']:
+            tenants = tenants.filter(id=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f'Condominio no encontrado: {options["tenant"]}')
+
+        total_rows = 0
+        total_mismatches = 0
+        for tenant in tenants:
+            if options['verify']:
+                mismatches = _verify_tenant_ledger(tenant)
+                total_mismatches += len(mismatches)
+                if mismatches:
+                    self.stdout.write(self.style.ERROR(f'{tenant.name}: {len(mismatches)} diferencias'))
+                    for unit_id, period, field, stored, expected in mismatches[:20]:
+                        self.stdout.write(f'   {unit_id} {period} {field or ""}: {stored} ≠ {expected}')
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'{tenant.name}: OK'))
+            else:
+                rows = _rebuild_tenant_ledger(tenant)
+                total_rows += rows
+                self.stdout.write(f'{tenant.name}: {rows} filas')
+
+        self.stdout.write('─' * 50)
+        if options['verify']:
+            if total_mismatches:
+                raise CommandError(f'Ledger con {total_mismatches} diferencias. Ejecuta el comando sin --verify.')
+            self.stdout.write(self.style.SUCCESS('Ledger verificado.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Ledger reconstruido: {total_rows} filas.'))
@@ -0,0 +1,87 @@
+"""
+Homly — Worker de trabajos pesados (ReportJob)
+==============================================
+Ejecuta los PDFs y correos encolados desde la API con ?async=1 (ver
+core/jobs.py). La cola vive en PostgreSQL; se pueden correr varios workers
+en paralelo.
+
+USO:
+    # Worker continuo (PM2 / systemd):
+    python manage.py run_report_jobs
+
+    # Procesar lo pendiente y salir (cron, pruebas):
+    python manage.py run_report_jobs --once
+
+    # Intervalo de sondeo cuando la cola está vacía (segundos, default 2):
+    python manage.py run_report_jobs --poll 5
+"""
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.jobs import (
+    claim_next_job, default_worker_id, purge_finished_jobs, requeue_stale_jobs, run_job,
+)
+
+# Cada cuánto revisar trabajos huérfanos y purgar resultados viejos (segundos)
+MAINTENANCE_INTERVAL = 300
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta los trabajos en segundo plano (PDFs, correos) encolados en ReportJob'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Procesa los trabajos pendientes y termina.',
+        )
+        parser.add_argument(
+            '--poll',
+            type=float,
+            default=2.0,
+            help='Segundos de espera cuando no hay trabajos. Default: 2.',
+        )
+
+    def handle(self, *args, **options):
+        self._stop = False
+        if not options['once']:
+            # Terminar el trabajo en curso antes de salir
+            signal.signal(signal.SIGTERM, self._request_stop)
+            signal.signal(signal.SIGINT, self._request_stop)
+
+        worker_id = default_worker_id()
+        self.stdout.write(f'Worker {worker_id} iniciado.')
+        processed = 0
+        last_maintenance = 0.0
+
+        while not self._stop:
+            close_old_connections()
+            if time.monotonic() - last_maintenance > MAINTENANCE_INTERVAL:
+                requeued, failed = requeue_stale_jobs()
+                purged = purge_finished_jobs()
+                if requeued or failed or purged:
+                    self.stdout.write(f'Huérfanos reencolados: {requeued} · fallidos: {failed} · purgados: {purged}')
+                last_maintenance = time.monotonic()
+
+            job = claim_next_job(worker_id)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll'])
+                continue
+
+            job = run_job(job)
+            processed += 1
+            line = f'{job.kind} {job.id}: {job.status}'
+            if job.status == 'done':
+                self.stdout.write(self.style.SUCCESS(line))
+            else:
+                self.stdout.write(self.style.ERROR(f'{line} — {job.error}'))
+
+        self.stdout.write(f'Worker {worker_id} detenido. Trabajos procesados: {processed}.')
+
+    def _request_stop(self, signum, frame):
+        self._stop = True
@@ -0,0 +1,127 @@
+"""
+Homly — Worker de correos salientes (OutboundEmail)
+===================================================
+Envía los correos encolados por las notificaciones (ver core/email_queue.py)
+en lotes, con una sola conexión SMTP por lote.
+
+USO:
+    # Worker continuo (PM2 / systemd):
+    python manage.py send_outbound_emails
+
+    # Enviar lo pendiente y salir (cron, pruebas):
+    python manage.py send_outbound_emails --once
+
+    # Métricas por condominio de las últimas 24 h (no envía nada):
+    python manage.py send_outbound_emails --stats
+    python manage.py send_outbound_emails --stats --hours 1
+"""
+import signal
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from core.email_queue import (
+    claim_email_batch, purge_sent_emails, requeue_stale_emails, send_email_batch,
+    throughput_by_tenant,
+)
+
+# Cada cuánto revisar lotes huérfanos y purgar enviados viejos (segundos)
+MAINTENANCE_INTERVAL = 300
+
+
+class Command(BaseCommand):
+    help = 'Envía por lotes los correos encolados en OutboundEmail'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Envía los correos vencidos y termina.',
+        )
+        parser.add_argument(
+            '--poll',
+            type=float,
+            default=2.0,
+            help='Segundos de espera cuando la cola está vacía. Default: 2.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Correos por lote (una conexión SMTP). Default: OUTBOUND_EMAIL_BATCH_SIZE.',
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Muestra métricas por condominio y termina.',
+        )
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=24,
+            help='Ventana de --stats en horas. Default: 24.',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self._print_stats(options['hours'])
+            return
+
+        self._stop = False
+        if not options['once']:
+            signal.signal(signal.SIGTERM, self._request_stop)
+            signal.signal(signal.SIGINT, self._request_stop)
+
+        totals = Counter()
+        last_maintenance = 0.0
+        while not self._stop:
+            close_old_connections()
+            if time.monotonic() - last_maintenance > MAINTENANCE_INTERVAL:
+                requeue_stale_emails()
+                purge_sent_emails()
+                last_maintenance = time.monotonic()
+
+            batch = claim_email_batch(options['batch_size'])
+            if not batch:
+                if options['once']:
+                    break
+                time.sleep(options['poll'])
+                continue
+
+            started = time.monotonic()
+            sent, retry, failed = send_email_batch(batch)
+            elapsed = time.monotonic() - started
+            totals.update(sent=sent, retry=retry, failed=failed)
+            per_tenant = Counter(str(mail.tenant_id or '—') for mail in batch)
+            self.stdout.write(
+                f'Lote de {len(batch)} en {elapsed:.1f}s ({len(batch) / max(elapsed, 0.001):.1f}/s): '
+                f'{sent} enviados · {retry} reintento · {failed} fallidos · '
+                + ', '.join(f'{tenant}={count}' for tenant, count in per_tenant.most_common())
+            )
+
+        self.stdout.write(
+            f'Worker detenido. Enviados: {totals["sent"]} · reintento: {totals["retry"]} · fallidos: {totals["failed"]}'
+        )
+
+    def _print_stats(self, hours):
+        since = timezone.now() - timedelta(hours=hours)
+        rows = throughput_by_tenant(since)
+        self.stdout.write(f'Correos de las últimas {hours} h por condominio')
+        self.stdout.write('─' * 70)
+        for row in rows:
+            delay = row['avg_delay']
+            delay_str = f'{delay.total_seconds():.0f}s' if delay is not None else '—'
+            self.stdout.write(
+                f'{(row["tenant__name"] or "(sin condominio)")[:30]:30} '
+                f'enviados {row["sent"]:>5} · pendientes {row["pending"]:>4} · '
+                f'fallidos {row["failed"]:>4} · demora media {delay_str}'
+            )
+        if not rows:
+            self.stdout.write('Sin correos en la ventana.')
+
+    def _request_stop(self, signum, frame):
+        self._stop = True
@@ -0,0 +1,83 @@
+"""
+Homly — Membresía del usuario en el condominio
+==============================================
+Permisos (core/permissions.py), vistas (vecino → solo su unidad) y
+_audit_log consultaban TenantUser por separado en cada request. Ahora
+todos preguntan a request.membership:
+
+    m = membership.for_request(request).get(tenant_id)
+    m.role, m.unit_id          # None si el usuario no es miembro
+
+MembershipMiddleware (core/middleware.py) adjunta el resolver al request. El usuario se lee al
+consultar, no al crear el resolver: la autenticación JWT de DRF ocurre
+después del middleware y actualiza request.user del HttpRequest.
+
+Cada (condominio, usuario) se resuelve una sola vez por request y no se
+comparte entre requests: el cache de Django es LocMemCache por proceso en
+producción, así que revocar o cambiar un rol solo se vería en el worker
+que hizo el cambio. Una consulta por request mantiene la autorización al
+día en todos los procesos.
+"""
+from typing import NamedTuple, Optional
+
+
+class Membership(NamedTuple):
+    id: str
+    role: str
+    unit_id: Optional[str]
+
+
+def _load(tenant_id, user_id):
+    from .models import TenantUser
+
+    row = (
+        TenantUser.objects.filter(tenant_id=tenant_id, user_id=user_id)
+        .values_list('id', 'role', 'unit_id')
+        .first()
+    )
+    return Membership(str(row[0]), row[1], str(row[2]) if row[2] else None) if row else None
+
+
+class MembershipResolver:
+
+    def __init__(self, request):
+        self._request = request
+        self._resolved = {}
+
+    def _user_id(self):
+        user = getattr(self._request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return None
+        return str(user.pk)
+
+    def get(self, tenant_id):
+        """Membership del usuario del request en *tenant_id*, o None."""
+        user_id = self._user_id()
+        if user_id is None or not tenant_id:
+            return None
+        key = (str(tenant_id), user_id)
+        if key not in self._resolved:
+            self._resolved[key] = _load(key[0], user_id)
+        return self._resolved[key]
+
+    def role(self, tenant_id):
+        member = self.get(tenant_id)
+        return member.role if member else None
+
+    def peek(self, tenant_id):
+        """(resuelto, Membership|None) sin consultar nada si aún no se resolvió en este request."""
+        user_id = self._user_id()
+        key = (str(tenant_id), user_id)
+        if user_id is None or key not in self._resolved:
+            return False, None
+        return True, self._resolved[key]
+
+
+def for_request(request):
+    """Resolver del request (lo crea si no pasó por MembershipMiddleware, p. ej. en tests)."""
+    request = getattr(request, '_request', request)  # rest_framework.request.Request → HttpRequest
+    resolver = getattr(request, 'membership', None)
+    if resolver is None:
+        resolver = request.membership = MembershipResolver(request)
+    return resolver
+
@@ -6,6 +6,8 @@ import logging
 from django.core.cache import cache
 from django.http import JsonResponse
 
+from .membership import MembershipResolver
+
 logger = logging.getLogger(__name__)
 
 
@@ -80,3 +82,18 @@ class AuthRateLimitMiddleware:
             # El primer elemento es la IP del cliente original
             return x_forwarded_for.split(',')[0].strip()
         return request.META.get('REMOTE_ADDR', '0.0.0.0')
+
+
+class MembershipMiddleware:
+    """
+    Adjunta request.membership (core/membership.py): el rol y la unidad del
+    usuario en cada condominio se consultan una sola vez por request y se
+    comparten entre permisos, vistas y auditoría.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.membership = MembershipResolver(request)
+        return self.get_response(request)
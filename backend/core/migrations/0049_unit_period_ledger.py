@@ -0,0 +1,51 @@
+"""
+Migration 0049 — Add UnitPeriodLedger model.
+
+Materialized per-unit/per-period statement rows (charge, paid, saldo_acum…)
+maintained incrementally on payment writes. The table starts empty; it is
+filled lazily on first read or with `python manage.py rebuild_unit_ledger`.
+"""
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0048_unit_credit_balance_evidence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnitPeriodLedger',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('period', models.CharField(max_length=7, help_text='Format: YYYY-MM')),
+                ('charge', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('paid', models.DecimalField(decimal_places=2, default=0, max_digits=14,
+                    help_text='Abonos mostrados (incluye campos neutrales y adeudos cobrados)')),
+                ('paid_balance', models.DecimalField(decimal_places=2, default=0, max_digits=14,
+                    help_text='Abonos que afectan el saldo')),
+                ('adelanto', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('adeudo_received', models.DecimalField(decimal_places=2, default=0, max_digits=14,
+                    help_text='Adeudo cobrado en otro período dirigido a este período')),
+                ('maintenance', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('saldo_acum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('status', models.CharField(default='pendiente', max_length=10)),
+                ('prev_debt_adeudo', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('has_active_plan', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                    related_name='unit_ledger', to='core.tenant')),
+                ('unit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                    related_name='ledger_entries', to='core.unit')),
+            ],
+            options={
+                'db_table': 'unit_period_ledger',
+                'unique_together': {('unit', 'period')},
+                'indexes': [models.Index(fields=['tenant', 'period'], name='unit_period_tenant__bf3e49_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+"""
+Migration 0050 — Bank balance snapshot on ClosedPeriod.
+
+Stores reconciled ingresos/egresos and the closing bank balance when a
+period is closed, so the opening balance of later periods does not replay
+every closed month.
+"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0049_unit_period_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='closedperiod',
+            name='ingresos_reconciled',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True,
+                                      help_text='Ingresos conciliados del período al cierre'),
+        ),
+        migrations.AddField(
+            model_name='closedperiod',
+            name='egresos_reconciled',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True,
+                                      help_text='Egresos conciliados del período al cierre'),
+        ),
+        migrations.AddField(
+            model_name='closedperiod',
+            name='closing_bank_balance',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True,
+                                      help_text='Saldo bancario al final del período'),
+        ),
+        migrations.AddField(
+            model_name='closedperiod',
+            name='snapshot_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,87 @@
+"""
+Migration 0051 — Add AdditionalPaymentAllocation and backfill it.
+
+Cross-unit additional payments (Payment.additional_payments[] entries with
+applied_to_unit_id) are normalized into one row per entry and field so the
+account statement can look them up by destination unit with an indexed
+query instead of scanning every payment's JSON.
+"""
+import uuid
+from decimal import Decimal, InvalidOperation
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_allocations(apps, schema_editor):
+    Payment = apps.get_model('core', 'Payment')
+    Unit = apps.get_model('core', 'Unit')
+    Allocation = apps.get_model('core', 'AdditionalPaymentAllocation')
+
+    units_by_tenant = {}
+    for unit_id, tenant_id in Unit.objects.values_list('id', 'tenant_id'):
+        units_by_tenant.setdefault(tenant_id, set()).add(str(unit_id))
+
+    batch = []
+    qs = Payment.objects.only('id', 'tenant_id', 'unit_id', 'period', 'additional_payments')
+    for pay in qs.iterator(chunk_size=500):
+        tenant_units = units_by_tenant.get(pay.tenant_id, set())
+        for entry in (pay.additional_payments or []):
+            if not isinstance(entry, dict):
+                continue
+            target = str(entry.get('applied_to_unit_id') or '')
+            if not target or target == str(pay.unit_id) or target not in tenant_units:
+                continue
+            fp_data = entry.get('field_payments') or {}
+            for field_key, fd in fp_data.items():
+                raw = fd.get('received', 0) if isinstance(fd, dict) else fd
+                try:
+                    amount = Decimal(str(raw or 0))
+                except InvalidOperation:
+                    continue
+                if amount <= 0:
+                    continue
+                batch.append(Allocation(
+                    tenant_id=pay.tenant_id, payment_id=pay.id,
+                    entry_id=str(entry.get('id', '')), applied_to_unit_id=target,
+                    period=pay.period, field_key=field_key, amount=amount,
+                ))
+        if len(batch) >= 1000:
+            Allocation.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Allocation.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0050_closedperiod_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdditionalPaymentAllocation',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('entry_id', models.CharField(max_length=64, help_text='additional_payments[].id')),
+                ('period', models.CharField(max_length=7, help_text='Período del pago origen (YYYY-MM)')),
+                ('field_key', models.CharField(max_length=100, help_text='"maintenance" or ExtraField.id')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('applied_to_unit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                    related_name='additional_allocations', to='core.unit')),
+                ('payment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                    related_name='additional_allocations', to='core.payment')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                    related_name='additional_allocations', to='core.tenant')),
+            ],
+            options={
+                'db_table': 'additional_payment_allocations',
+                'indexes': [
+                    models.Index(fields=['applied_to_unit', 'period'], name='additional__applied_8cc7bd_idx'),
+                    models.Index(fields=['tenant', 'period'], name='additional__tenant__93025b_idx'),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_allocations, migrations.RunPython.noop),
+    ]
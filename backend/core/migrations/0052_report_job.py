@@ -0,0 +1,64 @@
+"""
+Migration 0052 — Add ReportJob model.
+
+Database-backed queue for heavy work (PDF exports, statement emails) that
+used to run inside the gunicorn request. Jobs are consumed by
+`python manage.py run_report_jobs`.
+"""
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0051_additional_payment_allocation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(max_length=40, choices=[
+                    ('estado_por_unidad_pdf', 'PDF Estado por Unidad'),
+                    ('unit_statement_pdf', 'PDF Estado de Cuenta de Unidad'),
+                    ('receipt_pdf', 'PDF Recibo de Pago'),
+                    ('general_statement_email', 'Correo Estado General'),
+                    ('vecino_statement_email', 'Correo Estado de Cuenta (Vecino)'),
+                ])),
+                ('params', models.JSONField(blank=True, default=dict,
+                    help_text='Parámetros ya validados por la vista que encoló el trabajo')),
+                ('status', models.CharField(default='pending', max_length=10, choices=[
+                    ('pending', 'En cola'), ('running', 'En proceso'),
+                    ('done', 'Terminado'), ('failed', 'Fallido'),
+                ])),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('worker', models.CharField(blank=True, default='', max_length=100,
+                    help_text='Identificador del worker que tomó el trabajo')),
+                ('result_file', models.FileField(blank=True, null=True, upload_to='report_jobs/')),
+                ('result_filename', models.CharField(blank=True, default='', max_length=200)),
+                ('result_content_type', models.CharField(blank=True, default='', max_length=100)),
+                ('result', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL,
+                    related_name='report_jobs', to=settings.AUTH_USER_MODEL)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                    related_name='report_jobs', to='core.tenant')),
+            ],
+            options={
+                'db_table': 'report_jobs',
+                'ordering': ['-created_at'],
+                'indexes': [
+                    models.Index(fields=['status', 'created_at'], name='report_jobs_status_a52eae_idx'),
+                    models.Index(fields=['tenant', 'requested_by', '-created_at'], name='report_jobs_tenant__37aa3b_idx'),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+"""
+Migration 0053 — Add OutboundEmail model.
+
+Persistent outbound mail queue. Notification emails are stored already
+rendered and sent in batches over one SMTP connection by
+`python manage.py send_outbound_emails`, instead of one daemon thread per
+notification event.
+"""
+import uuid
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0052_report_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('category', models.CharField(default='notification', max_length=40,
+                    help_text='Origen del correo (p.ej. notif_type de la notificación)')),
+                ('to_email', models.EmailField(max_length=254)),
+                ('subject', models.CharField(max_length=300)),
+                ('plain_body', models.TextField(blank=True, default='')),
+                ('html_body', models.TextField(blank=True, default='')),
+                ('status', models.CharField(default='pending', max_length=10, choices=[
+                    ('pending', 'Pendiente'), ('sending', 'Enviando'),
+                    ('sent', 'Enviado'), ('failed', 'Fallido'),
+                ])),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('tenant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL,
+                    related_name='outbound_emails', to='core.tenant')),
+            ],
+            options={
+                'db_table': 'outbound_emails',
+                'indexes': [
+                    models.Index(fields=['status', 'next_attempt_at'], name='outbound_em_status_54195c_idx'),
+                    models.Index(fields=['tenant', 'created_at'], name='outbound_em_tenant__6e5895_idx'),
+                ],
+            },
+        ),
+    ]
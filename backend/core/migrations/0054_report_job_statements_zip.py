@@ -0,0 +1,29 @@
+"""
+Migration 0054 — ReportJob.kind 'statements_zip'.
+
+Bulk export of every unit's statement PDF in one ZIP
+(GET estado-cuenta-zip/?async=1).
+"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0053_outbound_email'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportjob',
+            name='kind',
+            field=models.CharField(max_length=40, choices=[
+                ('estado_por_unidad_pdf', 'PDF Estado por Unidad'),
+                ('unit_statement_pdf', 'PDF Estado de Cuenta de Unidad'),
+                ('receipt_pdf', 'PDF Recibo de Pago'),
+                ('general_statement_email', 'Correo Estado General'),
+                ('vecino_statement_email', 'Correo Estado de Cuenta (Vecino)'),
+                ('statements_zip', 'ZIP Estados de Cuenta por Unidad'),
+            ]),
+        ),
+    ]
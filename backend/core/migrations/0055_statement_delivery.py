@@ -0,0 +1,58 @@
+"""
+Migration 0055 — Statement email campaigns.
+
+Adds ReportJob.kind 'statement_campaign' and StatementDelivery, the
+per-unit delivery status of a campaign that emails every unit its
+estado de cuenta (POST send-statements-all/).
+"""
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0054_report_job_statements_zip'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportjob',
+            name='kind',
+            field=models.CharField(max_length=40, choices=[
+                ('estado_por_unidad_pdf', 'PDF Estado por Unidad'),
+                ('unit_statement_pdf', 'PDF Estado de Cuenta de Unidad'),
+                ('receipt_pdf', 'PDF Recibo de Pago'),
+                ('general_statement_email', 'Correo Estado General'),
+                ('vecino_statement_email', 'Correo Estado de Cuenta (Vecino)'),
+                ('statements_zip', 'ZIP Estados de Cuenta por Unidad'),
+                ('statement_campaign', 'Envío de Estados de Cuenta a todas las unidades'),
+            ]),
+        ),
+        migrations.CreateModel(
+            name='StatementDelivery',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('emails', models.JSONField(blank=True, default=list)),
+                ('status', models.CharField(default='pending', max_length=10, choices=[
+                    ('pending', 'Pendiente'), ('sent', 'Enviado'),
+                    ('failed', 'Fallido'), ('skipped', 'Sin correo'),
+                ])),
+                ('error', models.TextField(blank=True, default='')),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                    related_name='statement_deliveries', to='core.reportjob')),
+                ('unit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                    related_name='statement_deliveries', to='core.unit')),
+            ],
+            options={
+                'db_table': 'statement_deliveries',
+                'indexes': [
+                    models.Index(fields=['job', 'status'], name='statement_d_job_id_fbcfe6_idx'),
+                ],
+                'unique_together': {('job', 'unit')},
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+"""
+Migration 0056 — ReportJob.kind 'receipts_batch'.
+
+Every receipt of a period in one ZIP or PDF
+(GET payments/receipts-batch/?period=YYYY-MM&async=1).
+"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0055_statement_delivery'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportjob',
+            name='kind',
+            field=models.CharField(max_length=40, choices=[
+                ('estado_por_unidad_pdf', 'PDF Estado por Unidad'),
+                ('unit_statement_pdf', 'PDF Estado de Cuenta de Unidad'),
+                ('receipt_pdf', 'PDF Recibo de Pago'),
+                ('general_statement_email', 'Correo Estado General'),
+                ('vecino_statement_email', 'Correo Estado de Cuenta (Vecino)'),
+                ('statements_zip', 'ZIP Estados de Cuenta por Unidad'),
+                ('statement_campaign', 'Envío de Estados de Cuenta a todas las unidades'),
+                ('receipts_batch', 'Recibos de Pago del Período'),
+            ]),
+        ),
+    ]
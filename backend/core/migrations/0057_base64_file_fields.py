@@ -0,0 +1,71 @@
+"""
+Migration 0057 — Base64 → FileField.
+
+- Unit.credit_balance_evidence_file y CajaChicaEntry.evidence_file: las dos
+  columnas Base64 que aún no tenían FileField.
+- Payment.evidence_file pasa de ImageField a FileField (guarda la lista JSON
+  de comprobantes).
+- base_manager_name = 'objects' en los modelos con columnas Base64 deprecadas,
+  para que también los accesos por relación las difieran (LegacyBase64Manager).
+
+Los datos se copian con `python manage.py migrate_base64_to_files`.
+"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0056_report_job_receipts_batch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unit',
+            name='credit_balance_evidence_file',
+            field=models.FileField(
+                upload_to='unit_credit_evidences/', null=True, blank=True,
+                help_text='Evidencia de saldo a favor previo como archivo. Reemplaza al campo credit_balance_evidence (Base64).',
+            ),
+        ),
+        migrations.AddField(
+            model_name='cajachicaentry',
+            name='evidence_file',
+            field=models.FileField(
+                upload_to='caja_chica_evidences/', null=True, blank=True,
+                help_text='Evidencias (JSON [{data, mime, name}]) como archivo. Reemplaza al campo evidence.',
+            ),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='evidence_file',
+            field=models.FileField(
+                upload_to='payment_evidences/', null=True, blank=True,
+                help_text='Comprobantes de pago (JSON [{data, mime, name}]) como archivo. Reemplaza al campo evidence.',
+            ),
+        ),
+        migrations.AlterModelOptions(
+            name='tenant',
+            options={'ordering': ['name'], 'base_manager_name': 'objects'},
+        ),
+        migrations.AlterModelOptions(
+            name='unit',
+            options={'ordering': ['unit_id_code'], 'base_manager_name': 'objects'},
+        ),
+        migrations.AlterModelOptions(
+            name='payment',
+            options={'base_manager_name': 'objects'},
+        ),
+        migrations.AlterModelOptions(
+            name='gastoentry',
+            options={'ordering': ['-gasto_date', '-created_at'], 'base_manager_name': 'objects'},
+        ),
+        migrations.AlterModelOptions(
+            name='cajachicaentry',
+            options={'ordering': ['-date', '-created_at'], 'base_manager_name': 'objects'},
+        ),
+        migrations.AlterModelOptions(
+            name='bankstatement',
+            options={'base_manager_name': 'objects'},
+        ),
+    ]
@@ -0,0 +1,40 @@
+"""
+Migration 0058 — Add PeriodIncomeRollup model.
+
+Per-(tenant, period, concept, bank_reconciled) totals for the reporte
+general and the bank balance chain. The table starts empty; each period is
+built on its first read (core/income_rollup.py). The unique constraint's
+index also serves the (tenant, period) lookups.
+"""
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0057_base64_file_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PeriodIncomeRollup',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('period', models.CharField(max_length=7, help_text='Format: YYYY-MM')),
+                ('concept', models.CharField(max_length=120)),
+                ('bank_reconciled', models.BooleanField()),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.PositiveIntegerField(default=0,
+                    help_text='Pagos/registros que aportan al concepto')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                    related_name='income_rollup', to='core.tenant')),
+            ],
+            options={
+                'db_table': 'period_income_rollup',
+                'unique_together': {('tenant', 'period', 'concept', 'bank_reconciled')},
+            },
+        ),
+    ]
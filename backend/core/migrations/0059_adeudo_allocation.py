@@ -0,0 +1,83 @@
+"""
+Migration 0059 — Add AdeudoAllocation and backfill it.
+
+Payment.adeudo_payments ({target_period: {field_key: amount}}) is normalized
+into one row per target period and field, so debt received can be summed
+with SUM ... GROUP BY target_period instead of parsing every payment's JSON.
+The JSON column stays the API contract; the rows are rewritten from it on
+every Payment save (core/signals.py).
+"""
+import uuid
+from decimal import Decimal, InvalidOperation
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_allocations(apps, schema_editor):
+    Payment = apps.get_model('core', 'Payment')
+    Allocation = apps.get_model('core', 'AdeudoAllocation')
+
+    batch = []
+    qs = Payment.objects.only('id', 'tenant_id', 'unit_id', 'period', 'adeudo_payments').exclude(adeudo_payments={})
+    for pay in qs.iterator(chunk_size=500):
+        adeudo = pay.adeudo_payments
+        if not isinstance(adeudo, dict):
+            continue
+        for target_period, field_map in adeudo.items():
+            if not isinstance(field_map, dict):
+                continue
+            for field_key, raw in field_map.items():
+                try:
+                    amount = Decimal(str(raw or 0))
+                except InvalidOperation:
+                    continue
+                if not amount or not amount.is_finite():
+                    continue
+                batch.append(Allocation(
+                    tenant_id=pay.tenant_id, payment_id=pay.id, unit_id=pay.unit_id,
+                    period=pay.period, target_period=str(target_period)[:16],
+                    field_key=str(field_key)[:100], amount=amount,
+                ))
+        if len(batch) >= 1000:
+            Allocation.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Allocation.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0058_period_income_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdeudoAllocation',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('period', models.CharField(max_length=7,
+                    help_text='Período del pago que cobra el adeudo (YYYY-MM)')),
+                ('target_period', models.CharField(max_length=16,
+                    help_text='Período abonado (YYYY-MM) o "__prevDebt"')),
+                ('field_key', models.CharField(max_length=100,
+                    help_text='"maintenance", "prevDebt" or ExtraField.id')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('payment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                    related_name='adeudo_allocations', to='core.payment')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                    related_name='adeudo_allocations', to='core.tenant')),
+                ('unit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                    related_name='adeudo_allocations', to='core.unit', help_text='Unidad del pago')),
+            ],
+            options={
+                'db_table': 'adeudo_allocations',
+                'indexes': [
+                    models.Index(fields=['unit', 'target_period'], name='adeudo_allo_unit_id_20eb68_idx'),
+                    models.Index(fields=['tenant', 'period'], name='adeudo_allo_tenant__b08644_idx'),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_allocations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+"""
+Migration 0060 — Add AdelantoCredit and backfill it.
+
+FieldPayment.adelanto_targets ({target_period: amount}) is normalized into
+one row per target period, with the payment's tenant, unit and period
+copied in, so the credits landing in a period can be read for one unit or a
+whole tenant without parsing every field payment's JSON. The rows are
+rewritten from the JSON on every FieldPayment save (core/signals.py).
+"""
+import uuid
+from decimal import Decimal, InvalidOperation
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_credits(apps, schema_editor):
+    FieldPayment = apps.get_model('core', 'FieldPayment')
+    Credit = apps.get_model('core', 'AdelantoCredit')
+
+    batch = []
+    qs = (
+        FieldPayment.objects.exclude(adelanto_targets={})
+        .values('id', 'field_key', 'adelanto_targets', 'payment_id',
+                'payment__tenant_id', 'payment__unit_id', 'payment__period')
+    )
+    for fp in qs.iterator(chunk_size=500):
+        targets = fp['adelanto_targets']
+        if not isinstance(targets, dict):
+            continue
+        for target_period, raw in targets.items():
+            try:
+                amount = Decimal(str(raw or 0))
+            except InvalidOperation:
+                continue
+            if not amount or not amount.is_finite():
+                continue
+            batch.append(Credit(
+                tenant_id=fp['payment__tenant_id'], payment_id=fp['payment_id'], field_payment_id=fp['id'],
+                unit_id=fp['payment__unit_id'], period=fp['payment__period'],
+                target_period=str(target_period)[:16], field_key=fp['field_key'], amount=amount,
+            ))
+        if len(batch) >= 1000:
+            Credit.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Credit.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0059_adeudo_allocation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdelantoCredit',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('period', models.CharField(max_length=7,
+                    help_text='Período del pago que adelanta (YYYY-MM)')),
+                ('target_period', models.CharField(max_length=16,
+                    help_text='Período futuro abonado (YYYY-MM)')),
+                ('field_key', models.CharField(max_length=100,
+                    help_text='"maintenance" or ExtraField.id')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('field_payment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                    related_name='adelanto_credits', to='core.fieldpayment')),
+                ('payment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                    related_name='adelanto_credits', to='core.payment')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                    related_name='adelanto_credits', to='core.tenant')),
+                ('unit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                    related_name='adelanto_credits', to='core.unit', help_text='Unidad del pago')),
+            ],
+            options={
+                'db_table': 'adelanto_credits',
+                'indexes': [
+                    models.Index(fields=['unit', 'target_period'], name='adelanto_cr_unit_id_a1f570_idx'),
+                    models.Index(fields=['tenant', 'target_period'], name='adelanto_cr_tenant__2a25f2_idx'),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_credits, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+"""
+Migration 0061 — Indexes for keyset (cursor) pagination.
+
+Cursor pages of payments, reservations, notifications and audit logs are
+read with WHERE (created_at, id) < cursor ORDER BY created_at DESC, id DESC
+(core/pagination.py); these indexes serve that scan for each list's filter.
+"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0060_adelanto_credit'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['tenant', '-created_at', '-id'], name='payments_tenant__d67142_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='amenityreservation',
+            index=models.Index(fields=['tenant', '-created_at', '-id'], name='amenity_res_tenant__9434f8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['tenant', 'user', '-created_at', '-id'], name='notificatio_tenant__02da0f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['-created_at', '-id'], name='audit_logs_created_ca6de1_idx'),
+        ),
+    ]
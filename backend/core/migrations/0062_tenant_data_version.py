@@ -0,0 +1,43 @@
+"""
+Migration 0062 — Add TenantDataVersion model.
+
+The result cache (core/result_cache.py) kept the tenant data versions in
+Django's cache, which is per process without REDIS_URL. The versions now
+live in the database and are bumped in the same transaction as the write.
+Every existing tenant gets its row here; new tenants get it on creation
+(core/signals.py).
+"""
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_versions(apps, schema_editor):
+    Tenant = apps.get_model('core', 'Tenant')
+    TenantDataVersion = apps.get_model('core', 'TenantDataVersion')
+    TenantDataVersion.objects.bulk_create(
+        [TenantDataVersion(tenant_id=tenant_id) for tenant_id in Tenant.objects.values_list('id', flat=True)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0061_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantDataVersion',
+            fields=[
+                ('tenant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True,
+                    related_name='data_version', serialize=False, to='core.tenant')),
+                ('data', models.BigIntegerField(default=0)),
+                ('closed', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'tenant_data_versions',
+            },
+        ),
+        migrations.RunPython(create_versions, migrations.RunPython.noop),
+    ]
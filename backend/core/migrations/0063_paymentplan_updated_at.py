@@ -0,0 +1,25 @@
+"""
+Migration 0063 — Add PaymentPlan.updated_at.
+
+The cached receipt PDFs (core/receipt_cache.py) render the plan installment
+rows, so their fingerprint needs to change whenever the plan does. Existing
+plans take the migration time as their first updated_at.
+"""
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0062_tenant_data_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentplan',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
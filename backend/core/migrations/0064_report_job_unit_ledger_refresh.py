@@ -0,0 +1,33 @@
+"""
+Migration 0064 — ReportJob.kind 'unit_ledger_refresh'.
+
+Rows missing from the unit ledger for many units at once (month rollover,
+invalidated ledger) are filled in by the job worker instead of the request
+that found them.
+"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0063_paymentplan_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportjob',
+            name='kind',
+            field=models.CharField(max_length=40, choices=[
+                ('estado_por_unidad_pdf', 'PDF Estado por Unidad'),
+                ('unit_statement_pdf', 'PDF Estado de Cuenta de Unidad'),
+                ('receipt_pdf', 'PDF Recibo de Pago'),
+                ('general_statement_email', 'Correo Estado General'),
+                ('vecino_statement_email', 'Correo Estado de Cuenta (Vecino)'),
+                ('statements_zip', 'ZIP Estados de Cuenta por Unidad'),
+                ('statement_campaign', 'Envío de Estados de Cuenta a todas las unidades'),
+                ('receipts_batch', 'Recibos de Pago del Período'),
+                ('unit_ledger_refresh', 'Actualización del Estado de Cuenta Materializado'),
+            ]),
+        ),
+    ]
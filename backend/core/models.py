@@ -20,11 +20,58 @@ Model hierarchy:
 """
 
 import uuid
+from decimal import Decimal, InvalidOperation
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.core.validators import MinValueValidator
 
 
+# ═══════════════════════════════════════════════════════════
+#  COLUMNAS BASE64 DEPRECADAS
+# ═══════════════════════════════════════════════════════════
+
+class LegacyBase64QuerySet(models.QuerySet):
+    """
+    Difiere las columnas Base64 deprecadas (LEGACY_BASE64_FIELDS) también en
+    los modelos unidos con select_related: el contenido vive en los *_file
+    (core/base64_files.py) y las columnas solo las lee migrate_base64_to_files.
+    """
+
+    def lean(self, *fields):
+        """
+        Consulta para listados y reportes: Payment.objects.lean(...).
+
+        Sin argumentos lee todas las columnas salvo las Base64. Con *fields*
+        lee solo esas (la pk siempre; 'unit__unit_name' para las de un
+        select_related). Las Base64 nunca se leen aunque se nombren: only()
+        respeta el defer del manager.
+        """
+        return self.only(*fields) if fields else self
+
+    def select_related(self, *fields):
+        qs = super().select_related(*fields)
+        deferred = []
+        for path in fields:
+            if path is None:
+                continue
+            model = self.model
+            try:
+                for part in path.split('__'):
+                    model = model._meta.get_field(part).related_model
+            except Exception:
+                continue
+            deferred += [f'{path}__{name}' for name in getattr(model, 'LEGACY_BASE64_FIELDS', {})]
+        return qs.defer(*deferred) if deferred else qs
+
+
+class LegacyBase64Manager(models.Manager.from_queryset(LegacyBase64QuerySet)):
+    """Manager por defecto (y base) de los modelos con LEGACY_BASE64_FIELDS."""
+
+    def get_queryset(self):
+        return super().get_queryset().defer(*self.model.LEGACY_BASE64_FIELDS)
+
+
 # ═══════════════════════════════════════════════════════════
 #  CUSTOM USER
 # ═══════════════════════════════════════════════════════════
@@ -241,14 +288,40 @@ class Tenant(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Columna Base64 → (FileField, formato de la API); ver core/base64_files.py
+    LEGACY_BASE64_FIELDS = {'logo': ('logo_file', 'data_url')}
+
+    objects = LegacyBase64Manager()
+
     class Meta:
         db_table = 'tenants'
         ordering = ['name']
+        base_manager_name = 'objects'
 
     def __str__(self):
         return self.name
 
 
+class TenantDataVersion(models.Model):
+    """
+    Versiones de datos del condominio para el cache de resultados
+    (core/result_cache.py): `data` cambia con cualquier escritura que afecte
+    dashboard y reportes, `closed` solo con las que afectan períodos
+    cerrados. Se incrementan en la misma transacción que el cambio, así que
+    todos los procesos ven la versión nueva al confirmarla.
+    """
+    tenant = models.OneToOneField(Tenant, on_delete=models.CASCADE, primary_key=True,
+                                  related_name='data_version')
+    data = models.BigIntegerField(default=0)
+    closed = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'tenant_data_versions'
+
+    def __str__(self):
+        return f'{self.tenant_id}: d{self.data} c{self.closed}'
+
+
 # ═══════════════════════════════════════════════════════════
 #  TENANT USER (Role per tenant)
 # ═══════════════════════════════════════════════════════════
@@ -338,14 +411,26 @@ class Unit(models.Model):
                                          help_text='Saldo a favor previo al inicio de operaciones')
     credit_balance_evidence = models.TextField(blank=True, default='',
                                                help_text='Base64 PDF evidencia del saldo a favor previo')
+    credit_balance_evidence_file = models.FileField(
+        upload_to='unit_credit_evidences/', null=True, blank=True,
+        help_text='Evidencia de saldo a favor previo como archivo. Reemplaza al campo credit_balance_evidence (Base64).',
+    )
     is_active = models.BooleanField(default=True,
                                     help_text='Unidad activa. Si es False queda de solo lectura y no acepta nuevos pagos.')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    LEGACY_BASE64_FIELDS = {
+        'previous_debt_evidence': ('previous_debt_evidence_file', 'base64'),
+        'credit_balance_evidence': ('credit_balance_evidence_file', 'base64'),
+    }
+
+    objects = LegacyBase64Manager()
+
     class Meta:
         db_table = 'units'
         ordering = ['unit_id_code']
+        base_manager_name = 'objects'
         unique_together = ['tenant', 'unit_id_code']
         indexes = [
             models.Index(fields=['tenant', 'unit_name']),
@@ -437,9 +522,9 @@ class Payment(models.Model):
     notes = models.TextField(blank=True, default='')
     evidence = models.TextField(blank=True, default='', help_text='Base64 evidence image (deprecado — usar evidence_file)')
     # MIGRACIÓN Base64→File: nuevo campo que reemplazará a `evidence`
-    evidence_file = models.ImageField(
+    evidence_file = models.FileField(
         upload_to='payment_evidences/', null=True, blank=True,
-        help_text='Comprobante de pago como archivo. Reemplaza al campo evidence (Base64).',
+        help_text='Comprobantes de pago (JSON [{data, mime, name}]) como archivo. Reemplaza al campo evidence.',
     )
     bank_reconciled = models.BooleanField(default=False)
     folio = models.CharField(max_length=50, blank=True, default='',
@@ -460,13 +545,19 @@ class Payment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    LEGACY_BASE64_FIELDS = {'evidence': ('evidence_file', 'text')}
+
+    objects = LegacyBase64Manager()
+
     class Meta:
         db_table = 'payments'
+        base_manager_name = 'objects'
         unique_together = ['tenant', 'unit', 'period']
         indexes = [
             models.Index(fields=['tenant', 'period']),
             models.Index(fields=['tenant', 'period', 'status']),
             models.Index(fields=['unit', 'period']),
+            models.Index(fields=['tenant', '-created_at', '-id']),
         ]
 
     def __str__(self):
@@ -495,6 +586,257 @@ class FieldPayment(models.Model):
         return f'{self.field_key}: {self.received}'
 
 
+class AdditionalPaymentAllocation(models.Model):
+    """
+    Montos de additional_payments dirigidos a otra unidad (applied_to_unit_id),
+    normalizados para consultarlos por unidad destino sin recorrer el JSON
+    de todos los pagos del tenant. Se reescribe desde Payment.additional_payments
+    en cada guardado del pago (core/signals.py): una fila por entrada y campo
+    con monto > 0.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='additional_allocations')
+    payment = models.ForeignKey(Payment, on_delete=models.CASCADE, related_name='additional_allocations')
+    entry_id = models.CharField(max_length=64, help_text='additional_payments[].id')
+    applied_to_unit = models.ForeignKey(Unit, on_delete=models.CASCADE, related_name='additional_allocations')
+    period = models.CharField(max_length=7, help_text='Período del pago origen (YYYY-MM)')
+    field_key = models.CharField(max_length=100, help_text='"maintenance" or ExtraField.id')
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'additional_payment_allocations'
+        indexes = [
+            models.Index(fields=['applied_to_unit', 'period']),
+            models.Index(fields=['tenant', 'period']),
+        ]
+
+    def __str__(self):
+        return f'{self.entry_id} → {self.applied_to_unit_id} {self.field_key}: {self.amount}'
+
+    @classmethod
+    def rows_for(cls, payment):
+        """
+        Filas de las entradas de additional_payments dirigidas a otra unidad del
+        tenant (se omiten montos vacíos, no numéricos o no positivos).
+        """
+        rows = []
+        tenant_units = None
+        for entry in (payment.additional_payments or []):
+            if not isinstance(entry, dict):
+                continue
+            target = str(entry.get('applied_to_unit_id') or '')
+            if not target or target == str(payment.unit_id):
+                continue
+            if tenant_units is None:
+                tenant_units = {
+                    str(uid) for uid in
+                    Unit.objects.filter(tenant_id=payment.tenant_id).values_list('id', flat=True)
+                }
+            if target not in tenant_units:
+                continue
+            for field_key, fd in (entry.get('field_payments') or {}).items():
+                raw = fd.get('received', 0) if isinstance(fd, dict) else fd
+                try:
+                    amount = Decimal(str(raw or 0))
+                except InvalidOperation:
+                    continue
+                if amount.is_finite() and amount > 0:
+                    rows.append(cls(
+                        tenant_id=payment.tenant_id, payment_id=payment.id,
+                        entry_id=str(entry.get('id', ''))[:64], applied_to_unit_id=target,
+                        period=payment.period, field_key=str(field_key)[:100], amount=amount,
+                    ))
+        return rows
+
+    @classmethod
+    def sync(cls, payment):
+        """Reescribe las filas del pago desde payment.additional_payments."""
+        cls.objects.filter(payment_id=payment.id).delete()
+        rows = cls.rows_for(payment)
+        if rows:
+            cls.objects.bulk_create(rows)
+
+
+class AdeudoAllocation(models.Model):
+    """
+    Payment.adeudo_payments ({período destino: {campo: monto}}) normalizado:
+    una fila por período destino y campo con monto distinto de 0. El JSON
+    sigue siendo lo que la API recibe y devuelve; estas filas se reescriben
+    desde él en cada guardado del pago (core/signals.py) para sumar adeudos
+    cobrados con SUM … GROUP BY en lugar de recorrer el JSON de cada pago.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='adeudo_allocations')
+    payment = models.ForeignKey(Payment, on_delete=models.CASCADE, related_name='adeudo_allocations')
+    unit = models.ForeignKey(Unit, on_delete=models.CASCADE, related_name='adeudo_allocations',
+                             help_text='Unidad del pago')
+    period = models.CharField(max_length=7, help_text='Período del pago que cobra el adeudo (YYYY-MM)')
+    target_period = models.CharField(max_length=16, help_text='Período abonado (YYYY-MM) o "__prevDebt"')
+    field_key = models.CharField(max_length=100, help_text='"maintenance", "prevDebt" or ExtraField.id')
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'adeudo_allocations'
+        indexes = [
+            models.Index(fields=['unit', 'target_period']),
+            models.Index(fields=['tenant', 'period']),
+        ]
+
+    def __str__(self):
+        return f'{self.payment_id} → {self.target_period} {self.field_key}: {self.amount}'
+
+    @classmethod
+    def rows_for(cls, payment):
+        """Filas del JSON adeudo_payments del pago (se omiten montos vacíos o no numéricos)."""
+        rows = []
+        for target_period, field_map in (payment.adeudo_payments or {}).items():
+            if not isinstance(field_map, dict):
+                continue
+            for field_key, raw in field_map.items():
+                try:
+                    amount = Decimal(str(raw or 0))
+                except InvalidOperation:
+                    continue
+                if amount and amount.is_finite():
+                    rows.append(cls(
+                        tenant_id=payment.tenant_id, payment_id=payment.id, unit_id=payment.unit_id,
+                        period=payment.period, target_period=str(target_period)[:16],
+                        field_key=str(field_key)[:100], amount=amount,
+                    ))
+        return rows
+
+    @classmethod
+    def sync(cls, payment):
+        """Reescribe las filas del pago desde payment.adeudo_payments."""
+        cls.objects.filter(payment_id=payment.id).delete()
+        rows = cls.rows_for(payment)
+        if rows:
+            cls.objects.bulk_create(rows)
+
+
+class AdelantoCredit(models.Model):
+    """
+    FieldPayment.adelanto_targets ({período futuro: monto}) normalizado: una
+    fila por período destino con monto distinto de 0. Permite leer los
+    adelantos que llegan a un período (de una unidad o de todo el condominio)
+    sin recorrer el historial de pagos. Se reescribe desde el JSON en cada
+    guardado del FieldPayment; unidad y período se copian del pago y se
+    actualizan cuando el pago cambia (core/signals.py).
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='adelanto_credits')
+    payment = models.ForeignKey(Payment, on_delete=models.CASCADE, related_name='adelanto_credits')
+    field_payment = models.ForeignKey(FieldPayment, on_delete=models.CASCADE, related_name='adelanto_credits')
+    unit = models.ForeignKey(Unit, on_delete=models.CASCADE, related_name='adelanto_credits',
+                             help_text='Unidad del pago')
+    period = models.CharField(max_length=7, help_text='Período del pago que adelanta (YYYY-MM)')
+    target_period = models.CharField(max_length=16, help_text='Período futuro abonado (YYYY-MM)')
+    field_key = models.CharField(max_length=100, help_text='"maintenance" or ExtraField.id')
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'adelanto_credits'
+        indexes = [
+            models.Index(fields=['unit', 'target_period']),
+            models.Index(fields=['tenant', 'target_period']),
+        ]
+
+    def __str__(self):
+        return f'{self.field_payment_id} → {self.target_period}: {self.amount}'
+
+    @classmethod
+    def rows_for(cls, field_payment, payment):
+        """Filas del JSON adelanto_targets (se omiten montos vacíos o no numéricos)."""
+        targets = field_payment.adelanto_targets
+        if not isinstance(targets, dict):
+            return []
+        rows = []
+        for target_period, raw in targets.items():
+            try:
+                amount = Decimal(str(raw or 0))
+            except InvalidOperation:
+                continue
+            if amount and amount.is_finite():
+                rows.append(cls(
+                    tenant_id=payment.tenant_id, payment_id=payment.id, field_payment_id=field_payment.id,
+                    unit_id=payment.unit_id, period=payment.period, target_period=str(target_period)[:16],
+                    field_key=field_payment.field_key, amount=amount,
+                ))
+        return rows
+
+    @classmethod
+    def sync(cls, field_payment):
+        """Reescribe las filas del FieldPayment desde adelanto_targets."""
+        cls.objects.filter(field_payment_id=field_payment.id).delete()
+        rows = cls.rows_for(field_payment, field_payment.payment)
+        if rows:
+            cls.objects.bulk_create(rows)
+
+
+class UnitPeriodLedger(models.Model):
+    """
+    Estado de cuenta materializado: una fila por (unidad, período) con los
+    mismos montos que calcula _compute_statement. Se recalcula de forma
+    incremental al registrar/modificar pagos y se reconstruye con
+    `python manage.py rebuild_unit_ledger`.
+    Cubre desde operation_start_date hasta el período actual.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='unit_ledger')
+    unit = models.ForeignKey(Unit, on_delete=models.CASCADE, related_name='ledger_entries')
+    period = models.CharField(max_length=7, help_text='Format: YYYY-MM')
+    charge = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    paid = models.DecimalField(max_digits=14, decimal_places=2, default=0,
+                               help_text='Abonos mostrados (incluye campos neutrales y adeudos cobrados)')
+    paid_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0,
+                                       help_text='Abonos que afectan el saldo')
+    adelanto = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    adeudo_received = models.DecimalField(max_digits=14, decimal_places=2, default=0,
+                                          help_text='Adeudo cobrado en otro período dirigido a este período')
+    maintenance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    saldo_acum = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    status = models.CharField(max_length=10, default='pendiente')
+    # Datos a nivel unidad repetidos en cada fila para leer el ledger sin otra consulta
+    prev_debt_adeudo = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    has_active_plan = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'unit_period_ledger'
+        unique_together = ['unit', 'period']
+        indexes = [
+            models.Index(fields=['tenant', 'period']),
+        ]
+
+    def __str__(self):
+        return f'{self.unit_id} — {self.period}: {self.saldo_acum}'
+
+
+class PeriodIncomeRollup(models.Model):
+    """
+    Totales del reporte general por (condominio, período, concepto, conciliado):
+    mantenimiento, mantenimiento adelantado, adeudos, referenciados (centavos),
+    campos de cobranza ('campo:<field_key>'), ingresos no identificados y
+    egresos. Las escrituras de pagos, gastos e ingresos no identificados
+    borran las filas de su período y la siguiente lectura las reconstruye
+    (core/income_rollup.py).
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='income_rollup')
+    period = models.CharField(max_length=7, help_text='Format: YYYY-MM')
+    concept = models.CharField(max_length=120)
+    bank_reconciled = models.BooleanField()
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0, help_text='Pagos/registros que aportan al concepto')
+
+    class Meta:
+        db_table = 'period_income_rollup'
+        unique_together = ['tenant', 'period', 'concept', 'bank_reconciled']
+
+    def __str__(self):
+        return f'{self.tenant_id} {self.period} {self.concept} ({self.bank_reconciled}): {self.amount}'
+
+
 # ═══════════════════════════════════════════════════════════
 #  GASTO ENTRY (Expense records)
 # ═══════════════════════════════════════════════════════════
@@ -536,8 +878,13 @@ class GastoEntry(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    LEGACY_BASE64_FIELDS = {'evidence': ('evidence_file', 'text')}
+
+    objects = LegacyBase64Manager()
+
     class Meta:
         db_table = 'gasto_entries'
+        base_manager_name = 'objects'
         ordering = ['-gasto_date', '-created_at']
         indexes = [
             models.Index(fields=['tenant', 'period']),
@@ -573,10 +920,19 @@ class CajaChicaEntry(models.Model):
         blank=True, default='',
         help_text='JSON array of {data, mime, name} base64-encoded evidence files for this entry.',
     )
+    evidence_file = models.FileField(
+        upload_to='caja_chica_evidences/', null=True, blank=True,
+        help_text='Evidencias (JSON [{data, mime, name}]) como archivo. Reemplaza al campo evidence.',
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    LEGACY_BASE64_FIELDS = {'evidence': ('evidence_file', 'text')}
+
+    objects = LegacyBase64Manager()
+
     class Meta:
         db_table = 'caja_chica'
+        base_manager_name = 'objects'
         ordering = ['-date', '-created_at']
         indexes = [
             models.Index(fields=['tenant', 'period']),
@@ -651,6 +1007,7 @@ class PaymentPlan(models.Model):
     created_by_name  = models.CharField(max_length=200, blank=True)
     created_by_email = models.CharField(max_length=200, blank=True)
     created_at       = models.DateTimeField(auto_now_add=True)
+    updated_at       = models.DateTimeField(auto_now=True)
 
     sent_by_name = models.CharField(max_length=200, blank=True)
     sent_at      = models.DateTimeField(null=True, blank=True)
@@ -721,8 +1078,13 @@ class BankStatement(models.Model):
     )
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    LEGACY_BASE64_FIELDS = {'file_data': ('statement_file', 'base64')}
+
+    objects = LegacyBase64Manager()
+
     class Meta:
         db_table = 'bank_statements'
+        base_manager_name = 'objects'
         unique_together = ['tenant', 'period']
 
     def __str__(self):
@@ -744,6 +1106,15 @@ class ClosedPeriod(models.Model):
     closed_at = models.DateTimeField(auto_now_add=True)
     closed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
 
+    # Snapshot bancario al cierre: ReporteGeneral no necesita recalcular períodos cerrados
+    ingresos_reconciled = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True,
+                                              help_text='Ingresos conciliados del período al cierre')
+    egresos_reconciled = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True,
+                                             help_text='Egresos conciliados del período al cierre')
+    closing_bank_balance = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True,
+                                               help_text='Saldo bancario al final del período')
+    snapshot_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         db_table = 'closed_periods'
         unique_together = ['tenant', 'period']
@@ -974,6 +1345,7 @@ class AmenityReservation(models.Model):
         indexes = [
             models.Index(fields=['tenant', 'date']),
             models.Index(fields=['tenant', 'status']),
+            models.Index(fields=['tenant', '-created_at', '-id']),
         ]
 
     def __str__(self):
@@ -1026,6 +1398,7 @@ class Notification(models.Model):
         ordering = ['-created_at']
         indexes  = [
             models.Index(fields=['tenant', 'user', 'is_read']),
+            models.Index(fields=['tenant', 'user', '-created_at', '-id']),
         ]
 
     def __str__(self):
@@ -1097,12 +1470,150 @@ class AuditLog(models.Model):
             models.Index(fields=['tenant', '-created_at']),
             models.Index(fields=['user',   '-created_at']),
             models.Index(fields=['module', 'action']),
+            models.Index(fields=['-created_at', '-id']),
         ]
 
     def __str__(self):
         return f'[{self.module}/{self.action}] {self.description[:60]}'
 
 
+# ═══════════════════════════════════════════════════════════
+#  REPORT JOBS (cola de trabajos pesados en la base de datos)
+# ═══════════════════════════════════════════════════════════
+
+class ReportJob(models.Model):
+    """
+    Trabajo pesado (PDF, correo con estado de cuenta) encolado desde la API
+    y ejecutado fuera del request por `python manage.py run_report_jobs`.
+    La cola es esta misma tabla: los workers toman trabajos con
+    SELECT … FOR UPDATE SKIP LOCKED, sin broker externo.
+    """
+    KIND_CHOICES = [
+        ('estado_por_unidad_pdf',   'PDF Estado por Unidad'),
+        ('unit_statement_pdf',      'PDF Estado de Cuenta de Unidad'),
+        ('receipt_pdf',             'PDF Recibo de Pago'),
+        ('general_statement_email', 'Correo Estado General'),
+        ('vecino_statement_email',  'Correo Estado de Cuenta (Vecino)'),
+        ('statements_zip',          'ZIP Estados de Cuenta por Unidad'),
+        ('statement_campaign',      'Envío de Estados de Cuenta a todas las unidades'),
+        ('receipts_batch',          'Recibos de Pago del Período'),
+        ('unit_ledger_refresh',     'Actualización del Estado de Cuenta Materializado'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'En cola'),
+        ('running', 'En proceso'),
+        ('done',    'Terminado'),
+        ('failed',  'Fallido'),
+    ]
+
+    id           = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant       = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='report_jobs')
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='report_jobs')
+    kind         = models.CharField(max_length=40, choices=KIND_CHOICES)
+    params       = models.JSONField(default=dict, blank=True,
+                                    help_text='Parámetros ya validados por la vista que encoló el trabajo')
+    status       = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts     = models.PositiveSmallIntegerField(default=0)
+    worker       = models.CharField(max_length=100, blank=True, default='',
+                                    help_text='Identificador del worker que tomó el trabajo')
+    # Resultado: archivo generado y/o datos (p.ej. mensaje de envío)
+    result_file  = models.FileField(upload_to='report_jobs/', null=True, blank=True)
+    result_filename = models.CharField(max_length=200, blank=True, default='')
+    result_content_type = models.CharField(max_length=100, blank=True, default='')
+    result       = models.JSONField(default=dict, blank=True)
+    error        = models.TextField(blank=True, default='')
+    created_at   = models.DateTimeField(auto_now_add=True)
+    started_at   = models.DateTimeField(null=True, blank=True)
+    finished_at  = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'report_jobs'
+        ordering = ['-created_at']
+        indexes  = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['tenant', 'requested_by', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f'[{self.kind}] {self.status} — {self.tenant_id}'
+
+
+class StatementDelivery(models.Model):
+    """
+    Estado de envío del estado de cuenta de una unidad dentro de un envío
+    masivo (ReportJob 'statement_campaign'). Se crean todas al encolar la
+    campaña; el worker solo procesa las 'pending', así un reintento del
+    trabajo no reenvía a las unidades que ya lo recibieron.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('sent',    'Enviado'),
+        ('failed',  'Fallido'),
+        ('skipped', 'Sin correo'),
+    ]
+
+    id         = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    job        = models.ForeignKey(ReportJob, on_delete=models.CASCADE, related_name='statement_deliveries')
+    unit       = models.ForeignKey(Unit, on_delete=models.CASCADE, related_name='statement_deliveries')
+    emails     = models.JSONField(default=list, blank=True)
+    status     = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    error      = models.TextField(blank=True, default='')
+    sent_at    = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'statement_deliveries'
+        unique_together = ['job', 'unit']
+        indexes  = [
+            models.Index(fields=['job', 'status']),
+        ]
+
+    def __str__(self):
+        return f'[{self.status}] {self.unit_id} — {self.job_id}'
+
+
+class OutboundEmail(models.Model):
+    """
+    Correo pendiente de envío. Las notificaciones se encolan aquí (ya
+    renderizadas) y `python manage.py send_outbound_emails` las envía por
+    lotes reutilizando una sola conexión SMTP. Los fallos se reintentan con
+    espera exponencial (next_attempt_at).
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('sending', 'Enviando'),
+        ('sent',    'Enviado'),
+        ('failed',  'Fallido'),
+    ]
+
+    id              = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant          = models.ForeignKey(Tenant, on_delete=models.SET_NULL, null=True, blank=True,
+                                        related_name='outbound_emails')
+    category        = models.CharField(max_length=40, default='notification',
+                                       help_text='Origen del correo (p.ej. notif_type de la notificación)')
+    to_email        = models.EmailField()
+    subject         = models.CharField(max_length=300)
+    plain_body      = models.TextField(blank=True, default='')
+    html_body       = models.TextField(blank=True, default='')
+    status          = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts        = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_at       = models.DateTimeField(null=True, blank=True)
+    last_error      = models.TextField(blank=True, default='')
+    created_at      = models.DateTimeField(auto_now_add=True)
+    sent_at         = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'outbound_emails'
+        indexes  = [
+            models.Index(fields=['status', 'next_attempt_at']),
+            models.Index(fields=['tenant', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f'[{self.status}] {self.subject[:60]} → {self.to_email}'
+
+
 # ═══════════════════════════════════════════════════════════
 #  CONDOMINIO REQUEST (Landing page registration leads)
 # ═══════════════════════════════════════════════════════════
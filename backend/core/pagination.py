@@ -1,8 +1,57 @@
 """
 Custom pagination that allows client to override page_size via query param.
 Used for pages like Cobranza and Estado de Cuenta that need all units.
+
+Listados grandes (pagos, bitácora, notificaciones, reservaciones) aceptan
+además paginación por cursor sobre (created_at, id): ?cursor= (vacío para la
+primera página). Cada página es un WHERE sobre el índice en lugar de un
+OFFSET y no cuenta el total; ?count=approx|exact lo agrega.
 """
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# Por debajo de esta estimación se cuenta exacto: el COUNT ya es barato
+EXACT_COUNT_BELOW = 10000
+
+
+def approximate_count(queryset):
+    """
+    Total aproximado según el planner de PostgreSQL: pg_class.reltuples si
+    el queryset no tiene filtros, si no las filas estimadas por EXPLAIN.
+    En otros motores (o con estimaciones pequeñas) devuelve count() exacto.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    estimate = None
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            estimate = row[0] if row else None
+        else:
+            sql, params = queryset.order_by().values('pk').query.sql_with_params()
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = plan[0]['Plan']['Plan Rows']
+    # reltuples = -1: la tabla nunca se ha analizado
+    if estimate is None or estimate < EXACT_COUNT_BELOW:
+        return queryset.count()
+    return int(estimate)
 
 
 class FlexiblePageNumberPagination(PageNumberPagination):
@@ -10,3 +59,140 @@ class FlexiblePageNumberPagination(PageNumberPagination):
     page_size = 25
     page_size_query_param = 'page_size'
     max_page_size = 10000  # Allow up to 10k items when client requests it
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por cursor sobre (created_at, id), más recientes primero.
+
+    El cursor codifica el último (o primero) registro de la página y la
+    siguiente se pide con created_at/id estrictamente menores, así que
+    cuesta lo mismo en la página 1 que en la 10 000. El orden es fijo: se
+    ignora ?ordering.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    ordering = ('created_at', 'id')
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def _page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def _decode(self, token):
+        if not token:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8'))
+            return datetime.fromisoformat(data['t']), data['i'], bool(data.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _encode(self, obj, reverse):
+        time_field, id_field = self.ordering
+        data = {'t': getattr(obj, time_field).isoformat(), 'i': str(getattr(obj, id_field)), 'r': reverse}
+        return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).decode('ascii')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        time_field, id_field = self.ordering
+        self.request = request
+        size = self._page_size(request)
+        cursor = self._decode(request.query_params.get(self.cursor_query_param, ''))
+        reverse = bool(cursor and cursor[2])
+
+        self.count = None
+        count_mode = request.query_params.get(self.count_query_param)
+        if count_mode in ('approx', 'exact'):
+            self.count = approximate_count(queryset) if count_mode == 'approx' else queryset.count()
+
+        if reverse:
+            queryset = queryset.order_by(time_field, id_field)
+        else:
+            queryset = queryset.order_by(f'-{time_field}', f'-{id_field}')
+        if cursor:
+            at, pk, _reverse = cursor
+            try:
+                pk = queryset.model._meta.get_field(id_field).to_python(pk)
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            op = 'gt' if reverse else 'lt'
+            queryset = queryset.filter(
+                Q(**{f'{time_field}__{op}': at}) | Q(**{time_field: at, f'{id_field}__{op}': pk})
+            )
+
+        items = list(queryset[:size + 1])
+        has_more = len(items) > size
+        items = items[:size]
+        if reverse:
+            items.reverse()
+
+        # Hay página siguiente si sobró un registro (o si se llegó retrocediendo);
+        # anterior si se llegó con cursor hacia adelante (o sobró retrocediendo)
+        has_next = has_more if not reverse else bool(cursor)
+        has_previous = bool(cursor) if not reverse else has_more
+        self.next_cursor = self._encode(items[-1], False) if items and has_next else None
+        self.previous_cursor = self._encode(items[0], True) if items and has_previous else None
+        return items
+
+    def _link(self, token):
+        if token is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def get_paginated_response(self, data):
+        body = {
+            'next': self._link(self.next_cursor),
+            'previous': self._link(self.previous_cursor),
+        }
+        if self.count is not None:
+            body['count'] = self.count
+        body['results'] = data
+        return Response(body)
+
+
+class KeysetOrPageNumberPagination(FlexiblePageNumberPagination):
+    """
+    FlexiblePageNumberPagination por defecto (compatibilidad); con ?cursor=
+    en la URL usa KeysetPagination. Con ?count=approx la paginación por
+    página reporta el total estimado en lugar de hacer COUNT(*).
+    """
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if KeysetPagination.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        if request.query_params.get(KeysetPagination.count_query_param) == 'approx':
+            queryset = _ApproxCountQuerySet(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class _ApproxCountQuerySet:
+    """Envuelve un queryset para que el Paginator de Django use approximate_count()."""
+
+    def __init__(self, queryset):
+        self._queryset = queryset
+
+    def count(self):
+        return approximate_count(self._queryset)
+
+    def __getitem__(self, key):
+        return self._queryset[key]
+
+    def __len__(self):
+        return len(self._queryset)
+
+    def __getattr__(self, name):
+        return getattr(self._queryset, name)
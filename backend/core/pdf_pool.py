@@ -0,0 +1,65 @@
+"""
+Homly — Procesos para renderizar PDFs en paralelo
+=================================================
+reportlab es Python puro y con hilos quedaría limitado por el GIL, así que
+los ZIP masivos de estados de cuenta y recibos renderizan en un
+ProcessPoolExecutor de STATEMENT_PDF_WORKERS procesos.
+
+Los procesos se crean con forkserver (spawn donde no existe) y no con fork:
+el proceso que los pide puede tener hilos (flusher de AuditLog, envíos de
+correo) y un fork copia sus locks tal como estén, posiblemente tomados.
+Cada proceso configura Django una sola vez en el initializer y recibe el
+condominio y su logo ya reducido; los documentos no consultan la base de
+datos.
+
+Solo lo usan los trabajos de core/jobs.py (run_report_jobs); las descargas
+por HTTP renderizan en el propio proceso del worker de gunicorn.
+
+Este módulo no importa Django al cargarse: los procesos nuevos lo importan
+antes de ejecutar el initializer.
+"""
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+# Condominio de los procesos de render (se envía una vez por proceso, no por documento)
+_tenant = None
+
+
+def _init_worker(settings_module, tenant_pickle, logo):
+    global _tenant
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+    from . import assets
+    _tenant = pickle.loads(tenant_pickle)
+    assets.preload_tenant_logo(_tenant, logo)
+
+
+def render_statement(task):
+    """task = (unit, rows, total_charges, total_paid, adj_balance, from_period, to_period)."""
+    from .views import _generate_unit_statement_pdf
+    return _generate_unit_statement_pdf(_tenant, *task)
+
+
+def render_receipt(task):
+    """task = (unit, payment, receipt_data, exempt)."""
+    from .views import _generate_receipt_pdf
+    return _generate_receipt_pdf(_tenant, *task)
+
+
+def start(tenant, workers):
+    """ProcessPoolExecutor de *workers* procesos para los documentos de *tenant*."""
+    from django.conf import settings
+
+    from . import assets
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(settings.SETTINGS_MODULE, pickle.dumps(tenant), assets.tenant_logo(tenant)),
+    )
@@ -1,9 +1,18 @@
 """
 Homly — Custom Permissions
 Role-based access control matching the original app's role system.
+Roles come from request.membership (core/membership.py): one lookup per
+request, shared with the views and the audit log.
 """
 from rest_framework.permissions import BasePermission
-from .models import TenantUser
+from . import membership
+
+
+def _tenant_role(request, view):
+    tenant_id = view.kwargs.get('tenant_id')
+    if not tenant_id:
+        return None
+    return membership.for_request(request).role(tenant_id)
 
 
 class IsSuperAdmin(BasePermission):
@@ -37,12 +46,7 @@ class IsTenantMember(BasePermission):
             return False
         if request.user.is_super_admin:
             return True
-        tenant_id = view.kwargs.get('tenant_id')
-        if not tenant_id:
-            return False
-        return TenantUser.objects.filter(
-            user=request.user, tenant_id=tenant_id
-        ).exists()
+        return _tenant_role(request, view) is not None
 
 
 class IsTenantAdmin(BasePermission):
@@ -52,12 +56,7 @@ class IsTenantAdmin(BasePermission):
             return False
         if request.user.is_super_admin:
             return True
-        tenant_id = view.kwargs.get('tenant_id')
-        if not tenant_id:
-            return False
-        return TenantUser.objects.filter(
-            user=request.user, tenant_id=tenant_id, role='admin'
-        ).exists()
+        return _tenant_role(request, view) == 'admin'
 
 
 class IsAdminOrTesorero(BasePermission):
@@ -67,13 +66,7 @@ class IsAdminOrTesorero(BasePermission):
             return False
         if request.user.is_super_admin:
             return True
-        tenant_id = view.kwargs.get('tenant_id')
-        if not tenant_id:
-            return False
-        return TenantUser.objects.filter(
-            user=request.user, tenant_id=tenant_id,
-            role__in=['admin', 'tesorero']
-        ).exists()
+        return _tenant_role(request, view) in ('admin', 'tesorero')
 
 
 class IsReadOnly(BasePermission):
@@ -97,13 +90,8 @@ class IsAdminOrTesOrAuditor(BasePermission):
             return False
         if request.user.is_super_admin:
             return True
-        tenant_id = view.kwargs.get('tenant_id')
-        if not tenant_id:
-            return False
         allowed = self.WRITE_ROLES if request.method not in ('GET', 'HEAD', 'OPTIONS') else self.READ_ROLES
-        return TenantUser.objects.filter(
-            user=request.user, tenant_id=tenant_id, role__in=allowed
-        ).exists()
+        return _tenant_role(request, view) in allowed
 
 
 class CanApproveReservation(BasePermission):
@@ -122,11 +110,9 @@ class CanApproveReservation(BasePermission):
         tenant_id = view.kwargs.get('tenant_id')
         if not tenant_id:
             return False
-        try:
-            tu = TenantUser.objects.get(user=request.user, tenant_id=tenant_id)
-        except TenantUser.DoesNotExist:
+        role = membership.for_request(request).role(tenant_id)
+        if role is None:
             return False
-        role = tu.role
         # Try to read per-role configuration from tenant reservation_settings
         try:
             from .models import Tenant
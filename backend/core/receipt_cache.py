@@ -0,0 +1,109 @@
+"""
+Homly — Caché de recibos PDF en media
+=====================================
+receipt-pdf y send-receipt generaban el mismo recibo desde cero en cada
+descarga o reenvío. El PDF se guarda una vez en default_storage bajo
+
+    receipts/<tenant_id>/<payment_id>/<huella>.pdf
+
+donde la huella resume todo lo que cambia el contenido del recibo: el pago
+(updated_at), la marca del condominio (Tenant.updated_at: nombre, logo,
+cuota), la unidad (Unit.updated_at), los campos extra activos, la exención
+de mesa directiva, los planes de pago de la unidad (el activo y los que el
+pago abona, con su updated_at: cuotas y estatus) y RECEIPT_LAYOUT_VERSION. Mientras la huella coincida, el
+archivo se sirve tal cual (X-Accel-Redirect en producción, igual que
+ProtectedMediaView); si algo cambia la ruta es otra, se genera de nuevo y
+las versiones anteriores del mismo pago se eliminan.
+
+La huella no es adivinable (incluye el UUID del pago), así que la ruta solo
+la conoce quien pasó la autorización de receipt-pdf.
+"""
+import hashlib
+import logging
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+RECEIPT_DIR = 'receipts'
+# Subir al cambiar el diseño de _generate_receipt_pdf: invalida todos los recibos guardados
+RECEIPT_LAYOUT_VERSION = 1
+
+
+def _stamp(value):
+    return value.isoformat() if value is not None else ''
+
+
+def receipt_fingerprint(tenant, unit, payment, extra_fields, exempt=False, plans=()):
+    parts = [
+        f'layout={RECEIPT_LAYOUT_VERSION}',
+        f'payment={payment.id}@{_stamp(payment.updated_at)}',
+        f'tenant={tenant.id}@{_stamp(getattr(tenant, "updated_at", None))}',
+        f'unit={unit.id}@{_stamp(getattr(unit, "updated_at", None))}',
+        f'exempt={int(bool(exempt))}',
+    ]
+    for ef in sorted(extra_fields, key=lambda e: str(e.id)):
+        parts.append(f'field={ef.id}|{ef.label}|{ef.default_amount}|{int(ef.required)}|{ef.field_type}')
+    for plan in sorted(plans, key=lambda p: str(p.id)):
+        parts.append(f'plan={plan.id}@{_stamp(plan.updated_at)}')
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()[:40]
+
+
+def _payment_dir(tenant_id, payment_id):
+    return f'{RECEIPT_DIR}/{tenant_id}/{payment_id}'
+
+
+def receipt_name(tenant, unit, payment, extra_fields, exempt=False, plans=()):
+    """Ruta en default_storage del recibo para la versión actual del pago."""
+    fingerprint = receipt_fingerprint(tenant, unit, payment, extra_fields, exempt, plans)
+    return f'{_payment_dir(tenant.id, payment.id)}/{fingerprint}.pdf'
+
+
+def exists(name):
+    try:
+        return default_storage.exists(name)
+    except Exception:
+        logger.warning('No se pudo consultar el recibo en caché %s', name, exc_info=True)
+        return False
+
+
+def read(name):
+    with default_storage.open(name, 'rb') as fh:
+        return fh.read()
+
+
+def store(name, pdf_bytes):
+    """
+    Guarda el recibo y elimina las versiones anteriores del mismo pago.
+    Si otro request ya lo guardó con la misma huella, conserva ese archivo.
+    Devuelve el nombre guardado.
+    """
+    if not default_storage.exists(name):
+        saved = default_storage.save(name, ContentFile(pdf_bytes))
+        if saved != name:
+            # Carrera con otro request: el storage renombró la copia; sobra
+            default_storage.delete(saved)
+    directory, keep = posixpath.split(name)
+    _delete_files(directory, keep=keep)
+    return name
+
+
+def _delete_files(directory, keep=None):
+    try:
+        _dirs, files = default_storage.listdir(directory)
+    except (FileNotFoundError, NotImplementedError):
+        return
+    for filename in files:
+        if filename == keep:
+            continue
+        try:
+            default_storage.delete(f'{directory}/{filename}')
+        except Exception:
+            logger.warning('No se pudo eliminar el recibo %s/%s', directory, filename, exc_info=True)
+
+
+def purge_payment(tenant_id, payment_id):
+    """Elimina todos los recibos guardados de un pago (al borrarlo)."""
+    _delete_files(_payment_dir(tenant_id, payment_id))
@@ -0,0 +1,92 @@
+"""
+Homly — Caché de resultados financieros por tenant
+==================================================
+Dashboard, reporte general, reporte de adeudos y estado de cuenta devuelven
+el mismo resultado mientras no cambien los datos del condominio. Cada
+resultado se guarda en el cache de Django con la clave
+
+    (tenant, endpoint, parámetros, versión de datos del tenant)
+
+La versión vive en la base de datos (TenantDataVersion) y se incrementa en
+la misma transacción que cada escritura de los modelos que alimentan los
+reportes (ver core/signals.py). El cache de Django es por proceso sin
+REDIS_URL, pero todos los procesos (workers de Gunicorn, homly-worker,
+homly-mailer) leen la misma versión: tras un cambio la clave es otra en
+todos y la entrada anterior expira sola.
+
+Los reportes de períodos sellados (el período y todos los anteriores
+cerrados) usan una segunda versión que solo cambia al cerrar/reabrir
+períodos o al tocar la configuración del tenant, y se guardan sin
+expiración: al reabrir, la versión cambia y nadie vuelve a leer la clave
+anterior, que el backend desaloja cuando necesita espacio (MAX_ENTRIES en
+LocMemCache; en Redis, una política maxmemory allkeys-lru).
+"""
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from .models import TenantDataVersion
+
+logger = logging.getLogger(__name__)
+
+
+def get_versions(tenant_id):
+    """(versión de datos, versión de períodos cerrados) del tenant, o None si no tiene fila."""
+    return TenantDataVersion.objects.filter(tenant_id=tenant_id).values_list('data', 'closed').first()
+
+
+def create_versions(tenant_id):
+    TenantDataVersion.objects.get_or_create(tenant_id=tenant_id)
+
+
+def bump_tenant_version(tenant_id, closed=False):
+    """Invalida los resultados del tenant. closed=True invalida también los de períodos sellados."""
+    if not tenant_id:
+        return
+    values = {'data': F('data') + 1}
+    if closed:
+        values['closed'] = F('closed') + 1
+    # Sin fila (tenant recién borrado) no hay nada en cache bajo sus versiones
+    TenantDataVersion.objects.filter(tenant_id=tenant_id).update(**values)
+
+
+def cached_tenant_result(tenant_id, endpoint, params, compute, sealed=False):
+    """
+    Devuelve compute() desde el cache o lo calcula y lo guarda.
+
+    params: dict con los parámetros ya resueltos (períodos, unidad…).
+    sealed: el resultado solo depende de períodos cerrados → se guarda bajo
+            la versión de períodos cerrados, sin expiración.
+    """
+    versions = get_versions(tenant_id)
+    if versions is None:
+        return compute()
+    if sealed:
+        version = f'c{versions[1]}'
+        timeout = None
+    else:
+        version = f'd{versions[0]}'
+        timeout = getattr(settings, 'RESULT_CACHE_TIMEOUT', 300)
+    digest = hashlib.md5(
+        json.dumps(params, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    key = f'homly_result:{tenant_id}:{endpoint}:{version}:{digest}'
+
+    try:
+        result = cache.get(key)
+    except Exception:
+        logger.exception('Error leyendo cache de resultados %s', key)
+        result = None
+    if result is not None:
+        return result
+
+    result = compute()
+    try:
+        cache.set(key, result, timeout=timeout)
+    except Exception:
+        logger.exception('Error guardando cache de resultados %s', key)
+    return result
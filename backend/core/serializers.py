@@ -15,13 +15,72 @@ from .models import (
     SubscriptionPayment,
     CRMContact, CRMOpportunity, CRMActivity,
     CRMCampaign, CRMCampaignContact, CRMTicket,
-    SystemRole,
+    SystemRole, ReportJob, StatementDelivery,
 )
+from . import base64_files
+from .exemptions import ExemptionCalendar
 
 
 # Only super_admin system users exist — no restricted roles.
 
 
+# ═══════════════════════════════════════════════════════════
+#  BASE64 → FILEFIELD
+# ═══════════════════════════════════════════════════════════
+
+class Base64FileField(serializers.Field):
+    """
+    Campo Base64 de la API (logo, evidencias, estado bancario) respaldado por
+    el FileField de LEGACY_BASE64_FIELDS: se lee del archivo y la escritura la
+    hace Base64FileModelSerializer (core/base64_files.py).
+    """
+    default_error_messages = {'invalid': 'Se esperaba texto Base64.'}
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('required', False)
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        return base64_files.read(instance, self.source)
+
+    def to_representation(self, value):
+        return value
+
+    def to_internal_value(self, data):
+        if data is None:
+            return ''
+        if not isinstance(data, str):
+            self.fail('invalid')
+        try:
+            base64_files.decode(data, base64_files.spec(self.parent.Meta.model, self.source)[1])
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return data
+
+
+class Base64FileModelSerializer(serializers.ModelSerializer):
+    """ModelSerializer que guarda los Base64FileField en archivo y deja vacía la columna Base64."""
+
+    def _pop_base64(self, validated_data):
+        legacy = self.Meta.model.LEGACY_BASE64_FIELDS
+        return {name: validated_data.pop(name) for name in list(validated_data) if name in legacy}
+
+    def create(self, validated_data):
+        blobs = self._pop_base64(validated_data)
+        instance = super().create(validated_data)
+        if blobs:
+            update_fields = []
+            for name, value in blobs.items():
+                update_fields += base64_files.write(instance, name, value)
+            instance.save(update_fields=update_fields)
+        return instance
+
+    def update(self, instance, validated_data):
+        for name, value in self._pop_base64(validated_data).items():
+            base64_files.write(instance, name, value)
+        return super().update(instance, validated_data)
+
+
 # ═══════════════════════════════════════════════════════════
 #  AUTH
 # ═══════════════════════════════════════════════════════════
@@ -459,14 +518,15 @@ class TenantListSerializer(serializers.ModelSerializer):
         return str(sub.trial_end) if sub and sub.trial_end else None
 
 
-class TenantDetailSerializer(serializers.ModelSerializer):
+class TenantDetailSerializer(Base64FileModelSerializer):
     subscription_allowed_modules = serializers.SerializerMethodField()
     subscription_status          = serializers.SerializerMethodField()
+    logo = Base64FileField()
 
     class Meta:
         model = Tenant
         fields = '__all__'
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'logo_file', 'created_at', 'updated_at']
 
     def get_subscription_allowed_modules(self, obj):
         try:
@@ -532,10 +592,10 @@ class UnitListSerializer(serializers.ModelSerializer):
     has_credit_evidence = serializers.SerializerMethodField()
 
     def get_has_evidence(self, obj):
-        return bool(obj.previous_debt_evidence)
+        return bool(obj.previous_debt_evidence_file)
 
     def get_has_credit_evidence(self, obj):
-        return bool(obj.credit_balance_evidence)
+        return bool(obj.credit_balance_evidence_file)
 
     class Meta:
         model = Unit
@@ -550,9 +610,11 @@ class UnitListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class UnitSerializer(serializers.ModelSerializer):
+class UnitSerializer(Base64FileModelSerializer):
     """Serializer completo — incluye previous_debt_evidence y credit_balance_evidence (Base64 PDF)."""
     responsible_name = serializers.ReadOnlyField()
+    previous_debt_evidence = Base64FileField()
+    credit_balance_evidence = Base64FileField()
 
     class Meta:
         model = Unit
@@ -607,6 +669,17 @@ def _parse_evidence(raw):
     return [{'data': stripped, 'mime': '', 'name': 'Evidencia adjunta'}]
 
 
+def _maintenance_exempt(serializer, payment):
+    """
+    Exención de mantenimiento del pago en su período (core/exemptions.py).
+    Los listados pasan el calendario del tenant en context['exemptions'].
+    """
+    exemptions = serializer.context.get('exemptions')
+    if exemptions is None:
+        exemptions = ExemptionCalendar.for_tenant(payment.tenant, units=[payment.unit])
+    return exemptions.is_exempt(payment.unit_id, payment.period)
+
+
 class PaymentSerializer(serializers.ModelSerializer):
     field_payments = FieldPaymentSerializer(many=True, read_only=True)
     additional_payments = serializers.JSONField(read_only=True)
@@ -614,12 +687,16 @@ class PaymentSerializer(serializers.ModelSerializer):
     unit_name = serializers.CharField(source='unit.unit_name', read_only=True)
     responsible = serializers.CharField(source='unit.responsible_name', read_only=True)
     evidence = serializers.SerializerMethodField()
+    maintenance_exempt = serializers.SerializerMethodField()
     applied_to_unit_id   = serializers.UUIDField(source='applied_to_unit.id',          read_only=True, allow_null=True, default=None)
     applied_to_unit_code = serializers.CharField(source='applied_to_unit.unit_id_code', read_only=True, allow_null=True, default=None)
     applied_to_unit_name = serializers.CharField(source='applied_to_unit.unit_name',    read_only=True, allow_null=True, default=None)
 
     def get_evidence(self, obj):
-        return _parse_evidence(obj.evidence)
+        return _parse_evidence(base64_files.read(obj, 'evidence'))
+
+    def get_maintenance_exempt(self, obj):
+        return _maintenance_exempt(self, obj)
 
     class Meta:
         model = Payment
@@ -627,7 +704,7 @@ class PaymentSerializer(serializers.ModelSerializer):
                   'period', 'status', 'payment_type', 'payment_date', 'notes', 'folio',
                   'evidence', 'bank_reconciled', 'adeudo_payments', 'field_payments', 'additional_payments',
                   'applied_to_unit_id', 'applied_to_unit_code', 'applied_to_unit_name',
-                  'created_at', 'updated_at']
+                  'maintenance_exempt', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
@@ -645,12 +722,16 @@ class PaymentListSerializer(serializers.ModelSerializer):
     unit_name = serializers.CharField(source='unit.unit_name', read_only=True)
     responsible = serializers.CharField(source='unit.responsible_name', read_only=True)
     has_evidence = serializers.SerializerMethodField()
+    maintenance_exempt = serializers.SerializerMethodField()
     applied_to_unit_id   = serializers.UUIDField(source='applied_to_unit.id',          read_only=True, allow_null=True, default=None)
     applied_to_unit_code = serializers.CharField(source='applied_to_unit.unit_id_code', read_only=True, allow_null=True, default=None)
     applied_to_unit_name = serializers.CharField(source='applied_to_unit.unit_name',    read_only=True, allow_null=True, default=None)
 
     def get_has_evidence(self, obj):
-        return bool(obj.evidence)
+        return bool(obj.evidence_file)
+
+    def get_maintenance_exempt(self, obj):
+        return _maintenance_exempt(self, obj)
 
     class Meta:
         model = Payment
@@ -658,7 +739,7 @@ class PaymentListSerializer(serializers.ModelSerializer):
                   'period', 'status', 'payment_type', 'payment_date', 'notes', 'folio',
                   'has_evidence', 'bank_reconciled', 'adeudo_payments', 'field_payments',
                   'additional_payments', 'applied_to_unit_id', 'applied_to_unit_code',
-                  'applied_to_unit_name', 'created_at', 'updated_at']
+                  'applied_to_unit_name', 'maintenance_exempt', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
@@ -691,8 +772,9 @@ class AddAdditionalPaymentSerializer(serializers.Serializer):
 #  GASTOS
 # ═══════════════════════════════════════════════════════════
 
-class GastoEntrySerializer(serializers.ModelSerializer):
+class GastoEntrySerializer(Base64FileModelSerializer):
     field_label = serializers.CharField(source='field.label', read_only=True, default='')
+    evidence = Base64FileField()
 
     class Meta:
         model = GastoEntry
@@ -713,7 +795,7 @@ class GastoListSerializer(serializers.ModelSerializer):
     has_evidence = serializers.SerializerMethodField()
 
     def get_has_evidence(self, obj):
-        return bool(obj.evidence)
+        return bool(obj.evidence_file)
 
     class Meta:
         model = GastoEntry
@@ -728,7 +810,8 @@ class GastoListSerializer(serializers.ModelSerializer):
 #  CAJA CHICA
 # ═══════════════════════════════════════════════════════════
 
-class CajaChicaEntrySerializer(serializers.ModelSerializer):
+class CajaChicaEntrySerializer(Base64FileModelSerializer):
+    evidence = Base64FileField()
     evidence_list = serializers.SerializerMethodField()
 
     class Meta:
@@ -738,8 +821,8 @@ class CajaChicaEntrySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'tenant', 'created_at', 'evidence_list']
 
     def get_evidence_list(self, obj):
-        """Normalise evidence TextField to a list of {data, mime, name} dicts."""
-        return _parse_evidence(obj.evidence)
+        """Normalise evidence to a list of {data, mime, name} dicts."""
+        return _parse_evidence(base64_files.read(obj, 'evidence'))
 
 
 class CajaChicaListSerializer(serializers.ModelSerializer):
@@ -752,7 +835,7 @@ class CajaChicaListSerializer(serializers.ModelSerializer):
     has_evidence = serializers.SerializerMethodField()
 
     def get_has_evidence(self, obj):
-        return bool(obj.evidence)
+        return bool(obj.evidence_file)
 
     class Meta:
         model = CajaChicaEntry
@@ -765,13 +848,32 @@ class CajaChicaListSerializer(serializers.ModelSerializer):
 #  BANK / PERIODS / ASSEMBLY
 # ═══════════════════════════════════════════════════════════
 
-class BankStatementSerializer(serializers.ModelSerializer):
+class BankStatementSerializer(Base64FileModelSerializer):
+    file_data = Base64FileField()
+
     class Meta:
         model = BankStatement
         fields = ['id', 'tenant', 'period', 'file_data', 'uploaded_at']
         read_only_fields = ['id', 'tenant', 'uploaded_at']
 
 
+class BankStatementListSerializer(serializers.ModelSerializer):
+    """Serializer ligero para listados de Estados Bancarios.
+
+    Excluye ``file_data`` (el PDF completo en Base64). Expone ``has_file``
+    (bool); el PDF se obtiene bajo demanda en GET /bank-statements/{id}/.
+    """
+    has_file = serializers.SerializerMethodField()
+
+    def get_has_file(self, obj):
+        return bool(obj.statement_file)
+
+    class Meta:
+        model = BankStatement
+        fields = ['id', 'tenant', 'period', 'has_file', 'uploaded_at']
+        read_only_fields = ['id', 'tenant', 'uploaded_at']
+
+
 class PaymentPlanSerializer(serializers.ModelSerializer):
     unit_code = serializers.CharField(source='unit.unit_id_code', read_only=True)
     unit_name = serializers.CharField(source='unit.unit_name',    read_only=True)
@@ -823,8 +925,10 @@ class ClosedPeriodSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ClosedPeriod
-        fields = ['id', 'tenant', 'period', 'closed_at', 'closed_by', 'closed_by_name']
-        read_only_fields = ['id', 'closed_at']
+        fields = ['id', 'tenant', 'period', 'closed_at', 'closed_by', 'closed_by_name',
+                  'ingresos_reconciled', 'egresos_reconciled', 'closing_bank_balance', 'snapshot_at']
+        read_only_fields = ['id', 'closed_at',
+                            'ingresos_reconciled', 'egresos_reconciled', 'closing_bank_balance', 'snapshot_at']
 
 
 class ReopenRequestSerializer(serializers.ModelSerializer):
@@ -1051,6 +1155,43 @@ class AuditLogSerializer(serializers.ModelSerializer):
         return obj.get_action_display()
 
 
+# ═══════════════════════════════════════════════════════════
+#  REPORT JOBS
+# ═══════════════════════════════════════════════════════════
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    kind_label   = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model  = ReportJob
+        fields = [
+            'id', 'kind', 'kind_label', 'status', 'attempts',
+            'result', 'result_filename', 'error', 'download_url',
+            'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+    def get_kind_label(self, obj):
+        return obj.get_kind_display()
+
+    def get_download_url(self, obj):
+        if obj.status != 'done' or not obj.result_file:
+            return None
+        return f'/api/tenants/{obj.tenant_id}/report-jobs/{obj.id}/download/'
+
+
+class StatementDeliverySerializer(serializers.ModelSerializer):
+    unit_id      = serializers.UUIDField(source='unit.id', read_only=True)
+    unit_id_code = serializers.CharField(source='unit.unit_id_code', read_only=True)
+    unit_name    = serializers.CharField(source='unit.unit_name', read_only=True)
+
+    class Meta:
+        model  = StatementDelivery
+        fields = ['id', 'unit_id', 'unit_id_code', 'unit_name', 'emails', 'status', 'error', 'sent_at']
+        read_only_fields = fields
+
+
 # ═══════════════════════════════════════════════════════════
 #  SUBSCRIPTION PLANS
 # ═══════════════════════════════════════════════════════════
@@ -0,0 +1,270 @@
+"""
+Homly — Señales de invalidación
+===============================
+Cualquier escritura en los modelos que alimentan dashboard y reportes
+incrementa la versión de datos del tenant (core/result_cache.py) en la
+misma transacción. Se usan señales y no llamadas en las vistas para cubrir
+también admin, comandos y shell.
+
+También invalidan el LRU de nombres de condominio y roles que usa el
+buffer de AuditLog (core/audit.py) y el logo decodificado de los PDFs
+(core/assets.py). Al borrar un pago se eliminan sus recibos PDF guardados
+(core/receipt_cache.py) y un cambio del saldo inicial del condominio
+descarta los saldos bancarios finales guardados al cerrar cada período.
+Pagos, gastos e ingresos no identificados
+descartan los totales de su período (core/income_rollup.py) y cada
+guardado de un pago reescribe sus filas de AdeudoAllocation y
+AdditionalPaymentAllocation; las de AdelantoCredit se reescriben al guardar
+cada FieldPayment. Pagos, campos,
+unidades y planes recalculan el estado de cuenta materializado de las
+unidades afectadas; la configuración lo descarta (core/unit_ledger.py).
+"""
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import (
+    Tenant, TenantUser, Unit, ExtraField, Payment, FieldPayment, GastoEntry, CajaChicaEntry,
+    UnrecognizedIncome, PaymentPlan, ClosedPeriod, AssemblyPosition, AdeudoAllocation, AdelantoCredit,
+    AdditionalPaymentAllocation,
+)
+from . import assets, income_rollup, receipt_cache, unit_ledger
+from .audit import tenant_names, tenant_roles
+from .result_cache import bump_tenant_version, create_versions
+
+
+def _is_closed(tenant_id, period):
+    return bool(period) and ClosedPeriod.objects.filter(tenant_id=tenant_id, period=period).exists()
+
+
+# Configuración y estructura: afectan también a los reportes de períodos cerrados
+@receiver([post_save, post_delete], sender=ClosedPeriod)
+@receiver([post_save, post_delete], sender=ExtraField)
+@receiver([post_save, post_delete], sender=Unit)
+def _bump_tenant_config(sender, instance, **kwargs):
+    bump_tenant_version(instance.tenant_id, closed=True)
+
+
+@receiver([post_save, post_delete], sender=Tenant)
+def _bump_tenant(sender, instance, created=False, **kwargs):
+    if created:
+        create_versions(instance.id)
+    bump_tenant_version(instance.id, closed=True)
+    tenant_names.discard(str(instance.id))
+    assets.invalidate_tenant(instance.id)
+
+
+@receiver([post_save, post_delete], sender=TenantUser)
+def _evict_tenant_user(sender, instance, **kwargs):
+    tenant_id, user_id = str(instance.tenant_id), str(instance.user_id)
+    tenant_roles.discard((tenant_id, user_id))
+
+
+# Movimientos por período: solo invalidan períodos cerrados si tocan uno
+@receiver([post_save, post_delete], sender=Payment)
+@receiver([post_save, post_delete], sender=GastoEntry)
+@receiver([post_save, post_delete], sender=CajaChicaEntry)
+@receiver([post_save, post_delete], sender=UnrecognizedIncome)
+def _bump_period_record(sender, instance, **kwargs):
+    bump_tenant_version(instance.tenant_id, closed=_is_closed(instance.tenant_id, instance.period))
+    if sender is not CajaChicaEntry:
+        income_rollup.invalidate(instance.tenant_id, instance.period)
+
+
+@receiver(pre_save, sender=Payment)
+@receiver(pre_save, sender=GastoEntry)
+@receiver(pre_save, sender=UnrecognizedIncome)
+def _rollup_period_moved(sender, instance, update_fields=None, **kwargs):
+    # Si el registro cambia de período, el período anterior también pierde sus totales
+    if instance._state.adding or (update_fields is not None and 'period' not in update_fields):
+        return
+    old = sender.objects.filter(pk=instance.pk).values_list('period', flat=True).first()
+    if old and old != instance.period:
+        income_rollup.invalidate(instance.tenant_id, old)
+
+
+# Columnas del pago copiadas en AdeudoAllocation, AdditionalPaymentAllocation y AdelantoCredit
+_ADEUDO_SOURCE_FIELDS = {'adeudo_payments', 'period', 'unit', 'tenant'}
+_ADDITIONAL_SOURCE_FIELDS = {'additional_payments', 'period', 'unit', 'tenant'}
+_PAYMENT_COPY_FIELDS = {'period', 'unit', 'tenant'}
+
+
+@receiver(post_save, sender=Payment)
+def _sync_adeudo_allocations(sender, instance, created=False, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields is not None and not _ADEUDO_SOURCE_FIELDS & set(update_fields)):
+        return
+    AdeudoAllocation.sync(instance)
+    if not created and (update_fields is None or _PAYMENT_COPY_FIELDS & set(update_fields)):
+        AdelantoCredit.objects.filter(payment_id=instance.id).update(
+            tenant_id=instance.tenant_id, unit_id=instance.unit_id, period=instance.period,
+        )
+    # Una lectura concurrente pudo calcular los totales con las filas anteriores
+    income_rollup.invalidate(instance.tenant_id, instance.period)
+
+
+@receiver(post_save, sender=Payment)
+def _sync_additional_allocations(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields is not None and not _ADDITIONAL_SOURCE_FIELDS & set(update_fields)):
+        return
+    AdditionalPaymentAllocation.sync(instance)
+
+
+_ADELANTO_SOURCE_FIELDS = {'adelanto_targets', 'field_key', 'payment'}
+
+
+@receiver(post_save, sender=FieldPayment)
+def _sync_adelanto_credits(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields is not None and not _ADELANTO_SOURCE_FIELDS & set(update_fields)):
+        return
+    AdelantoCredit.sync(instance)
+
+
+@receiver(post_delete, sender=Payment)
+def _purge_payment_receipts(sender, instance, **kwargs):
+    receipt_cache.purge_payment(instance.tenant_id, instance.id)
+
+
+# El saldo bancario final de cada cierre arrastra el saldo inicial del condominio
+_BANK_SEED_FIELDS = ('bank_initial_balance', 'operation_start_date')
+
+
+@receiver(pre_save, sender=Tenant)
+def _bank_seed_before(sender, instance, update_fields=None, raw=False, **kwargs):
+    instance._bank_seed_changed = False
+    if raw or instance._state.adding or (update_fields is not None and not set(_BANK_SEED_FIELDS) & set(update_fields)):
+        return
+    old = Tenant.objects.filter(pk=instance.pk).values_list(*_BANK_SEED_FIELDS).first()
+    instance._bank_seed_changed = old is not None and old != tuple(getattr(instance, f) for f in _BANK_SEED_FIELDS)
+
+
+@receiver(post_save, sender=Tenant)
+def _clear_closing_balances(sender, instance, **kwargs):
+    if getattr(instance, '_bank_seed_changed', False):
+        ClosedPeriod.objects.filter(tenant_id=instance.id).update(closing_bank_balance=None)
+
+
+@receiver([post_save, post_delete], sender=FieldPayment)
+def _bump_field_payment(sender, instance, **kwargs):
+    row = Payment.objects.filter(id=instance.payment_id).values('tenant_id', 'period').first()
+    if row is None:
+        # Borrado en cascada del Payment: su propia señal ya invalidó
+        return
+    bump_tenant_version(row['tenant_id'], closed=_is_closed(row['tenant_id'], row['period']))
+    income_rollup.invalidate(row['tenant_id'], row['period'])
+
+
+@receiver([post_save, post_delete], sender=PaymentPlan)
+@receiver([post_save, post_delete], sender=AssemblyPosition)
+def _bump_statement_inputs(sender, instance, **kwargs):
+    bump_tenant_version(instance.tenant_id)
+
+
+# ─── Estado de cuenta materializado (core/unit_ledger.py) ───
+# Va al final: el alcance de un pago se calcula con sus AdeudoAllocation y
+# AdelantoCredit ya sincronizados por los receptores de arriba.
+
+# Columnas que no cambian ningún estado de cuenta: guardar solo estas no recalcula
+_LEDGER_IGNORED_FIELDS = {
+    Payment: {'evidence', 'evidence_file', 'notes', 'folio', 'updated_at'},
+    Unit: {
+        'previous_debt_evidence', 'previous_debt_evidence_file',
+        'credit_balance_evidence', 'credit_balance_evidence_file', 'updated_at',
+    },
+    Tenant: {
+        'hibernated', 'is_active', 'hibernation_reason',
+        'onboarding_completed', 'onboarding_dismissed_at', 'updated_at',
+    },
+}
+
+
+def _affects_ledger(sender, update_fields):
+    return update_fields is None or not set(update_fields) <= _LEDGER_IGNORED_FIELDS[sender]
+
+
+def _field_payment_scope(instance):
+    payment = Payment.objects.filter(id=instance.payment_id).first()
+    return (payment.tenant_id, unit_ledger.payment_scope(payment)) if payment else (None, {})
+
+
+@receiver(pre_save, sender=Payment)
+def _ledger_payment_before(sender, instance, update_fields=None, raw=False, **kwargs):
+    # Alcance anterior: p.ej. si se quita un applied_to_unit o un abono a adeudo
+    instance._ledger_before = {}
+    if raw or instance._state.adding or not _affects_ledger(sender, update_fields):
+        return
+    old = Payment.objects.filter(pk=instance.pk).first()
+    if old is not None:
+        instance._ledger_before = unit_ledger.payment_scope(old)
+
+
+@receiver(post_save, sender=Payment)
+def _refresh_payment_ledger(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or not _affects_ledger(sender, update_fields):
+        return
+    unit_ledger.refresh(instance.tenant_id, unit_ledger.merge_scopes(
+        getattr(instance, '_ledger_before', {}), unit_ledger.payment_scope(instance),
+    ))
+
+
+@receiver(pre_delete, sender=Payment)
+def _refresh_deleted_payment_ledger(sender, instance, **kwargs):
+    # Todavía existen sus AdelantoCredit; el borrado corre en una transacción,
+    # así que el recálculo ocurre al confirmarla
+    unit_ledger.refresh(instance.tenant_id, unit_ledger.payment_scope(instance))
+
+
+@receiver(pre_save, sender=FieldPayment)
+@receiver(pre_delete, sender=FieldPayment)
+def _ledger_field_payment_before(sender, instance, raw=False, **kwargs):
+    instance._ledger_before = (None, {}) if raw or instance._state.adding else _field_payment_scope(instance)
+
+
+@receiver(post_save, sender=FieldPayment)
+@receiver(post_delete, sender=FieldPayment)
+def _refresh_field_payment_ledger(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    before_tenant, before = getattr(instance, '_ledger_before', (None, {}))
+    tenant_id, scope = _field_payment_scope(instance)
+    tenant_id = tenant_id or before_tenant
+    if tenant_id:
+        unit_ledger.refresh(tenant_id, unit_ledger.merge_scopes(before, scope))
+
+
+@receiver(post_save, sender=Unit)
+def _refresh_saved_unit_ledger(sender, instance, update_fields=None, raw=False, **kwargs):
+    # previous_debt / credit_balance / admin_exempt cambian todo el estado de cuenta
+    if raw or not _affects_ledger(sender, update_fields):
+        return
+    unit_ledger.refresh(instance.tenant_id, {str(instance.id): ''})
+
+
+@receiver(pre_save, sender=PaymentPlan)
+def _ledger_plan_before(sender, instance, raw=False, **kwargs):
+    instance._ledger_was_active = not (raw or instance._state.adding) and PaymentPlan.objects.filter(
+        pk=instance.pk, status='accepted',
+    ).exists()
+
+
+@receiver([post_save, post_delete], sender=PaymentPlan)
+def _refresh_plan_ledger(sender, instance, raw=False, **kwargs):
+    # Solo el plan aceptado entra en el estado de cuenta; al completarse o
+    # cancelarse la deuda previa vuelve al saldo inicial de la unidad
+    if raw:
+        return
+    if instance.status == 'accepted' or getattr(instance, '_ledger_was_active', False):
+        unit_ledger.refresh(instance.tenant_id, {str(instance.unit_id): ''})
+
+
+# Cuotas, campos, exenciones por cargo y bajas de unidades afectan a todas las unidades
+@receiver([post_save, post_delete], sender=ExtraField)
+@receiver([post_save, post_delete], sender=AssemblyPosition)
+@receiver(post_delete, sender=Unit)
+def _invalidate_tenant_ledger(sender, instance, raw=False, **kwargs):
+    if not raw:
+        unit_ledger.invalidate_tenant(instance.tenant_id)
+
+
+@receiver(post_save, sender=Tenant)
+def _invalidate_ledger_on_config(sender, instance, created=False, update_fields=None, raw=False, **kwargs):
+    if not (raw or created) and _affects_ledger(sender, update_fields):
+        unit_ledger.invalidate_tenant(instance.id)
@@ -0,0 +1,281 @@
+"""
+Homly — Estados de cuenta calculados en la base de datos
+========================================================
+_statement_from_context (core/views.py) arma cada período de cada unidad en
+Python y acumula saldo_acum período por período. Reportes y dashboard solo
+usan los totales y las filas reducidas (las del ledger), así que con
+STATEMENT_ENGINE='sql' se calculan en una sola consulta:
+
+    periods × units                 rejilla unidad/período (exenciones por rango)
+    field_amounts                   abonos por campo: pago propio, cross-unit
+                                    (Caso A y B) y adelantos que llegan al período
+    adeudos                         AdeudoAllocation de los pagos propios
+    plan_installments / received    cuotas del plan activo y lo pagado a su campo
+    SUM(...) OVER (PARTITION BY unit ORDER BY period)  → saldo_accum
+
+Las reglas son las de _statement_from_context (cargos, abonos que cuentan
+para el saldo, estatus); StatementSqlEngineTests compara ambos motores.
+Los datos pequeños que ya resuelve Python (campos de cobranza, planes
+aceptados, calendario de exenciones) entran como listas VALUES. El SQL es
+estándar (CTE, VALUES, funciones de ventana) y corre igual en PostgreSQL y
+en SQLite.
+
+Devuelve el formato de _read_ledger_statements:
+{unit_id: (rows, total_charges, total_paid, balance, prev_debt_adeudo, has_active_plan)}.
+"""
+import uuid
+from decimal import Decimal
+
+from django.db import connection
+
+from .models import (
+    AdelantoCredit, AdeudoAllocation, AdditionalPaymentAllocation, FieldPayment, Payment, Unit,
+)
+
+_NUM = 'CAST(%s AS NUMERIC)'
+
+
+def _in(column, values, params):
+    """`column IN (...)` con parámetros; falso si no hay valores."""
+    if not values:
+        return '1 = 0'
+    params.extend(values)
+    return f"{column} IN ({', '.join(['%s'] * len(values))})"
+
+
+def _values(columns, rows, params, empty):
+    """SELECT sobre VALUES con columnas nombradas; *empty* si no hay filas."""
+    if not rows:
+        return empty
+    row_sql = '(' + ', '.join(_NUM if c.startswith('num:') else '%s' for c in columns) + ')'
+    placeholders = ', '.join([row_sql] * len(rows))
+    for row in rows:
+        params.extend(row)
+    names = ', '.join(f'column{i + 1} AS {c.removeprefix("num:")}' for i, c in enumerate(columns))
+    return f'SELECT {names} FROM (VALUES {placeholders}) AS v'
+
+
+def _uuid_param(value):
+    return Unit._meta.pk.get_db_prep_value(uuid.UUID(str(value)), connection)
+
+
+def _build_sql(tenant, periods, today, cob_fields, active_plans, exemptions):
+    t = {
+        'units': Unit._meta.db_table,
+        'payments': Payment._meta.db_table,
+        'field_payments': FieldPayment._meta.db_table,
+        'additional': AdditionalPaymentAllocation._meta.db_table,
+        'adeudos': AdeudoAllocation._meta.db_table,
+        'adelantos': AdelantoCredit._meta.db_table,
+    }
+    tenant_id = _uuid_param(tenant.id)
+    req_keys = [str(f.id) for f in cob_fields if f.required]
+    opt_keys = [str(f.id) for f in cob_fields if not f.required]
+    req_charge = sum((Decimal(str(f.default_amount or 0)) for f in cob_fields if f.required), Decimal('0'))
+    fee = tenant.maintenance_fee or Decimal('0')
+
+    plan_units, installments = [], {}
+    for uid, plan in active_plans.items():
+        if not plan:
+            continue
+        plan_units.append((_uuid_param(uid), plan.field_key))
+        for inst in (plan.installments or []):
+            if inst.get('period_key'):
+                installments[(uid, inst['period_key'])] = Decimal(str(inst.get('debt_part', 0)))
+    exempt_ranges = [
+        (_uuid_param(uid), start_date or '', end_date or '')
+        for uid, ranges in (exemptions.positions.items() if exemptions.enabled else ())
+        for start_date, end_date in ranges
+    ]
+
+    params = []
+    ctes = []
+    ctes.append(('periods', _values(['period'], [(p,) for p in periods], params, None)))
+    ctes.append(('tenant_units', f"""
+        SELECT id AS unit_id, previous_debt, credit_balance FROM {t['units']} WHERE tenant_id = %s"""))
+    params.append(tenant_id)
+    ctes.append(('exemptions', _values(
+        ['unit_id', 'start_p', 'end_p'], exempt_ranges, params,
+        "SELECT unit_id, '' AS start_p, '' AS end_p FROM tenant_units WHERE 1 = 0",
+    )))
+    ctes.append(('plan_units', _values(
+        ['unit_id', 'field_key'], plan_units, params,
+        "SELECT unit_id, '' AS field_key FROM tenant_units WHERE 1 = 0",
+    )))
+    ctes.append(('plan_installments', _values(
+        ['unit_id', 'period', 'num:debt_part'],
+        [(_uuid_param(uid), prd, debt) for (uid, prd), debt in installments.items()], params,
+        "SELECT unit_id, '' AS period, 0 AS debt_part FROM tenant_units WHERE 1 = 0",
+    )))
+    # Pagos propios: no redirigidos a otra unidad
+    ctes.append(('own_payments', f"""
+        SELECT id, unit_id, period FROM {t['payments']}
+        WHERE tenant_id = %s AND (applied_to_unit_id IS NULL OR applied_to_unit_id = unit_id)"""))
+    params.append(tenant_id)
+    ctes.append(('field_amounts', f"""
+        SELECT p.unit_id, p.period, fp.field_key, fp.received AS amount
+        FROM {t['field_payments']} fp JOIN own_payments p ON p.id = fp.payment_id
+        UNION ALL
+        SELECT p.applied_to_unit_id, p.period, fp.field_key, fp.received
+        FROM {t['field_payments']} fp JOIN {t['payments']} p ON p.id = fp.payment_id
+        WHERE p.tenant_id = %s AND p.applied_to_unit_id IS NOT NULL
+          AND p.applied_to_unit_id <> p.unit_id AND fp.received > 0
+        UNION ALL
+        SELECT a.applied_to_unit_id, p.period, a.field_key, a.amount
+        FROM {t['additional']} a JOIN {t['payments']} p ON p.id = a.payment_id
+        WHERE a.tenant_id = %s AND a.applied_to_unit_id <> p.unit_id AND a.amount > 0
+        UNION ALL
+        SELECT c.unit_id, c.target_period, c.field_key, c.amount
+        FROM {t['adelantos']} c JOIN {t['payments']} p ON p.id = c.payment_id
+        WHERE c.tenant_id = %s AND (p.applied_to_unit_id IS NULL OR p.applied_to_unit_id = c.unit_id)"""))
+    params.extend([tenant_id] * 3)
+    ctes.append(('field_totals', """
+        SELECT unit_id, period, field_key, SUM(amount) AS amount
+        FROM field_amounts GROUP BY unit_id, period, field_key"""))
+    # El abono de cada campo (recibido + cross-unit + adelanto) se agrupa por tipo de campo
+    req_in = _in('field_key', req_keys, params)
+    opt_in = _in('field_key', opt_keys, params)
+    cob_in = _in('field_key', req_keys + opt_keys, params)
+    ctes.append(('period_fields', f"""
+        SELECT unit_id, period,
+            SUM(CASE WHEN field_key = 'maintenance' THEN amount ELSE 0 END) AS maint_abono,
+            SUM(CASE WHEN {req_in} THEN amount ELSE 0 END) AS req_abono,
+            SUM(CASE WHEN {opt_in} THEN amount ELSE 0 END) AS opt_abono,
+            MAX(CASE WHEN {cob_in} AND amount > 0 THEN 1 ELSE 0 END) AS field_paid
+        FROM field_totals GROUP BY unit_id, period"""))
+    ctes.append(('adeudos', f"""
+        SELECT a.unit_id, a.period, a.target_period, a.amount
+        FROM {t['adeudos']} a JOIN {t['payments']} p ON p.id = a.payment_id
+        WHERE a.tenant_id = %s AND (p.applied_to_unit_id IS NULL OR p.applied_to_unit_id = a.unit_id)"""))
+    params.append(tenant_id)
+    ctes.append(('adeudo_recv', """
+        SELECT unit_id, period, SUM(amount) AS recv_all,
+            SUM(CASE WHEN target_period <> '__prevDebt' THEN amount ELSE 0 END) AS recv_spec
+        FROM adeudos GROUP BY unit_id, period"""))
+    ctes.append(('adeudo_for', """
+        SELECT unit_id, target_period AS period, SUM(amount) AS amount
+        FROM adeudos WHERE target_period <> '__prevDebt' GROUP BY unit_id, target_period"""))
+    ctes.append(('prev_debt_adeudo', """
+        SELECT unit_id, SUM(amount) AS amount
+        FROM adeudos WHERE target_period = '__prevDebt' GROUP BY unit_id"""))
+    ctes.append(('plan_received', f"""
+        SELECT pu.unit_id, p.period, SUM(fp.received) AS amount
+        FROM plan_units pu
+        JOIN {t['payments']} p ON p.unit_id = pu.unit_id AND p.tenant_id = %s
+        JOIN {t['field_payments']} fp ON fp.payment_id = p.id AND fp.field_key = pu.field_key
+        GROUP BY pu.unit_id, p.period"""))
+    params.append(tenant_id)
+    ctes.append(('grid', """
+        SELECT u.unit_id, pr.period,
+            CASE WHEN EXISTS (
+                SELECT 1 FROM exemptions e
+                WHERE e.unit_id = u.unit_id
+                  AND (e.start_p = '' OR pr.period >= e.start_p)
+                  AND (e.end_p = '' OR pr.period <= e.end_p)
+            ) THEN 1 ELSE 0 END AS exempt
+        FROM tenant_units u CROSS JOIN periods pr"""))
+    ctes.append(('amounts', f"""
+        SELECT g.unit_id, g.period, g.exempt,
+            CASE WHEN g.exempt = 1 THEN 0 ELSE {_NUM} END AS maint_charge,
+            CASE WHEN g.exempt = 1 THEN 0 ELSE COALESCE(f.maint_abono, 0) END AS maint_abono,
+            COALESCE(f.req_abono, 0) AS req_abono,
+            COALESCE(f.opt_abono, 0) AS opt_abono,
+            COALESCE(f.field_paid, 0) AS field_paid,
+            COALESCE(pi.debt_part, 0) AS debt_part,
+            CASE WHEN pi.unit_id IS NULL THEN 0 ELSE COALESCE(pr.amount, 0) END AS plan_abono,
+            CASE WHEN pi.unit_id IS NOT NULL AND pr.amount > 0 THEN 1 ELSE 0 END AS plan_paid,
+            COALESCE(ar.recv_all, 0) AS recv_all,
+            COALESCE(ar.recv_spec, 0) AS recv_spec,
+            COALESCE(af.amount, 0) AS adeudo_for
+        FROM grid g
+        LEFT JOIN period_fields f ON f.unit_id = g.unit_id AND f.period = g.period
+        LEFT JOIN plan_installments pi ON pi.unit_id = g.unit_id AND pi.period = g.period
+        LEFT JOIN plan_received pr ON pr.unit_id = g.unit_id AND pr.period = g.period
+        LEFT JOIN adeudo_recv ar ON ar.unit_id = g.unit_id AND ar.period = g.period
+        LEFT JOIN adeudo_for af ON af.unit_id = g.unit_id AND af.period = g.period"""))
+    params.append(fee)
+    ctes.append(('lines', f"""
+        SELECT unit_id, period, exempt, maint_charge, maint_abono,
+            maint_charge + {_NUM} + debt_part AS cargo_oblig,
+            maint_abono + req_abono + plan_abono AS oblig_abono,
+            maint_abono + req_abono + plan_abono + opt_abono + recv_spec AS paid_balance,
+            maint_abono + req_abono + plan_abono + opt_abono + recv_all AS paid,
+            CASE WHEN field_paid = 1 OR plan_paid = 1 THEN 1 ELSE 0 END AS non_maint_paid,
+            adeudo_for
+        FROM amounts"""))
+    params.append(req_charge)
+
+    sql = 'WITH ' + ',\n'.join(f'{name} AS ({body})' for name, body in ctes) + """
+    SELECT l.unit_id, l.period, l.cargo_oblig, l.paid, l.paid_balance, l.adeudo_for, l.maint_charge,
+        CASE
+            WHEN l.exempt = 1 AND l.cargo_oblig = 0 THEN 'exento'
+            WHEN l.cargo_oblig > 0 AND l.oblig_abono >= l.cargo_oblig
+                THEN CASE WHEN l.exempt = 1 THEN 'exento' ELSE 'pagado' END
+            WHEN l.maint_abono = 0 AND l.non_maint_paid = 1 THEN 'parcial'
+            WHEN l.maint_charge > 0 AND l.maint_abono > 0 AND l.maint_abono < l.maint_charge THEN 'parcial'
+            WHEN l.cargo_oblig > 0 AND l.oblig_abono > 0 THEN 'parcial'
+            WHEN l.period <= %s THEN 'pendiente'
+            ELSE 'futuro'
+        END AS status,
+        CASE WHEN pu.unit_id IS NULL
+            THEN COALESCE(u.previous_debt, 0) - COALESCE(pda.amount, 0) - COALESCE(u.credit_balance, 0)
+            ELSE 0 - COALESCE(u.credit_balance, 0)
+        END + SUM(l.cargo_oblig - l.paid_balance) OVER (
+            PARTITION BY l.unit_id ORDER BY l.period ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+        ) AS saldo_accum,
+        COALESCE(pda.amount, 0) AS prev_debt_adeudo,
+        CASE WHEN pu.unit_id IS NULL THEN 0 ELSE 1 END AS has_plan
+    FROM lines l
+    JOIN tenant_units u ON u.unit_id = l.unit_id
+    LEFT JOIN prev_debt_adeudo pda ON pda.unit_id = l.unit_id
+    LEFT JOIN plan_units pu ON pu.unit_id = l.unit_id
+    ORDER BY l.unit_id, l.period"""
+    params.append(today)
+    return sql, params
+
+
+def _float(value):
+    return float(Decimal(str(value or 0)))
+
+
+def tenant_statements(tenant, periods, today, cob_fields, active_plans, exemptions):
+    """
+    Estados de cuenta reducidos de todas las unidades del tenant en *periods*.
+
+    cob_fields: ExtraField de cobranza habilitados (sin 'gastos').
+    active_plans: {unit_id: PaymentPlan aceptado}.
+    exemptions: ExemptionCalendar del tenant (core/exemptions.py).
+    """
+    if not periods:
+        return {}
+    sql, params = _build_sql(tenant, periods, today, cob_fields, active_plans, exemptions)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        records = cursor.fetchall()
+
+    result = {}
+    by_unit = {}
+    for (unit_id, period, charge, paid, paid_balance, adeudo_for, maintenance,
+         status, saldo_accum, prev_debt_adeudo, has_plan) in records:
+        uid = str(uuid.UUID(str(unit_id)))
+        entry = by_unit.setdefault(uid, {'rows': [], 'pda': prev_debt_adeudo, 'plan': bool(has_plan)})
+        entry['rows'].append({
+            'period': period,
+            'charge': _float(charge),
+            'paid': _float(paid),
+            'paid_balance': _float(paid_balance),
+            'adeudo_received_for_period': _float(adeudo_for),
+            'maintenance': _float(maintenance),
+            'status': status,
+            'saldo_accum': _float(saldo_accum),
+        })
+    for uid, entry in by_unit.items():
+        rows = entry['rows']
+        total_charges = sum(r['charge'] for r in rows)
+        total_paid = sum(r['paid'] for r in rows)
+        balance = total_charges - sum(r['paid_balance'] for r in rows)
+        result[uid] = (
+            rows, float(total_charges), float(total_paid), float(balance),
+            _float(entry['pda']), entry['plan'],
+        )
+    return result
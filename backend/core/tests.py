@@ -3,6 +3,7 @@ Homly — Comprehensive Tests
 Validates all endpoints match original app functionality.
 """
 from decimal import Decimal
+from io import StringIO
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient
@@ -373,6 +374,178 @@ class PeriodTests(BaseTestCase):
         )
 
 
+class ClosedPeriodSnapshotTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tenant.bank_initial_balance = Decimal('10000')
+        self.tenant.save()
+        for period, amount in (('2024-01', '2500'), ('2024-02', '2500.50'), ('2024-03', '1800')):
+            pay = Payment.objects.create(
+                tenant=self.tenant, unit=self.unit1, period=period,
+                status='pagado', payment_type='transferencia', bank_reconciled=True,
+            )
+            FieldPayment.objects.create(payment=pay, field_key='maintenance', received=Decimal(amount))
+        GastoEntry.objects.create(tenant=self.tenant, period='2024-02', amount=Decimal('300'), bank_reconciled=True)
+
+    def _close(self, period):
+        from core.views import _snapshot_closed_period
+        cp = ClosedPeriod.objects.create(tenant=self.tenant, period=period, closed_by=self.admin_user)
+        _snapshot_closed_period(self.tenant, cp)
+        cp.refresh_from_db()
+        return cp
+
+    def test_saldo_inicial_uses_snapshots(self):
+        from unittest import mock
+        from core import income_rollup, views
+        expected = views._compute_saldo_inicial(self.tenant, '2024-04')
+        self.assertEqual(expected, 10000 + 2500 + 2500.50 - 300 + 1800)
+
+        jan = self._close('2024-01')
+        feb = self._close('2024-02')
+        self.assertEqual(jan.closing_bank_balance, Decimal('12500'))
+        self.assertEqual(feb.ingresos_reconciled, Decimal('2500.50'))
+        self.assertEqual(feb.closing_bank_balance, Decimal('14700.50'))
+
+        with mock.patch.object(views, '_compute_report_data', wraps=views._compute_report_data) as report, \
+                mock.patch.object(income_rollup, '_build', wraps=income_rollup._build) as build:
+            self.assertEqual(views._compute_saldo_inicial(self.tenant, '2024-04'), expected)
+        # Cerrados por snapshot; el abierto (2024-03) ya tiene sus totales de la primera lectura
+        self.assertEqual(report.call_count, 0)
+        self.assertEqual(build.call_count, 0)
+
+    def test_saldo_inicial_starts_from_latest_closing_balance(self):
+        from core import views
+        self._close('2024-01')
+        self._close('2024-02')
+        # El saldo final guardado manda: no se vuelven a sumar los períodos anteriores
+        ClosedPeriod.objects.filter(tenant=self.tenant, period='2024-02').update(closing_bank_balance=Decimal('20000'))
+        self.assertEqual(views._compute_saldo_inicial(self.tenant, '2024-04'), 20000 + 1800)
+
+    def test_closing_balance_needs_every_earlier_period_closed(self):
+        from core import views
+        expected = views._compute_saldo_inicial(self.tenant, '2024-04')
+        feb = self._close('2024-02')
+        self.assertIsNone(feb.closing_bank_balance)
+        self.assertEqual(feb.ingresos_reconciled, Decimal('2500.50'))
+        self.assertEqual(self._close('2024-01').closing_bank_balance, Decimal('12500'))
+        self.assertEqual(views._compute_saldo_inicial(self.tenant, '2024-04'), expected)
+
+        self.tenant.bank_initial_balance = Decimal('5000')
+        self.tenant.save()
+        self.assertFalse(ClosedPeriod.objects.filter(tenant=self.tenant, closing_bank_balance__isnull=False).exists())
+        self.assertEqual(views._compute_saldo_inicial(self.tenant, '2024-04'), expected - 5000)
+
+    def test_reopen_invalidates_later_snapshots(self):
+        from core.views import _invalidate_period_snapshots
+        self._close('2024-01')
+        feb = self._close('2024-02')
+        ClosedPeriod.objects.filter(tenant=self.tenant, period='2024-01').delete()
+        _invalidate_period_snapshots(self.tenant.id, '2024-01')
+        feb.refresh_from_db()
+        self.assertIsNone(feb.closing_bank_balance)
+        self.assertEqual(feb.ingresos_reconciled, Decimal('2500.50'))
+
+
+class PeriodIncomeRollupTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Confirmar los hooks de invalidación de la preparación (como al final de un request)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.parking = ExtraField.objects.create(
+                tenant=self.tenant, label='Estacionamiento', default_amount=Decimal('200'), enabled=True,
+            )
+            pay = Payment.objects.create(
+                tenant=self.tenant, unit=self.unit1, period='2024-03', status='pagado', bank_reconciled=True,
+                adeudo_payments={'2024-01': {'maintenance': 400}},
+                additional_payments=[{'field_payments': {'maintenance': {'received': 100}}}],
+            )
+            FieldPayment.objects.create(
+                payment=pay, field_key='maintenance', received=Decimal('2500.35'),
+                adelanto_targets={'2024-04': 2500},
+            )
+            FieldPayment.objects.create(payment=pay, field_key=str(self.parking.id), received=Decimal('200'))
+            pending = Payment.objects.create(
+                tenant=self.tenant, unit=self.unit2, period='2024-03', status='parcial', payment_type='efectivo',
+            )
+            self.pending_fp = FieldPayment.objects.create(payment=pending, field_key='maintenance', received=Decimal('1000'))
+            GastoEntry.objects.create(tenant=self.tenant, period='2024-03', amount=Decimal('300'), bank_reconciled=True)
+            self.cheque = GastoEntry.objects.create(tenant=self.tenant, period='2024-03', amount=Decimal('120'))
+            from core.models import UnrecognizedIncome
+            UnrecognizedIncome.objects.create(tenant=self.tenant, period='2024-03', amount=Decimal('50'))
+
+    def _rows(self, period='2024-03'):
+        from core.models import PeriodIncomeRollup
+        return PeriodIncomeRollup.objects.filter(tenant=self.tenant, period=period).count()
+
+    def test_report_totals_come_from_rollup(self):
+        from core.views import _compute_report_data
+        data = _compute_report_data(self.tenant, '2024-03')
+        self.assertEqual(data['ingreso_mantenimiento'], 2600.0)
+        self.assertAlmostEqual(data['ingresos_referenciados'], 0.35)
+        self.assertEqual(data['ingreso_maint_adelanto'], 2500.0)
+        self.assertEqual(data['ingreso_adeudo'], 400.0)
+        self.assertEqual(data['ingresos_conceptos'], {str(self.parking.id): {'total': 200.0, 'label': 'Estacionamiento'}})
+        self.assertEqual(data['ingresos_no_identificados'], 50.0)
+        self.assertAlmostEqual(data['total_ingresos_reconciled'], 5750.35)
+        self.assertEqual(data['ingreso_units_count'], 1)
+        self.assertEqual(data['total_egresos_reconciled'], 300.0)
+        self.assertEqual(data['total_cheques_transito'], 120.0)
+        self.assertEqual(data['ingresos_no_reconciled'], 1000.0)
+        self.assertEqual(data['ingresos_no_recon_details'][0]['unit_id'], 'C-002')
+        self.assertGreater(self._rows(), 0)
+
+        # Segunda lectura: sin recorrer pagos
+        from unittest import mock
+        from core import income_rollup
+        with mock.patch.object(income_rollup, '_build', wraps=income_rollup._build) as build:
+            self.assertEqual(_compute_report_data(self.tenant, '2024-03'), data)
+        self.assertEqual(build.call_count, 0)
+
+    def test_writes_invalidate_their_period(self):
+        from core.views import _compute_report_data
+        _compute_report_data(self.tenant, '2024-03')
+        self.pending_fp.received = Decimal('1500')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pending_fp.save()
+            # Se borra al confirmar, no en cada escritura
+            self.assertGreater(self._rows(), 0)
+        self.assertEqual(self._rows(), 0)
+        self.assertEqual(_compute_report_data(self.tenant, '2024-03')['ingresos_no_reconciled'], 1500.0)
+
+        _compute_report_data(self.tenant, '2024-04')
+        self.cheque.period = '2024-04'
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.cheque.save()
+            self.cheque.save()
+        # Un solo hook para ambos períodos y ambas escrituras
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual((self._rows('2024-03'), self._rows('2024-04')), (0, 0))
+        self.assertEqual(_compute_report_data(self.tenant, '2024-03')['total_cheques_transito'], 0.0)
+        self.assertEqual(_compute_report_data(self.tenant, '2024-04')['total_cheques_transito'], 120.0)
+
+    def test_rebuild_discarded_if_tenant_changed_meanwhile(self):
+        from unittest import mock
+        from django.db.models import F
+        from core import income_rollup
+        from core.models import TenantDataVersion
+        build = income_rollup._build
+
+        def concurrent_write(*args):
+            entries = build(*args)
+            # Otro proceso confirma una escritura mientras se calcula
+            TenantDataVersion.objects.filter(tenant=self.tenant).update(data=F('data') + 1)
+            return entries
+
+        with mock.patch.object(income_rollup, '_build', concurrent_write), \
+                self.captureOnCommitCallbacks(execute=True):
+            totals = income_rollup.totals(self.tenant.id, ['2024-03'])['2024-03']
+        # La lectura responde con lo calculado, pero no deja filas posiblemente viejas
+        self.assertEqual(totals[(income_rollup.NO_IDENTIFICADOS, False)][0], Decimal('50'))
+        self.assertEqual(self._rows(), 0)
+
+
 # ═══════════════════════════════════════════════════════════
 #  DASHBOARD TESTS
 # ═══════════════════════════════════════════════════════════
@@ -404,6 +577,33 @@ class DashboardTests(BaseTestCase):
         self.assertEqual(resp.data['paid_count'], 1)
         self.assertEqual(resp.data['pending_count'], 2)
 
+    def test_dashboard_aggregates(self):
+        self.client.force_authenticate(self.admin_user)
+        paid = Payment.objects.create(
+            tenant=self.tenant, unit=self.unit1, period='2025-01', status='pagado',
+            adeudo_payments={'2024-11': {'maintenance': 500}, '2024-12': {'maintenance': '250.50'}},
+        )
+        FieldPayment.objects.create(payment=paid, field_key='maintenance', received=Decimal('2500'))
+        FieldPayment.objects.create(payment=paid, field_key='extra', received=Decimal('300'))
+        partial = Payment.objects.create(
+            tenant=self.tenant, unit=self.unit2, period='2025-01', status='parcial',
+            adeudo_payments={'2024-12': {'maintenance': 100}},
+        )
+        FieldPayment.objects.create(payment=partial, field_key='maintenance', received=Decimal('1000'))
+        GastoEntry.objects.create(tenant=self.tenant, period='2025-01', amount=Decimal('400'), bank_reconciled=True)
+        GastoEntry.objects.create(tenant=self.tenant, period='2025-01', amount=Decimal('150'))
+
+        data = self.client.get(f'/api/tenants/{self.tenant.id}/dashboard/?period=2025-01').data
+        self.assertEqual(data['paid_count'], 1)
+        self.assertEqual(data['partial_count'], 1)
+        self.assertEqual(data['pending_count'], 1)
+        self.assertEqual(data['total_collected'], 3500.0)
+        self.assertEqual(data['ingreso_adicional'], 300.0)
+        self.assertEqual(data['total_ingresos'], 3800.0)
+        self.assertEqual(data['total_gastos'], 550.0)
+        self.assertEqual(data['total_gastos_conciliados'], 400.0)
+        self.assertEqual(data['total_adeudo_recibido'], 850.5)
+
 
 # ═══════════════════════════════════════════════════════════
 #  ESTADO DE CUENTA TESTS
@@ -428,6 +628,28 @@ class EstadoCuentaTests(BaseTestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(len(resp.data['periods']), 1)
 
+    def test_estado_por_unidad_pdf_streams_in_chunks(self):
+        from unittest import mock
+        from core import views
+        self.client.force_authenticate(self.admin_user)
+        for i in range(4, 12):
+            Unit.objects.create(tenant=self.tenant, unit_name=f'Casa {i}', unit_id_code=f'C-{i:03d}')
+        with mock.patch.object(views, 'ESTADO_PDF_UNIT_CHUNK', 4), \
+                mock.patch.object(views, 'ESTADO_PDF_ROWS_PER_TABLE', 3), \
+                mock.patch.object(views, '_compute_tenant_statements',
+                                  wraps=views._compute_tenant_statements) as compute:
+            # from_period distinto del inicio de operación: sin ledger, cálculo por bloques
+            resp = self.client.get(
+                f'/api/tenants/{self.tenant.id}/estado-cuenta-pdf/?cutoff=2024-03&from_period=2024-02'
+            )
+            content = b''.join(resp.streaming_content)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        self.assertTrue(content.startswith(b'%PDF'))
+        self.assertIn('estado_por_unidad_2024-03.pdf', resp['Content-Disposition'])
+        # 11 unidades en bloques de 4
+        self.assertEqual([len(c.kwargs['unit_ids']) for c in compute.call_args_list], [4, 4, 3])
+
 
 # ═══════════════════════════════════════════════════════════
 #  EXTRA FIELDS TESTS
@@ -515,3 +737,1388 @@ class PermissionTests(BaseTestCase):
     def test_unauthenticated_rejected(self):
         resp = self.client.get(f'/api/tenants/{self.tenant.id}/units/')
         self.assertEqual(resp.status_code, 401)
+
+    def _tenant_user_queries(self, path):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(path)
+        self.assertEqual(resp.status_code, 200)
+        return [q['sql'] for q in ctx.captured_queries if '"tenant_users"' in q['sql']]
+
+    def test_membership_resolved_once_per_request(self):
+        self.client.force_authenticate(self.vecino_user)
+        path = f'/api/tenants/{self.tenant.id}/payments/'
+        # IsTenantMember + filtro de vecino en get_queryset: una sola consulta
+        self.assertEqual(len(self._tenant_user_queries(path)), 1)
+        # No se comparte entre requests: el siguiente vuelve a consultar
+        self.assertEqual(len(self._tenant_user_queries(path)), 1)
+
+    def test_role_change_applies_to_next_request(self):
+        self.client.force_authenticate(self.vecino_user)
+        path = f'/api/tenants/{self.tenant.id}/gasto-entries/'
+        self.assertEqual(self.client.get(path).status_code, 403)
+        tu = TenantUser.objects.get(tenant=self.tenant, user=self.vecino_user)
+        tu.role = 'tesorero'
+        tu.save()
+        self.assertEqual(self.client.get(path).status_code, 200)
+        # QuerySet.update() no dispara señales y aun así se respeta
+        TenantUser.objects.filter(pk=tu.pk).update(role='vecino')
+        self.assertEqual(self.client.get(path).status_code, 403)
+        tu.delete()
+        self.assertEqual(self.client.get(path).status_code, 403)
+
+
+# ═══════════════════════════════════════════════════════════
+#  STATEMENT ENGINE TESTS
+# ═══════════════════════════════════════════════════════════
+
+class StatementFixtureTestCase(BaseTestCase):
+    """Pagos propios, cross-unit, adelantos, adeudos, plan activo y exención."""
+
+    def setUp(self):
+        super().setUp()
+        from core.models import PaymentPlan
+        self.unit2.admin_exempt = True
+        self.unit2.previous_debt = Decimal('1200')
+        self.unit2.save()
+        self.unit1.credit_balance = Decimal('300')
+        self.unit1.save()
+        AssemblyPosition.objects.create(
+            tenant=self.tenant, title='Tesorero', holder_unit=self.unit2,
+            start_date='2024-03', end_date='2024-06', active=True,
+        )
+
+        p1 = Payment.objects.create(
+            tenant=self.tenant, unit=self.unit1, period='2024-01',
+            status='pagado', payment_type='transferencia', bank_reconciled=True,
+            adeudo_payments={'__prevDebt': {'prevDebt': 100}},
+            additional_payments=[{
+                'id': 'a1', 'field_payments': {'maintenance': {'received': 400}},
+                'applied_to_unit_id': str(self.unit2.id), 'bank_reconciled': True,
+            }],
+        )
+        FieldPayment.objects.create(
+            payment=p1, field_key='maintenance', received=Decimal('2500'),
+            adelanto_targets={'2024-02': 2500, '2024-03': 1000.5},
+        )
+        FieldPayment.objects.create(payment=p1, field_key=str(self.fondo_reserva.id), received=Decimal('500'))
+
+        p2 = Payment.objects.create(
+            tenant=self.tenant, unit=self.unit2, period='2024-02',
+            status='parcial', payment_type='efectivo',
+            adeudo_payments={'2024-01': {'maintenance': 800}},
+        )
+        FieldPayment.objects.create(payment=p2, field_key='maintenance', received=Decimal('1200.75'))
+
+        # Caso A: pago registrado en unit1 pero aplicado a unit3
+        p3 = Payment.objects.create(
+            tenant=self.tenant, unit=self.unit1, period='2024-04',
+            status='pagado', payment_type='deposito', applied_to_unit=self.unit3,
+        )
+        FieldPayment.objects.create(payment=p3, field_key='maintenance', received=Decimal('2500'))
+
+        plan = PaymentPlan.objects.create(
+            tenant=self.tenant, unit=self.unit3, status='accepted',
+            total_adeudo=Decimal('3000'), total_with_interest=Decimal('3000'),
+            installments=[
+                {'num': 1, 'period_key': '2024-03', 'debt_part': 1500, 'status': 'pending'},
+                {'num': 2, 'period_key': '2024-05', 'debt_part': 1500, 'status': 'pending'},
+            ],
+        )
+        p4 = Payment.objects.create(
+            tenant=self.tenant, unit=self.unit3, period='2024-03',
+            status='parcial', payment_type='efectivo',
+        )
+        FieldPayment.objects.create(payment=p4, field_key=plan.field_key, received=Decimal('700'))
+
+    def _strip_pay(self, result):
+        rows, *rest = result
+        return [{k: v for k, v in r.items() if k != 'pay'} for r in rows], rest
+
+
+class StatementEngineTests(StatementFixtureTestCase):
+    """El cálculo por tenant debe coincidir con _compute_statement unidad por unidad."""
+
+    def test_batched_matches_single_unit(self):
+        from core.views import _compute_statement, _compute_tenant_statements
+        batched = _compute_tenant_statements(self.tenant, '2024-01', '2024-08')
+        self.assertEqual(len(batched), 3)
+        for unit in (self.unit1, self.unit2, self.unit3):
+            single = _compute_statement(self.tenant, str(unit.id), '2024-01', '2024-08')
+            self.assertEqual(self._strip_pay(batched[str(unit.id)]), self._strip_pay(single))
+
+    def test_subset_matches_full_for_cross_unit_inside_subset(self):
+        # p1 (unit1) lleva un additional_payment a unit2: ambas en el subconjunto
+        from core.views import _compute_tenant_statements
+        full = _compute_tenant_statements(self.tenant, '2024-01', '2024-08')
+        subset = _compute_tenant_statements(
+            self.tenant, '2024-01', '2024-08', unit_ids=[self.unit1.id, self.unit2.id],
+        )
+        self.assertEqual(set(subset), {str(self.unit1.id), str(self.unit2.id)})
+        for uid, result in subset.items():
+            self.assertEqual(self._strip_pay(result), self._strip_pay(full[uid]))
+        self.assertEqual(subset[str(self.unit2.id)][0][0]['cross_unit_payment']['unit_code'], 'C-001')
+
+    def test_single_unit_loads_only_its_counterparts(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from core.views import _compute_statement, _compute_tenant_statements
+        with CaptureQueriesContext(connection) as ctx:
+            result = _compute_statement(self.tenant, str(self.unit2.id), '2024-01', '2024-08')
+        unit_queries = [q['sql'] for q in ctx.captured_queries if 'FROM "units"' in q['sql']]
+        self.assertTrue(unit_queries)
+        for sql in unit_queries:
+            # unit2 y la unidad origen de su Caso B (unit1); unit3 no participa
+            self.assertIn('"units"."id" IN', sql)
+            self.assertNotIn(self.unit3.id.hex, sql.replace('-', ''))
+        full = _compute_tenant_statements(self.tenant, '2024-01', '2024-08')
+        self.assertEqual(self._strip_pay(result), self._strip_pay(full[str(self.unit2.id)]))
+        self.assertEqual(result[0][0]['cross_unit_payment']['unit_code'], 'C-001')
+
+    def test_cross_unit_additional_from_allocations(self):
+        from core.models import AdditionalPaymentAllocation
+        from core.views import _compute_statement
+        alloc = AdditionalPaymentAllocation.objects.get(applied_to_unit=self.unit2)
+        self.assertEqual((alloc.period, alloc.field_key, alloc.amount), ('2024-01', 'maintenance', Decimal('400')))
+        rows = _compute_statement(self.tenant, str(self.unit2.id), '2024-01', '2024-01')[0]
+        self.assertEqual(rows[0]['maint_detail']['received'], 400.0)
+        self.assertEqual(rows[0]['cross_unit_payment']['unit_code'], 'C-001')
+
+        p1 = Payment.objects.get(unit=self.unit1, period='2024-01')
+        p1.additional_payments = []
+        p1.save()
+        self.assertFalse(AdditionalPaymentAllocation.objects.filter(payment=p1).exists())
+        rows = _compute_statement(self.tenant, str(self.unit2.id), '2024-01', '2024-01')[0]
+        self.assertIsNone(rows[0]['cross_unit_payment'])
+
+    def test_additional_allocations_skip_invalid_amounts(self):
+        from core.models import AdditionalPaymentAllocation
+        p1 = Payment.objects.get(unit=self.unit1, period='2024-01')
+        p1.additional_payments = [{
+            'id': 'a2', 'applied_to_unit_id': str(self.unit3.id),
+            'field_payments': {
+                'maintenance': {'received': 'abc'},
+                str(self.fondo_reserva.id): {'received': 'NaN'},
+                'otro': {'received': '150.50'},
+            },
+        }]
+        p1.save()
+        self.assertEqual(
+            list(AdditionalPaymentAllocation.objects.filter(payment=p1).values_list('field_key', 'amount')),
+            [('otro', Decimal('150.50'))],
+        )
+
+    def test_adeudo_from_allocations(self):
+        from unittest import mock
+        from core.models import AdeudoAllocation
+        from core.views import _compute_statement
+        p1 = Payment.objects.get(unit=self.unit1, period='2024-01')
+        self.assertEqual(
+            sorted(AdeudoAllocation.objects.values_list('unit_id', 'period', 'target_period', 'field_key', 'amount')),
+            sorted([
+                (self.unit1.id, '2024-01', '__prevDebt', 'prevDebt', Decimal('100')),
+                (self.unit2.id, '2024-02', '2024-01', 'maintenance', Decimal('800')),
+            ]),
+        )
+        self.assertEqual(_compute_statement(self.tenant, str(self.unit1.id), '2024-01', '2024-03')[4], 100)
+
+        # Guardados que no tocan adeudo_payments no reescriben las filas
+        with mock.patch.object(AdeudoAllocation, 'sync') as sync:
+            p1.status = 'parcial'
+            p1.save(update_fields=['status'])
+        sync.assert_not_called()
+
+        p1.adeudo_payments = {'__prevDebt': {'prevDebt': '250.50', 'otro': 0}}
+        p1.save()
+        self.assertEqual(AdeudoAllocation.objects.filter(payment=p1).count(), 1)
+        self.assertEqual(_compute_statement(self.tenant, str(self.unit1.id), '2024-01', '2024-03')[4], 250.5)
+
+        # Un pago redirigido a otra unidad deja de abonar la deuda de la unidad origen
+        p1.applied_to_unit = self.unit3
+        p1.save()
+        self.assertEqual(_compute_statement(self.tenant, str(self.unit1.id), '2024-01', '2024-03')[4], 0)
+
+    def test_adelanto_from_credits(self):
+        from django.db.models import Sum
+        from core.models import AdelantoCredit
+        from core.views import _compute_statement
+        fp = FieldPayment.objects.get(payment__unit=self.unit1, payment__period='2024-01', field_key='maintenance')
+        landing = AdelantoCredit.objects.filter(tenant=self.tenant, target_period='2024-03')
+        self.assertEqual(landing.aggregate(t=Sum('amount'))['t'], Decimal('1000.50'))
+        rows = _compute_statement(self.tenant, str(self.unit1.id), '2024-01', '2024-03')[0]
+        self.assertEqual([r['maint_detail']['adelanto'] for r in rows], [0.0, 2500.0, 1000.5])
+
+        fp.adelanto_targets = {'2024-03': 300, '2024-04': 0}
+        fp.save()
+        self.assertEqual(list(AdelantoCredit.objects.filter(field_payment=fp).values_list('target_period', 'amount')),
+                         [('2024-03', Decimal('300'))])
+        rows = _compute_statement(self.tenant, str(self.unit1.id), '2024-01', '2024-03')[0]
+        self.assertEqual([r['maint_detail']['adelanto'] for r in rows], [0.0, 0.0, 300.0])
+
+        # Unidad y período se copian del pago
+        pay = fp.payment
+        pay.unit = self.unit2
+        pay.save(update_fields=['unit'])
+        self.assertEqual(list(landing.values_list('unit_id', 'period')), [(self.unit2.id, '2024-01')])
+
+    def test_query_count_independent_of_units(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from core.views import _compute_tenant_statements
+        with CaptureQueriesContext(connection) as before:
+            _compute_tenant_statements(self.tenant, '2024-01', '2024-08')
+        for i in range(5):
+            unit = Unit.objects.create(tenant=self.tenant, unit_name=f'Casa X{i}', unit_id_code=f'X-{i}')
+            pay = Payment.objects.create(tenant=self.tenant, unit=unit, period='2024-02', status='pagado')
+            FieldPayment.objects.create(payment=pay, field_key='maintenance', received=Decimal('2500'))
+        with CaptureQueriesContext(connection) as after:
+            _compute_tenant_statements(self.tenant, '2024-01', '2024-08')
+        self.assertEqual(len(before), len(after))
+
+
+class StatementSqlEngineTests(StatementFixtureTestCase):
+    """El motor SQL (core/statement_sql.py) debe coincidir con el cálculo en Python."""
+
+    _ROW_KEYS = ('period', 'charge', 'paid', 'paid_balance', 'adeudo_received_for_period',
+                 'maintenance', 'status', 'saldo_accum')
+
+    def _reduce(self, statements):
+        out = {}
+        for uid, (rows, tc, tp, bal, pda, plan) in statements.items():
+            out[uid] = (
+                [tuple(round(r[k], 2) if isinstance(r[k], float) else r[k] for k in self._ROW_KEYS) for r in rows],
+                round(tc, 2), round(tp, 2), round(bal, 2), round(pda, 2), bool(plan),
+            )
+        return out
+
+    def assertParity(self, start, cutoff):
+        from core.views import _compute_tenant_statements, _sql_tenant_statements
+        self.assertEqual(
+            self._reduce(_sql_tenant_statements(self.tenant, start, cutoff)),
+            self._reduce(_compute_tenant_statements(self.tenant, start, cutoff)),
+        )
+
+    def test_parity_with_python_engine(self):
+        for start, cutoff in (('2024-01', '2024-08'), ('2024-03', '2024-05'), ('2023-11', '2999-02')):
+            with self.subTest(start=start, cutoff=cutoff):
+                self.assertParity(start, cutoff)
+
+    def test_parity_optional_fields_and_exemptions(self):
+        adelanto = ExtraField.objects.create(
+            tenant=self.tenant, label='Ahorro', field_type='adelanto', required=False, enabled=True,
+        )
+        neutral = ExtraField.objects.create(
+            tenant=self.tenant, label='Donativo', field_type='normal', required=False, enabled=True,
+        )
+        pay = Payment.objects.create(
+            tenant=self.tenant, unit=self.unit2, period='2024-04', status='pagado',
+            adeudo_payments={'2024-02': {'maintenance': 300}, '__prevDebt': {'prevDebt': 50}},
+        )
+        FieldPayment.objects.create(payment=pay, field_key=str(adelanto.id), received=Decimal('150'),
+                                    adelanto_targets={'2024-05': 75})
+        FieldPayment.objects.create(payment=pay, field_key=str(neutral.id), received=Decimal('90.25'))
+        FieldPayment.objects.create(payment=pay, field_key='maintenance', received=Decimal('1000'))
+        self.assertParity('2024-01', '2024-08')
+        self.tenant.admin_type = 'administrador'
+        self.tenant.save()
+        self.assertParity('2024-01', '2024-08')
+
+    def test_selected_by_setting(self):
+        from unittest import mock
+        from django.test import override_settings
+        from core import views
+        with mock.patch.object(views, '_sql_tenant_statements', wraps=views._sql_tenant_statements) as sql:
+            # Corte futuro: el ledger no aplica
+            self.assertIsNone(views._summary_statements(self.tenant, '2024-01', '2999-01'))
+            with override_settings(STATEMENT_ENGINE='sql'):
+                statements = views._summary_statements(self.tenant, '2024-01', '2999-01')
+        self.assertEqual(sql.call_count, 1)
+        self.assertEqual(set(statements), {str(u.id) for u in (self.unit1, self.unit2, self.unit3)})
+
+
+class ExemptionCalendarTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.unit2.admin_exempt = True
+        self.unit2.save()
+        committee = Committee.objects.create(tenant=self.tenant, name='Vigilancia', exemption=False)
+        AssemblyPosition.objects.create(
+            tenant=self.tenant, title='Presidente', holder_unit=self.unit2,
+            start_date='2024-03', end_date='2024-06', active=True,
+        )
+        AssemblyPosition.objects.create(
+            tenant=self.tenant, title='Vocal', holder_unit=self.unit2, committee=committee,
+            start_date='2025-01', end_date='', active=True,
+        )
+        # Cargo vigente pero la unidad no tiene admin_exempt → no exenta
+        AssemblyPosition.objects.create(
+            tenant=self.tenant, title='Secretario', holder_unit=self.unit3,
+            start_date='2024-01', end_date='', active=True,
+        )
+
+    def test_exempt_periods(self):
+        from core.exemptions import ExemptionCalendar
+        with self.assertNumQueries(2):
+            cal = ExemptionCalendar.for_tenant(self.tenant)
+        with self.assertNumQueries(0):
+            self.assertFalse(cal.is_exempt(self.unit2.id, '2024-02'))
+            self.assertTrue(cal.is_exempt(self.unit2.id, '2024-03'))
+            self.assertTrue(cal.is_exempt(str(self.unit2.id), '2024-06'))
+            self.assertFalse(cal.is_exempt(self.unit2.id, '2024-07'))
+            self.assertTrue(cal.is_exempt(self.unit2.id, '2030-01'))
+            self.assertFalse(cal.is_exempt(self.unit3.id, '2024-04'))
+            self.assertEqual(cal.exempt_unit_ids('2024-04'), {str(self.unit2.id)})
+            self.assertEqual(cal.exempt_unit_ids('2024-08'), set())
+
+    def test_only_mesa_directiva_exempts(self):
+        from core.exemptions import ExemptionCalendar
+        self.tenant.admin_type = 'administrador'
+        with self.assertNumQueries(0):
+            cal = ExemptionCalendar.for_tenant(self.tenant)
+        self.assertFalse(cal.is_exempt(self.unit2.id, '2024-04'))
+
+    def test_api_exposes_computed_exemption(self):
+        # admin_exempt sin cargo vigente (2024-07) no exenta; el frontend usa estos campos
+        self.client.force_authenticate(user=self.admin_user)
+        for period in ('2024-04', '2024-07'):
+            Payment.objects.create(tenant=self.tenant, unit=self.unit2, period=period, payment_type='excento')
+        base = f'/api/tenants/{self.tenant.id}/payments/'
+        for period, exempt in (('2024-04', True), ('2024-07', False)):
+            listed = self.client.get(base, {'period': period}).data
+            listed = listed['results'] if isinstance(listed, dict) else listed
+            self.assertEqual([p['maintenance_exempt'] for p in listed], [exempt])
+            detail = self.client.get(f'{base}{listed[0]["id"]}/')
+            self.assertEqual(detail.data['maintenance_exempt'], exempt)
+        resp = self.client.get(f'{base}exempt-units/', {'period': '2024-04'})
+        self.assertEqual(resp.data, {'period': '2024-04', 'unit_ids': [str(self.unit2.id)]})
+        resp = self.client.get(f'{base}exempt-units/', {'period': '2024-07'})
+        self.assertEqual(resp.data['unit_ids'], [])
+
+    def test_receipt_builds_one_calendar(self):
+        import tempfile
+        from unittest import mock
+        from django.test import override_settings
+        from core.exemptions import ExemptionCalendar
+        from core.views import _ensure_receipt_pdf
+        payment = Payment.objects.create(tenant=self.tenant, unit=self.unit2, period='2024-04')
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media), \
+                mock.patch.object(ExemptionCalendar, 'for_tenant', wraps=ExemptionCalendar.for_tenant) as for_tenant:
+            _ensure_receipt_pdf(self.tenant, payment)
+        self.assertEqual(for_tenant.call_count, 1)
+
+
+# ═══════════════════════════════════════════════════════════
+#  UNIT PERIOD LEDGER TESTS
+# ═══════════════════════════════════════════════════════════
+
+class UnitPeriodLedgerTests(StatementFixtureTestCase):
+
+    def setUp(self):
+        # Ejecuta el recálculo que las señales dejan pendiente al confirmar
+        with self.captureOnCommitCallbacks(execute=True):
+            super().setUp()
+
+    def _totals(self, statements):
+        return {uid: (round(tc, 2), round(tp, 2), round(bal, 2), pda, bool(plan))
+                for uid, (_rows, tc, tp, bal, pda, plan) in statements.items()}
+
+    def test_rebuild_matches_engine(self):
+        from django.core.management import call_command
+        from core.views import _compute_tenant_statements, _read_ledger_statements
+        call_command('rebuild_unit_ledger', stdout=StringIO())
+        call_command('rebuild_unit_ledger', '--verify', stdout=StringIO())
+        ledger = _read_ledger_statements(self.tenant, '2024-01', '2024-08')
+        engine = _compute_tenant_statements(self.tenant, '2024-01', '2024-08')
+        self.assertEqual(self._totals(ledger), self._totals(engine))
+        for uid, (rows, *_rest) in engine.items():
+            self.assertEqual(
+                [(r['period'], r['status'], r['saldo_accum']) for r in ledger[uid][0]],
+                [(r['period'], r['status'], r['saldo_accum']) for r in rows],
+            )
+
+    def test_incremental_refresh_after_payment_change(self):
+        from core.views import _rebuild_tenant_ledger, _verify_tenant_ledger
+        _rebuild_tenant_ledger(self.tenant)
+        pay = Payment.objects.get(unit=self.unit2, period='2024-02')
+        pay.adeudo_payments = {'__prevDebt': {'prevDebt': 500}}
+        pay.applied_to_unit = self.unit3
+        with self.captureOnCommitCallbacks(execute=True):
+            pay.save()
+        self.assertEqual(_verify_tenant_ledger(self.tenant), [])
+
+        # Quitar el applied_to_unit recalcula también la unidad que lo recibía
+        pay.applied_to_unit = None
+        with self.captureOnCommitCallbacks(execute=True):
+            pay.save()
+        self.assertEqual(_verify_tenant_ledger(self.tenant), [])
+
+    def test_model_writes_refresh_ledger_once_per_transaction(self):
+        from django.db import transaction
+        from core import unit_ledger
+        from core.models import PaymentPlan, UnitPeriodLedger
+        from core.views import _rebuild_tenant_ledger, _verify_tenant_ledger
+        _rebuild_tenant_ledger(self.tenant)
+        fp = FieldPayment.objects.get(payment__unit=self.unit2, field_key='maintenance')
+        plan = PaymentPlan.objects.get(unit=self.unit3)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                fp.received = Decimal('2000')
+                fp.save()
+                self.unit1.previous_debt = Decimal('750')
+                self.unit1.save()
+                plan.status = 'cancelled'
+                plan.save()
+        self.assertEqual(len([c for c in callbacks if isinstance(c, unit_ledger._PendingRefresh)]), 1)
+        self.assertEqual(_verify_tenant_ledger(self.tenant), [])
+
+        # Guardar solo la evidencia no recalcula nada
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.unit1.save(update_fields=['previous_debt_evidence', 'updated_at'])
+        self.assertEqual(callbacks, [])
+
+        # La configuración descarta el ledger del tenant
+        self.fondo_reserva.save()
+        self.assertFalse(UnitPeriodLedger.objects.filter(tenant=self.tenant).exists())
+
+    def test_capture_refreshes_unit_once(self):
+        from unittest import mock
+        from core import views
+        self.client.force_authenticate(user=self.admin_user)
+        with mock.patch.object(views, '_refresh_unit_ledger', wraps=views._refresh_unit_ledger) as refresh, \
+                self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(f'/api/tenants/{self.tenant.id}/payments/capture/', {
+                'unit_id': str(self.unit2.id), 'period': '2024-05', 'payment_type': 'transferencia',
+                'field_payments': {
+                    'maintenance': {'received': '2500'},
+                    str(self.fondo_reserva.id): {'received': '500'},
+                },
+            }, format='json')
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(refresh.call_count, 1)
+        self.assertEqual(views._verify_tenant_ledger(self.tenant), [])
+
+    def test_missing_rows_rebuilt_on_read(self):
+        from unittest import mock
+        from core import views
+        from core.models import UnitPeriodLedger
+        from core.views import _read_ledger_statements, _verify_tenant_ledger
+        # Las escrituras del fixture ya dejaron el ledger al día
+        self.assertEqual(_verify_tenant_ledger(self.tenant), [])
+        UnitPeriodLedger.objects.filter(unit=self.unit1, period__gte='2024-03').delete()
+        with mock.patch.object(views, '_refresh_unit_ledger', wraps=views._refresh_unit_ledger) as refresh:
+            self.assertIsNotNone(_read_ledger_statements(self.tenant, '2024-01', '2024-06'))
+        # Solo la unidad incompleta, desde su primer período faltante
+        refresh.assert_called_once_with(self.tenant, {str(self.unit1.id): '2024-03'})
+        self.assertEqual(_verify_tenant_ledger(self.tenant), [])
+        # Cortes futuros o inicios distintos recurren al cálculo completo
+        self.assertIsNone(_read_ledger_statements(self.tenant, '2024-03', '2024-06'))
+        self.assertIsNone(_read_ledger_statements(self.tenant, '2024-01', '2999-01'))
+
+
+    def test_many_missing_units_are_handed_to_the_worker(self):
+        from django.test import override_settings
+        from core import jobs
+        from core.models import ReportJob, UnitPeriodLedger
+        from core.views import _read_ledger_statements, _verify_tenant_ledger
+        UnitPeriodLedger.objects.filter(tenant=self.tenant).delete()
+        with override_settings(UNIT_LEDGER_INLINE_UNITS=1):
+            self.assertIsNone(_read_ledger_statements(self.tenant, '2024-01', '2024-06'))
+            self.assertIsNone(_read_ledger_statements(self.tenant, '2024-01', '2024-06'))
+        self.assertFalse(UnitPeriodLedger.objects.filter(tenant=self.tenant).exists())
+        queued = ReportJob.objects.filter(tenant=self.tenant, kind='unit_ledger_refresh')
+        self.assertEqual(queued.count(), 1)
+
+        job = jobs.run_job(jobs.claim_next_job('w1'))
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(_verify_tenant_ledger(self.tenant), [])
+
+    def test_refresh_failure_is_logged(self):
+        from unittest import mock
+        from core import unit_ledger, views
+        from core.models import UnitPeriodLedger
+        with mock.patch.object(views, '_compute_tenant_statements', side_effect=RuntimeError('boom')), \
+                self.assertLogs('core.unit_ledger', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+            unit_ledger.refresh(self.tenant.id, {str(self.unit1.id): ''})
+        self.assertFalse(UnitPeriodLedger.objects.filter(unit=self.unit1).exists())
+
+
+# ═══════════════════════════════════════════════════════════
+#  RESULT CACHE TESTS
+# ═══════════════════════════════════════════════════════════
+
+class ResultCacheTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.admin_user)
+
+    def _count_builds(self, view_class):
+        from unittest import mock
+        calls = []
+        original = view_class._build
+
+        def counting(view, *args):
+            calls.append(args)
+            return original(view, *args)
+        return calls, mock.patch.object(view_class, '_build', counting)
+
+    def test_dashboard_cached_until_write(self):
+        from core.views import DashboardView
+        url = f'/api/tenants/{self.tenant.id}/dashboard/?period=2024-03'
+        calls, patch = self._count_builds(DashboardView)
+        with patch:
+            first = self.client.get(url)
+            second = self.client.get(url)
+            self.assertEqual(first.status_code, 200)
+            self.assertEqual(first.data, second.data)
+            self.assertEqual(len(calls), 1)
+
+            pay = Payment.objects.create(
+                tenant=self.tenant, unit=self.unit1, period='2024-03',
+                status='pagado', payment_type='efectivo',
+            )
+            FieldPayment.objects.create(payment=pay, field_key='maintenance', received=Decimal('2500'))
+            third = self.client.get(url)
+            self.assertEqual(len(calls), 2)
+        self.assertEqual(third.data['total_collected'], 2500.0)
+        self.assertEqual(third.data['paid_count'], 1)
+
+    def test_sealed_period_survives_open_period_writes(self):
+        from core.views import ReporteGeneralView
+        ClosedPeriod.objects.create(tenant=self.tenant, period='2024-01', closed_by=self.admin_user)
+        url = f'/api/tenants/{self.tenant.id}/reporte-general/?period=2024-01'
+        calls, patch = self._count_builds(ReporteGeneralView)
+        with patch:
+            self.assertEqual(self.client.get(url).status_code, 200)
+            GastoEntry.objects.create(tenant=self.tenant, period='2024-05', amount=Decimal('100'))
+            self.client.get(url)
+            self.assertEqual(len(calls), 1)
+            ClosedPeriod.objects.filter(tenant=self.tenant, period='2024-01').delete()
+            self.client.get(url)
+            self.assertEqual(len(calls), 2)
+
+    def test_version_bumped_by_another_process_invalidates(self):
+        from django.db.models import F
+        from core.models import TenantDataVersion
+        from core.views import DashboardView
+        url = f'/api/tenants/{self.tenant.id}/dashboard/?period=2024-03'
+        calls, patch = self._count_builds(DashboardView)
+        with patch:
+            self.client.get(url)
+            # Otro proceso confirma una escritura: solo cambia la versión en la BD
+            TenantDataVersion.objects.filter(tenant=self.tenant).update(data=F('data') + 1)
+            self.client.get(url)
+            self.assertEqual(len(calls), 2)
+
+    def test_sealed_results_do_not_expire(self):
+        from unittest import mock
+        from django.conf import settings
+        from django.core.cache import cache
+        from core.result_cache import cached_tenant_result
+        with mock.patch.object(cache, 'set') as cache_set:
+            cached_tenant_result(self.tenant.id, 'test', {}, lambda: 1, sealed=True)
+            cached_tenant_result(self.tenant.id, 'test', {}, lambda: 1)
+        sealed, open_ = (call.kwargs['timeout'] for call in cache_set.call_args_list)
+        self.assertIsNone(sealed)
+        self.assertEqual(open_, settings.RESULT_CACHE_TIMEOUT)
+
+
+# ═══════════════════════════════════════════════════════════
+#  REPORT JOB TESTS
+# ═══════════════════════════════════════════════════════════
+
+class ReportJobTests(BaseTestCase):
+
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.client.force_authenticate(self.admin_user)
+
+    def _run_worker(self):
+        from unittest import mock
+        from django.core.management import call_command
+        # En PostgreSQL cerraría la conexión de la transacción del TestCase
+        with mock.patch('core.management.commands.run_report_jobs.close_old_connections'):
+            call_command('run_report_jobs', '--once', stdout=StringIO())
+
+    def test_async_pdf_is_queued_and_downloadable(self):
+        from django.test import override_settings
+        from core.models import ReportJob
+        resp = self.client.get(f'/api/tenants/{self.tenant.id}/estado-cuenta-pdf/?cutoff=2024-03&async=1')
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(resp.data['status'], 'pending')
+        self.assertIsNone(resp.data['download_url'])
+
+        self._run_worker()
+
+        job = ReportJob.objects.get(id=resp.data['id'])
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(job.params, {'from_period': '2024-01', 'cutoff': '2024-03'})
+        status_resp = self.client.get(f'/api/tenants/{self.tenant.id}/report-jobs/{job.id}/')
+        self.assertEqual(status_resp.data['status'], 'done')
+        with override_settings(DEBUG=True):
+            download = self.client.get(status_resp.data['download_url'])
+        self.assertEqual(download.status_code, 200)
+        self.assertTrue(download.content.startswith(b'%PDF'))
+        self.assertIn('estado_por_unidad_2024-03.pdf', download['Content-Disposition'])
+
+    def test_statements_zip_has_one_pdf_per_unit(self):
+        import io
+        import zipfile
+        from django.test import override_settings
+        from unittest import mock
+        from core import pdf_pool
+        expected = [f'estado_cuenta_C-00{i}_2024-03.pdf' for i in (1, 2, 3)]
+        # La descarga HTTP renderiza en el propio proceso aunque haya workers configurados
+        with override_settings(STATEMENT_PDF_WORKERS=2), mock.patch.object(pdf_pool, 'start') as start:
+            resp = self.client.get(f'/api/tenants/{self.tenant.id}/estado-cuenta-zip/?cutoff=2024-03')
+            self.assertEqual(resp.status_code, 200)
+            self.assertTrue(resp.streaming)
+            archive = zipfile.ZipFile(io.BytesIO(b''.join(resp.streaming_content)))
+        start.assert_not_called()
+        self.assertEqual(archive.namelist(), expected)
+        for name in expected:
+            self.assertTrue(archive.read(name).startswith(b'%PDF'))
+
+        # El trabajo en segundo plano usa los procesos de core/pdf_pool.py
+        resp = self.client.get(f'/api/tenants/{self.tenant.id}/estado-cuenta-zip/?cutoff=2024-03&async=1')
+        self.assertEqual(resp.status_code, 202)
+        with override_settings(STATEMENT_PDF_WORKERS=2):
+            self._run_worker()
+        from core.models import ReportJob
+        job = ReportJob.objects.get(id=resp.data['id'])
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(job.result_content_type, 'application/zip')
+        with job.result_file.open('rb') as fh:
+            self.assertEqual(zipfile.ZipFile(fh).namelist(), expected)
+
+        self.client.force_authenticate(self.vecino_user)
+        resp = self.client.get(f'/api/tenants/{self.tenant.id}/estado-cuenta-zip/?cutoff=2024-03')
+        self.assertEqual(resp.status_code, 403)
+
+    def test_statement_campaign_sends_batches_over_one_connection(self):
+        from unittest import mock
+        from django.core import mail
+        from django.test import override_settings
+        from core.models import ReportJob
+        Unit.objects.filter(id=self.unit3.id).update(owner_email='ana@email.com')
+
+        resp = self.client.post(f'/api/tenants/{self.tenant.id}/send-statements-all/', {
+            'from_period': '2024-01', 'to_period': '2024-03',
+        }, format='json')
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual((resp.data['total'], resp.data['skipped']), (3, 1))
+
+        with override_settings(STATEMENT_EMAIL_BATCH_SIZE=1, STATEMENT_EMAIL_BATCH_PAUSE=0), \
+                mock.patch('django.core.mail.get_connection', wraps=mail.get_connection) as get_connection:
+            self._run_worker()
+        self.assertEqual(get_connection.call_count, 1)
+
+        job = ReportJob.objects.get(id=resp.data['id'])
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(job.result, {'sent': 2, 'failed': 0, 'skipped': 1})
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['ana@email.com', 'carlos@email.com'])
+        self.assertIn('filename="estado_cuenta_C-001_2024-03.pdf"', mail.outbox[0].message().as_string())
+
+        progress = self.client.get(resp.data['progress_url'])
+        self.assertEqual(progress.status_code, 200)
+        self.assertEqual(progress.data['counts'], {'pending': 0, 'sent': 2, 'failed': 0, 'skipped': 1})
+        self.assertEqual(
+            [(d['unit_id_code'], d['status']) for d in progress.data['deliveries']],
+            [('C-001', 'sent'), ('C-002', 'skipped'), ('C-003', 'sent')],
+        )
+
+    def test_requeued_campaign_is_abandoned_without_resending(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from unittest import mock
+        from django.core import mail
+        from django.test import override_settings
+        from core import email_service, jobs
+        from core.models import ReportJob, StatementDelivery
+        Unit.objects.filter(id=self.unit3.id).update(owner_email='ana@email.com')
+        resp = self.client.post(f'/api/tenants/{self.tenant.id}/send-statements-all/', {
+            'from_period': '2024-01', 'to_period': '2024-03',
+        }, format='json')
+        job_id = resp.data['id']
+        real_send = email_service.send_branded_batch
+
+        def slow_send(messages, connection=None):
+            # El lote tardó más que REPORT_JOB_STALE_SECONDS: otro worker lo reencola
+            ReportJob.objects.filter(id=job_id).update(started_at=timezone.now() - timedelta(hours=1))
+            jobs.requeue_stale_jobs()
+            return real_send(messages, connection=connection)
+
+        with override_settings(STATEMENT_EMAIL_BATCH_SIZE=1, STATEMENT_EMAIL_BATCH_PAUSE=0), \
+                mock.patch.object(email_service, 'send_branded_batch', side_effect=slow_send):
+            jobs.run_job(jobs.claim_next_job('w1'))
+
+        job = ReportJob.objects.get(id=job_id)
+        self.assertEqual((job.status, job.worker), ('pending', ''))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(
+            sorted(StatementDelivery.objects.filter(job=job).values_list('status', flat=True)),
+            ['pending', 'sent', 'skipped'],
+        )
+
+        # Quien lo retoma solo envía la unidad que quedó pendiente
+        with override_settings(STATEMENT_EMAIL_BATCH_SIZE=1, STATEMENT_EMAIL_BATCH_PAUSE=0):
+            self._run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.result, {'sent': 2, 'failed': 0, 'skipped': 1})
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['ana@email.com', 'carlos@email.com'])
+
+    def test_heartbeat_keeps_long_job_from_being_requeued(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from core import jobs
+        from core.models import ReportJob
+        jobs.enqueue_job(self.tenant, self.admin_user, 'estado_por_unidad_pdf',
+                         {'from_period': '2024-01', 'cutoff': '2024-03'})
+        job = jobs.claim_next_job('w1')
+        ReportJob.objects.filter(id=job.id).update(started_at=timezone.now() - timedelta(hours=1))
+        job.started_at = timezone.now() - timedelta(hours=1)
+        jobs.heartbeat(job)
+        self.assertEqual(jobs.requeue_stale_jobs(), (0, 0))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'running')
+
+    def test_lost_job_does_not_overwrite_new_owner(self):
+        from unittest import mock
+        from core import jobs
+        from core.models import ReportJob
+
+        def taken_over(job, outcome):
+            def handler(running):
+                # Otro worker lo reencoló y lo tomó mientras este seguía corriendo
+                ReportJob.objects.filter(id=running.id).update(worker='w2')
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return outcome
+            return handler
+
+        for outcome in ({'filename': 'x.pdf', 'content': b'%PDF'}, RuntimeError('SMTP caído')):
+            job = jobs.enqueue_job(self.tenant, self.admin_user, 'estado_por_unidad_pdf',
+                                   {'from_period': '2024-01', 'cutoff': '2024-03'})
+            with mock.patch.dict(jobs.JOB_HANDLERS, {'estado_por_unidad_pdf': taken_over(job, outcome)}):
+                jobs.run_job(jobs.claim_next_job('w1'))
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.worker, job.error), ('running', 'w2', ''))
+            self.assertFalse(job.result_file)
+            ReportJob.objects.filter(id=job.id).delete()
+
+    def test_long_builders_renew_heartbeat(self):
+        from unittest import mock
+        from django.test import override_settings
+        from core import jobs
+        Payment.objects.create(tenant=self.tenant, unit=self.unit1, period='2024-01', status='pagado')
+        for kind, params in (
+            ('estado_por_unidad_pdf', {'from_period': '2024-01', 'cutoff': '2024-03'}),
+            ('receipts_batch', {'period': '2024-01', 'output': 'pdf'}),
+        ):
+            jobs.enqueue_job(self.tenant, self.admin_user, kind, params)
+            with override_settings(REPORT_JOB_HEARTBEAT_SECONDS=0), \
+                    mock.patch.object(jobs, 'heartbeat', wraps=jobs.heartbeat) as beat:
+                job = jobs.run_job(jobs.claim_next_job('w1'))
+            self.assertEqual(job.status, 'done', kind)
+            self.assertTrue(beat.called, kind)
+
+    def test_failed_statement_email_is_not_retried(self):
+        from unittest import mock
+        from django.core import mail
+        from core import email_service, jobs
+        job = jobs.enqueue_job(self.tenant, self.admin_user, 'general_statement_email',
+                               {'emails': ['a@b.com', 'c@d.com'], 'cutoff': '2024-03'})
+        with mock.patch.object(email_service, 'send_general_statement_email', return_value=False) as send:
+            self._run_worker()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, send.call_count), ('failed', 1, 1))
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_jobs_are_private_to_requester(self):
+        from core.jobs import enqueue_job
+        job = enqueue_job(self.tenant, self.tesorero_user, 'estado_por_unidad_pdf',
+                          {'from_period': '2024-01', 'cutoff': '2024-03'})
+        resp = self.client.get(f'/api/tenants/{self.tenant.id}/report-jobs/{job.id}/')
+        self.assertEqual(resp.status_code, 404)
+
+    def test_failing_job_is_retried_then_marked_failed(self):
+        from unittest import mock
+        from django.conf import settings
+        from core import jobs
+
+        def boom(job):
+            raise RuntimeError('SMTP caído')
+
+        job = jobs.enqueue_job(self.tenant, self.admin_user, 'general_statement_email',
+                               {'emails': ['a@b.com'], 'cutoff': '2024-03'})
+        with mock.patch.dict(jobs.JOB_HANDLERS, {'general_statement_email': boom}):
+            self._run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.attempts, settings.REPORT_JOB_MAX_ATTEMPTS)
+        self.assertEqual(job.error, 'SMTP caído')
+
+
+# ═══════════════════════════════════════════════════════════
+#  OUTBOUND EMAIL QUEUE TESTS
+# ═══════════════════════════════════════════════════════════
+
+class OutboundEmailQueueTests(BaseTestCase):
+
+    def _drain(self):
+        from unittest import mock
+        from django.core.management import call_command
+        # En PostgreSQL cerraría la conexión de la transacción del TestCase
+        with mock.patch('core.management.commands.send_outbound_emails.close_old_connections'):
+            call_command('send_outbound_emails', '--once', stdout=StringIO())
+
+    def test_notifications_are_queued_and_sent_over_one_connection(self):
+        from unittest import mock
+        from django.core import mail
+        from core import email_service
+        from core.models import OutboundEmail
+        from core.views import _notify_roles
+
+        _notify_roles(self.tenant.id, ['admin', 'tesorero', 'vecino'], 'general', 'Aviso', 'Corte de agua')
+        self.assertEqual(OutboundEmail.objects.filter(status='pending').count(), 3)
+        self.assertEqual(len(mail.outbox), 0)
+
+        with mock.patch.object(email_service, 'get_connection', wraps=email_service.get_connection) as conn:
+            self._drain()
+        self.assertEqual(conn.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(OutboundEmail.objects.filter(status='sent').count(), 3)
+        self.assertEqual(
+            sorted(m.to[0] for m in mail.outbox),
+            ['ana@email.com', 'carlos@email.com', 'maria@email.com'],
+        )
+
+        from django.core.management import call_command
+        out = StringIO()
+        call_command('send_outbound_emails', '--stats', stdout=out)
+        self.assertIn('Residencial Las Palmas', out.getvalue())
+        self.assertIn('enviados     3', out.getvalue())
+
+    def test_failed_send_backs_off_then_fails(self):
+        from unittest import mock
+        from django.conf import settings
+        from django.utils import timezone
+        from core import email_service
+        from core.email_queue import queue_notification_emails
+        from core.models import OutboundEmail
+
+        queue_notification_emails(self.tenant, [('carlos@email.com', 'Carlos')], 'general', 'Aviso')
+        failing = mock.patch.object(email_service, 'send_branded_batch',
+                                    side_effect=lambda items: [(False, 'SMTPServerDisconnected')] * len(items))
+        with failing:
+            self._drain()
+            queued = OutboundEmail.objects.get()
+            self.assertEqual(queued.status, 'pending')
+            self.assertEqual(queued.attempts, 1)
+            self.assertGreater(queued.next_attempt_at, timezone.now())
+            self.assertEqual(queued.last_error, 'SMTPServerDisconnected')
+
+            # Mientras no venza el backoff el worker no lo vuelve a tomar
+            self._drain()
+            self.assertEqual(OutboundEmail.objects.get().attempts, 1)
+
+            for _ in range(settings.OUTBOUND_EMAIL_MAX_ATTEMPTS - 1):
+                OutboundEmail.objects.update(next_attempt_at=timezone.now())
+                self._drain()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'failed')
+        self.assertEqual(queued.attempts, settings.OUTBOUND_EMAIL_MAX_ATTEMPTS)
+
+
+# ═══════════════════════════════════════════════════════════
+#  AUDIT LOG BUFFER TESTS
+# ═══════════════════════════════════════════════════════════
+
+class AuditBufferTests(BaseTestCase):
+
+    def setUp(self):
+        from django.test import override_settings
+        from core.audit import audit_buffer, tenant_names, tenant_roles
+        from core.models import AuditLog
+        super().setUp()
+        settings_override = override_settings(AUDIT_LOG_BUFFER_SIZE=3, AUDIT_LOG_FLUSH_SECONDS=3600)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Descartar lo que hayan dejado otras pruebas en el buffer del proceso
+        audit_buffer.flush()
+        AuditLog.objects.all().delete()
+        tenant_names.clear()
+        tenant_roles.clear()
+
+    def _log(self, user, description, resolve_role=False):
+        from django.test import RequestFactory
+        from core import membership
+        from core.views import _audit_log
+        request = RequestFactory().post('/')
+        request.user = user
+        if resolve_role:
+            membership.for_request(request).get(self.tenant.id)
+        _audit_log(request, 'cobranza', 'create', description, tenant_id=self.tenant.id)
+
+    def test_reuses_role_resolved_by_request(self):
+        from core.models import AuditLog
+        for i, user in enumerate([self.admin_user, self.tesorero_user]):
+            self._log(user, str(i), resolve_role=True)
+        # Rol del vecino (los permisos del request) + tenant + INSERT: ningún rol desde el buffer
+        # (+ SAVEPOINT/RELEASE del lote: la prueba corre dentro de una transacción)
+        with self.assertNumQueries(5):
+            self._log(self.vecino_user, '2', resolve_role=True)
+        roles = dict(AuditLog.objects.values_list('description', 'user_role'))
+        self.assertEqual(roles, {'0': 'admin', '1': 'tesorero', '2': 'vecino'})
+
+    def test_flushes_in_bulk_when_buffer_is_full(self):
+        from core.audit import audit_buffer
+        from core.models import AuditLog
+        self._log(self.admin_user, 'uno')
+        self._log(self.tesorero_user, 'dos')
+        self.assertEqual(AuditLog.objects.count(), 0)
+        self.assertEqual(audit_buffer.pending(), 2)
+
+        # Tenant + roles + un solo INSERT (+ SAVEPOINT/RELEASE del lote)
+        with self.assertNumQueries(5):
+            self._log(self.admin_user, 'tres')
+        self.assertEqual(audit_buffer.pending(), 0)
+        logs = {log.description: log for log in AuditLog.objects.all()}
+        self.assertEqual(set(logs), {'uno', 'dos', 'tres'})
+        self.assertEqual(logs['uno'].tenant_name, 'Residencial Las Palmas')
+        self.assertEqual(logs['uno'].user_role, 'admin')
+        self.assertEqual(logs['dos'].user_role, 'tesorero')
+
+    def test_cached_lookups_are_evicted_on_change(self):
+        from core.audit import audit_buffer
+        from core.models import AuditLog
+        self._log(self.admin_user, 'antes')
+        audit_buffer.flush()
+
+        self._log(self.admin_user, 'cacheado')
+        # Solo el INSERT (+ SAVEPOINT/RELEASE del lote)
+        with self.assertNumQueries(3):
+            audit_buffer.flush()
+
+        TenantUser.objects.filter(user=self.admin_user).update(role='auditor')
+        TenantUser.objects.get(user=self.admin_user).save()
+        self._log(self.admin_user, 'despues')
+        audit_buffer.flush()
+        self.assertEqual(AuditLog.objects.get(description='despues').user_role, 'auditor')
+
+    def test_deleted_user_is_saved_without_fk(self):
+        from core.audit import audit_buffer
+        from core.models import AuditLog
+        ghost = User.objects.create_user(email='ghost@email.com', password='Ghost123', name='Ghost')
+        self._log(ghost, 'borrado')
+        self._log(self.admin_user, 'vigente')
+        ghost.delete()
+        self.assertEqual(audit_buffer.flush(), 2)
+        log = AuditLog.objects.get(description='borrado')
+        self.assertIsNone(log.user_id)
+        self.assertEqual(log.user_email, 'ghost@email.com')
+        self.assertEqual(AuditLog.objects.get(description='vigente').user_id, self.admin_user.id)
+
+    def test_failed_batch_falls_back_to_single_rows(self):
+        from unittest import mock
+        from django.db import DatabaseError
+        from core.audit import audit_buffer
+        from core.models import AuditLog
+        self._log(self.admin_user, 'uno')
+        self._log(self.admin_user, 'mala')
+        original_save = AuditLog.save
+
+        def failing_save(log, *args, **kwargs):
+            if log.description == 'mala':
+                raise DatabaseError('fila inválida')
+            return original_save(log, *args, **kwargs)
+
+        with mock.patch.object(AuditLog.objects, 'bulk_create', side_effect=DatabaseError('lote')), \
+                mock.patch.object(AuditLog, 'save', failing_save):
+            self.assertEqual(audit_buffer.flush(), 1)
+        self.assertEqual(list(AuditLog.objects.values_list('description', flat=True)), ['uno'])
+
+
+class AssetCacheTests(BaseTestCase):
+
+    def setUp(self):
+        import base64
+        import io
+        import tempfile
+        from django.test import override_settings
+        from PIL import Image
+        from core import assets, base64_files
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        assets.clear()
+        buf = io.BytesIO()
+        Image.new('RGB', (1200, 300), (13, 124, 110)).save(buf, format='PNG')
+        logo = 'data:image/png;base64,' + base64.b64encode(buf.getvalue()).decode()
+        base64_files.write(self.tenant, 'logo', logo)
+        self.tenant.save()
+
+    def test_logo_is_decoded_once_per_tenant_version(self):
+        import io
+        from unittest import mock
+        from PIL import Image
+        from core import assets
+        with mock.patch.object(assets, '_decode_logo', wraps=assets._decode_logo) as decode:
+            logo = assets.tenant_logo(self.tenant)
+            self.assertIs(assets.tenant_logo(self.tenant), logo)
+            self.assertEqual(decode.call_count, 1)
+            self.assertEqual(Image.open(io.BytesIO(logo)).size, (600, 150))
+
+            self.tenant.save()
+            assets.tenant_logo(self.tenant)
+            self.assertEqual(decode.call_count, 2)
+
+    def test_pdf_with_logo_still_renders(self):
+        self.client.force_authenticate(self.admin_user)
+        resp = self.client.get(f'/api/tenants/{self.tenant.id}/estado-cuenta-pdf/?cutoff=2024-03')
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(b''.join(resp.streaming_content).startswith(b'%PDF'))
+
+
+class ReceiptCacheTests(BaseTestCase):
+
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.client.force_authenticate(self.admin_user)
+        self.payment = Payment.objects.create(
+            tenant=self.tenant, unit=self.unit1, period='2025-01',
+            status='pagado', payment_type='transferencia',
+        )
+        FieldPayment.objects.create(payment=self.payment, field_key='maintenance', received=Decimal('2500'))
+        self.url = f'/api/tenants/{self.tenant.id}/payments/{self.payment.id}/receipt-pdf/'
+
+    def test_receipt_is_generated_once_per_payment_version(self):
+        from unittest import mock
+        from django.core.files.storage import default_storage
+        from django.test import override_settings
+        from core import views
+        with mock.patch.object(views, '_generate_receipt_pdf', wraps=views._generate_receipt_pdf) as generate:
+            first = self.client.get(self.url)
+            self.assertEqual(first.status_code, 200)
+            name = first['X-Accel-Redirect'].removeprefix('/protected-media/')
+            self.assertTrue(name.startswith(f'receipts/{self.tenant.id}/{self.payment.id}/'))
+            self.assertIn('recibo_C-001_202501.pdf', first['Content-Disposition'])
+
+            with override_settings(DEBUG=True):
+                second = self.client.get(self.url)
+            self.assertTrue(second.content.startswith(b'%PDF'))
+            self.assertEqual(generate.call_count, 1)
+
+            self.payment.notes = 'Corrección'
+            self.payment.save()
+            third = self.client.get(self.url)
+            self.assertEqual(generate.call_count, 2)
+            self.assertNotEqual(third['X-Accel-Redirect'], first['X-Accel-Redirect'])
+            self.assertFalse(default_storage.exists(name))
+
+        payment_dir = f'receipts/{self.tenant.id}/{self.payment.id}'
+        self.payment.delete()
+        self.assertEqual(default_storage.listdir(payment_dir)[1], [])
+
+    def test_plan_change_regenerates_receipt(self):
+        from core.models import PaymentPlan
+        from core.views import _ensure_receipt_pdf, _load_period_receipts
+        plan = PaymentPlan.objects.create(
+            tenant=self.tenant, unit=self.unit1, status='accepted',
+            total_adeudo=Decimal('3000'), total_with_interest=Decimal('3000'),
+            installments=[{'num': 1, 'period_key': '2025-01', 'debt_part': 1500, 'status': 'pending'}],
+        )
+        FieldPayment.objects.create(payment=self.payment, field_key=plan.field_key, received=Decimal('1500'))
+        first = _ensure_receipt_pdf(self.tenant, self.payment)
+        (_payment, _exempt, batch_name), = _load_period_receipts(self.tenant, '2025-01')[0]
+        self.assertEqual(batch_name, first)
+
+        # Las cuotas del plan cambian sin tocar el pago: el recibo guardado ya no sirve
+        plan.installments[0]['debt_part'] = 2000
+        plan.save()
+        second = _ensure_receipt_pdf(self.tenant, self.payment)
+        self.assertNotEqual(second, first)
+        (_payment, _exempt, batch_name), = _load_period_receipts(self.tenant, '2025-01')[0]
+        self.assertEqual(batch_name, second)
+
+    def test_receipts_batch_zip_and_merged_pdf(self):
+        import io
+        import re
+        import zipfile
+        from django.test import override_settings
+        second = Payment.objects.create(
+            tenant=self.tenant, unit=self.unit2, period='2025-01',
+            status='parcial', payment_type='efectivo',
+        )
+        FieldPayment.objects.create(payment=second, field_key='maintenance', received=Decimal('1000'))
+        url = f'/api/tenants/{self.tenant.id}/payments/receipts-batch/?period=2025-01'
+
+        from core.views import _iter_period_receipts_zip
+        expected = ['recibo_C-001_202501.pdf', 'recibo_C-002_202501.pdf']
+        # 2 procesos (como en run_report_jobs); después la descarga HTTP los lee de media
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(_iter_period_receipts_zip(self.tenant, '2025-01', workers=2))))
+        self.assertEqual(archive.namelist(), expected)
+        with override_settings(STATEMENT_PDF_WORKERS=2):
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(resp.streaming_content)))
+        self.assertEqual(archive.namelist(), expected)
+        self.assertTrue(all(archive.read(n).startswith(b'%PDF') for n in archive.namelist()))
+
+        resp = self.client.get(url + '&output=pdf')
+        self.assertEqual(resp.status_code, 200)
+        pdf = b''.join(resp.streaming_content)
+        self.assertEqual(len(re.findall(rb'/Type /Page\b', pdf)), 2)
+
+        self.assertEqual(self.client.get(url.replace('2025-01', '2025-02')).status_code, 404)
+
+
+class Base64FileTests(BaseTestCase):
+
+    PDF = b'%PDF-1.4\n% evidencia\n'
+
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.state_file = f'{media.name}/state.json'
+        self.client.force_authenticate(self.admin_user)
+        from core import base64_files
+        base64_files._legacy_pending.clear()
+
+    def test_api_writes_file_and_blanks_legacy_column(self):
+        import base64
+        b64 = base64.b64encode(self.PDF).decode()
+        url = f'/api/tenants/{self.tenant.id}/units/{self.unit1.id}/'
+        resp = self.client.patch(url, {'previous_debt_evidence': b64}, format='json')
+        self.assertEqual(resp.status_code, 200)
+
+        unit = Unit.objects.get(pk=self.unit1.pk)
+        self.assertNotIn('previous_debt_evidence', unit.__dict__)
+        self.assertEqual(unit.previous_debt_evidence, '')
+        self.assertTrue(unit.previous_debt_evidence_file.name.endswith('.pdf'))
+        self.assertEqual(self.client.get(url + 'evidence/').data['evidence'], b64)
+
+        resp = self.client.patch(url, {'previous_debt_evidence': 'no es base64!'}, format='json')
+        self.assertEqual(resp.status_code, 400)
+
+    def test_backfill_migrates_legacy_rows_and_verify_repairs(self):
+        import base64
+        import json
+        from django.core.management import call_command
+        from core import base64_files
+        b64 = base64.b64encode(self.PDF).decode()
+        evidence = json.dumps([{'data': b64, 'mime': 'application/pdf', 'name': 'pago.pdf'}])
+        payment = Payment.objects.create(tenant=self.tenant, unit=self.unit1, period='2025-01', status='pagado')
+        Unit.objects.filter(pk=self.unit1.pk).update(previous_debt_evidence=b64)
+        Payment.objects.filter(pk=payment.pk).update(evidence=evidence)
+
+        call_command('migrate_base64_to_files', batch_size=1, workers=2, state_file=self.state_file, stdout=StringIO())
+        unit = Unit.objects.get(pk=self.unit1.pk)
+        payment = Payment.objects.get(pk=payment.pk)
+        self.assertEqual(base64_files.read(unit, 'previous_debt_evidence'), b64)
+        self.assertEqual(base64_files.read(payment, 'evidence'), evidence)
+        self.assertEqual(unit.previous_debt_evidence_file.name, f'unit_debt_evidences/unit_{unit.pk}.pdf')
+
+        # Archivo dañado (p. ej. escrito por la versión anterior del comando)
+        with unit.previous_debt_evidence_file.open('wb') as fh:
+            fh.write(b'basura')
+        out = StringIO()
+        call_command('migrate_base64_to_files', verify=True, clear_legacy=True, state_file=self.state_file, stdout=out)
+        self.assertIn('Migrados:    1', out.getvalue())
+        self.assertIn('Verificados: 1', out.getvalue())
+        unit = Unit.objects.get(pk=self.unit1.pk)
+        self.assertEqual(base64_files.read_bytes(unit, 'previous_debt_evidence'), self.PDF)
+        self.assertEqual(Unit.objects.filter(pk=unit.pk).values_list('previous_debt_evidence', flat=True).get(), '')
+        self.assertEqual(Payment.objects.filter(pk=payment.pk).values_list('evidence', flat=True).get(), '')
+
+    def test_reads_fall_back_to_legacy_column_until_backfilled(self):
+        import base64
+        from django.core.management import call_command
+        b64 = base64.b64encode(self.PDF).decode()
+        Unit.objects.filter(pk=self.unit1.pk).update(previous_debt_evidence=b64)
+        url = f'/api/tenants/{self.tenant.id}/units/{self.unit1.id}/'
+        self.assertEqual(self.client.get(url + 'evidence/').data['evidence'], b64)
+        self.assertEqual(self.client.get(url).data['previous_debt_evidence'], b64)
+
+        call_command('migrate_base64_to_files', verify=True, clear_legacy=True, state_file=self.state_file,
+                     stdout=StringIO())
+        self.assertEqual(self.client.get(url + 'evidence/').data['evidence'], b64)
+
+    def test_binary_evidence_file_is_returned_as_list(self):
+        import base64
+        from django.core.files.base import ContentFile
+        jpg = b'\xff\xd8\xff\xe0 imagen'
+        payment = Payment.objects.create(tenant=self.tenant, unit=self.unit1, period='2025-01', status='pagado')
+        payment.evidence_file.save('comprobante.jpg', ContentFile(jpg))
+        resp = self.client.get(f'/api/tenants/{self.tenant.id}/payments/{payment.id}/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.data['evidence']), 1)
+        self.assertEqual(resp.data['evidence'][0]['mime'], 'image/jpeg')
+        self.assertEqual(base64.b64decode(resp.data['evidence'][0]['data']), jpg)
+
+    def test_lean_querysets_and_bank_statement_list(self):
+        import base64
+        payment = Payment.objects.create(tenant=self.tenant, unit=self.unit1, period='2025-01', status='pagado')
+        lean = Payment.objects.lean('id', 'period', 'evidence', 'unit__unit_name').select_related('unit').get(pk=payment.pk)
+        self.assertEqual(lean.get_deferred_fields() & {'evidence', 'notes', 'additional_payments'},
+                         {'evidence', 'notes', 'additional_payments'})
+        self.assertEqual(lean.unit.unit_name, 'Casa 1')
+        self.assertIn('previous_debt_evidence', lean.unit.get_deferred_fields())
+
+        b64 = base64.b64encode(self.PDF).decode()
+        url = f'/api/tenants/{self.tenant.id}/bank-statements/'
+        created = self.client.post(url, {'period': '2025-01', 'file_data': b64}, format='json')
+        self.assertEqual(created.status_code, 201)
+        resp = self.client.get(url)
+        rows = resp.data['results'] if isinstance(resp.data, dict) else resp.data
+        self.assertEqual([(r['period'], r['has_file']) for r in rows], [('2025-01', True)])
+        self.assertNotIn('file_data', rows[0])
+        self.assertEqual(self.client.get(f'{url}{created.data["id"]}/').data['file_data'], b64)
+
+    def test_multipart_upload_streams_to_file_field(self):
+        import base64
+        import io
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.test import override_settings
+        from PIL import Image
+        png = io.BytesIO()
+        Image.new('RGB', (4, 4)).save(png, format='PNG')
+        payment = Payment.objects.create(tenant=self.tenant, unit=self.unit1, period='2025-01', status='pagado')
+        url = f'/api/tenants/{self.tenant.id}/payments/{payment.id}/evidence/'
+
+        resp = self.client.post(url, {'file': [
+            SimpleUploadedFile('recibo.pdf', self.PDF, content_type='application/octet-stream'),
+            SimpleUploadedFile('foto.png', png.getvalue(), content_type='image/png'),
+        ]}, format='multipart')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            [(e['name'], e['mime'], base64.b64decode(e['data'])) for e in resp.data['evidence']],
+            [('recibo.pdf', 'application/pdf', self.PDF), ('foto.png', 'image/png', png.getvalue())],
+        )
+
+        resp = self.client.post(url, {'file': SimpleUploadedFile('x.pdf', b'no soy pdf')}, format='multipart')
+        self.assertEqual(resp.status_code, 415)
+        with override_settings(UPLOAD_MAX_FILE_BYTES=8):
+            resp = self.client.post(url, {'file': SimpleUploadedFile('x.pdf', self.PDF)}, format='multipart')
+        self.assertEqual(resp.status_code, 413)
+        self.assertEqual(len(self.client.get(f'/api/tenants/{self.tenant.id}/payments/{payment.id}/').data['evidence']), 2)
+
+        bank_url = f'/api/tenants/{self.tenant.id}/bank-statements/'
+        resp = self.client.post(bank_url + 'upload/', {
+            'period': '2025-01', 'file': SimpleUploadedFile('estado.pdf', self.PDF),
+        }, format='multipart')
+        self.assertEqual(resp.status_code, 201)
+        self.assertTrue(resp.data['has_file'])
+        self.assertEqual(base64.b64decode(self.client.get(f'{bank_url}{resp.data["id"]}/').data['file_data']), self.PDF)
+
+
+# ═══════════════════════════════════════════════════════════
+#  KEYSET PAGINATION TESTS
+# ═══════════════════════════════════════════════════════════
+
+class KeysetPaginationTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        from django.utils import timezone
+        self.client.force_authenticate(self.admin_user)
+        self.url = f'/api/tenants/{self.tenant.id}/payments/'
+        units = [self.unit1, self.unit2, self.unit3]
+        now = timezone.now()
+        for i in range(7):
+            Payment.objects.create(tenant=self.tenant, unit=units[i % 3], period=f'2024-{i + 1:02d}')
+        # Empates en created_at: el id desempata
+        for i, pay in enumerate(Payment.objects.order_by('period')):
+            Payment.objects.filter(pk=pay.pk).update(created_at=now - timezone.timedelta(minutes=i // 2))
+        self.expected = [
+            str(pk) for pk in Payment.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        ]
+
+    def _ids(self, resp):
+        return [r['id'] for r in resp.data['results']]
+
+    def test_cursor_pages_follow_created_at_and_id(self):
+        resp = self.client.get(self.url, {'cursor': '', 'page_size': 3})
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn('count', resp.data)
+        self.assertIsNone(resp.data['previous'])
+        seen = self._ids(resp)
+        pages = [resp]
+        while resp.data['next']:
+            resp = self.client.get(resp.data['next'])
+            pages.append(resp)
+            seen += self._ids(resp)
+        self.assertEqual(seen, self.expected)
+        self.assertEqual([len(self._ids(p)) for p in pages], [3, 3, 1])
+
+        back = self.client.get(pages[2].data['previous'])
+        self.assertEqual(self._ids(back), self.expected[3:6])
+        back = self.client.get(back.data['previous'])
+        self.assertEqual(self._ids(back), self.expected[:3])
+        self.assertIsNone(back.data['previous'])
+
+    def test_offset_pagination_still_default(self):
+        resp = self.client.get(self.url, {'page_size': 5, 'page': 2, 'count': 'approx'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['count'], 7)
+        self.assertEqual(len(resp.data['results']), 2)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(self.url, {'cursor': 'no-es-un-cursor'}).status_code, 404)
+
+    def test_audit_logs_and_notifications(self):
+        from django.utils import timezone
+        from core.audit import audit_buffer
+        from core.models import AuditLog, Notification
+        # Lo que otras pruebas dejaron en el buffer del proceso se guardaría aquí
+        audit_buffer.flush()
+        AuditLog.objects.all().delete()
+        start = timezone.now()
+        for i in range(4):
+            log = AuditLog.objects.create(tenant=self.tenant, module='cobranza', action='create', description=f'log {i}')
+            notif = Notification.objects.create(tenant=self.tenant, user=self.admin_user, title=f'aviso {i}')
+            at = start + timezone.timedelta(seconds=i)
+            AuditLog.objects.filter(pk=log.pk).update(created_at=at)
+            Notification.objects.filter(pk=notif.pk).update(created_at=at)
+
+        self.client.force_authenticate(self.super_admin)
+        resp = self.client.get('/api/audit-logs/', {'cursor': '', 'page_size': 3, 'count': 'exact'})
+        self.assertEqual(resp.data['count'], 4)
+        self.assertEqual([r['description'] for r in resp.data['results']], ['log 3', 'log 2', 'log 1'])
+        resp = self.client.get(resp.data['next'])
+        self.assertEqual([r['description'] for r in resp.data['results']], ['log 0'])
+        # Paginación por página: mismo formato de siempre
+        resp = self.client.get('/api/audit-logs/', {'per_page': 10, 'count': 'approx'})
+        self.assertEqual((resp.data['count'], resp.data['page']), (4, 1))
+
+        self.client.force_authenticate(self.admin_user)
+        url = f'/api/tenants/{self.tenant.id}/notifications/'
+        self.assertEqual(len(self.client.get(url).data), 4)
+        resp = self.client.get(url, {'cursor': '', 'page_size': 2})
+        self.assertEqual([r['title'] for r in resp.data['results']], ['aviso 3', 'aviso 2'])
+        self.assertIsNotNone(resp.data['next'])
@@ -0,0 +1,121 @@
+"""
+Homly — Refresco del estado de cuenta materializado (UnitPeriodLedger)
+======================================================================
+Las escrituras de Payment, FieldPayment, Unit, PaymentPlan, ExtraField,
+AssemblyPosition y Tenant (core/signals.py) marcan qué unidades y desde qué
+período cambió su estado de cuenta. Igual que los totales de
+core/income_rollup.py, un único hook on_commit por transacción acumula las
+unidades tocadas y las recalcula una sola vez al confirmarla
+(_refresh_unit_ledger en core/views.py); fuera de una transacción se
+recalcula de inmediato. La captura de un pago son varias escrituras (pago,
+cada campo, estatus, cuotas del plan), así que la vista las agrupa en
+transaction.atomic() para recalcular la unidad una vez y no en cada una.
+
+Los cambios de configuración (cuotas, campos, exenciones) afectan a todas
+las unidades: invalidate_tenant() borra el ledger en la misma transacción y
+la siguiente lectura lo encarga al worker (ReportJob 'unit_ledger_refresh').
+"""
+import logging
+import uuid
+from collections import defaultdict
+
+from django.db import transaction
+
+from .models import Tenant, UnitPeriodLedger
+
+logger = logging.getLogger(__name__)
+
+
+def payment_scope(payment):
+    """
+    Units whose statement depends on *payment*, mapped to the earliest affected
+    period ('' = desde el inicio, p.ej. abonos a deuda previa).
+    Includes the payment's unit, the cross-unit target (Caso A) and the
+    targets of additional_payments entries (Caso B).
+    """
+    scope = {}
+
+    def _touch(unit_id, period):
+        try:
+            uid = str(uuid.UUID(str(unit_id)))
+        except (TypeError, ValueError):
+            return
+        scope[uid] = min(scope.get(uid, period), period)
+
+    earliest = payment.period
+    for target_p in (payment.adeudo_payments or {}):
+        earliest = '' if target_p == '__prevDebt' else min(earliest, target_p)
+    if payment.pk:
+        for target_p in payment.adelanto_credits.values_list('target_period', flat=True):
+            earliest = min(earliest, target_p)
+    _touch(payment.unit_id, earliest)
+    if payment.applied_to_unit_id:
+        _touch(payment.applied_to_unit_id, payment.period)
+    for ap in (payment.additional_payments or []):
+        if isinstance(ap, dict) and ap.get('applied_to_unit_id'):
+            _touch(ap['applied_to_unit_id'], payment.period)
+    return scope
+
+
+def merge_scopes(*scopes):
+    """Une alcances {unit_id: período} quedándose con el período más antiguo."""
+    merged = {}
+    for scope in scopes:
+        for uid, period in scope.items():
+            merged[uid] = min(merged.get(uid, period), period)
+    return merged
+
+
+def _refresh(tenant_id, scope):
+    from .views import _refresh_unit_ledger
+    tenant = Tenant.objects.filter(id=tenant_id).first()
+    if tenant is None:
+        return
+    try:
+        _refresh_unit_ledger(tenant, scope)
+    except Exception:
+        # Las filas de esas unidades ya se borraron: la siguiente lectura las completa
+        logger.exception('Error refreshing unit ledger for tenant %s (%s units)', tenant_id, len(scope))
+
+
+class _PendingRefresh:
+    """Hook on_commit de la transacción: recalcula las unidades marcadas."""
+
+    def __init__(self):
+        self.scopes = defaultdict(dict)
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        for tenant_id, scope in self.scopes.items():
+            _refresh(tenant_id, scope)
+
+
+def _pending_hook(connection):
+    # Django descarta los hooks de una transacción (o savepoint) revertida
+    for _sids, func, _robust in connection.run_on_commit:
+        if isinstance(func, _PendingRefresh) and not func.done:
+            return func
+    hook = _PendingRefresh()
+    transaction.on_commit(hook)
+    return hook
+
+
+def refresh(tenant_id, scope):
+    """
+    Recalcula el ledger de *scope* ({unit_id: período desde el que cambió,
+    '' = desde el inicio}) al confirmar la transacción del cambio.
+    """
+    if not scope:
+        return
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        _refresh(tenant_id, scope)
+        return
+    pending = _pending_hook(connection).scopes
+    pending[str(tenant_id)] = merge_scopes(pending[str(tenant_id)], scope)
+
+
+def invalidate_tenant(tenant_id):
+    """Descarta el ledger completo del tenant; la siguiente lectura lo reconstruye."""
+    UnitPeriodLedger.objects.filter(tenant_id=tenant_id).delete()
@@ -0,0 +1,94 @@
+"""
+Homly — Subida multipart de evidencias y estados bancarios
+==========================================================
+Alternativa a mandar el archivo como Base64 dentro del JSON (un 33% más
+grande y copiado varias veces en memoria: cuerpo, JSON, bytes decodificados).
+Django ya recibe cada archivo por trozos y pasa a un temporal en disco los
+que superan FILE_UPLOAD_MAX_MEMORY_SIZE; este módulo agrega:
+
+- SizeLimitUploadHandler: descarta el archivo en cuanto supera
+  UPLOAD_MAX_FILE_BYTES, sin esperar a recibirlo completo.
+- sniff(): tipo por magic bytes; no se confía en el Content-Type del cliente.
+- receive(): archivos del campo 'file' validados, listos para
+  base64_files.write_upload().
+
+receive() debe llamarse antes de leer request.data: los upload handlers no
+se pueden cambiar después de procesar el cuerpo.
+"""
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+
+from . import base64_files
+
+PDF_TYPES = {'.pdf'}
+EVIDENCE_TYPES = {'.pdf', '.png', '.jpg', '.gif', '.webp'}
+
+
+class UploadError(Exception):
+
+    def __init__(self, detail, status_code=400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class SizeLimitUploadHandler(FileUploadHandler):
+    """Primer handler de la cadena: cuenta bytes y salta el archivo al pasar el límite."""
+
+    def __init__(self, request=None, max_bytes=None):
+        super().__init__(request)
+        self.max_bytes = max_bytes
+        self.received = 0
+        self.rejected = []
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_bytes:
+            self.rejected.append(self.file_name)
+            raise SkipFile()
+        return raw_data
+
+    def file_complete(self, file_size):
+        # El archivo lo construye el siguiente handler (memoria o temporal)
+        return None
+
+
+def sniff(upload):
+    """Extensión según los primeros bytes del archivo ('' si no es un tipo conocido)."""
+    upload.seek(0)
+    head = upload.read(16)
+    upload.seek(0)
+    return base64_files.guess_extension(head, default='')
+
+
+def receive(request, allowed, max_files=1, field='file'):
+    """
+    Archivos subidos en *field* como [(UploadedFile, ext)]. Lanza UploadError
+    (400 sin archivos o demasiados, 413 si alguno supera el límite, 415 si el
+    tipo no está en *allowed*).
+    """
+    max_bytes = settings.UPLOAD_MAX_FILE_BYTES
+    limiter = SizeLimitUploadHandler(request, max_bytes)
+    request.upload_handlers.insert(0, limiter)
+
+    files = request.FILES.getlist(field)
+    if limiter.rejected:
+        raise UploadError(
+            f'{limiter.rejected[0]} supera el límite de {max_bytes // (1024 * 1024)} MB por archivo.', 413,
+        )
+    if not files:
+        raise UploadError(f'Adjunta el archivo en el campo "{field}" (multipart/form-data).')
+    if len(files) > max_files:
+        raise UploadError(f'Máximo {max_files} archivo(s) por subida.')
+
+    uploads = []
+    for upload in files:
+        ext = sniff(upload)
+        if ext not in allowed:
+            raise UploadError(f'Tipo de archivo no permitido: {upload.name}', 415)
+        uploads.append((upload, ext))
+    return uploads
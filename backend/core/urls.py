@@ -43,6 +43,7 @@ tenant_router.register(r'unrecognized-income', views.UnrecognizedIncomeViewSet,
 tenant_router.register(r'amenity-reservations', views.AmenityReservationViewSet, basename='amenity-reservations')
 tenant_router.register(r'notifications', views.NotificationViewSet, basename='notifications')
 tenant_router.register(r'payment-plans', views.PaymentPlanViewSet, basename='payment-plans')
+tenant_router.register(r'report-jobs', views.ReportJobViewSet, basename='report-jobs')
 
 urlpatterns = [
     # Auth
@@ -84,6 +85,8 @@ urlpatterns = [
          views.ReporteAdeudosView.as_view(), name='reporte-adeudos'),
     path('tenants/<uuid:tenant_id>/estado-cuenta-pdf/',
          views.EstadoPorUnidadPDFView.as_view(), name='estado-cuenta-pdf'),
+    path('tenants/<uuid:tenant_id>/estado-cuenta-zip/',
+         views.EstadoCuentaZipView.as_view(), name='estado-cuenta-zip'),
 
     # CRM Dashboard (aggregate stats)
     path('crm/dashboard/', views.CRMDashboardView.as_view(), name='crm-dashboard'),
@@ -95,4 +98,6 @@ urlpatterns = [
          views.SendGeneralStatementEmailView.as_view(), name='send-statement-email'),
     path('tenants/<uuid:tenant_id>/send-vecino-statement-email/',
          views.SendVecinoStatementEmailView.as_view(), name='send-vecino-statement-email'),
+    path('tenants/<uuid:tenant_id>/send-statements-all/',
+         views.SendAllStatementsEmailView.as_view(), name='send-statements-all'),
 ]
@@ -8,6 +8,7 @@ import threading
 from decimal import Decimal
 from django.db.models import Sum, Count, Q, F  # noqa: F401 - Q used in estado cuenta
 from django.conf import settings
+from django.core.files.storage import default_storage
 from django.http import HttpResponse
 from datetime import timedelta
 from django.utils import timezone
@@ -28,10 +29,11 @@ from .models import (
     SubscriptionPayment,
     CRMContact, CRMOpportunity, CRMActivity,
     CRMCampaign, CRMCampaignContact, CRMTicket,
-    SystemRole,
+    SystemRole, UnitPeriodLedger, AdditionalPaymentAllocation, AdeudoAllocation, AdelantoCredit, ReportJob,
+    StatementDelivery,
 )
 from .email_service import (
-    send_verification_email, send_notification_email, CODE_EXPIRY_MINUTES,
+    send_verification_email, CODE_EXPIRY_MINUTES,
     send_payment_plan_email, send_trial_welcome_email, send_trial_approved_email,
     send_trial_rejected_email,
 )
@@ -42,7 +44,7 @@ from .serializers import (
     UnitSerializer, UnitListSerializer, ExtraFieldSerializer,
     PaymentSerializer, PaymentListSerializer, PaymentCaptureSerializer, AddAdditionalPaymentSerializer, FieldPaymentSerializer,
     GastoEntrySerializer, GastoListSerializer, CajaChicaEntrySerializer, CajaChicaListSerializer,
-    BankStatementSerializer, ClosedPeriodSerializer, ReopenRequestSerializer,
+    BankStatementSerializer, BankStatementListSerializer, ClosedPeriodSerializer, ReopenRequestSerializer,
     PeriodClosureRequestSerializer,
     AssemblyPositionSerializer, CommitteeSerializer, UnrecognizedIncomeSerializer,
     DashboardSerializer, AmenityReservationSerializer, CondominioRequestSerializer,
@@ -52,8 +54,16 @@ from .serializers import (
     CRMContactSerializer, CRMOpportunitySerializer, CRMActivitySerializer,
     CRMCampaignSerializer, CRMCampaignContactSerializer, CRMTicketSerializer,
     SystemUserSerializer, SystemUserCreateSerializer,
-    SystemRoleSerializer,
+    SystemRoleSerializer, ReportJobSerializer, StatementDeliverySerializer,
 )
+from . import base64_files, income_rollup, membership, pdf_pool, receipt_cache, statement_sql, uploads
+from .assets import pdf_style, tenant_logo
+from .pagination import KeysetOrPageNumberPagination, KeysetPagination, approximate_count
+from .audit import audit_buffer
+from .email_queue import queue_notification_emails
+from .exemptions import ExemptionCalendar
+from .jobs import enqueue_job
+from .result_cache import cached_tenant_result
 from .permissions import IsSuperAdmin, IsTenantAdmin, IsTenantMember, IsAdminOrTesorero, IsAdminOrTesOrAuditor, CanApproveReservation
 
 
@@ -107,7 +117,7 @@ def _role_has_module(module_perms, role, module_key):
 def _notify_roles(tenant_id, roles, notif_type, title, message='', **extra_fields):
     """Create notifications for every TenantUser whose role is in *roles*,
     respecting the tenant's per-role module-permission configuration.
-    Also sends a branded alert email to each recipient in a background thread."""
+    Also queues a branded alert email for each recipient (OutboundEmail)."""
     required_module = _NOTIF_MODULE_MAP.get(notif_type)
     try:
         tenant = Tenant.objects.get(id=tenant_id)
@@ -134,24 +144,13 @@ def _notify_roles(tenant_id, roles, notif_type, title, message='', **extra_field
     if notifs:
         Notification.objects.bulk_create(notifs)
     if recipients:
-        tenant_name = tenant.name
-        def _send_all():
-            for email, user_name in recipients:
-                send_notification_email(
-                    email=email,
-                    user_name=user_name,
-                    notif_type=notif_type,
-                    title=title,
-                    message=message,
-                    tenant_name=tenant_name,
-                )
-        threading.Thread(target=_send_all, daemon=True).start()
+        queue_notification_emails(tenant, recipients, notif_type, title, message)
 
 
 def _notify_unit_residents(tenant_id, unit_id, notif_type, title, message='', **extra_fields):
     """Create notifications for all vecinos assigned to *unit_id*,
     respecting tenant module permissions.
-    Also sends a branded alert email to each resident in a background thread."""
+    Also queues a branded alert email for each resident (OutboundEmail)."""
     if not unit_id:
         return
     required_module = _NOTIF_MODULE_MAP.get(notif_type)
@@ -182,18 +181,7 @@ def _notify_unit_residents(tenant_id, unit_id, notif_type, title, message='', **
     if notifs:
         Notification.objects.bulk_create(notifs)
     if recipients:
-        tenant_name = tenant.name
-        def _send_all():
-            for email, user_name in recipients:
-                send_notification_email(
-                    email=email,
-                    user_name=user_name,
-                    notif_type=notif_type,
-                    title=title,
-                    message=message,
-                    tenant_name=tenant_name,
-                )
-        threading.Thread(target=_send_all, daemon=True).start()
+        queue_notification_emails(tenant, recipients, notif_type, title, message)
 
 
 # ═══════════════════════════════════════════════════════════
@@ -211,61 +199,37 @@ def _get_client_ip(request):
 def _audit_log(request, module, action, description,
                tenant_id=None, object_type='', object_id='',
                object_repr='', extra_data=None):
-    """Registra un AuditLog en un hilo de fondo (daemon) para no añadir latencia
-    al response del usuario. Todos los datos del request se extraen en el hilo
-    principal antes de hacer spawn, ya que el objeto request no es thread-safe.
+    """Registra un AuditLog sin añadir latencia al response del usuario: el
+    registro se agrega al buffer del proceso (core/audit.py), que lo escribe
+    por lotes con bulk_create. Los datos del request se extraen aquí porque
+    el objeto request no sobrevive al response.
     El bloque try/except garantiza que nunca interrumpa el flujo principal."""
-
-    # ── Extraer datos del request en el hilo principal ──────────────────────
-    user           = getattr(request, 'user', None)
-    ip             = _get_client_ip(request)
-    is_authed      = bool(user and getattr(user, 'is_authenticated', False))
-    user_pk        = user.pk        if is_authed else None
-    user_name      = (getattr(user, 'name', '') or getattr(user, 'email', '')) if is_authed else ''
-    user_email     = getattr(user, 'email', '')  if is_authed else ''
-    is_super_admin = getattr(user, 'is_super_admin', False) if is_authed else False
-
-    def _run():
-        try:
-            # Resolver tenant snapshot
-            tenant_obj  = None
-            tenant_name = ''
-            if tenant_id:
-                try:
-                    tenant_obj  = Tenant.objects.get(id=tenant_id)
-                    tenant_name = tenant_obj.name
-                except Tenant.DoesNotExist:
-                    pass
-
-            # Resolver rol del usuario en el tenant
-            user_role = ''
-            if is_authed:
-                if tenant_id:
-                    tu = TenantUser.objects.filter(tenant_id=tenant_id, user_id=user_pk).first()
-                    user_role = tu.role if tu else ('superadmin' if is_super_admin else '')
-                elif is_super_admin:
-                    user_role = 'superadmin'
-
-            AuditLog.objects.create(
-                tenant      = tenant_obj,
-                tenant_name = tenant_name,
-                user_id     = user_pk,
-                user_name   = user_name,
-                user_email  = user_email,
-                user_role   = user_role,
-                module      = module,
-                action      = action,
-                description = description,
-                object_type = object_type,
-                object_id   = str(object_id) if object_id else '',
-                object_repr = object_repr or '',
-                ip_address  = ip,
-                extra_data  = extra_data or {},
-            )
-        except Exception:
-            pass  # los audit logs nunca deben cortar el flujo principal
-
-    threading.Thread(target=_run, daemon=True).start()
+    try:
+        user           = getattr(request, 'user', None)
+        is_authed      = bool(user and getattr(user, 'is_authenticated', False))
+        entry = {
+            'tenant_id':      str(tenant_id) if tenant_id else None,
+            'user_id':        str(user.pk) if is_authed else None,
+            'user_name':      (getattr(user, 'name', '') or getattr(user, 'email', '')) if is_authed else '',
+            'user_email':     getattr(user, 'email', '') if is_authed else '',
+            'is_super_admin': getattr(user, 'is_super_admin', False) if is_authed else False,
+            'module':         module,
+            'action':         action,
+            'description':    description,
+            'object_type':    object_type,
+            'object_id':      str(object_id) if object_id else '',
+            'object_repr':    object_repr or '',
+            'ip_address':     _get_client_ip(request),
+            'extra_data':     extra_data or {},
+        }
+        if tenant_id and is_authed:
+            # Rol ya resuelto por los permisos de este request: el buffer no lo vuelve a consultar
+            resolved, member = membership.for_request(request).peek(tenant_id)
+            if resolved:
+                entry['tenant_role'] = member.role if member else None
+        audit_buffer.add(entry)
+    except Exception:
+        pass  # los audit logs nunca deben cortar el flujo principal
 
 
 # ═══════════════════════════════════════════════════════════
@@ -610,6 +574,22 @@ class ProtectedMediaView(APIView):
             return resp
 
 
+def _protected_file_response(name, filename, content_type):
+    """
+    Descarga de un archivo de default_storage ya autorizado por la vista:
+    en desarrollo se sirve directo, en producción vía X-Accel-Redirect
+    (igual que ProtectedMediaView).
+    """
+    if settings.DEBUG:
+        with default_storage.open(name, 'rb') as f:
+            resp = HttpResponse(f.read(), content_type=content_type)
+    else:
+        resp = HttpResponse(content_type=content_type)
+        resp['X-Accel-Redirect'] = f'/protected-media/{name}'
+    resp['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return resp
+
+
 class TenantListForLoginView(APIView):
     """GET /api/auth/tenants/ — List tenants for login dropdown (legacy)"""
     permission_classes = [permissions.AllowAny]
@@ -867,7 +847,7 @@ class TenantViewSet(viewsets.ModelViewSet):
         tenant = self.get_object()
         # Extra guard: non-superadmin must be a member of this tenant
         if not request.user.is_super_admin:
-            if not TenantUser.objects.filter(user=request.user, tenant=tenant).exists():
+            if membership.for_request(request).get(tenant.id) is None:
                 return Response({'detail': 'No tienes acceso a este condominio.'}, status=403)
         try:
             sub = tenant.subscription
@@ -885,7 +865,7 @@ class TenantViewSet(viewsets.ModelViewSet):
         tenant = self.get_object()
         # Non-superadmin must be a member of this tenant
         if not request.user.is_super_admin:
-            if not TenantUser.objects.filter(user=request.user, tenant=tenant).exists():
+            if membership.for_request(request).get(tenant.id) is None:
                 return Response({'detail': 'No tienes acceso a este condominio.'}, status=403)
         try:
             sub = tenant.subscription
@@ -1055,13 +1035,13 @@ class UnitViewSet(viewsets.ModelViewSet):
     def evidence(self, request, tenant_id=None, pk=None):
         """GET /api/tenants/{tenant_id}/units/{pk}/evidence/ — devuelve solo el Base64 PDF de adeudo previo."""
         unit = self.get_object()
-        return Response({'evidence': unit.previous_debt_evidence or ''})
+        return Response({'evidence': base64_files.read(unit, 'previous_debt_evidence')})
 
     @action(detail=True, methods=['get'], url_path='credit-evidence')
     def credit_evidence(self, request, tenant_id=None, pk=None):
         """GET /api/tenants/{tenant_id}/units/{pk}/credit-evidence/ — devuelve Base64 PDF de saldo a favor previo."""
         unit = self.get_object()
-        return Response({'evidence': unit.credit_balance_evidence or ''})
+        return Response({'evidence': base64_files.read(unit, 'credit_balance_evidence')})
 
     @action(detail=False, methods=['patch'], url_path='update-my-info')
     def update_my_info(self, request, tenant_id=None):
@@ -1373,6 +1353,12 @@ class ExtraFieldViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(tenant_id=self.kwargs['tenant_id'])
 
+    def perform_update(self, serializer):
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        instance.delete()
+
 
 # ═══════════════════════════════════════════════════════════
 #  PAYMENTS (Cobranza)
@@ -1437,10 +1423,29 @@ def _compute_payment_status(payment, tenant, extra_fields, plan_charge=Decimal('
     return 'pendiente'
 
 
+def _receive_upload(request, allowed, max_files=1):
+    """uploads.receive() → ([(UploadedFile, ext)], None) o (None, Response de error)."""
+    try:
+        return uploads.receive(request, allowed, max_files), None
+    except uploads.UploadError as e:
+        return None, Response({'detail': e.detail}, status=e.status_code)
+
+
+def _save_upload(instance, legacy_field, files):
+    """Guarda una subida multipart en el FileField de *legacy_field* (y updated_at si existe)."""
+    from django.db import transaction
+    fields = base64_files.write_upload(instance, legacy_field, files)
+    if any(f.name == 'updated_at' for f in instance._meta.concrete_fields):
+        fields.append('updated_at')
+    with transaction.atomic():
+        instance.save(update_fields=fields)
+
+
 class PaymentViewSet(viewsets.ModelViewSet):
     """CRUD /api/tenants/{tenant_id}/payments/"""
     serializer_class = PaymentSerializer
     permission_classes = [IsTenantMember]
+    pagination_class = KeysetOrPageNumberPagination
 
     def get_serializer_class(self):
         """Usa el serializer ligero (sin Base64) para el listado.
@@ -1449,32 +1454,36 @@ class PaymentViewSet(viewsets.ModelViewSet):
             return PaymentListSerializer
         return PaymentSerializer
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'list':
+            # Un solo calendario de exenciones para todo el listado
+            tenant = Tenant.objects.filter(id=self.kwargs['tenant_id']).first()
+            context['exemptions'] = ExemptionCalendar.for_tenant(tenant)
+        return context
+
     def get_queryset(self):
-        qs = Payment.objects.filter(
+        qs = Payment.objects.lean().filter(
             tenant_id=self.kwargs['tenant_id']
-        ).select_related('unit').prefetch_related('field_payments')
+        ).select_related('unit', 'applied_to_unit').prefetch_related('field_payments')
 
         # M-01: Restricción IDOR — vecino solo ve pagos de su propia unidad.
         # Se aplica antes de cualquier filtro de query params para evitar bypass.
         if not self.request.user.is_super_admin:
-            try:
-                tu = TenantUser.objects.get(
-                    user=self.request.user,
-                    tenant_id=self.kwargs['tenant_id'],
-                )
-                if tu.role == 'vecino':
-                    if tu.unit_id:
-                        qs = qs.filter(unit_id=tu.unit_id)
-                    else:
-                        return Payment.objects.none()
-                    # Para vecino: solo se aplica filtro de período; no se permite
-                    # sobreescribir unit_id desde query params (evita bypass del IDOR).
-                    period = self.request.query_params.get('period')
-                    if period:
-                        qs = qs.filter(period=period)
-                    return qs
-            except TenantUser.DoesNotExist:
+            tu = membership.for_request(self.request).get(self.kwargs['tenant_id'])
+            if tu is None:
                 return Payment.objects.none()
+            if tu.role == 'vecino':
+                if tu.unit_id:
+                    qs = qs.filter(unit_id=tu.unit_id)
+                else:
+                    return Payment.objects.none()
+                # Para vecino: solo se aplica filtro de período; no se permite
+                # sobreescribir unit_id desde query params (evita bypass del IDOR).
+                period = self.request.query_params.get('period')
+                if period:
+                    qs = qs.filter(period=period)
+                return qs
 
         period = self.request.query_params.get('period')
         if period:
@@ -1486,6 +1495,16 @@ class PaymentViewSet(viewsets.ModelViewSet):
 
         return qs
 
+    @action(detail=False, methods=['get'], url_path='exempt-units')
+    def exempt_units(self, request, tenant_id=None):
+        """GET /api/tenants/{tenant_id}/payments/exempt-units/?period=YYYY-MM
+           Unidades exentas de mantenimiento en el período (core/exemptions.py),
+           con el mismo cálculo que el estado de cuenta y los recibos."""
+        period = request.query_params.get('period') or _today_period()
+        tenant = Tenant.objects.get(id=tenant_id)
+        unit_ids = ExemptionCalendar.for_tenant(tenant).exempt_unit_ids(period)
+        return Response({'period': period, 'unit_ids': sorted(unit_ids)})
+
     @action(detail=False, methods=['post'], url_path='capture')
     def capture_payment(self, request, tenant_id=None):
         """POST /api/tenants/{tenant_id}/payments/capture/"""
@@ -1512,75 +1531,82 @@ class PaymentViewSet(viewsets.ModelViewSet):
             if str(applied_to_unit_id) == str(data['unit_id']):
                 applied_to_unit_id = None  # misma unidad = sin redirección
 
-        # Create or update payment
-        payment, created = Payment.objects.update_or_create(
-            tenant_id=tenant_id,
-            unit_id=data['unit_id'],
-            period=data['period'],
-            defaults={
-                'payment_type': data['payment_type'],
-                'payment_date': data.get('payment_date'),
-                'notes': data.get('notes', ''),
-                'folio': data.get('folio', ''),
-                'evidence': json.dumps(data.get('evidence', [])),
-                'bank_reconciled': data.get('bank_reconciled', False),
-                'adeudo_payments': data.get('adeudo_payments', {}),
-                'applied_to_unit_id': applied_to_unit_id,
-            }
-        )
-
-        # Process field payments
-        field_payments_data = data.get('field_payments', {})
-        for field_key, fp_data in field_payments_data.items():
-            FieldPayment.objects.update_or_create(
-                payment=payment,
-                field_key=field_key,
+        from django.db import transaction
+        # Create or update payment. Pago, campos, estatus y cuotas del plan en
+        # una transacción: el ledger de la unidad se recalcula una vez al
+        # confirmarla (core/unit_ledger.py)
+        with transaction.atomic():
+            payment, created = Payment.objects.update_or_create(
+                tenant_id=tenant_id,
+                unit_id=data['unit_id'],
+                period=data['period'],
                 defaults={
-                    'received': Decimal(str(fp_data.get('received', 0))),
-                    'target_unit_id': fp_data.get('targetUnitId'),
-                    'adelanto_targets': fp_data.get('adelantoTargets', {}),
+                    'payment_type': data['payment_type'],
+                    'payment_date': data.get('payment_date'),
+                    'notes': data.get('notes', ''),
+                    'folio': data.get('folio', ''),
+                    'bank_reconciled': data.get('bank_reconciled', False),
+                    'adeudo_payments': data.get('adeudo_payments', {}),
+                    'applied_to_unit_id': applied_to_unit_id,
                 }
             )
 
-        # Auto-compute status (main + additional_payments + active plan installment)
-        extra_fields = ExtraField.objects.filter(
-            tenant_id=tenant_id, enabled=True, required=True
-        )
-        payment.refresh_from_db()
-
-        # Check if this unit has an active payment plan with an installment due this period
-        plan_charge = Decimal('0')
-        plan_key = ''
-        active_plan = None
-        try:
-            active_plan = PaymentPlan.objects.filter(
-                tenant_id=tenant_id,
-                unit_id=data['unit_id'],
-                status='accepted',
-            ).first()
-            if active_plan:
-                period_str = data['period']
-                for inst in (active_plan.installments or []):
-                    if inst.get('period_key') == period_str:
-                        plan_charge = Decimal(str(inst.get('debt_part', 0)))
-                        plan_key = active_plan.field_key
-                        break
-        except Exception:
-            pass
+            # Process field payments
+            field_payments_data = data.get('field_payments', {})
+            for field_key, fp_data in field_payments_data.items():
+                FieldPayment.objects.update_or_create(
+                    payment=payment,
+                    field_key=field_key,
+                    defaults={
+                        'received': Decimal(str(fp_data.get('received', 0))),
+                        'target_unit_id': fp_data.get('targetUnitId'),
+                        'adelanto_targets': fp_data.get('adelantoTargets', {}),
+                    }
+                )
 
-        payment.status = _compute_payment_status(
-            payment, tenant, list(extra_fields),
-            plan_charge=plan_charge, plan_key=plan_key,
-        )
-        payment.save()
+            # Auto-compute status (main + additional_payments + active plan installment)
+            extra_fields = ExtraField.objects.filter(
+                tenant_id=tenant_id, enabled=True, required=True
+            )
+            payment.refresh_from_db()
 
-        # Update plan installment statuses after payment capture
-        if active_plan:
+            # Check if this unit has an active payment plan with an installment due this period
+            plan_charge = Decimal('0')
+            plan_key = ''
+            active_plan = None
             try:
-                _update_plan_installments(active_plan)
+                active_plan = PaymentPlan.objects.filter(
+                    tenant_id=tenant_id,
+                    unit_id=data['unit_id'],
+                    status='accepted',
+                ).first()
+                if active_plan:
+                    period_str = data['period']
+                    for inst in (active_plan.installments or []):
+                        if inst.get('period_key') == period_str:
+                            plan_charge = Decimal(str(inst.get('debt_part', 0)))
+                            plan_key = active_plan.field_key
+                            break
             except Exception:
                 pass
 
+            payment.status = _compute_payment_status(
+                payment, tenant, list(extra_fields),
+                plan_charge=plan_charge, plan_key=plan_key,
+            )
+            # Evidencias en archivo (core/base64_files.py), no en la columna Base64
+            evidence = data.get('evidence') or []
+            base64_files.write(payment, 'evidence', json.dumps(evidence) if evidence else '')
+            payment.save()
+
+            # Update plan installment statuses after payment capture
+            if active_plan:
+                try:
+                    with transaction.atomic():
+                        _update_plan_installments(active_plan)
+                except Exception:
+                    pass
+
         # ── Notify vecinos of the unit ──────────────────────────
         try:
             unit_obj = payment.unit
@@ -1612,9 +1638,30 @@ class PaymentViewSet(viewsets.ModelViewSet):
             status=status.HTTP_200_OK if not created else status.HTTP_201_CREATED
         )
 
+    @action(detail=True, methods=['post'], url_path='evidence', permission_classes=[IsAdminOrTesorero])
+    def upload_evidence(self, request, tenant_id=None, pk=None):
+        """POST /api/tenants/{tenant_id}/payments/{pk}/evidence/ — multipart, uno o varios `file`.
+        Reemplaza los comprobantes del pago sin mandarlos en Base64 dentro del JSON."""
+        payment = self.get_object()
+        if ClosedPeriod.objects.filter(tenant_id=tenant_id, period=payment.period).exists():
+            return Response({'detail': 'El periodo está cerrado.'}, status=status.HTTP_400_BAD_REQUEST)
+        files, error = _receive_upload(request, uploads.EVIDENCE_TYPES, settings.UPLOAD_MAX_FILES)
+        if error:
+            return error
+        _save_upload(payment, 'evidence', files)
+        _audit_log(
+            request, 'cobranza', 'update',
+            f'Comprobantes de pago actualizados: unidad {payment.unit.unit_id_code}, período {payment.period}',
+            tenant_id=tenant_id,
+            object_type='Payment', object_id=str(payment.id),
+            object_repr=f'{payment.unit.unit_id_code} / {payment.period}',
+        )
+        return Response(PaymentSerializer(payment).data)
+
     @action(detail=True, methods=['post'], url_path='add-additional')
     def add_additional(self, request, tenant_id=None, pk=None):
         """POST /api/tenants/{tenant_id}/payments/{id}/add-additional/"""
+        from django.db import transaction
         payment = self.get_object()
         if payment.tenant_id != tenant_id:
             return Response({'detail': 'No encontrado.'}, status=status.HTTP_404_NOT_FOUND)
@@ -1687,14 +1734,15 @@ class PaymentViewSet(viewsets.ModelViewSet):
             payment, tenant, list(extra_fields),
             plan_charge=_add_plan_charge, plan_key=_add_plan_key,
         )
-        payment.save()
-
-        # Sync plan installments if there is an active plan for this unit
-        try:
-            if _add_active_plan:
-                _update_plan_installments(_add_active_plan)
-        except Exception:
-            pass
+        with transaction.atomic():
+            payment.save()
+            # Sync plan installments if there is an active plan for this unit
+            try:
+                if _add_active_plan:
+                    with transaction.atomic():
+                        _update_plan_installments(_add_active_plan)
+            except Exception:
+                pass
 
         return Response(PaymentSerializer(payment).data, status=status.HTTP_200_OK)
 
@@ -1725,15 +1773,18 @@ class PaymentViewSet(viewsets.ModelViewSet):
         except Exception:
             pass
 
-        payment.field_payments.all().delete()
-        payment.delete()
+        from django.db import transaction
+        with transaction.atomic():
+            payment.field_payments.all().delete()
+            payment.delete()
 
-        # Sync plan installments after payment deletion
-        if active_plan_for_sync:
-            try:
-                _update_plan_installments(active_plan_for_sync)
-            except Exception:
-                pass
+            # Sync plan installments after payment deletion
+            if active_plan_for_sync:
+                try:
+                    with transaction.atomic():
+                        _update_plan_installments(active_plan_for_sync)
+                except Exception:
+                    pass
 
         # Notify vecinos after deletion
         if unit_id_str:
@@ -1757,6 +1808,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['delete'], url_path='delete-additional/(?P<additional_id>[^/.]+)')
     def delete_additional(self, request, tenant_id=None, pk=None, additional_id=None):
         """DELETE /api/tenants/{tenant_id}/payments/{id}/delete-additional/{additional_id}/"""
+        from django.db import transaction
         payment = self.get_object()
         if payment.tenant_id != tenant_id:
             return Response({'detail': 'No encontrado.'}, status=status.HTTP_404_NOT_FOUND)
@@ -1789,18 +1841,21 @@ class PaymentViewSet(viewsets.ModelViewSet):
             payment, tenant, list(extra_fields),
             plan_charge=_del_plan_charge, plan_key=_del_plan_key,
         )
-        payment.save()
-        # Sync plan installments
-        try:
-            if _del_active_plan:
-                _update_plan_installments(_del_active_plan)
-        except Exception:
-            pass
+        with transaction.atomic():
+            payment.save()
+            # Sync plan installments
+            try:
+                if _del_active_plan:
+                    with transaction.atomic():
+                        _update_plan_installments(_del_active_plan)
+            except Exception:
+                pass
         return Response(PaymentSerializer(payment).data, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['patch'], url_path='update-additional/(?P<additional_id>[^/.]+)')
     def update_additional(self, request, tenant_id=None, pk=None, additional_id=None):
         """PATCH /api/tenants/{tenant_id}/payments/{id}/update-additional/{additional_id}/"""
+        from django.db import transaction
         payment = self.get_object()
         if payment.tenant_id != tenant_id:
             return Response({'detail': 'No encontrado.'}, status=status.HTTP_404_NOT_FOUND)
@@ -1850,13 +1905,15 @@ class PaymentViewSet(viewsets.ModelViewSet):
             payment, tenant, list(extra_fields),
             plan_charge=_upd_plan_charge, plan_key=_upd_plan_key,
         )
-        payment.save()
-        # Sync plan installments
-        try:
-            if _upd_active_plan:
-                _update_plan_installments(_upd_active_plan)
-        except Exception:
-            pass
+        with transaction.atomic():
+            payment.save()
+            # Sync plan installments
+            try:
+                if _upd_active_plan:
+                    with transaction.atomic():
+                        _update_plan_installments(_upd_active_plan)
+            except Exception:
+                pass
         return Response(PaymentSerializer(payment).data, status=status.HTTP_200_OK)
 
     def _check_payment_period_open(self, payment):
@@ -1889,28 +1946,67 @@ class PaymentViewSet(viewsets.ModelViewSet):
         unit = payment.unit
 
         # Vecino authorization: only their own unit
-        tu = TenantUser.objects.filter(tenant_id=tenant_id, user=request.user).first()
-        if tu and tu.role == 'vecino' and str(tu.unit_id) != str(unit.id):
+        tu = membership.for_request(request).get(tenant_id)
+        if tu and tu.role == 'vecino' and tu.unit_id != str(unit.id):
             return Response({'detail': 'No autorizado.'}, status=status.HTTP_403_FORBIDDEN)
 
         tenant = Tenant.objects.get(id=tenant_id)
-        extra_fields = list(ExtraField.objects.filter(tenant_id=tenant_id, enabled=True))
+        if _wants_async(request):
+            return _submit_report_job(request, tenant, 'receipt_pdf', {'payment_id': str(payment.id)})
 
-        receipt_data = _compute_receipt_email_data(payment, unit, tenant, extra_fields)
-
-        pdf_bytes = _generate_receipt_pdf(tenant, unit, payment, receipt_data)
-        if pdf_bytes is None:
+        name = _ensure_receipt_pdf(tenant, payment)
+        if name is None:
             return Response(
                 {'detail': 'No se pudo generar el PDF. Verifica que reportlab esté instalado.'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+        return _protected_file_response(name, _receipt_pdf_filename(payment), 'application/pdf')
+
+    @action(detail=False, methods=['get'], url_path='receipts-batch',
+            permission_classes=[IsAdminOrTesOrAuditor])
+    def receipts_batch(self, request, tenant_id=None):
+        """GET /api/tenants/{tenant_id}/payments/receipts-batch/?period=YYYY-MM&output=zip|pdf
+           Recibos de todos los pagos del período (impresión de fin de mes):
+           output=zip (default) un PDF por pago, output=pdf un solo PDF con una
+           página por recibo. Con ?async=1 se encola un ReportJob."""
+        import re
+        period = request.query_params.get('period', '')
+        if not re.fullmatch(r'\d{4}-\d{2}', period):
+            return Response({'detail': 'El parámetro period (YYYY-MM) es requerido.'}, status=status.HTTP_400_BAD_REQUEST)
+        output = request.query_params.get('output', 'zip')
+        if output not in ('zip', 'pdf'):
+            return Response({'detail': 'output debe ser zip o pdf.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            import reportlab  # noqa: F401
+        except ImportError:
+            return Response(
+                {'error': 'reportlab no instalado. Ejecuta: docker-compose up -d --build backend'},
+                status=503
+            )
 
-        period_safe = payment.period.replace('-', '')
-        unit_safe = ''.join(c if c.isalnum() or c in '-_' else '_' for c in (unit.unit_id_code or 'unidad'))
-        filename = f'recibo_{unit_safe}_{period_safe}.pdf'
+        tenant = Tenant.objects.get(id=tenant_id)
+        if not Payment.objects.filter(tenant_id=tenant_id, period=period).exists():
+            return Response({'detail': 'No hay pagos registrados en el período.'}, status=status.HTTP_404_NOT_FOUND)
+
+        if _wants_async(request):
+            return _submit_report_job(request, tenant, 'receipts_batch', {'period': period, 'output': output})
+
+        if output == 'pdf':
+            # Archivo temporal enviado por bloques, igual que estado-cuenta-pdf
+            import tempfile
+            from django.http import FileResponse
+            pdf_file = tempfile.TemporaryFile()
+            _write_period_receipts_pdf(tenant, period, pdf_file)
+            pdf_file.seek(0)
+            return FileResponse(
+                pdf_file, as_attachment=True,
+                filename=_period_receipts_filename(tenant, period, 'pdf'), content_type='application/pdf',
+            )
 
-        response = HttpResponse(pdf_bytes, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        from django.http import StreamingHttpResponse
+        response = StreamingHttpResponse(_iter_period_receipts_zip(tenant, period), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="{_period_receipts_filename(tenant, period, "zip")}"'
         return response
 
     @action(detail=True, methods=['post'], url_path='send-receipt')
@@ -1943,10 +2039,12 @@ class PaymentViewSet(viewsets.ModelViewSet):
         tenant = Tenant.objects.get(id=tenant_id)
         extra_fields = list(ExtraField.objects.filter(tenant_id=tenant_id, enabled=True))
 
-        receipt_data = _compute_receipt_email_data(payment, unit, tenant, extra_fields)
+        exemptions = ExemptionCalendar.for_tenant(tenant, units=[unit])
+        receipt_data = _compute_receipt_email_data(payment, unit, tenant, extra_fields, exemptions=exemptions)
 
-        # Generate PDF attachment
-        pdf_bytes = _generate_receipt_pdf(tenant, unit, payment, receipt_data)
+        # PDF adjunto: el guardado si el pago no cambió desde la última vez
+        pdf_name = _ensure_receipt_pdf(tenant, payment, extra_fields, receipt_data, exemptions)
+        pdf_bytes = receipt_cache.read(pdf_name) if pdf_name else None
         folio_label = receipt_data.get('folio') or str(payment.id)[:8].upper()
         period_label = (payment.period or '').replace('-', '')   # e.g. "202501"
         unit_label = ''.join(c if c.isalnum() or c in '-_' else '_' for c in (unit.unit_id_code or 'unidad'))
@@ -1981,7 +2079,7 @@ class GastoEntryViewSet(viewsets.ModelViewSet):
         return GastoEntrySerializer
 
     def get_queryset(self):
-        qs = GastoEntry.objects.filter(
+        qs = GastoEntry.objects.lean().filter(
             tenant_id=self.kwargs['tenant_id']
         ).select_related('field')
 
@@ -2019,6 +2117,26 @@ class GastoEntryViewSet(viewsets.ModelViewSet):
             object_repr=f'{instance.field.label if instance.field else ""} / {instance.period}',
         )
 
+    @action(detail=True, methods=['post'], url_path='evidence')
+    def upload_evidence(self, request, tenant_id=None, pk=None):
+        """POST /api/tenants/{tenant_id}/gasto-entries/{pk}/evidence/ — multipart, uno o varios `file`.
+        Reemplaza las evidencias del gasto sin mandarlas en Base64 dentro del JSON."""
+        gasto = self.get_object()
+        self._check_gasto_period_open(gasto.period)
+        files, error = _receive_upload(request, uploads.EVIDENCE_TYPES, settings.UPLOAD_MAX_FILES)
+        if error:
+            return error
+        _save_upload(gasto, 'evidence', files)
+        label = gasto.field.label if gasto.field else ''
+        _audit_log(
+            request, 'gastos', 'update',
+            f'Evidencias de gasto actualizadas: {label} — período {gasto.period}',
+            tenant_id=tenant_id,
+            object_type='GastoEntry', object_id=str(gasto.id),
+            object_repr=f'{label} / {gasto.period}',
+        )
+        return Response(GastoEntrySerializer(gasto).data)
+
     def perform_destroy(self, instance):
         self._check_gasto_period_open(instance.period)
         desc = f'{instance.field.label if instance.field else ""} / {instance.period}'
@@ -2050,7 +2168,7 @@ class CajaChicaViewSet(viewsets.ModelViewSet):
         return CajaChicaEntrySerializer
 
     def get_queryset(self):
-        qs = CajaChicaEntry.objects.filter(tenant_id=self.kwargs['tenant_id'])
+        qs = CajaChicaEntry.objects.lean().filter(tenant_id=self.kwargs['tenant_id'])
         period = self.request.query_params.get('period')
         if period:
             qs = qs.filter(period=period)
@@ -2085,6 +2203,25 @@ class CajaChicaViewSet(viewsets.ModelViewSet):
             object_repr=f'CajaChica / {instance.period}',
         )
 
+    @action(detail=True, methods=['post'], url_path='evidence')
+    def upload_evidence(self, request, tenant_id=None, pk=None):
+        """POST /api/tenants/{tenant_id}/caja-chica/{pk}/evidence/ — multipart, uno o varios `file`.
+        Reemplaza las evidencias del movimiento sin mandarlas en Base64 dentro del JSON."""
+        entry = self.get_object()
+        self._check_caja_period_open(entry.period)
+        files, error = _receive_upload(request, uploads.EVIDENCE_TYPES, settings.UPLOAD_MAX_FILES)
+        if error:
+            return error
+        _save_upload(entry, 'evidence', files)
+        _audit_log(
+            request, 'gastos', 'update',
+            f'Evidencias de caja chica actualizadas — período {entry.period}',
+            tenant_id=tenant_id,
+            object_type='CajaChicaEntry', object_id=str(entry.id),
+            object_repr=f'CajaChica / {entry.period}',
+        )
+        return Response(CajaChicaEntrySerializer(entry).data)
+
     def perform_destroy(self, instance):
         self._check_caja_period_open(instance.period)
         desc = f'CajaChica / {instance.period}'
@@ -2108,8 +2245,15 @@ class BankStatementViewSet(viewsets.ModelViewSet):
     serializer_class = BankStatementSerializer
     permission_classes = [IsAdminOrTesorero]
 
+    def get_serializer_class(self):
+        """Usa el serializer ligero (sin el PDF) para el listado.
+        El retrieve/create devuelve el serializer completo con file_data."""
+        if self.action == 'list':
+            return BankStatementListSerializer
+        return BankStatementSerializer
+
     def get_queryset(self):
-        return BankStatement.objects.filter(tenant_id=self.kwargs['tenant_id'])
+        return BankStatement.objects.lean().filter(tenant_id=self.kwargs['tenant_id']).order_by('period')
 
     def perform_create(self, serializer):
         serializer.save(tenant_id=self.kwargs['tenant_id'])
@@ -2117,17 +2261,47 @@ class BankStatementViewSet(viewsets.ModelViewSet):
     def create(self, request, *args, **kwargs):
         """Upsert: if a statement already exists for this period, replace it."""
         period = request.data.get('period')
+        from django.db import transaction
         file_data = request.data.get('file_data')
         tenant_id = self.kwargs['tenant_id']
-        obj, created = BankStatement.objects.update_or_create(
-            tenant_id=tenant_id,
-            period=period,
-            defaults={'file_data': file_data},
-        )
+        try:
+            base64_files.decode(file_data, 'base64')
+        except ValueError as e:
+            return Response({'file_data': [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+        # El PDF va a statement_file (core/base64_files.py); file_data queda vacío
+        with transaction.atomic():
+            obj, created = BankStatement.objects.select_for_update().get_or_create(
+                tenant_id=tenant_id,
+                period=period,
+                defaults={'file_data': ''},
+            )
+            obj.save(update_fields=base64_files.write(obj, 'file_data', file_data))
         serializer = self.get_serializer(obj)
         st = status.HTTP_201_CREATED if created else status.HTTP_200_OK
         return Response(serializer.data, status=st)
 
+    @action(detail=False, methods=['post'], url_path='upload')
+    def upload(self, request, tenant_id=None):
+        """POST /api/tenants/{tenant_id}/bank-statements/upload/ — multipart `period` + `file` (PDF).
+        Mismo upsert que create, sin mandar el PDF en Base64 dentro del JSON."""
+        import re
+        from django.db import transaction
+        files, error = _receive_upload(request, uploads.PDF_TYPES)
+        if error:
+            return error
+        period = request.data.get('period') or ''
+        if not re.fullmatch(r'\d{4}-\d{2}', period):
+            return Response({'period': ['Formato YYYY-MM requerido.']}, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            obj, created = BankStatement.objects.select_for_update().get_or_create(
+                tenant_id=tenant_id,
+                period=period,
+                defaults={'file_data': ''},
+            )
+            obj.save(update_fields=base64_files.write_upload(obj, 'file_data', files))
+        st = status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        return Response(BankStatementListSerializer(obj).data, status=st)
+
 
 # ═══════════════════════════════════════════════════════════
 #  PAYMENT PLANS
@@ -2190,7 +2364,6 @@ def _generate_payment_plan_pdf(plan, tenant):
         from reportlab.platypus import (
             SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, HRFlowable,
         )
-        from reportlab.lib.styles import ParagraphStyle
         from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
     except ImportError:
         return None
@@ -2220,15 +2393,15 @@ def _generate_payment_plan_pdf(plan, tenant):
     )
     W = A4[0] - 2 * margin
 
-    st_hdr_title = ParagraphStyle('HT', fontSize=13, fontName='Helvetica-Bold', textColor=COL_WHITE)
-    st_hdr_sub   = ParagraphStyle('HS', fontSize=10, fontName='Helvetica', textColor=colors.HexColor('#b2dcd8'))
-    st_hdr_right = ParagraphStyle('HR', fontSize=11, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)
-    st_lbl       = ParagraphStyle('LB', fontSize=8, fontName='Helvetica', textColor=COL_INK_LT)
-    st_val       = ParagraphStyle('VL', fontSize=9.5, fontName='Helvetica-Bold', textColor=COL_INK, leading=12)
-    st_col_hdr   = ParagraphStyle('CH', fontSize=8.5, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_CENTER)
-    st_cell      = ParagraphStyle('CE', fontSize=8.5, fontName='Helvetica', textColor=COL_INK)
-    st_cell_r    = ParagraphStyle('CR', fontSize=8.5, fontName='Helvetica', textColor=COL_INK, alignment=TA_RIGHT)
-    st_note      = ParagraphStyle('NT', fontSize=8, fontName='Helvetica-Oblique', textColor=COL_INK_LT)
+    st_hdr_title = pdf_style('HT', fontSize=13, fontName='Helvetica-Bold', textColor=COL_WHITE)
+    st_hdr_sub   = pdf_style('HS', fontSize=10, fontName='Helvetica', textColor=colors.HexColor('#b2dcd8'))
+    st_hdr_right = pdf_style('HR', fontSize=11, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)
+    st_lbl       = pdf_style('LB', fontSize=8, fontName='Helvetica', textColor=COL_INK_LT)
+    st_val       = pdf_style('VL', fontSize=9.5, fontName='Helvetica-Bold', textColor=COL_INK, leading=12)
+    st_col_hdr   = pdf_style('CH', fontSize=8.5, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_CENTER)
+    st_cell      = pdf_style('CE', fontSize=8.5, fontName='Helvetica', textColor=COL_INK)
+    st_cell_r    = pdf_style('CR', fontSize=8.5, fontName='Helvetica', textColor=COL_INK, alignment=TA_RIGHT)
+    st_note      = pdf_style('NT', fontSize=8, fontName='Helvetica-Oblique', textColor=COL_INK_LT)
 
     story = []
 
@@ -2245,20 +2418,13 @@ def _generate_payment_plan_pdf(plan, tenant):
             addr_parts.append(val)
     tenant_address = ', '.join(addr_parts) if addr_parts else ''
 
-    # Try to embed tenant logo (base64 stored in tenant.logo)
+    # Try to embed tenant logo (decodificado y reducido una vez por proceso)
     logo_image = None
-    logo_b64 = (getattr(tenant, 'logo', '') or '').strip()
-    if logo_b64:
+    logo_data = tenant_logo(tenant)
+    if logo_data:
         try:
-            import base64 as _b64
-            import io as _io2
-            # Strip data URL prefix if present
-            if ',' in logo_b64:
-                logo_b64 = logo_b64.split(',', 1)[1]
-            logo_data = _b64.b64decode(logo_b64)
             from reportlab.platypus import Image as RLImage
-            img_buf = _io2.BytesIO(logo_data)
-            logo_image = RLImage(img_buf, width=2.2 * cm, height=2.2 * cm)
+            logo_image = RLImage(_io.BytesIO(logo_data), width=2.2 * cm, height=2.2 * cm)
             logo_image.hAlign = 'LEFT'
         except Exception:
             logo_image = None
@@ -2303,7 +2469,7 @@ def _generate_payment_plan_pdf(plan, tenant):
     }
     status_label = status_label_map.get(plan.status, plan.status)
     badge_data = [[Paragraph(f'Estado: {status_label}',
-                             ParagraphStyle('BD', fontSize=9, fontName='Helvetica-Bold',
+                             pdf_style('BD', fontSize=9, fontName='Helvetica-Bold',
                                             textColor=COL_WHITE, alignment=TA_CENTER))]]
     badge_tbl = Table(badge_data, colWidths=[W])
     badge_tbl.setStyle(TableStyle([
@@ -2388,7 +2554,7 @@ def _generate_payment_plan_pdf(plan, tenant):
          Paragraph(f'${float(plan.maintenance_fee):,.2f}', st_val),
          Paragraph(interest_str, st_val),
          Paragraph(f'${float(plan.total_with_interest):,.2f}',
-                   ParagraphStyle('TV2', fontSize=10, fontName='Helvetica-Bold', textColor=COL_TEAL))],
+                   pdf_style('TV2', fontSize=10, fontName='Helvetica-Bold', textColor=COL_TEAL))],
     ]
     totals_tbl = Table(totals_data, colWidths=[W / 4, W / 4, W / 4, W / 4])
     totals_tbl.setStyle(TableStyle([
@@ -2427,7 +2593,7 @@ def _generate_payment_plan_pdf(plan, tenant):
             Paragraph(f"${float(inst.get('total', 0)):,.2f}", st_cell_r),
             Paragraph(f"${float(inst.get('paid_amount', 0)):,.2f}", st_cell_r),
             Paragraph(s_labels.get(s, s),
-                      ParagraphStyle('IS', fontSize=8, fontName='Helvetica-Bold', textColor=s_color)),
+                      pdf_style('IS', fontSize=8, fontName='Helvetica-Bold', textColor=s_color)),
         ])
 
     # Footer row — totals
@@ -2438,10 +2604,10 @@ def _generate_payment_plan_pdf(plan, tenant):
     inst_rows.append([
         Paragraph('', st_col_hdr),
         Paragraph('TOTALES', st_col_hdr),
-        Paragraph(f'${total_debt_parts:,.2f}', ParagraphStyle('TotR', fontSize=8.5, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)),
-        Paragraph(f'${total_regular_parts:,.2f}', ParagraphStyle('TotR2', fontSize=8.5, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)),
-        Paragraph(f'${total_all:,.2f}', ParagraphStyle('TotR3', fontSize=8.5, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)),
-        Paragraph(f'${total_paid_all:,.2f}', ParagraphStyle('TotR4', fontSize=8.5, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)),
+        Paragraph(f'${total_debt_parts:,.2f}', pdf_style('TotR', fontSize=8.5, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)),
+        Paragraph(f'${total_regular_parts:,.2f}', pdf_style('TotR2', fontSize=8.5, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)),
+        Paragraph(f'${total_all:,.2f}', pdf_style('TotR3', fontSize=8.5, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)),
+        Paragraph(f'${total_paid_all:,.2f}', pdf_style('TotR4', fontSize=8.5, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)),
         Paragraph('', st_col_hdr),
     ])
 
@@ -2499,15 +2665,12 @@ class PaymentPlanViewSet(viewsets.ModelViewSet):
         # Vecinos only see plans that have been sent/accepted/rejected/completed
         user = self.request.user
         if not user.is_super_admin:
-            try:
-                tu = TenantUser.objects.get(user=user, tenant_id=tenant_id)
-                if tu.role == 'vecino':
-                    qs = qs.filter(
-                        unit_id=tu.unit_id,
-                        status__in=['sent', 'accepted', 'rejected', 'completed', 'cancelled'],
-                    )
-            except TenantUser.DoesNotExist:
-                pass
+            tu = membership.for_request(self.request).get(tenant_id)
+            if tu and tu.role == 'vecino':
+                qs = qs.filter(
+                    unit_id=tu.unit_id,
+                    status__in=['sent', 'accepted', 'rejected', 'completed', 'cancelled'],
+                )
 
         # Optional filters
         unit_id = self.request.query_params.get('unit_id')
@@ -2853,11 +3016,8 @@ class PaymentPlanViewSet(viewsets.ModelViewSet):
         # Ensure only vecino of the unit (or admin) can accept
         user = request.user
         if not user.is_super_admin:
-            try:
-                tu = TenantUser.objects.get(user=user, tenant_id=tenant_id)
-                if tu.role == 'vecino' and str(tu.unit_id) != str(plan.unit_id):
-                    return Response({'detail': 'No autorizado.'}, status=status.HTTP_403_FORBIDDEN)
-            except TenantUser.DoesNotExist:
+            tu = membership.for_request(request).get(tenant_id)
+            if tu is None or (tu.role == 'vecino' and tu.unit_id != str(plan.unit_id)):
                 return Response({'detail': 'No autorizado.'}, status=status.HTTP_403_FORBIDDEN)
 
         name, _email = self._get_user_info(tenant_id)
@@ -2873,7 +3033,7 @@ class PaymentPlanViewSet(viewsets.ModelViewSet):
                 proposal_group=plan.proposal_group,
             ).exclude(id=plan.id).filter(
                 status__in=['draft', 'sent'],
-            ).update(status='cancelled')
+            ).update(status='cancelled', updated_at=timezone.now())
 
         _audit_log(
             request, 'cobranza', 'update',
@@ -2903,11 +3063,8 @@ class PaymentPlanViewSet(viewsets.ModelViewSet):
             )
         user = request.user
         if not user.is_super_admin:
-            try:
-                tu = TenantUser.objects.get(user=user, tenant_id=tenant_id)
-                if tu.role == 'vecino' and str(tu.unit_id) != str(plan.unit_id):
-                    return Response({'detail': 'No autorizado.'}, status=status.HTTP_403_FORBIDDEN)
-            except TenantUser.DoesNotExist:
+            tu = membership.for_request(request).get(tenant_id)
+            if tu is None or (tu.role == 'vecino' and tu.unit_id != str(plan.unit_id)):
                 return Response({'detail': 'No autorizado.'}, status=status.HTTP_403_FORBIDDEN)
 
         plan.status = 'rejected'
@@ -3062,6 +3219,7 @@ class ClosedPeriodViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         tenant_id = self.kwargs['tenant_id']
         obj = serializer.save(tenant_id=tenant_id, closed_by=self.request.user)
+        _snapshot_closed_period(Tenant.objects.get(id=tenant_id), obj)
         # Notify all roles that have access to the cobranza module
         try:
             _notify_roles(
@@ -3085,6 +3243,7 @@ class ClosedPeriodViewSet(viewsets.ModelViewSet):
         tenant_id = self.kwargs['tenant_id']
         period = instance.period
         instance.delete()
+        _invalidate_period_snapshots(tenant_id, period)
         # Notify roles with access to cobranza
         try:
             _notify_roles(
@@ -3125,8 +3284,9 @@ class ReopenRequestViewSet(viewsets.ModelViewSet):
         req.resolved_by = request.user
         req.resolved_at = timezone.now()
         req.save()
-        # Remove closed period
+        # Remove closed period (and its bank snapshot)
         ClosedPeriod.objects.filter(tenant_id=tenant_id, period=req.period).delete()
+        _invalidate_period_snapshots(tenant_id, req.period)
         # Notify roles with access to cobranza
         try:
             _notify_roles(
@@ -3237,6 +3397,7 @@ class PeriodClosureRequestViewSet(viewsets.ReadOnlyModelViewSet):
                 tenant_id=tenant_id, period=period,
                 defaults={'closed_by': request.user},
             )
+            _snapshot_closed_period(tenant, cp)
             try:
                 _notify_roles(
                     tenant_id,
@@ -3281,14 +3442,12 @@ class PeriodClosureRequestViewSet(viewsets.ReadOnlyModelViewSet):
         first_step = closure.steps.order_by('order').first()
         if first_step and first_step.approver and first_step.approver.email:
             try:
-                from .email_service import send_notification_email
-                send_notification_email(
-                    email=first_step.approver.email,
-                    user_name=first_step.approver.name or first_step.approver.email,
+                queue_notification_emails(
+                    tenant,
+                    [(first_step.approver.email, first_step.approver.name or first_step.approver.email)],
                     notif_type='period_closed',
                     title=f'Solicitud de cierre — período {period}',
                     message=f'Se requiere tu aprobación para cerrar el período {period} en {tenant.name}.',
-                    tenant_name=tenant.name,
                 )
             except Exception:
                 pass
@@ -3338,6 +3497,7 @@ class PeriodClosureRequestViewSet(viewsets.ReadOnlyModelViewSet):
                 tenant_id=tenant_id, period=closure.period,
                 defaults={'closed_by': request.user},
             )
+            _snapshot_closed_period(self._get_tenant(), cp)
             try:
                 _notify_roles(
                     tenant_id,
@@ -3361,17 +3521,15 @@ class PeriodClosureRequestViewSet(viewsets.ReadOnlyModelViewSet):
             if next_step and next_step.approver and next_step.approver.email:
                 try:
                     tenant = self._get_tenant()
-                    from .email_service import send_notification_email
-                    send_notification_email(
-                        email=next_step.approver.email,
-                        user_name=next_step.approver.name or next_step.approver.email,
+                    queue_notification_emails(
+                        tenant,
+                        [(next_step.approver.email, next_step.approver.name or next_step.approver.email)],
                         notif_type='period_closed',
                         title=f'Solicitud de cierre — período {closure.period}',
                         message=(
                             f'Se requiere tu aprobación para cerrar el período {closure.period} '
                             f'en {tenant.name}. El paso anterior ya fue aprobado.'
                         ),
-                        tenant_name=tenant.name,
                     )
                 except Exception:
                     pass
@@ -3455,6 +3613,12 @@ class AssemblyPositionViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(tenant_id=self.kwargs['tenant_id'])
 
+    def perform_update(self, serializer):
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        instance.delete()
+
 
 class CommitteeViewSet(viewsets.ModelViewSet):
     serializer_class = CommitteeSerializer
@@ -3499,6 +3663,7 @@ class UnrecognizedIncomeViewSet(viewsets.ModelViewSet):
 class AmenityReservationViewSet(viewsets.ModelViewSet):
     """CRUD + approve/reject for amenity reservations."""
     serializer_class = AmenityReservationSerializer
+    pagination_class = KeysetOrPageNumberPagination
 
     def get_permissions(self):
         if self.action in ['approve', 'reject']:
@@ -3559,7 +3724,7 @@ class AmenityReservationViewSet(viewsets.ModelViewSet):
         )
 
     def perform_create(self, serializer):
-        from .models import TenantUser as TU, Unit
+        from .models import Unit
         user = self.request.user
         unit = None
         role = None
@@ -3567,13 +3732,11 @@ class AmenityReservationViewSet(viewsets.ModelViewSet):
         if user.is_super_admin:
             role = 'superadmin'
         else:
-            try:
-                tu = TU.objects.get(user=user, tenant_id=self.kwargs['tenant_id'])
+            tu = membership.for_request(self.request).get(self.kwargs['tenant_id'])
+            if tu:
                 role = tu.role
                 if tu.role == 'vecino' and tu.unit_id:
-                    unit = tu.unit
-            except TU.DoesNotExist:
-                pass
+                    unit = Unit.objects.filter(id=tu.unit_id).first()
 
         if unit is None:
             unit_id = self.request.data.get('unit_id')
@@ -3700,13 +3863,7 @@ class AmenityReservationViewSet(viewsets.ModelViewSet):
         unit_label  = f' — {res.unit.unit_name}' if res.unit else ''
         cancel_msg  = f'Fecha: {res.date}  {time_str}'
 
-        user = request.user
-        canceller_role = None
-        try:
-            tu = TenantUser.objects.get(user=user, tenant_id=tenant_id)
-            canceller_role = tu.role
-        except TenantUser.DoesNotExist:
-            pass
+        canceller_role = membership.for_request(request).role(tenant_id)
 
         if canceller_role in ('admin', 'tesorero', 'superadmin', None):
             # Admin/manager cancelled → notify vecinos of the unit
@@ -3741,12 +3898,14 @@ class AmenityReservationViewSet(viewsets.ModelViewSet):
 class NotificationViewSet(viewsets.GenericViewSet):
     """
     GET  /tenants/{id}/notifications/           → list (current user)
+         ?cursor= → páginas por cursor en lugar de las 100 más recientes
     GET  /tenants/{id}/notifications/unread-count/ → {count}
     POST /tenants/{id}/notifications/{id}/mark-read/ → mark one read
     POST /tenants/{id}/notifications/mark-all-read/  → mark all read
     """
     serializer_class   = NotificationSerializer
     permission_classes = [IsTenantMember]
+    pagination_class   = KeysetPagination
 
     def get_queryset(self):
         return Notification.objects.filter(
@@ -3759,6 +3918,9 @@ class NotificationViewSet(viewsets.GenericViewSet):
         only_unread = request.query_params.get('unread') == '1'
         if only_unread:
             qs = qs.filter(is_read=False)
+        if KeysetPagination.cursor_query_param in request.query_params:
+            page = self.paginate_queryset(qs)
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
         # cap to 100 most recent
         qs = qs[:100]
         return Response(self.get_serializer(qs, many=True).data)
@@ -3791,12 +3953,15 @@ class NotificationViewSet(viewsets.GenericViewSet):
 class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
     """
     GET  /api/audit-logs/           → list (with filters)
+         ?cursor= → páginas por cursor (created_at, id) sin OFFSET ni COUNT
+         ?count=approx → total estimado por el planner en la paginación por página
     GET  /api/audit-logs/{id}/      → retrieve
     GET  /api/audit-logs/summary/   → counts per module / action (last 30 days)
     Super-admin access only.
     """
     serializer_class   = AuditLogSerializer
     permission_classes = [IsSuperAdmin]
+    pagination_class   = KeysetPagination
 
     def get_queryset(self):
         qs = AuditLog.objects.select_related('tenant', 'user').all()
@@ -3841,7 +4006,11 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
 
     def list(self, request, *args, **kwargs):
         qs     = self.get_queryset()
-        total  = qs.count()
+        if KeysetPagination.cursor_query_param in request.query_params:
+            page = self.paginate_queryset(qs)
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        approx = request.query_params.get('count') == 'approx'
+        total  = approximate_count(qs) if approx else qs.count()
         # Pagination
         try:
             page     = max(1, int(request.query_params.get('page', 1)))
@@ -3894,6 +4063,73 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
         })
 
 
+# ═══════════════════════════════════════════════════════════
+#  REPORT JOBS (PDFs y correos pesados fuera del request)
+# ═══════════════════════════════════════════════════════════
+
+def _wants_async(request):
+    """True si el cliente pidió ejecutar en segundo plano (?async=1 o "async": true)."""
+    flag = request.query_params.get('async')
+    if flag is None and hasattr(request.data, 'get'):
+        flag = request.data.get('async')
+    return str(flag).lower() in ('1', 'true', 'yes')
+
+
+def _submit_report_job(request, tenant, kind, params):
+    """Encola un ReportJob (ver core/jobs.py) y responde 202 con su estado."""
+    job = enqueue_job(tenant, request.user, kind, params)
+    return Response(
+        ReportJobSerializer(job, context={'request': request}).data,
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
+class ReportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    GET /tenants/{id}/report-jobs/                → trabajos del usuario (recientes primero)
+    GET /tenants/{id}/report-jobs/{job_id}/       → estado (pending | running | done | failed)
+    GET /tenants/{id}/report-jobs/{job_id}/download/ → archivo generado
+    Los trabajos se crean desde los endpoints de PDF/correo con ?async=1.
+    """
+    serializer_class   = ReportJobSerializer
+    permission_classes = [IsTenantMember]
+
+    def get_queryset(self):
+        return ReportJob.objects.filter(
+            tenant_id=self.kwargs['tenant_id'],
+            requested_by=self.request.user,
+        )
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, tenant_id=None, pk=None):
+        job = self.get_object()
+        if job.status != 'done' or not job.result_file:
+            return Response(
+                {'detail': 'El archivo aún no está disponible.', 'status': job.status},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return _protected_file_response(job.result_file.name, job.result_filename, job.result_content_type)
+
+    @action(detail=True, methods=['get'])
+    def progress(self, request, tenant_id=None, pk=None):
+        """Avance de un envío masivo de estados de cuenta: totales por estado y detalle por unidad."""
+        job = self.get_object()
+        counts = {key: 0 for key, _label in StatementDelivery.STATUS_CHOICES}
+        counts.update(
+            job.statement_deliveries.values_list('status').annotate(n=Count('id')).values_list('status', 'n')
+        )
+        deliveries = job.statement_deliveries.select_related('unit').only(
+            'id', 'emails', 'status', 'error', 'sent_at',
+            'unit__id', 'unit__unit_id_code', 'unit__unit_name',
+        ).order_by('unit__unit_id_code')
+        return Response({
+            'job': ReportJobSerializer(job, context={'request': request}).data,
+            'total': sum(counts.values()),
+            'counts': counts,
+            'deliveries': StatementDeliverySerializer(deliveries, many=True).data,
+        })
+
+
 # ═══════════════════════════════════════════════════════════
 #  DASHBOARD
 # ═══════════════════════════════════════════════════════════
@@ -3908,99 +4144,115 @@ class DashboardView(APIView):
             from datetime import date
             period = date.today().strftime('%Y-%m')
 
+        data = cached_tenant_result(
+            tenant_id, 'dashboard', {'period': period, 'today': _today_period()},
+            lambda: self._build(tenant_id, period),
+        )
+        return Response(data)
+
+    def _build(self, tenant_id, period):
         tenant = Tenant.objects.get(id=tenant_id)
-        units = Unit.objects.filter(tenant_id=tenant_id)
-        total_units = units.count()
-        exempt_count = units.filter(admin_exempt=True).count()
+        # Una sola lectura de unidades: conteos y deuda total salen de esta lista
+        units = list(
+            Unit.objects.lean('id', 'occupancy', 'previous_debt', 'credit_balance')
+            .filter(tenant_id=tenant_id)
+        )
+        total_units = len(units)
+        rented_count = sum(1 for u in units if u.occupancy == 'rentada')
 
-        payments = Payment.objects.filter(tenant_id=tenant_id, period=period)
+        # Exentas en este período según el mismo calendario que el estado de cuenta
+        exempt_unit_ids = ExemptionCalendar.for_tenant(tenant).exempt_unit_ids(period)
+        exempt_count = len(exempt_unit_ids)
 
         # Count by unique unit IDs to avoid double-counting and to exclude exempt units
-        exempt_unit_ids = set(units.filter(admin_exempt=True).values_list('id', flat=True))
-        non_exempt_unit_ids = set(units.filter(admin_exempt=False).values_list('id', flat=True))
-
-        paid_unit_ids = (
-            set(payments.filter(status='pagado').values_list('unit_id', flat=True))
-            - exempt_unit_ids
-        )
-        partial_unit_ids = (
-            set(payments.filter(status='parcial').values_list('unit_id', flat=True))
-            - exempt_unit_ids
-            - paid_unit_ids  # unit paid in full takes precedence over partial
+        non_exempt_unit_ids = {str(u.id) for u in units} - exempt_unit_ids
+
+        # Estatus por unidad en una consulta agrupada
+        paid_unit_ids, partial_unit_ids = set(), set()
+        status_rows = (
+            Payment.objects.filter(tenant_id=tenant_id, period=period)
+            .values('unit_id')
+            .annotate(
+                paid=Count('id', filter=Q(status='pagado')),
+                partial=Count('id', filter=Q(status='parcial')),
+            )
         )
+        for row in status_rows:
+            uid = str(row['unit_id'])
+            if uid in exempt_unit_ids:
+                continue
+            if row['paid']:
+                paid_unit_ids.add(uid)
+            elif row['partial']:
+                # unit paid in full takes precedence over partial
+                partial_unit_ids.add(uid)
         paid_count = len(paid_unit_ids)
         partial_count = len(partial_unit_ids)
         pending_count = max(0, len(non_exempt_unit_ids) - paid_count - partial_count)
 
-        # Total collected — solo mantenimiento fijo
-        total_collected = FieldPayment.objects.filter(
+        # Total collected (solo mantenimiento fijo) e ingresos adicionales
+        # (campos extra, NO incluye adeudo_payments que son JSON aparte)
+        fp_totals = FieldPayment.objects.filter(
             payment__tenant_id=tenant_id,
             payment__period=period,
-            field_key='maintenance',
-        ).aggregate(total=Sum('received'))['total'] or Decimal('0')
+        ).aggregate(
+            maintenance=Sum('received', filter=Q(field_key='maintenance')),
+            extra=Sum('received', filter=~Q(field_key='maintenance')),
+        )
+        total_collected = fp_totals['maintenance'] or Decimal('0')
+        ingreso_adicional = fp_totals['extra'] or Decimal('0')
 
         # Cargos fijos: solo unidades no exentas
         billable_units = total_units - exempt_count
         total_expected = tenant.maintenance_fee * billable_units
 
         # Required extra fields
-        req_fields = ExtraField.objects.filter(
+        req_total = ExtraField.objects.filter(
             tenant_id=tenant_id, enabled=True, required=True
-        )
-        for ef in req_fields:
-            total_expected += ef.default_amount * billable_units
+        ).aggregate(total=Sum('default_amount'))['total'] or Decimal('0')
+        total_expected += req_total * billable_units
 
         collection_rate = (
             float(total_collected / total_expected * 100) if total_expected > 0 else 0
         )
 
-        # Gastos
-        total_gastos = GastoEntry.objects.filter(
+        # Gastos (total y solo conciliados, para tarjeta Gastos vs Ingresos)
+        gasto_totals = GastoEntry.objects.filter(
             tenant_id=tenant_id, period=period
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-
-        # Solo gastos conciliados (para tarjeta Gastos vs Ingresos)
-        total_gastos_conciliados = GastoEntry.objects.filter(
-            tenant_id=tenant_id, period=period, bank_reconciled=True
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        ).aggregate(
+            total=Sum('amount'),
+            conciliados=Sum('amount', filter=Q(bank_reconciled=True)),
+        )
+        total_gastos = gasto_totals['total'] or Decimal('0')
+        total_gastos_conciliados = gasto_totals['conciliados'] or Decimal('0')
 
         total_caja = CajaChicaEntry.objects.filter(
             tenant_id=tenant_id, period=period
         ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
 
-        rented_count = units.filter(occupancy='rentada').count()
-
-        # Ingresos adicionales: FieldPayments del periodo que NO sean mantenimiento
-        # (campos extra opcionales/obligatorios — NO incluye adeudo_payments que son JSON aparte)
-        ingreso_adicional = FieldPayment.objects.filter(
-            payment__tenant_id=tenant_id,
-            payment__period=period,
-        ).exclude(field_key='maintenance').aggregate(total=Sum('received'))['total'] or Decimal('0')
-
-        # Adeudo recibido este periodo (suma de adeudo_payments JSON — métrica separada, no forma parte de ingresos)
-        total_adeudo_recibido = Decimal('0')
-        for p in payments:
-            for period_debt in (p.adeudo_payments or {}).values():
-                if isinstance(period_debt, dict):
-                    for amt in period_debt.values():
-                        total_adeudo_recibido += Decimal(str(amt or 0))
+        # Adeudo recibido este periodo (todos los montos de adeudo_payments, también
+        # negativos — métrica separada, no forma parte de ingresos)
+        total_adeudo_recibido = AdeudoAllocation.objects.filter(
+            tenant_id=tenant_id, period=period,
+        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
 
         # Deuda total = suma del adeudo real por unidad al corte del período
         # (misma lógica que ReporteAdeudosView para que coincida con el reporte)
         start_period = tenant.operation_start_date or '2024-01'
         deuda_total = Decimal('0')
-        # Pre-fetch planes activos una sola vez para evitar N+1 queries en _compute_statement
-        _unit_active_plans = {
-            str(_p.unit_id): _p
-            for _p in PaymentPlan.objects.filter(tenant_id=tenant_id, status='accepted')
-        }
+        # Ledger materializado o motor SQL (una consulta); si ninguno aplica se
+        # precarga todo el tenant en un número fijo de queries (sin N+1 por unidad)
+        ledger = _summary_statements(tenant, start_period, period)
+        stmt_ctx = None if ledger is not None else _load_statement_context(tenant, serialize_payments=False)
         for unit in units:
             # Si una unidad falla en el cálculo, no debe tumbar todo el dashboard
             try:
-                _, _, _, bal, prev_debt_adeudo, _u_active_plan = _compute_statement(
-                    tenant, str(unit.id), start_period, period,
-                    _prefetched_plan=_unit_active_plans.get(str(unit.id)),
-                )
+                if ledger is not None:
+                    _, _, _, bal, prev_debt_adeudo, _u_active_plan = ledger[str(unit.id)]
+                else:
+                    _, _, _, bal, prev_debt_adeudo, _u_active_plan = _statement_from_context(
+                        stmt_ctx, unit.id, start_period, period,
+                    )
                 previous_debt_u = Decimal(str(unit.previous_debt or 0))
                 credit_balance_u = Decimal(str(unit.credit_balance or 0))
                 prev_debt_adeudo_dec = Decimal(str(prev_debt_adeudo))
@@ -4045,7 +4297,7 @@ class DashboardView(APIView):
             'deuda_total': float(deuda_total),
             'total_ingresos': float(total_ingresos),
         }
-        return Response(DashboardSerializer(data).data)
+        return DashboardSerializer(data).data
 
 
 # ═══════════════════════════════════════════════════════════
@@ -4100,8 +4352,12 @@ def _period_label_es(period: str) -> str:
         return period
 
 
-def _compute_receipt_email_data(payment, unit, tenant, extra_fields: list) -> dict:
-    """Compute receipt rows and totals for the email, mirroring JS receipt logic."""
+def _compute_receipt_email_data(payment, unit, tenant, extra_fields: list, exemptions=None, plans=None) -> dict:
+    """Compute receipt rows and totals for the email, mirroring JS receipt logic.
+
+    exemptions: ExemptionCalendar ya construido; plans: {plan_id: PaymentPlan}
+    del tenant. Los usa receipts-batch para no consultar por cada pago.
+    """
     # Effective totals: main field_payments + additional_payments
     eff_totals: dict[str, Decimal] = {}
     for fp in payment.field_payments.all():
@@ -4111,7 +4367,9 @@ def _compute_receipt_email_data(payment, unit, tenant, extra_fields: list) -> di
             v = fd.get('received', 0) if isinstance(fd, dict) else fd
             eff_totals[fk] = eff_totals.get(fk, Decimal('0')) + Decimal(str(v or 0))
 
-    is_exempt = bool(unit.admin_exempt)
+    if exemptions is None:
+        exemptions = ExemptionCalendar.for_tenant(tenant, units=[unit])
+    is_exempt = exemptions.is_exempt(unit.id, payment.period)
     maint_charge = Decimal('0') if is_exempt else Decimal(str(tenant.maintenance_fee or 0))
 
     req_efs = [ef for ef in extra_fields if ef.required]
@@ -4194,11 +4452,16 @@ def _compute_receipt_email_data(payment, unit, tenant, extra_fields: list) -> di
         if not fk.startswith('plan_'):
             continue
         plan_uuid = fk[5:]  # strip 'plan_' prefix
-        try:
-            from .models import PaymentPlan as _PP
-            plan_obj = _PP.objects.get(id=plan_uuid, tenant_id=tenant.id, unit_id=unit.id)
-        except Exception:
-            continue
+        if plans is not None:
+            plan_obj = plans.get(plan_uuid)
+            if plan_obj is None or str(plan_obj.unit_id) != str(unit.id):
+                continue
+        else:
+            try:
+                from .models import PaymentPlan as _PP
+                plan_obj = _PP.objects.get(id=plan_uuid, tenant_id=tenant.id, unit_id=unit.id)
+            except Exception:
+                continue
         inst = next((i for i in (plan_obj.installments or []) if i.get('period_key') == payment.period), None)
         if inst is None:
             continue
@@ -4253,77 +4516,226 @@ def _compute_receipt_email_data(payment, unit, tenant, extra_fields: list) -> di
     }
 
 
-def _has_admin_exempt(tenant, unit_id, period):
-    """Check if unit has active admin exemption for period (mesa_directiva)."""
-    if not tenant or getattr(tenant, 'admin_type', None) != 'mesa_directiva':
-        return False
-    unit = Unit.objects.filter(id=unit_id, tenant_id=tenant.id).first()
-    if not unit or not unit.admin_exempt:
-        return False
-    qs = AssemblyPosition.objects.filter(tenant_id=tenant.id, holder_unit_id=unit_id, active=True)
-    for pos in qs:
-        if pos.start_date and period < pos.start_date:
-            continue
-        if pos.end_date and period > pos.end_date:
-            continue
-        if pos.committee_id:
-            cm = Committee.objects.filter(id=pos.committee_id).first()
-            if cm and cm.exemption:
-                return True
-        return True
-    return False
-
-
 # Sentinel: distinguishes "caller did not pass a plan" (do the DB lookup)
 # from "caller explicitly passed None" (no active plan, skip lookup).
 _NO_PREFETCH = object()
 
 
-def _compute_statement(tenant, unit_id, start_period, cutoff_period, _prefetched_plan=_NO_PREFETCH):
+class _StatementContext:
     """
-    Replicate HTML computeStatement logic.
-    Returns list of period rows: charge, paid, status, maintenance, saldo_accum.
+    Datos precargados para calcular estados de cuenta de una o varias unidades.
 
-    _prefetched_plan: pass a PaymentPlan instance (or None) to skip the DB lookup.
-    When omitted the function queries the DB itself (fine for single-unit calls).
-    Always pass this in loops to avoid N+1 queries.
+    Se construye con _load_statement_context() en un número fijo de queries
+    (campos, unidades, pagos + field_payments, cobros de adeudo, adelantos,
+    planes, cuotas de plan, cargos de mesa directiva) sin importar cuántas
+    unidades o períodos se calculen.
     """
-    from datetime import date
-    today = _today_period()
 
+    def __init__(self, tenant, cob_fields, units_by_id, own_payments, cross_direct,
+                 cross_additional, adeudo_received, adelanto_credits, active_plans,
+                 plan_received, exemptions, serialize_payments):
+        self.tenant = tenant
+        self.cob_fields = cob_fields
+        self.units_by_id = units_by_id
+        self.own_payments = own_payments            # unit_id → [Payment] propios
+        self.cross_direct = cross_direct            # unit_id → [Payment] de otra unidad (Caso A)
+        self.cross_additional = cross_additional    # unit_id → [(Payment, entry)] (Caso B)
+        self.adeudo_received = adeudo_received      # unit_id → [(period, target_period, Decimal)]
+        self.adelanto_credits = adelanto_credits    # unit_id → {target_period: {field_key: Decimal}}
+        self.active_plans = active_plans            # unit_id → PaymentPlan aceptado
+        self.plan_received = plan_received          # unit_id → {period: Decimal}
+        self.exemptions = exemptions                # ExemptionCalendar
+        self.serialize_payments = serialize_payments
+
+
+def _load_active_plans(tenant, unit_ids=None):
+    """{unit_id (str): PaymentPlan aceptado} (el primero por unidad)."""
+    plans_qs = PaymentPlan.objects.filter(tenant_id=tenant.id, status='accepted')
+    if unit_ids is not None:
+        plans_qs = plans_qs.filter(unit_id__in=unit_ids)
+    active_plans = {}
+    for plan in plans_qs:
+        active_plans.setdefault(str(plan.unit_id), plan)
+    return active_plans
+
+
+def _load_statement_context(tenant, unit_ids=None, active_plans=None, serialize_payments=True):
+    """
+    Precarga todo lo necesario para _statement_from_context().
+
+    unit_ids: unidades a calcular (None = todas las del tenant).
+    active_plans: {unit_id: PaymentPlan|None} para omitir la consulta de planes.
+    serialize_payments: incluir PaymentSerializer(pay).data en cada fila ('pay').
+        Los listados por tenant no lo usan; desactivarlo evita leer los
+        archivos de evidencia.
+    """
     cob_fields = list(ExtraField.objects.filter(
         tenant_id=tenant.id, enabled=True
     ).exclude(field_type='gastos'))
-    req_fields = [f for f in cob_fields if f.required]
-    # Adelanto: pagos opcionales que suman como saldo a favor (reducen saldo_acum y saldo_final).
-    # Neutral: pagos registrados pero que NO afectan el saldo (ni suman ni restan).
-    adelanto_opt_fields = [f for f in cob_fields if not f.required and f.field_type == 'adelanto']
-    neutral_opt_fields  = [f for f in cob_fields if not f.required and f.field_type != 'adelanto']
-    opt_fields = adelanto_opt_fields + neutral_opt_fields  # orden: adelantos primero en field_detail
 
-    unit = Unit.objects.filter(id=unit_id, tenant_id=tenant.id).first()
-    previous_debt = float(unit.previous_debt or 0) if unit else 0
-    credit_balance = float(unit.credit_balance or 0) if unit else 0
-
-    # Solo pagos propios que NO fueron redirigidos a otra unidad
-    payments_qs = Payment.objects.filter(
-        tenant_id=tenant.id, unit_id=unit_id
-    ).filter(
-        Q(applied_to_unit__isnull=True) | Q(applied_to_unit_id=unit_id)
-    ).prefetch_related('field_payments')
+    targets = None if unit_ids is None else {str(u) for u in unit_ids}
+
+    payments_qs = Payment.objects.lean().filter(tenant_id=tenant.id)
+    if unit_ids is not None:
+        payments_qs = payments_qs.filter(Q(unit_id__in=targets) | Q(applied_to_unit_id__in=targets))
+    if not serialize_payments:
+        # Los cobros de adeudo se leen de AdeudoAllocation; el JSON solo lo usa el serializer
+        payments_qs = payments_qs.defer('adeudo_payments')
+    payments = list(payments_qs.prefetch_related('field_payments'))
+
+    # Caso B: entradas de additional_payments de OTRAS unidades dirigidas a las unidades pedidas,
+    # leídas del índice AdditionalPaymentAllocation por unidad destino (sin recorrer el JSON).
+    allocations_qs = AdditionalPaymentAllocation.objects.filter(tenant_id=tenant.id)
+    if unit_ids is not None:
+        allocations_qs = allocations_qs.filter(applied_to_unit_id__in=targets)
+    allocations = list(allocations_qs.values('payment_id', 'entry_id', 'applied_to_unit_id', 'field_key', 'amount'))
+    payments_by_id = {p.id: p for p in payments}
+    missing_ids = {a['payment_id'] for a in allocations} - set(payments_by_id)
+    addl_sources = []
+    if missing_ids:
+        # Solo las columnas de metadatos del pago origen (unidad, período, tipo, fecha)
+        addl_sources = list(
+            Payment.objects.lean('id', 'unit_id', 'period', 'status', 'payment_type', 'payment_date')
+            .filter(id__in=missing_ids)
+        )
+        payments_by_id.update((p.id, p) for p in addl_sources)
+
+    # Las unidades pedidas y las contrapartes de sus pagos cross-unit (para
+    # mostrar el código/nombre de la unidad origen); sin unit_ids, todas.
+    units_qs = Unit.objects.lean().filter(tenant_id=tenant.id)
+    if unit_ids is not None:
+        referenced = set(targets)
+        for p in payments + addl_sources:
+            referenced.add(str(p.unit_id))
+            if p.applied_to_unit_id:
+                referenced.add(str(p.applied_to_unit_id))
+        units_qs = units_qs.filter(id__in=referenced)
+    units_by_id = {str(u.id): u for u in units_qs}
+    if targets is None:
+        targets = set(units_by_id)
+
+    # Asignar las unidades ya cargadas evita una query por pago al serializar / mostrar cross-unit
+    for p in payments + addl_sources:
+        if str(p.unit_id) in units_by_id:
+            p.unit = units_by_id[str(p.unit_id)]
+        if p.applied_to_unit_id and str(p.applied_to_unit_id) in units_by_id:
+            p.applied_to_unit = units_by_id[str(p.applied_to_unit_id)]
+
+    own_payments, cross_direct, cross_additional = {}, {}, {}
+    for p in payments:
+        uid = str(p.unit_id)
+        applied = str(p.applied_to_unit_id) if p.applied_to_unit_id else None
+        # Solo pagos propios que NO fueron redirigidos a otra unidad
+        if uid in targets and (applied is None or applied == uid):
+            own_payments.setdefault(uid, []).append(p)
+        # Caso A: el Payment principal tiene applied_to_unit_id = unidad destino
+        if applied and applied != uid and applied in targets:
+            cross_direct.setdefault(applied, []).append(p)
+    entries_by_key = {}
+    for a in allocations:
+        p = payments_by_id[a['payment_id']]
+        target = str(a['applied_to_unit_id'])
+        if target not in targets or target == str(p.unit_id):
+            continue
+        key = (a['payment_id'], a['entry_id'], target)
+        if key not in entries_by_key:
+            entries_by_key[key] = {'field_payments': {}}
+            cross_additional.setdefault(target, []).append((p, entries_by_key[key]))
+        fp_data = entries_by_key[key]['field_payments']
+        prev = fp_data.get(a['field_key'], {}).get('received', Decimal('0'))
+        fp_data[a['field_key']] = {'received': prev + a['amount']}
+
+    # Cobros de adeudo de los pagos propios (no redirigidos), sumados en SQL por
+    # período receptor y período destino en lugar de recorrer adeudo_payments.
+    adeudo_qs = AdeudoAllocation.objects.filter(tenant_id=tenant.id).filter(
+        Q(payment__applied_to_unit__isnull=True) | Q(payment__applied_to_unit_id=F('unit_id'))
+    )
+    if unit_ids is not None:
+        adeudo_qs = adeudo_qs.filter(unit_id__in=targets)
+    adeudo_received = {}
+    for row in (
+        adeudo_qs.values('unit_id', 'period', 'target_period')
+        .annotate(total=Sum('amount'))
+        .order_by()
+    ):
+        adeudo_received.setdefault(str(row['unit_id']), []).append(
+            (row['period'], row['target_period'], row['total'])
+        )
+
+    # Adelantos de los pagos propios que llegan a cada período, desde AdelantoCredit
+    adelanto_qs = AdelantoCredit.objects.filter(tenant_id=tenant.id).filter(
+        Q(payment__applied_to_unit__isnull=True) | Q(payment__applied_to_unit_id=F('unit_id'))
+    )
+    if unit_ids is not None:
+        adelanto_qs = adelanto_qs.filter(unit_id__in=targets)
+    adelanto_credits = {}
+    for row in (
+        adelanto_qs.values('unit_id', 'target_period', 'field_key')
+        .annotate(total=Sum('amount'))
+        .order_by()
+    ):
+        by_field = adelanto_credits.setdefault(str(row['unit_id']), {}).setdefault(row['target_period'], {})
+        by_field[row['field_key']] = row['total']
+
+    if active_plans is None:
+        active_plans = _load_active_plans(tenant, None if unit_ids is None else targets)
+    else:
+        active_plans = {str(k): v for k, v in active_plans.items()}
+
+    plan_received = {}
+    plan_units_by_key = {plan.field_key: uid for uid, plan in active_plans.items() if plan}
+    if plan_units_by_key:
+        for pfp in FieldPayment.objects.filter(
+            payment__tenant_id=tenant.id,
+            field_key__in=list(plan_units_by_key),
+        ).values('payment__unit_id', 'payment__period', 'field_key', 'received'):
+            uid = plan_units_by_key[pfp['field_key']]
+            if str(pfp['payment__unit_id']) != uid:
+                continue
+            by_period = plan_received.setdefault(uid, {})
+            prd = pfp['payment__period']
+            by_period[prd] = by_period.get(prd, Decimal('0')) + Decimal(str(pfp['received'] or 0))
+
+    exemptions = ExemptionCalendar.for_tenant(tenant, units=units_by_id.values())
+
+    return _StatementContext(
+        tenant, cob_fields, units_by_id, own_payments, cross_direct, cross_additional,
+        adeudo_received, adelanto_credits, active_plans, plan_received, exemptions,
+        serialize_payments,
+    )
+
+
+def _statement_from_context(ctx, unit_id, start_period, cutoff_period):
+    """
+    Replicate HTML computeStatement logic for one unit using preloaded data.
+    Returns (rows, total_charges, total_paid, balance, prev_debt_adeudo, active_plan).
+    """
+    tenant = ctx.tenant
+    unit_id = str(unit_id)
+    today = _today_period()
+
+    cob_fields = ctx.cob_fields
+    req_fields = [f for f in cob_fields if f.required]
+    # Adelanto: pagos opcionales que suman como saldo a favor (reducen saldo_acum y saldo_final).
+    # Neutral: pagos registrados pero que NO afectan el saldo (ni suman ni restan).
+    adelanto_opt_fields = [f for f in cob_fields if not f.required and f.field_type == 'adelanto']
+    neutral_opt_fields  = [f for f in cob_fields if not f.required and f.field_type != 'adelanto']
+    opt_fields = adelanto_opt_fields + neutral_opt_fields  # orden: adelantos primero en field_detail
+
+    unit = ctx.units_by_id.get(unit_id)
+    previous_debt = float(unit.previous_debt or 0) if unit else 0
+    credit_balance = float(unit.credit_balance or 0) if unit else 0
 
-    payments_by_period = {p.period: p for p in payments_qs}
+    # Solo pagos propios que NO fueron redirigidos a otra unidad
+    own_payments = ctx.own_payments.get(unit_id, [])
+    payments_by_period = {p.period: p for p in own_payments}
 
     # Pagos de OTRAS unidades que aplican a esta unidad (cross-unit)
     # Caso A: el Payment principal tiene applied_to_unit_id = unit_id
     # → sumas de field_payments del FieldPayment model
     cross_fp_by_period = {}   # period → {field_key: Decimal total}
     cross_meta_by_period = {} # period → first cross Payment (para metadata display)
-    cross_qs = Payment.objects.filter(
-        tenant_id=tenant.id,
-        applied_to_unit_id=unit_id,
-    ).exclude(unit_id=unit_id).prefetch_related('field_payments', 'unit')
-    for cp in cross_qs:
+    for cp in ctx.cross_direct.get(unit_id, []):
         if cp.period not in cross_meta_by_period:
             cross_meta_by_period[cp.period] = cp
         for cfp in cp.field_payments.all():
@@ -4334,81 +4746,44 @@ def _compute_statement(tenant, unit_id, start_period, cutoff_period, _prefetched
 
     # Caso B: una additional_payment entry de OTRO pago tiene applied_to_unit_id = unit_id
     # → sumas de los field_payments JSON de esa entrada adicional
-    addl_cross_qs = Payment.objects.filter(
-        tenant_id=tenant.id,
-    ).exclude(unit_id=unit_id).only('id', 'unit_id', 'period', 'additional_payments').select_related('unit')
-    for ap_pay in addl_cross_qs:
-        for ap_entry in (ap_pay.additional_payments or []):
-            if str(ap_entry.get('applied_to_unit_id', '')) != str(unit_id):
-                continue
-            fp_data = ap_entry.get('field_payments') or {}
-            for f_id, fd in fp_data.items():
-                amt = Decimal(str(fd.get('received', 0) if isinstance(fd, dict) else fd or 0))
-                if amt > 0:
-                    cross_fp_by_period.setdefault(ap_pay.period, {})[f_id] = \
-                        cross_fp_by_period.get(ap_pay.period, {}).get(f_id, Decimal('0')) + amt
-                    if ap_pay.period not in cross_meta_by_period:
-                        cross_meta_by_period[ap_pay.period] = ap_pay
+    for ap_pay, ap_entry in ctx.cross_additional.get(unit_id, []):
+        fp_data = ap_entry.get('field_payments') or {}
+        for f_id, fd in fp_data.items():
+            amt = Decimal(str(fd.get('received', 0) if isinstance(fd, dict) else fd or 0))
+            if amt > 0:
+                cross_fp_by_period.setdefault(ap_pay.period, {})[f_id] = \
+                    cross_fp_by_period.get(ap_pay.period, {}).get(f_id, Decimal('0')) + amt
+                if ap_pay.period not in cross_meta_by_period:
+                    cross_meta_by_period[ap_pay.period] = ap_pay
 
-    adelanto_credits = {}
+    adelanto_credits = ctx.adelanto_credits.get(unit_id, {})
     adeudo_credits_received = {}
     prev_debt_adeudo = Decimal('0')
     # Adeudo recibido por período de pago (para mostrar en la columna Abono del período receptor)
     adeudo_all_by_recv = {}   # payment.period -> total adeudo cobrado (todos los tipos, para display)
     adeudo_spec_by_recv = {}  # payment.period -> total adeudo de períodos específicos (para balance)
 
-    for p in payments_qs:
-        fp_map = {fp.field_key: fp for fp in p.field_payments.all()}
-        for field_key, fp in fp_map.items():
-            at = fp.adelanto_targets or {}
-            for target_period, amt in at.items():
-                if target_period not in adelanto_credits:
-                    adelanto_credits[target_period] = {}
-                adelanto_credits[target_period][field_key] = adelanto_credits[target_period].get(field_key, Decimal('0')) + Decimal(str(amt or 0))
-
-        ap = p.adeudo_payments or {}
-        recv_period = p.period
-        for target_p, field_map in ap.items():
-            total = sum(Decimal(str(v or 0)) for v in (field_map or {}).values())
-            if target_p == '__prevDebt':
-                prev_debt_adeudo += total
-            else:
-                adeudo_credits_received[target_p] = adeudo_credits_received.get(target_p, Decimal('0')) + total
-                adeudo_spec_by_recv[recv_period] = adeudo_spec_by_recv.get(recv_period, Decimal('0')) + total
-            adeudo_all_by_recv[recv_period] = adeudo_all_by_recv.get(recv_period, Decimal('0')) + total
+    for recv_period, target_p, total in ctx.adeudo_received.get(unit_id, []):
+        if target_p == '__prevDebt':
+            prev_debt_adeudo += total
+        else:
+            adeudo_credits_received[target_p] = adeudo_credits_received.get(target_p, Decimal('0')) + total
+            adeudo_spec_by_recv[recv_period] = adeudo_spec_by_recv.get(recv_period, Decimal('0')) + total
+        adeudo_all_by_recv[recv_period] = adeudo_all_by_recv.get(recv_period, Decimal('0')) + total
 
     # ── Plan de pagos activo ────────────────────────────────────────
     # Cuando la unidad tiene un plan de pagos aceptado, la deuda anterior
     # queda absorbida en las cuotas del plan (debt_part por periodo).
     # El saldo inicial no incluye previous_debt; arranca limpio menos credit_balance.
-    #
-    # Use _prefetched_plan when the caller is looping over units (avoids N+1).
-    # When not provided, query the DB here (single-unit calls, e.g. unit detail).
-    if _prefetched_plan is _NO_PREFETCH:
-        active_plan = PaymentPlan.objects.filter(
-            tenant_id=tenant.id, unit_id=unit_id, status='accepted',
-        ).first()
-    else:
-        active_plan = _prefetched_plan  # may be None (no plan for this unit)
+    active_plan = ctx.active_plans.get(unit_id)
     plan_installments_by_period = {}
     plan_field_payments_by_period = {}
     if active_plan:
-        _plan_key = active_plan.field_key
         for _inst in (active_plan.installments or []):
             _pk = _inst.get('period_key')
             if _pk:
                 plan_installments_by_period[_pk] = _inst
-        _plan_fps = FieldPayment.objects.filter(
-            payment__tenant_id=tenant.id,
-            payment__unit_id=unit_id,
-            field_key=_plan_key,
-        ).values('payment__period', 'received')
-        for _pfp in _plan_fps:
-            _prd = _pfp['payment__period']
-            plan_field_payments_by_period[_prd] = (
-                plan_field_payments_by_period.get(_prd, Decimal('0')) +
-                Decimal(str(_pfp['received'] or 0))
-            )
+        plan_field_payments_by_period = ctx.plan_received.get(unit_id, {})
     # ──────────────────────────────────────────────────────────────
 
     # Saldo inicial = deuda anterior - abonos a deuda - saldo a favor previo
@@ -4436,7 +4811,7 @@ def _compute_statement(tenant, unit_id, start_period, cutoff_period, _prefetched
 
         ac = adelanto_credits.get(period, {})
 
-        is_exempt = _has_admin_exempt(tenant, unit_id, period)
+        is_exempt = ctx.exemptions.is_exempt(unit_id, period)
         maint_charge = Decimal('0') if is_exempt else (tenant.maintenance_fee or Decimal('0'))
         maint_fp = fp_map.get('maintenance')
         # Unidades exentas: mantenimiento completamente neutro (cargo=0, abono=0)
@@ -4613,7 +4988,10 @@ def _compute_statement(tenant, unit_id, start_period, cutoff_period, _prefetched
             'payment_date': str((pay or eff_pay).payment_date) if (pay or eff_pay) and (pay or eff_pay).payment_date else None,
             'field_detail': field_detail,
             'maint_detail': {'charge': float(maint_charge), 'received': float(maint_received), 'adelanto': float(maint_adelanto), 'abono': float(maint_abono)},
-            'pay': PaymentSerializer(pay).data if pay else None,
+            'pay': (
+                PaymentSerializer(pay, context={'exemptions': ctx.exemptions}).data
+                if pay and ctx.serialize_payments else None
+            ),
             'cross_unit_payment': cross_unit_info,
             'saldo_accum': float(saldo_acum),
         })
@@ -4626,6 +5004,257 @@ def _compute_statement(tenant, unit_id, start_period, cutoff_period, _prefetched
     return rows, float(total_charges), float(total_paid_display), float(balance), float(prev_debt_adeudo), active_plan
 
 
+def _compute_statement(tenant, unit_id, start_period, cutoff_period, _prefetched_plan=_NO_PREFETCH):
+    """
+    Replicate HTML computeStatement logic.
+    Returns list of period rows: charge, paid, status, maintenance, saldo_accum.
+
+    _prefetched_plan: pass a PaymentPlan instance (or None) to skip the DB lookup.
+    When omitted the function queries the DB itself (fine for single-unit calls).
+    For several units use _compute_tenant_statements() instead of looping here.
+    """
+    active_plans = None if _prefetched_plan is _NO_PREFETCH else {str(unit_id): _prefetched_plan}
+    ctx = _load_statement_context(tenant, unit_ids=[unit_id], active_plans=active_plans)
+    return _statement_from_context(ctx, unit_id, start_period, cutoff_period)
+
+
+def _compute_tenant_statements(tenant, start_period, cutoff_period, unit_ids=None, serialize_payments=False):
+    """
+    Batched _compute_statement for every unit of the tenant (or *unit_ids*).
+
+    Loads payments, field payments, cross-unit payments, adelanto targets,
+    adeudo JSON, active plans and exemptions in a fixed number of queries,
+    independent of the number of units and periods.
+    Returns {unit_id (str): (rows, total_charges, total_paid, balance, prev_debt_adeudo, active_plan)}.
+    """
+    ctx = _load_statement_context(tenant, unit_ids=unit_ids, serialize_payments=serialize_payments)
+    ids = list(ctx.units_by_id) if unit_ids is None else [str(u) for u in unit_ids]
+    return {
+        uid: _statement_from_context(ctx, uid, start_period, cutoff_period)
+        for uid in ids
+    }
+
+
+# ═══════════════════════════════════════════════════════════
+#  UNIT PERIOD LEDGER — Estado de cuenta materializado por unidad/período
+# ═══════════════════════════════════════════════════════════
+
+def _ledger_start(tenant):
+    return tenant.operation_start_date or '2024-01'
+
+
+def _ledger_entries_from_statement(tenant_id, unit_id, stmt, from_period=''):
+    rows, _tc, _tp, _bal, prev_debt_adeudo, active_plan = stmt
+    entries = []
+    for r in rows:
+        if r['period'] < from_period:
+            continue
+        adelanto = r['maint_detail']['adelanto'] + sum(fd.get('adelanto', 0) for fd in r['field_detail'])
+        entries.append(UnitPeriodLedger(
+            tenant_id=tenant_id, unit_id=unit_id, period=r['period'],
+            charge=Decimal(str(r['charge'])),
+            paid=Decimal(str(r['paid'])),
+            paid_balance=Decimal(str(r['paid_balance'])),
+            adelanto=Decimal(str(adelanto)),
+            adeudo_received=Decimal(str(r['adeudo_received_for_period'])),
+            maintenance=Decimal(str(r['maintenance'])),
+            saldo_acum=Decimal(str(r['saldo_accum'])),
+            status=r['status'],
+            prev_debt_adeudo=Decimal(str(prev_debt_adeudo)),
+            has_active_plan=active_plan is not None,
+        ))
+    return entries
+
+
+def _refresh_unit_ledger(tenant, scope):
+    """
+    Recalcula el ledger de las unidades en *scope* ({unit_id: período}) desde
+    el período indicado en adelante. El estado de cuenta de la unidad se
+    calcula completo (el saldo acumulado depende de los períodos anteriores),
+    pero solo se reescriben las filas a partir del período afectado.
+    Si algo falla se borran las filas de esas unidades (la siguiente lectura
+    las reconstruye en lugar de servir un saldo obsoleto) y se relanza el
+    error para que el llamador lo registre.
+    """
+    if not scope:
+        return
+    from django.db import transaction
+    unit_ids = [
+        str(uid) for uid in
+        Unit.objects.filter(tenant_id=tenant.id, id__in=list(scope)).values_list('id', flat=True)
+    ]
+    if not unit_ids:
+        return
+    try:
+        statements = _compute_tenant_statements(
+            tenant, _ledger_start(tenant), _today_period(), unit_ids=unit_ids,
+        )
+        with transaction.atomic():
+            for uid in unit_ids:
+                from_period = scope.get(uid, '')
+                UnitPeriodLedger.objects.filter(unit_id=uid, period__gte=from_period).delete()
+                UnitPeriodLedger.objects.bulk_create(
+                    _ledger_entries_from_statement(tenant.id, uid, statements[uid], from_period)
+                )
+    except Exception:
+        UnitPeriodLedger.objects.filter(unit_id__in=unit_ids).delete()
+        raise
+
+
+def _rebuild_tenant_ledger(tenant):
+    """Reconstruye todo el ledger del tenant (operation_start → período actual)."""
+    from django.db import transaction
+    statements = _compute_tenant_statements(tenant, _ledger_start(tenant), _today_period())
+    entries = []
+    for uid, stmt in statements.items():
+        entries.extend(_ledger_entries_from_statement(tenant.id, uid, stmt))
+    with transaction.atomic():
+        UnitPeriodLedger.objects.filter(tenant_id=tenant.id).delete()
+        UnitPeriodLedger.objects.bulk_create(entries, batch_size=1000)
+    return len(entries)
+
+
+def _verify_tenant_ledger(tenant):
+    """Compara el ledger guardado contra un recálculo completo.
+    Returns list of (unit_id, period, field, stored, expected) mismatches."""
+    statements = _compute_tenant_statements(tenant, _ledger_start(tenant), _today_period())
+    stored = {
+        (str(e.unit_id), e.period): e
+        for e in UnitPeriodLedger.objects.filter(tenant_id=tenant.id)
+    }
+    fields = ['charge', 'paid', 'paid_balance', 'adelanto', 'adeudo_received',
+              'maintenance', 'saldo_acum', 'status', 'prev_debt_adeudo', 'has_active_plan']
+    mismatches = []
+    expected_keys = set()
+    for uid, stmt in statements.items():
+        for exp in _ledger_entries_from_statement(tenant.id, uid, stmt):
+            key = (uid, exp.period)
+            expected_keys.add(key)
+            got = stored.get(key)
+            if got is None:
+                mismatches.append((uid, exp.period, None, None, 'missing'))
+                continue
+            for f in fields:
+                a, b = getattr(got, f), getattr(exp, f)
+                if isinstance(b, Decimal):
+                    a, b = Decimal(str(a)).quantize(Decimal('0.01')), b.quantize(Decimal('0.01'))
+                if a != b:
+                    mismatches.append((uid, exp.period, f, a, b))
+    for key in set(stored) - expected_keys:
+        mismatches.append((key[0], key[1], None, 'extra', None))
+    return mismatches
+
+
+def _enqueue_ledger_refresh(tenant, scope):
+    """Encarga al worker completar el ledger de *scope*, salvo que ya haya uno en cola."""
+    from .models import ReportJob
+    queued = ReportJob.objects.filter(
+        tenant_id=tenant.id, kind='unit_ledger_refresh', status__in=['pending', 'running'],
+    ).exists()
+    if not queued:
+        enqueue_job(tenant, None, 'unit_ledger_refresh', {'scope': scope})
+
+
+def _read_ledger_statements(tenant, start_period, cutoff_period, _rebuild=True):
+    """
+    Totales por unidad leídos del ledger en una sola consulta indexada.
+    Devuelve el mismo formato que _compute_tenant_statements —
+    {unit_id: (rows, total_charges, total_paid, balance, prev_debt_adeudo, has_active_plan)} —
+    con filas reducidas (period, charge, paid, paid_balance,
+    adeudo_received_for_period, maintenance, status, saldo_accum) y un booleano
+    en lugar del PaymentPlan.
+    Returns None cuando el ledger no aplica (inicio distinto de operation_start
+    o corte futuro); el llamador recurre entonces al cálculo completo.
+
+    Si faltan filas se completan solo esas unidades desde su primer período
+    faltante: hasta UNIT_LEDGER_INLINE_UNITS unidades (p.ej. una unidad nueva)
+    aquí mismo; más (cambio de mes, ledger invalidado) se encargan a un
+    ReportJob 'unit_ledger_refresh' y esta lectura devuelve None.
+    """
+    if start_period != _ledger_start(tenant) or cutoff_period > _today_period():
+        return None
+    periods = _periods_between(start_period, cutoff_period)
+    if not periods:
+        return None
+    unit_ids = [str(uid) for uid in Unit.objects.filter(tenant_id=tenant.id).values_list('id', flat=True)]
+    by_unit = {uid: [] for uid in unit_ids}
+    entries = UnitPeriodLedger.objects.filter(
+        tenant_id=tenant.id, period__gte=start_period, period__lte=cutoff_period,
+    ).order_by('unit_id', 'period')
+    for e in entries:
+        by_unit.setdefault(str(e.unit_id), []).append(e)
+
+    stale = {}
+    for uid in unit_ids:
+        stored = {e.period for e in by_unit[uid]}
+        missing = next((p for p in periods if p not in stored), None)
+        if missing is not None:
+            stale[uid] = missing
+    if stale:
+        if not _rebuild:
+            return None
+        if len(stale) > settings.UNIT_LEDGER_INLINE_UNITS:
+            _enqueue_ledger_refresh(tenant, stale)
+            return None
+        try:
+            _refresh_unit_ledger(tenant, stale)
+        except Exception:
+            import logging
+            logging.getLogger(__name__).exception(
+                'Error completing unit ledger for tenant %s (%s units)', tenant.id, len(stale)
+            )
+            return None
+        return _read_ledger_statements(tenant, start_period, cutoff_period, _rebuild=False)
+
+    result = {}
+    for uid in unit_ids:
+        rows = [{
+            'period': e.period,
+            'charge': float(e.charge),
+            'paid': float(e.paid),
+            'paid_balance': float(e.paid_balance),
+            'adeudo_received_for_period': float(e.adeudo_received),
+            'maintenance': float(e.maintenance),
+            'status': e.status,
+            'saldo_accum': float(e.saldo_acum),
+        } for e in by_unit[uid]]
+        total_charges = sum(r['charge'] for r in rows)
+        total_paid = sum(r['paid'] for r in rows)
+        balance = total_charges - sum(r['paid_balance'] for r in rows)
+        last = by_unit[uid][-1]
+        result[uid] = (
+            rows, float(total_charges), float(total_paid), float(balance),
+            float(last.prev_debt_adeudo), last.has_active_plan,
+        )
+    return result
+
+
+def _sql_tenant_statements(tenant, start_period, cutoff_period):
+    """
+    Estados de cuenta reducidos de todo el tenant calculados en una consulta
+    (core/statement_sql.py), con el formato de _read_ledger_statements.
+    """
+    cob_fields = list(ExtraField.objects.filter(
+        tenant_id=tenant.id, enabled=True
+    ).exclude(field_type='gastos'))
+    return statement_sql.tenant_statements(
+        tenant, _periods_between(start_period, cutoff_period), _today_period(),
+        cob_fields, _load_active_plans(tenant), ExemptionCalendar.for_tenant(tenant),
+    )
+
+
+def _summary_statements(tenant, start_period, cutoff_period):
+    """
+    Totales por unidad para reportes y dashboard: el ledger si cubre el rango;
+    si no, con STATEMENT_ENGINE='sql', el cálculo en SQL. None cuando ninguno
+    aplica; el llamador recurre a _compute_tenant_statements.
+    """
+    ledger = _read_ledger_statements(tenant, start_period, cutoff_period)
+    if ledger is not None or settings.STATEMENT_ENGINE != 'sql':
+        return ledger
+    return _sql_tenant_statements(tenant, start_period, cutoff_period) or None
+
+
 class EstadoCuentaView(APIView):
     """GET /api/tenants/{tenant_id}/estado-cuenta/?unit_id=X&from=YYYY-MM&to=YYYY-MM
        Without unit_id: returns units list with totals (for Estado por Unidad view)."""
@@ -4668,6 +5297,15 @@ class EstadoCuentaView(APIView):
         start_period = period_from or tenant.operation_start_date or '2024-01'
         cutoff = period_to or cutoff_param or _today_period()
 
+        data = cached_tenant_result(
+            tenant_id, 'estado-cuenta',
+            {'unit_id': unit_id, 'from': start_period, 'cutoff': cutoff, 'today': _today_period()},
+            lambda: self._build(tenant, unit_id, start_period, cutoff),
+        )
+        return Response(data)
+
+    def _build(self, tenant, unit_id, start_period, cutoff):
+        tenant_id = tenant.id
         if not unit_id:
             units = Unit.objects.filter(tenant_id=tenant_id).order_by('unit_id_code')
             unit_data = []
@@ -4688,16 +5326,12 @@ class EstadoCuentaView(APIView):
                                      'pagados': 0, 'parciales': 0, 'pendientes': 0, 'futuros': 0}
                 period_agg[p]['total_paid'] += amt
 
-            # Pre-fetch planes activos una sola vez para evitar N+1 queries en _compute_statement
-            _ec_unit_plans = {
-                str(_p.unit_id): _p
-                for _p in PaymentPlan.objects.filter(tenant_id=tenant_id, status='accepted')
-            }
+            statements = (
+                _summary_statements(tenant, start_period, cutoff)
+                or _compute_tenant_statements(tenant, start_period, cutoff)
+            )
             for unit in units:
-                rows, tc, tp, bal, pda, _unit_active_plan = _compute_statement(
-                    tenant, str(unit.id), start_period, cutoff,
-                    _prefetched_plan=_ec_unit_plans.get(str(unit.id)),
-                )
+                rows, tc, tp, bal, pda, _unit_active_plan = statements[str(unit.id)]
                 # Apply same adjustment as unit detail: include previous_debt and credit_balance
                 # When unit has active payment plan, previous_debt is absorbed into plan installments
                 prev_debt = float(unit.previous_debt or 0)
@@ -4741,7 +5375,7 @@ class EstadoCuentaView(APIView):
                     'credit_balance': str(credit_bal),
                 })
 
-            return Response({
+            return {
                 'tenant': TenantDetailSerializer(tenant).data,
                 'period': cutoff,
                 'units': unit_data,
@@ -4753,7 +5387,7 @@ class EstadoCuentaView(APIView):
                 'start_period': start_period,
                 'cutoff': cutoff,
                 'period_aggregates': sorted(period_agg.values(), key=lambda x: x['period']),
-            })
+            }
 
         unit = Unit.objects.get(id=unit_id, tenant_id=tenant_id)
 
@@ -4802,7 +5436,7 @@ class EstadoCuentaView(APIView):
         else:
             adjusted_balance = balance + previous_debt - prev_debt_adeudo_val - credit_balance
 
-        return Response({
+        return {
             'unit': UnitSerializer(unit).data,
             'periods': periods_out,
             'total_charges': str(total_charges),
@@ -4816,241 +5450,174 @@ class EstadoCuentaView(APIView):
             'credit_balance': credit_balance,
             'has_active_plan': active_plan is not None,
             'active_plan': PaymentPlanSerializer(active_plan).data if active_plan else None,
-        })
+        }
 
 
 # ═══════════════════════════════════════════════════════════
 #  REPORTE GENERAL — Replicates HTML computePeriodBankData + computeBankBalanceForPeriod
 # ═══════════════════════════════════════════════════════════
 
-def _payment_total_income(pay):
-    """Total income from payment (field_payments + additional_payments)."""
-    total = Decimal('0')
-    for fp in pay.field_payments.all():
-        total += Decimal(str(fp.received or 0))
-        for amt in (fp.adelanto_targets or {}).values():
-            total += Decimal(str(amt or 0))
-    ap = pay.adeudo_payments or {}
-    for _tp, field_map in ap.items():
-        for amt in (field_map or {}).values():
-            total += Decimal(str(amt or 0))
-    for ap_entry in (pay.additional_payments or []):
-        fp = ap_entry.get('field_payments') or ap_entry.get('fieldPayments') or {}
-        for v in fp.values():
-            rec = v.get('received', v) if isinstance(v, dict) else v
-            total += Decimal(str(rec or 0))
-    return total
-
-
 def _compute_report_data(tenant, period):
-    """Compute bank reconciliation data for a period (HTML computePeriodBankData)."""
-    units = Unit.objects.filter(tenant_id=tenant.id).order_by('unit_id_code')
-    cob_fields = list(ExtraField.objects.filter(
-        tenant_id=tenant.id, enabled=True
-    ).exclude(field_type='gastos'))
-    cf_map = {str(f.id): f for f in cob_fields}
-
-    payments = {
-        p.unit_id: p for p in
-        Payment.objects.filter(tenant_id=tenant.id, period=period).prefetch_related('field_payments')
-    }
-
-    ingreso_mantenimiento = Decimal('0')       # Mantenimiento del período (solo período actual)
-    ingreso_maint_adelanto = Decimal('0')      # Mantenimiento adelantado (otros períodos)
-    ingreso_adeudo = Decimal('0')              # Cobros de adeudos de períodos anteriores
-    ingresos_referenciados = Decimal('0')
+    """Compute bank reconciliation data for a period (HTML computePeriodBankData).
+    Los totales salen de PeriodIncomeRollup (core/income_rollup.py); solo se
+    leen los registros que el reporte lista: pagos sin conciliar, gastos e
+    ingresos no identificados."""
+    totals = income_rollup.totals(tenant.id, [period])[period]
+
+    def _total(concept, reconciled=True):
+        return totals.get((concept, reconciled), (Decimal('0'), 0))
+
+    labels = dict(
+        ExtraField.objects.filter(tenant_id=tenant.id, enabled=True)
+        .exclude(field_type='gastos').values_list('id', 'label')
+    )
+    labels = {str(k): v for k, v in labels.items()}
     ingresos_conceptos = {}
-    ingreso_units_count = 0
-    ingresos_no_reconciled = Decimal('0')
-    ingreso_no_recon_count = 0
-    ingresos_no_recon_details = []
-
-    for unit in units:
-        pay = payments.get(unit.id)
-        if not pay:
-            continue
-        if not pay.bank_reconciled:
-            pti = _payment_total_income(pay)
-            if pti > 0:
-                ingresos_no_reconciled += pti
-                ingreso_no_recon_count += 1
-                ingresos_no_recon_details.append({
-                    'unit_id': unit.unit_id_code,
-                    'unit_name': unit.unit_name,
-                    'amount': float(pti),
-                    'payment_type': pay.payment_type or '',
-                    'payment_date': str(pay.payment_date) if pay.payment_date else '',
-                })
-            continue
-        ingreso_units_count += 1
-        fp_map = {fp.field_key: fp for fp in pay.field_payments.all()}
+    for (concept, reconciled), (amount, _count) in sorted(totals.items()):
+        if reconciled and concept.startswith(income_rollup.CAMPO):
+            fk = concept[len(income_rollup.CAMPO):]
+            ingresos_conceptos[fk] = {'total': float(amount), 'label': labels.get(fk, fk)}
 
-        # Maintenance
-        maint = fp_map.get('maintenance')
-        if maint:
-            rec = Decimal(str(maint.received or 0))
-            if rec > 0:
-                from decimal import ROUND_FLOOR
-                int_rec = rec.quantize(Decimal('1'), rounding=ROUND_FLOOR)
-                cents = rec - int_rec
-                if cents > Decimal('0.001'):
-                    ingreso_mantenimiento += int_rec
-                    ingresos_referenciados += cents
-                else:
-                    ingreso_mantenimiento += rec
-
-        # Adelanto targets (maintenance) — pagos adelantados de mantenimiento
-        if maint and maint.adelanto_targets:
-            for amt in (maint.adelanto_targets or {}).values():
-                a = Decimal(str(amt or 0))
-                if a > 0:
-                    from decimal import ROUND_FLOOR
-                    int_a = a.quantize(Decimal('1'), rounding=ROUND_FLOOR)
-                    cents_a = a - int_a
-                    if cents_a > Decimal('0.001'):
-                        ingreso_maint_adelanto += int_a
-                        ingresos_referenciados += cents_a
-                    else:
-                        ingreso_maint_adelanto += a
-
-        # Extra cobranza fields
-        for fk, fp in fp_map.items():
-            if fk == 'maintenance':
-                continue
-            rec = Decimal(str((fp and fp.received) or 0))
-            if rec > 0:
-                if fk not in ingresos_conceptos:
-                    cf = cf_map.get(fk)
-                    ingresos_conceptos[fk] = {'total': Decimal('0'), 'label': getattr(cf, 'label', fk) if cf else fk}
-                from decimal import ROUND_FLOOR
-                int_rec = rec.quantize(Decimal('1'), rounding=ROUND_FLOOR)
-                cents_rec = rec - int_rec
-                if cents_rec > Decimal('0.001'):
-                    ingresos_conceptos[fk]['total'] += int_rec
-                    ingresos_referenciados += cents_rec
-                else:
-                    ingresos_conceptos[fk]['total'] += rec
-            if fp and fp.adelanto_targets:
-                for amt in fp.adelanto_targets.values():
-                    a2 = Decimal(str(amt or 0))
-                    if a2 > 0:
-                        if fk not in ingresos_conceptos:
-                            cf2 = cf_map.get(fk)
-                            ingresos_conceptos[fk] = {'total': Decimal('0'), 'label': getattr(cf2, 'label', fk) if cf2 else fk}
-                        ingresos_conceptos[fk]['total'] += a2
-
-        # Adeudo payments — todos los cobros de adeudos previos van a ingreso_adeudo (NO a mantenimiento)
-        ap = pay.adeudo_payments or {}
-        for _tp, field_map in ap.items():
-            for f_id, amt in (field_map or {}).items():
-                a3 = Decimal(str(amt or 0))
-                if a3 > 0:
-                    ingreso_adeudo += a3
-
-        # Additional payments (igual que HTML: cuando main está conciliado, incluir adicionales)
-        for ap_entry in (pay.additional_payments or []):
-            ap_recon = ap_entry.get('bank_reconciled', True)
-            if not pay.bank_reconciled and not ap_recon:
-                continue
-            fp_a = ap_entry.get('field_payments') or ap_entry.get('fieldPayments') or {}
-            for f_id, fd in fp_a.items():
-                a_r = Decimal(str((fd or {}).get('received', 0) or 0))
-                if a_r <= 0:
-                    continue
-                if f_id == 'maintenance':
-                    from decimal import ROUND_FLOOR
-                    int_ar = a_r.quantize(Decimal('1'), rounding=ROUND_FLOOR)
-                    cents_ar = a_r - int_ar
-                    if cents_ar > Decimal('0.001'):
-                        ingreso_mantenimiento += int_ar
-                        ingresos_referenciados += cents_ar
-                    else:
-                        ingreso_mantenimiento += a_r
-                else:
-                    if f_id not in ingresos_conceptos:
-                        cf_a = cf_map.get(f_id)
-                        ingresos_conceptos[f_id] = {'total': Decimal('0'), 'label': getattr(cf_a, 'label', f_id) if cf_a else f_id}
-                    ingresos_conceptos[f_id]['total'] += a_r
-
-    for cf in cob_fields:
-        fid = str(cf.id)
-        if fid in ingresos_conceptos:
-            ingresos_conceptos[fid]['label'] = cf.label
+    # Pagos sin conciliar: el reporte los lista por unidad
+    ingresos_no_recon_details = []
+    unreconciled = (
+        Payment.objects.lean(
+            'id', 'unit_id', 'payment_type', 'payment_date', 'additional_payments',
+            'unit__unit_id_code', 'unit__unit_name',
+        )
+        .filter(tenant_id=tenant.id, period=period, bank_reconciled=False)
+        .select_related('unit').prefetch_related(income_rollup.field_payments_prefetch())
+        .order_by('unit__unit_id_code')
+    )
+    adeudos = income_rollup.adeudo_by_payment(tenant_id=tenant.id, period=period, payment__bank_reconciled=False)
+    adelantos = income_rollup.adelantos_by_payment(tenant_id=tenant.id, period=period, payment__bank_reconciled=False)
+    for pay in unreconciled:
+        _received, adeudo_total = adeudos.get(pay.id, (Decimal('0'), Decimal('0')))
+        pti = income_rollup.payment_total_income(pay, adeudo_total, adelantos.get(pay.id))
+        if pti > 0:
+            ingresos_no_recon_details.append({
+                'unit_id': pay.unit.unit_id_code,
+                'unit_name': pay.unit.unit_name,
+                'amount': float(pti),
+                'payment_type': pay.payment_type or '',
+                'payment_date': str(pay.payment_date) if pay.payment_date else '',
+            })
 
     # Egresos: gastos conciliados vs cheques en tránsito
     egresos_reconciled = []
     cheques_transito = []
-    total_egresos = Decimal('0')
-    total_cheques = Decimal('0')
-
-    gastos = GastoEntry.objects.filter(tenant_id=tenant.id, period=period).select_related('field')
+    gastos = GastoEntry.objects.lean(
+        'amount', 'bank_reconciled', 'field_id_legacy', 'provider_name', 'notes', 'field__label',
+    ).filter(tenant_id=tenant.id, period=period, amount__gt=0).select_related('field')
     for g in gastos:
-        amt = Decimal(str(g.amount or 0))
-        if amt <= 0:
-            continue
         label = g.field.label if g.field else str(g.field_id_legacy or 'Gasto')
-        entry = {'label': label, 'amount': float(amt), 'provider': g.provider_name or '', 'notes': g.notes or ''}
-        if g.bank_reconciled:
-            egresos_reconciled.append(entry)
-            total_egresos += amt
-        else:
-            cheques_transito.append(entry)
-            total_cheques += amt
+        entry = {'label': label, 'amount': float(g.amount), 'provider': g.provider_name or '', 'notes': g.notes or ''}
+        (egresos_reconciled if g.bank_reconciled else cheques_transito).append(entry)
 
     # Nota: Caja chica NO se incluye en el reporte general (sólo se incluyen gastos)
 
     # Ingresos no identificados (UnrecognizedIncome)
-    ingresos_no_identificados = Decimal('0')
-    ingresos_no_identificados_list = []
-    for ui in UnrecognizedIncome.objects.filter(tenant_id=tenant.id, period=period):
-        amt = Decimal(str(ui.amount or 0))
-        if amt > 0:
-            ingresos_no_identificados += amt
-            ingresos_no_identificados_list.append({
-                'concept': ui.description or '',
-                'amount': float(amt),
-                'bank_reconciled': ui.bank_reconciled,
-            })
-
-    total_ingresos = ingreso_mantenimiento + ingreso_maint_adelanto + ingreso_adeudo + ingresos_referenciados + sum(
-        x['total'] for x in ingresos_conceptos.values()
-    ) + ingresos_no_identificados
+    ingresos_no_identificados_list = [
+        {'concept': ui.description or '', 'amount': float(ui.amount), 'bank_reconciled': ui.bank_reconciled}
+        for ui in UnrecognizedIncome.objects.filter(tenant_id=tenant.id, period=period, amount__gt=0)
+    ]
+    ingresos_no_identificados = (
+        _total(income_rollup.NO_IDENTIFICADOS)[0] + _total(income_rollup.NO_IDENTIFICADOS, False)[0]
+    )
 
     return {
-        'ingreso_mantenimiento': float(ingreso_mantenimiento),
-        'ingreso_maint_adelanto': float(ingreso_maint_adelanto),
-        'ingreso_adeudo': float(ingreso_adeudo),
-        'ingresos_referenciados': float(ingresos_referenciados),
-        'ingresos_conceptos': {k: {'total': float(v['total']), 'label': v['label']} for k, v in ingresos_conceptos.items()},
+        'ingreso_mantenimiento': float(_total(income_rollup.MANTENIMIENTO)[0]),
+        'ingreso_maint_adelanto': float(_total(income_rollup.MAINT_ADELANTO)[0]),
+        'ingreso_adeudo': float(_total(income_rollup.ADEUDO)[0]),
+        'ingresos_referenciados': float(_total(income_rollup.REFERENCIADOS)[0]),
+        'ingresos_conceptos': ingresos_conceptos,
         'ingresos_no_identificados': float(ingresos_no_identificados),
         'ingresos_no_identificados_list': ingresos_no_identificados_list,
-        'total_ingresos_reconciled': float(total_ingresos),
-        'ingreso_units_count': ingreso_units_count,
+        'total_ingresos_reconciled': float(income_rollup.reconciled_income(totals)),
+        'ingreso_units_count': _total(income_rollup.PAGOS)[1],
         'egresos_reconciled': egresos_reconciled,
         'cheques_transito': cheques_transito,
-        'total_egresos_reconciled': float(total_egresos),
-        'total_cheques_transito': float(total_cheques),
-        'ingresos_no_reconciled': float(ingresos_no_reconciled),
-        'ingreso_no_recon_count': ingreso_no_recon_count,
+        'total_egresos_reconciled': float(_total(income_rollup.EGRESOS)[0]),
+        'total_cheques_transito': float(_total(income_rollup.EGRESOS, False)[0]),
+        'ingresos_no_reconciled': float(_total(income_rollup.PAGOS, False)[0]),
+        'ingreso_no_recon_count': _total(income_rollup.PAGOS, False)[1],
         'ingresos_no_recon_details': ingresos_no_recon_details,
     }
 
 
 def _compute_saldo_inicial(tenant, target_period):
-    """Saldo inicial = bank_initial_balance + sum(ingresos-egresos) of all periods before target."""
+    """Saldo inicial = bank_initial_balance + sum(ingresos-egresos) of all periods before target.
+    Parte del closing_bank_balance del último período cerrado (sin huecos
+    desde el inicio) y suma solo los períodos posteriores: los cerrados con
+    su snapshot y los abiertos con los totales de PeriodIncomeRollup."""
     start = getattr(tenant, 'operation_start_date', None) or '2024-01'
     periods = _periods_between(start, target_period)
     if not periods or target_period not in periods:
         return float(tenant.bank_initial_balance or 0)
-    idx = periods.index(target_period) if target_period in periods else len(periods)
-    prev_periods = periods[:idx]
+    prev_periods = periods[:periods.index(target_period)]
+    snapshots = {
+        cp.period: cp for cp in ClosedPeriod.objects.filter(
+            tenant_id=tenant.id, period__in=prev_periods, snapshot_at__isnull=False,
+        )
+    }
     running = Decimal(str(tenant.bank_initial_balance or 0))
-    for p in prev_periods:
-        data = _compute_report_data(tenant, p)
-        running += Decimal(str(data['total_ingresos_reconciled'])) - Decimal(str(data['total_egresos_reconciled']))
+    seed = 0
+    for i, period in enumerate(prev_periods):
+        snap = snapshots.get(period)
+        if snap is None:
+            break
+        if snap.closing_bank_balance is not None:
+            running, seed = snap.closing_bank_balance, i + 1
+    prev_periods = prev_periods[seed:]
+    for period in prev_periods:
+        if period in snapshots:
+            running += snapshots[period].ingresos_reconciled - snapshots[period].egresos_reconciled
+    open_periods = [p for p in prev_periods if p not in snapshots]
+    for ingresos, egresos in income_rollup.bank_movements(tenant.id, open_periods).values():
+        running += ingresos - egresos
     return float(running)
 
 
+def _snapshot_closed_period(tenant, closed_period):
+    """Guarda en el ClosedPeriod los ingresos/egresos conciliados y el saldo bancario final.
+    El saldo final solo se guarda si todos los períodos anteriores ya están
+    cerrados: si alguno sigue abierto puede cambiar y el saldo quedaría viejo.
+    Un error aquí no debe impedir el cierre: sin snapshot el período se recalcula."""
+    try:
+        data = _compute_report_data(tenant, closed_period.period)
+        ingresos = Decimal(str(data['total_ingresos_reconciled']))
+        egresos = Decimal(str(data['total_egresos_reconciled']))
+        start = getattr(tenant, 'operation_start_date', None) or '2024-01'
+        earlier = _periods_between(start, closed_period.period)[:-1]
+        earlier_closed = ClosedPeriod.objects.filter(
+            tenant_id=tenant.id, period__in=earlier, snapshot_at__isnull=False,
+        ).count()
+        closed_period.ingresos_reconciled = ingresos
+        closed_period.egresos_reconciled = egresos
+        closed_period.closing_bank_balance = None
+        if earlier_closed == len(earlier):
+            opening = Decimal(str(_compute_saldo_inicial(tenant, closed_period.period)))
+            closed_period.closing_bank_balance = opening + ingresos - egresos
+        closed_period.snapshot_at = timezone.now()
+        closed_period.save(update_fields=[
+            'ingresos_reconciled', 'egresos_reconciled', 'closing_bank_balance', 'snapshot_at',
+        ])
+    except Exception:
+        import logging
+        logging.getLogger(__name__).exception(
+            'Error saving bank snapshot for tenant %s period %s', tenant.id, closed_period.period
+        )
+
+
+def _invalidate_period_snapshots(tenant_id, period):
+    """Al reabrir *period* su snapshot desaparece con el ClosedPeriod; los saldos finales
+    de los períodos cerrados posteriores lo arrastran y dejan de ser válidos.
+    (Los ingresos/egresos de cada período no dependen de otros y se conservan.)"""
+    ClosedPeriod.objects.filter(
+        tenant_id=tenant_id, period__gt=period,
+    ).update(closing_bank_balance=None)
+
+
 class ReporteAdeudosView(APIView):
     """GET /api/tenants/{tenant_id}/reporte-adeudos/?cutoff=YYYY-MM
     Returns per-unit debt breakdown: previous debt + unpaid periods up to cutoff."""
@@ -5059,6 +5626,13 @@ class ReporteAdeudosView(APIView):
     def get(self, request, tenant_id):
         cutoff = request.query_params.get('cutoff') or _today_period()
 
+        data = cached_tenant_result(
+            tenant_id, 'reporte-adeudos', {'cutoff': cutoff, 'today': _today_period()},
+            lambda: self._build(tenant_id, cutoff),
+        )
+        return Response(data)
+
+    def _build(self, tenant_id, cutoff):
         tenant = Tenant.objects.get(id=tenant_id)
         start_period = tenant.operation_start_date or '2024-01'
         units = Unit.objects.filter(tenant_id=tenant_id).order_by('unit_id_code')
@@ -5067,17 +5641,13 @@ class ReporteAdeudosView(APIView):
         grand_total = Decimal('0')
         units_with_debt = 0
 
-        # Pre-fetch planes activos una sola vez para evitar N+1 queries en _compute_statement
-        _ra_unit_plans = {
-            str(_p.unit_id): _p
-            for _p in PaymentPlan.objects.filter(tenant_id=tenant_id, status='accepted')
-        }
+        statements = (
+            _summary_statements(tenant, start_period, cutoff)
+            or _compute_tenant_statements(tenant, start_period, cutoff)
+        )
 
         for unit in units:
-            rows, tc, tp, bal, prev_debt_adeudo, _u_active_plan = _compute_statement(
-                tenant, str(unit.id), start_period, cutoff,
-                _prefetched_plan=_ra_unit_plans.get(str(unit.id)),
-            )
+            rows, tc, tp, bal, prev_debt_adeudo, _u_active_plan = statements[str(unit.id)]
             previous_debt = Decimal(str(unit.previous_debt or 0))
             credit_balance = Decimal(str(unit.credit_balance or 0))
             prev_debt_adeudo_dec = Decimal(str(prev_debt_adeudo))
@@ -5132,7 +5702,7 @@ class ReporteAdeudosView(APIView):
 
         result.sort(key=lambda x: x['total_adeudo'], reverse=True)
 
-        return Response({
+        return {
             'tenant': TenantDetailSerializer(tenant).data,
             'cutoff': cutoff,
             'start_period': start_period,
@@ -5140,7 +5710,7 @@ class ReporteAdeudosView(APIView):
             'grand_total_adeudo': float(grand_total),
             'units_with_debt': units_with_debt,
             'total_units': units.count(),
-        })
+        }
 
 
 class ReporteGeneralView(APIView):
@@ -5154,13 +5724,28 @@ class ReporteGeneralView(APIView):
             period = date.today().strftime('%Y-%m')
 
         tenant = Tenant.objects.get(id=tenant_id)
-        units = Unit.objects.filter(tenant_id=tenant_id).order_by('unit_id_code')
+        # Período sellado (él y todos los anteriores cerrados): no cambia con
+        # movimientos de períodos abiertos → cache sin expiración.
+        start = tenant.operation_start_date or '2024-01'
+        prev_and_current = _periods_between(start, period)
+        sealed = bool(prev_and_current) and ClosedPeriod.objects.filter(
+            tenant_id=tenant_id, period__in=prev_and_current,
+        ).count() == len(prev_and_current)
+
+        data = cached_tenant_result(
+            tenant_id, 'reporte-general', {'period': period},
+            lambda: self._build(tenant, period), sealed=sealed,
+        )
+        return Response(data)
+
+    def _build(self, tenant, period):
+        units = Unit.objects.filter(tenant_id=tenant.id).order_by('unit_id_code')
 
         report_data = _compute_report_data(tenant, period)
         saldo_inicial = _compute_saldo_inicial(tenant, period)
         saldo_final = saldo_inicial + report_data['total_ingresos_reconciled'] - report_data['total_egresos_reconciled']
 
-        return Response({
+        return {
             'tenant': TenantDetailSerializer(tenant).data,
             'period': period,
             'units_count': units.count(),
@@ -5168,15 +5753,27 @@ class ReporteGeneralView(APIView):
             'saldo_final': saldo_final,
             'report_data': report_data,
             'is_closed': ClosedPeriod.objects.filter(
-                tenant_id=tenant_id, period=period
+                tenant_id=tenant.id, period=period
             ).exists(),
-        })
+        }
 
 
 # ═══════════════════════════════════════════════════════════
 #  EMAIL — ESTADO DE CUENTA POR UNIDAD
 # ═══════════════════════════════════════════════════════════
 
+def _unit_statement_recipients(unit, recipients):
+    """Correos de la unidad según recipients: 'owner' | 'coowner' | 'tenant' | 'both'."""
+    emails = []
+    if recipients in ('owner', 'both') and (unit.owner_email or '').strip():
+        emails.append(unit.owner_email.strip())
+    if recipients in ('coowner', 'both') and (unit.coowner_email or '').strip():
+        emails.append(unit.coowner_email.strip())
+    if recipients in ('tenant', 'both') and (unit.tenant_email or '').strip():
+        emails.append(unit.tenant_email.strip())
+    return emails
+
+
 class SendUnitStatementEmailView(APIView):
     """POST /api/tenants/{tenant_id}/send-unit-statement-email/
        Sends the estado de cuenta for a single unit by email."""
@@ -5200,13 +5797,7 @@ class SendUnitStatementEmailView(APIView):
         if emails_param and isinstance(emails_param, list):
             emails = [e.strip() for e in emails_param if isinstance(e, str) and e.strip()]
         else:
-            emails = []
-            if recipients in ('owner', 'both') and (unit.owner_email or '').strip():
-                emails.append(unit.owner_email.strip())
-            if recipients in ('coowner', 'both') and (unit.coowner_email or '').strip():
-                emails.append(unit.coowner_email.strip())
-            if recipients in ('tenant', 'both') and (unit.tenant_email or '').strip():
-                emails.append(unit.tenant_email.strip())
+            emails = _unit_statement_recipients(unit, recipients)
 
         if not emails:
             return Response(
@@ -5271,24 +5862,244 @@ class SendUnitStatementEmailView(APIView):
         return Response({'detail': 'Error al enviar el correo. Verifica la configuración SMTP.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+# ═══════════════════════════════════════════════════════════
+#  EMAIL — ESTADOS DE CUENTA A TODAS LAS UNIDADES
+# ═══════════════════════════════════════════════════════════
+
+def _send_statement_campaign(tenant, job):
+    """
+    Envía el estado de cuenta (con PDF) de cada StatementDelivery pendiente
+    del trabajo 'statement_campaign'.
+
+    Lotes de STATEMENT_EMAIL_BATCH_SIZE unidades: los estados de cuenta del
+    lote se calculan juntos con _compute_tenant_statements, cada mensaje se
+    arma con _make_mime_message (send_branded_batch) y todos los lotes usan
+    la misma conexión SMTP, con STATEMENT_EMAIL_BATCH_PAUSE segundos entre
+    lotes para no exceder el límite de envío del proveedor. El estado de
+    cada unidad se guarda al terminar su lote.
+
+    Cada lote se toma con SELECT … FOR UPDATE SKIP LOCKED dentro de su propia
+    transacción y antes de cada lote se renueva el heartbeat del trabajo
+    (core/jobs.py): si el trabajo se reencoló por lento, este worker lo
+    abandona y nunca hay dos enviando la misma unidad.
+    """
+    import time
+    from django.core.mail import get_connection
+    from django.db import transaction
+    from .jobs import heartbeat
+
+    start_period = job.params['from_period']
+    to_period = job.params['to_period']
+    tenant_name = getattr(tenant, 'razon_social', '') or tenant.name or ''
+    batch_size = max(1, settings.STATEMENT_EMAIL_BATCH_SIZE)
+    pending = (
+        job.statement_deliveries.filter(status='pending')
+        .select_related('unit')
+        .select_for_update(skip_locked=True, of=('self',))
+        .order_by('unit__unit_id_code')
+    )
+
+    connection = get_connection(fail_silently=False)
+    try:
+        first = True
+        while True:
+            if not first:
+                time.sleep(settings.STATEMENT_EMAIL_BATCH_PAUSE)
+            heartbeat(job, force=not first)
+            first = False
+            with transaction.atomic():
+                batch = list(pending[:batch_size])
+                if not batch:
+                    break
+                _send_statement_batch(tenant, tenant_name, batch, start_period, to_period, connection)
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    counts = dict(job.statement_deliveries.values_list('status').annotate(n=Count('id')).values_list('status', 'n'))
+    return {key: counts.get(key, 0) for key in ('sent', 'failed', 'skipped')}
+
+
+def _send_statement_batch(tenant, tenant_name, batch, start_period, to_period, connection):
+    """Arma y envía los correos de un lote de StatementDelivery y guarda su estado."""
+    from .email_service import build_unit_statement_email, send_branded_batch
+
+    statements = _compute_tenant_statements(
+        tenant, start_period, to_period, unit_ids=[d.unit_id for d in batch],
+    )
+    messages = []
+    for delivery in batch:
+        unit = delivery.unit
+        rows, total_charges, total_paid, adj_balance = _unit_statement_rows(
+            unit, statements[str(unit.id)]
+        )
+        subject, plain, html = build_unit_statement_email(
+            tenant_name, unit.unit_id_code or '', unit.unit_name or '',
+            unit.responsible_name or '',
+            _period_label_es(start_period), _period_label_es(to_period),
+            rows, total_charges, total_paid, adj_balance,
+        )
+        pdf_bytes = _generate_unit_statement_pdf(
+            tenant, unit, rows, total_charges, total_paid, adj_balance,
+            start_period, to_period,
+        )
+        messages.append({
+            'subject': subject,
+            'plain': plain,
+            'html': html,
+            'to_emails': delivery.emails,
+            'pdf_attachment': (
+                _unit_statement_pdf_filename(unit, to_period), pdf_bytes, 'application/pdf',
+            ) if pdf_bytes else None,
+        })
+
+    results = send_branded_batch(messages, connection=connection)
+    now = timezone.now()
+    for delivery, (ok, error) in zip(batch, results):
+        delivery.status = 'sent' if ok else 'failed'
+        delivery.error = error[:2000]
+        delivery.sent_at = now if ok else None
+    StatementDelivery.objects.bulk_update(batch, ['status', 'error', 'sent_at'])
+
+
+class SendAllStatementsEmailView(APIView):
+    """
+    POST /api/tenants/{tenant_id}/send-statements-all/
+    Body: {from_period?, to_period?, recipients?: 'owner' | 'coowner' | 'tenant' | 'both'}
+    Encola el envío del estado de cuenta a todas las unidades (ReportJob
+    'statement_campaign') y responde 202. Las unidades sin correo quedan
+    como 'skipped'. Avance: GET report-jobs/{id}/progress/.
+    """
+    permission_classes = [IsAdminOrTesorero]
+
+    def post(self, request, tenant_id=None):
+        from django.db import transaction
+        tenant = Tenant.objects.get(id=tenant_id)
+        start_period = request.data.get('from_period', '') or tenant.operation_start_date or '2024-01'
+        to_period = request.data.get('to_period', '') or _today_period()
+        recipients = request.data.get('recipients', 'owner')
+        if recipients not in ('owner', 'coowner', 'tenant', 'both'):
+            return Response({'detail': 'recipients no válido.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        units = Unit.objects.filter(tenant_id=tenant.id).only(
+            'id', 'owner_email', 'coowner_email', 'tenant_email',
+        )
+        with transaction.atomic():
+            job = enqueue_job(tenant, request.user, 'statement_campaign', {
+                'from_period': start_period, 'to_period': to_period, 'recipients': recipients,
+            })
+            deliveries = []
+            for unit in units:
+                emails = _unit_statement_recipients(unit, recipients)
+                deliveries.append(StatementDelivery(
+                    job=job, unit=unit, emails=emails,
+                    status='pending' if emails else 'skipped',
+                ))
+            StatementDelivery.objects.bulk_create(deliveries)
+
+        data = ReportJobSerializer(job, context={'request': request}).data
+        data['total'] = len(deliveries)
+        data['skipped'] = sum(1 for d in deliveries if d.status == 'skipped')
+        data['progress_url'] = f'/api/tenants/{tenant.id}/report-jobs/{job.id}/progress/'
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
+
 # ═══════════════════════════════════════════════════════════
 #  EMAIL — VECINO ENVÍA SU PROPIO ESTADO DE CUENTA
 # ═══════════════════════════════════════════════════════════
 
-def _generate_receipt_pdf(tenant, unit, payment, receipt_data):
+def _receipt_pdf_filename(payment):
+    period_safe = payment.period.replace('-', '')
+    unit_safe = ''.join(c if c.isalnum() or c in '-_' else '_' for c in (payment.unit.unit_id_code or 'unidad'))
+    return f'recibo_{unit_safe}_{period_safe}.pdf'
+
+
+def _ensure_receipt_pdf(tenant, payment, extra_fields=None, receipt_data=None, exemptions=None):
+    """
+    Nombre en default_storage del recibo PDF de *payment* (core/receipt_cache.py).
+    Solo se genera si no existe uno para la versión actual del pago, la unidad,
+    los campos extra y el condominio. None si reportlab no está instalado.
+    exemptions: ExemptionCalendar ya construido por el llamador.
+    """
+    unit = payment.unit
+    if extra_fields is None:
+        extra_fields = list(ExtraField.objects.filter(tenant_id=tenant.id, enabled=True))
+    if exemptions is None:
+        exemptions = ExemptionCalendar.for_tenant(tenant, units=[unit])
+    exempt = exemptions.is_exempt(unit.id, payment.period)
+    plans = {
+        str(plan.id): plan
+        for plan in PaymentPlan.objects.filter(tenant_id=tenant.id, unit_id=unit.id).filter(
+            Q(status='accepted') | Q(id__in=_receipt_plan_ids(payment))
+        )
+    }
+    name = receipt_cache.receipt_name(tenant, unit, payment, extra_fields, exempt, plans.values())
+    if receipt_cache.exists(name):
+        return name
+
+    if receipt_data is None:
+        receipt_data = _compute_receipt_email_data(
+            payment, unit, tenant, extra_fields, exemptions=exemptions, plans=plans,
+        )
+    pdf_bytes = _generate_receipt_pdf(tenant, unit, payment, receipt_data, exempt=exempt)
+    if pdf_bytes is None:
+        return None
+    return receipt_cache.store(name, pdf_bytes)
+
+
+def _build_receipt_pdf_file(tenant, payment):
+    """Recibo de pago en PDF. Devuelve (filename, pdf_bytes); pdf_bytes es None si reportlab no está instalado."""
+    name = _ensure_receipt_pdf(tenant, payment)
+    pdf_bytes = receipt_cache.read(name) if name else None
+    return _receipt_pdf_filename(payment), pdf_bytes
+
+
+def _receipt_pdf_template(out, pending=None):
+    """
+    SimpleDocTemplate del recibo. pending: iterador de bloques de flowables
+    que se piden a medida que se dibuja (varios recibos en un solo PDF).
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate
+
+    class _ReceiptDocTemplate(SimpleDocTemplate):
+        def filterFlowables(self, flowables):
+            if pending is not None and len(flowables) <= 1:
+                flowables.extend(next(pending, []))
+
+    margin = 1.8 * cm
+    return _ReceiptDocTemplate(
+        out, pagesize=A4,
+        leftMargin=margin, rightMargin=margin,
+        topMargin=1.4 * cm, bottomMargin=1.6 * cm,
+    )
+
+
+def _generate_receipt_pdf(tenant, unit, payment, receipt_data, exempt=None):
     """
     Generate a single-page receipt PDF for a payment.
     Returns bytes or None if reportlab is not installed.
+    exempt: exención ya resuelta (receipts-batch renderiza en procesos sin base de datos).
     """
     import io as _io
+    story = _receipt_pdf_story(tenant, unit, payment, receipt_data, exempt)
+    if story is None:
+        return None
+    buf = _io.BytesIO()
+    _receipt_pdf_template(buf).build(story)
+    return buf.getvalue()
+
+
+def _receipt_pdf_story(tenant, unit, payment, receipt_data, exempt=None):
+    """Flowables de un recibo de pago, o None si reportlab no está instalado."""
     try:
         from reportlab.lib.pagesizes import A4
         from reportlab.lib import colors
         from reportlab.lib.units import cm
-        from reportlab.platypus import (
-            SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer,
-        )
-        from reportlab.lib.styles import ParagraphStyle
+        from reportlab.platypus import Table, TableStyle, Paragraph, Spacer
         from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
     except ImportError:
         return None
@@ -5314,28 +6125,20 @@ def _generate_receipt_pdf(tenant, unit, payment, receipt_data):
         'parcial': 'Parcial', 'pendiente': 'Pendiente',
     }
 
-    buf = _io.BytesIO()
-    margin = 1.8 * cm
-    doc = SimpleDocTemplate(
-        buf, pagesize=A4,
-        leftMargin=margin, rightMargin=margin,
-        topMargin=1.4 * cm, bottomMargin=1.6 * cm,
-    )
-
-    W = A4[0] - 2 * margin
-
-    st_hdr_title = ParagraphStyle('HT', fontSize=13, fontName='Helvetica-Bold', textColor=COL_WHITE)
-    st_hdr_sub   = ParagraphStyle('HS', fontSize=10, fontName='Helvetica', textColor=colors.HexColor('#b2dcd8'))
-    st_hdr_right = ParagraphStyle('HR', fontSize=14, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)
-    st_info_lbl  = ParagraphStyle('IL', fontSize=8, fontName='Helvetica', textColor=COL_INK_LT)
-    st_info_val  = ParagraphStyle('IV', fontSize=9.5, fontName='Helvetica-Bold', textColor=COL_INK, leading=12)
-    st_col_hdr   = ParagraphStyle('CH', fontSize=8.5, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_CENTER)
-    st_cell      = ParagraphStyle('CE', fontSize=8.5, fontName='Helvetica', textColor=COL_INK)
-    st_cell_r    = ParagraphStyle('CR', fontSize=8.5, fontName='Helvetica', textColor=COL_INK, alignment=TA_RIGHT)
-    st_section   = ParagraphStyle('SC', fontSize=8, fontName='Helvetica-Bold', textColor=COL_TEAL)
-    st_total_lbl = ParagraphStyle('TL', fontSize=10, fontName='Helvetica-Bold', textColor=COL_WHITE)
-    st_total_val = ParagraphStyle('TV', fontSize=10, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)
-    st_status    = ParagraphStyle('ST', fontSize=11, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_CENTER)
+    W = A4[0] - 2 * 1.8 * cm
+
+    st_hdr_title = pdf_style('HT', fontSize=13, fontName='Helvetica-Bold', textColor=COL_WHITE)
+    st_hdr_sub   = pdf_style('HS', fontSize=10, fontName='Helvetica', textColor=colors.HexColor('#b2dcd8'))
+    st_hdr_right = pdf_style('HR', fontSize=14, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)
+    st_info_lbl  = pdf_style('IL', fontSize=8, fontName='Helvetica', textColor=COL_INK_LT)
+    st_info_val  = pdf_style('IV', fontSize=9.5, fontName='Helvetica-Bold', textColor=COL_INK, leading=12)
+    st_col_hdr   = pdf_style('CH', fontSize=8.5, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_CENTER)
+    st_cell      = pdf_style('CE', fontSize=8.5, fontName='Helvetica', textColor=COL_INK)
+    st_cell_r    = pdf_style('CR', fontSize=8.5, fontName='Helvetica', textColor=COL_INK, alignment=TA_RIGHT)
+    st_section   = pdf_style('SC', fontSize=8, fontName='Helvetica-Bold', textColor=COL_TEAL)
+    st_total_lbl = pdf_style('TL', fontSize=10, fontName='Helvetica-Bold', textColor=COL_WHITE)
+    st_total_val = pdf_style('TV', fontSize=10, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)
+    st_status    = pdf_style('ST', fontSize=11, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_CENTER)
 
     story = []
 
@@ -5460,8 +6263,10 @@ def _generate_receipt_pdf(tenant, unit, payment, receipt_data):
     saldo         = receipt_data.get('saldo', 0)
 
     pay_status = payment.status or 'pendiente'
-    # Override with exento if unit is exempt
-    if unit.admin_exempt:
+    # Override with exento if unit is exempt in the payment period
+    if exempt is None:
+        exempt = ExemptionCalendar.for_tenant(tenant, units=[unit]).is_exempt(unit.id, payment.period)
+    if exempt:
         pay_status = 'exento'
     st_color = STATUS_COLORS.get(pay_status, COL_CORAL)
     st_label = STATUS_LABELS_MAP.get(pay_status, pay_status.capitalize())
@@ -5494,12 +6299,10 @@ def _generate_receipt_pdf(tenant, unit, payment, receipt_data):
     from datetime import date as _date
     today_str = _date.today().strftime('%d/%m/%Y')
     story.append(Table([[
-        Paragraph(f'Documento generado el {today_str} · {tenant_display}', ParagraphStyle('FT', fontSize=7, fontName='Helvetica', textColor=COL_INK_LT)),
-        Paragraph('Homly · Sistema de Gestión Condominial', ParagraphStyle('FR', fontSize=7, fontName='Helvetica', textColor=COL_INK_LT, alignment=TA_RIGHT)),
+        Paragraph(f'Documento generado el {today_str} · {tenant_display}', pdf_style('FT', fontSize=7, fontName='Helvetica', textColor=COL_INK_LT)),
+        Paragraph('Homly · Sistema de Gestión Condominial', pdf_style('FR', fontSize=7, fontName='Helvetica', textColor=COL_INK_LT, alignment=TA_RIGHT)),
     ]], colWidths=[W * 0.6, W * 0.4]))
-
-    doc.build(story)
-    return buf.getvalue()
+    return story
 
 
 def _generate_unit_statement_pdf(tenant, unit, rows, total_charges, total_paid, adj_balance, from_period, to_period):
@@ -5517,7 +6320,6 @@ def _generate_unit_statement_pdf(tenant, unit, rows, total_charges, total_paid,
         from reportlab.platypus import (
             SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, HRFlowable,
         )
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
         from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
     except ImportError:
         return None
@@ -5570,15 +6372,14 @@ def _generate_unit_statement_pdf(tenant, unit, rows, total_charges, total_paid,
         topMargin=1.4 * cm, bottomMargin=1.6 * cm,
     )
 
-    styles = getSampleStyleSheet()
-    st_title   = ParagraphStyle('T', fontSize=16, fontName='Helvetica-Bold', textColor=COL_INK, spaceAfter=2, leading=20)
-    st_sub     = ParagraphStyle('S', fontSize=9,  fontName='Helvetica', textColor=COL_INK_LIGHT, spaceAfter=1)
-    st_info    = ParagraphStyle('I', fontSize=8.5, fontName='Helvetica', textColor=COL_INK_LIGHT, spaceAfter=1, leading=11)
-    st_bold    = ParagraphStyle('B', fontSize=10, fontName='Helvetica-Bold', textColor=COL_INK)
-    st_center  = ParagraphStyle('C', fontSize=9,  fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_CENTER)
-    st_right   = ParagraphStyle('R', fontSize=9,  fontName='Helvetica', textColor=COL_INK, alignment=TA_RIGHT)
-    st_kpi_val = ParagraphStyle('KV', fontSize=13, fontName='Helvetica-Bold', textColor=COL_INK, alignment=TA_CENTER, leading=16)
-    st_kpi_lbl = ParagraphStyle('KL', fontSize=7.5, fontName='Helvetica', textColor=COL_INK_LIGHT, alignment=TA_CENTER)
+    st_title   = pdf_style('T', fontSize=16, fontName='Helvetica-Bold', textColor=COL_INK, spaceAfter=2, leading=20)
+    st_sub     = pdf_style('S', fontSize=9,  fontName='Helvetica', textColor=COL_INK_LIGHT, spaceAfter=1)
+    st_info    = pdf_style('I', fontSize=8.5, fontName='Helvetica', textColor=COL_INK_LIGHT, spaceAfter=1, leading=11)
+    st_bold    = pdf_style('B', fontSize=10, fontName='Helvetica-Bold', textColor=COL_INK)
+    st_center  = pdf_style('C', fontSize=9,  fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_CENTER)
+    st_right   = pdf_style('R', fontSize=9,  fontName='Helvetica', textColor=COL_INK, alignment=TA_RIGHT)
+    st_kpi_val = pdf_style('KV', fontSize=13, fontName='Helvetica-Bold', textColor=COL_INK, alignment=TA_CENTER, leading=16)
+    st_kpi_lbl = pdf_style('KL', fontSize=7.5, fontName='Helvetica', textColor=COL_INK_LIGHT, alignment=TA_CENTER)
 
     story = []
 
@@ -5588,8 +6389,8 @@ def _generate_unit_statement_pdf(tenant, unit, rows, total_charges, total_paid,
     rfc_str        = getattr(tenant, 'rfc', '') or ''
 
     header_data = [[
-        Paragraph(f'<b>{tenant_display}</b>', ParagraphStyle('HD', fontSize=12, fontName='Helvetica-Bold', textColor=COL_WHITE)),
-        Paragraph('Estado de Cuenta', ParagraphStyle('HT', fontSize=14, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)),
+        Paragraph(f'<b>{tenant_display}</b>', pdf_style('HD', fontSize=12, fontName='Helvetica-Bold', textColor=COL_WHITE)),
+        Paragraph('Estado de Cuenta', pdf_style('HT', fontSize=14, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)),
     ]]
     header_tbl = Table(header_data, colWidths=[None, 6*cm])
     header_tbl.setStyle(TableStyle([
@@ -5633,9 +6434,9 @@ def _generate_unit_statement_pdf(tenant, unit, rows, total_charges, total_paid,
     # ── KPI row ──
     saldo_color = COL_CORAL if adj_balance > 0.01 else COL_GREEN_OK
     kpi_data = [[
-        Paragraph(f'<b>{fmt_cur(total_charges)}</b>', ParagraphStyle('K1', fontSize=13, fontName='Helvetica-Bold', textColor=COL_INK, alignment=TA_CENTER, leading=16)),
-        Paragraph(f'<b>{fmt_cur(total_paid)}</b>', ParagraphStyle('K2', fontSize=13, fontName='Helvetica-Bold', textColor=COL_GREEN_OK, alignment=TA_CENTER, leading=16)),
-        Paragraph(f'<b>{fmt_cur(adj_balance)}</b>', ParagraphStyle('K3', fontSize=13, fontName='Helvetica-Bold', textColor=saldo_color, alignment=TA_CENTER, leading=16)),
+        Paragraph(f'<b>{fmt_cur(total_charges)}</b>', pdf_style('K1', fontSize=13, fontName='Helvetica-Bold', textColor=COL_INK, alignment=TA_CENTER, leading=16)),
+        Paragraph(f'<b>{fmt_cur(total_paid)}</b>', pdf_style('K2', fontSize=13, fontName='Helvetica-Bold', textColor=COL_GREEN_OK, alignment=TA_CENTER, leading=16)),
+        Paragraph(f'<b>{fmt_cur(adj_balance)}</b>', pdf_style('K3', fontSize=13, fontName='Helvetica-Bold', textColor=saldo_color, alignment=TA_CENTER, leading=16)),
     ],[
         Paragraph('Total Cargos', st_kpi_lbl),
         Paragraph('Total Abonado', st_kpi_lbl),
@@ -5658,11 +6459,11 @@ def _generate_unit_statement_pdf(tenant, unit, rows, total_charges, total_paid,
     col_widths = [col_w*0.28, col_w*0.18, col_w*0.18, col_w*0.20, col_w*0.16]
 
     detail_rows = [[
-        Paragraph('Período',           ParagraphStyle('DH', fontSize=9, fontName='Helvetica-Bold', textColor=COL_WHITE)),
-        Paragraph('Cargo',             ParagraphStyle('DH', fontSize=9, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)),
-        Paragraph('Abono',             ParagraphStyle('DH', fontSize=9, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)),
-        Paragraph('Saldo Acum.',       ParagraphStyle('DH', fontSize=9, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)),
-        Paragraph('Estado',            ParagraphStyle('DH', fontSize=9, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_CENTER)),
+        Paragraph('Período',           pdf_style('DH', fontSize=9, fontName='Helvetica-Bold', textColor=COL_WHITE)),
+        Paragraph('Cargo',             pdf_style('DH', fontSize=9, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)),
+        Paragraph('Abono',             pdf_style('DH', fontSize=9, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)),
+        Paragraph('Saldo Acum.',       pdf_style('DH', fontSize=9, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_RIGHT)),
+        Paragraph('Estado',            pdf_style('DH', fontSize=9, fontName='Helvetica-Bold', textColor=COL_WHITE, alignment=TA_CENTER)),
     ]]
 
     row_styles = []
@@ -5674,11 +6475,11 @@ def _generate_unit_statement_pdf(tenant, unit, rows, total_charges, total_paid,
         bg = COL_SAND if i % 2 == 0 else COL_WHITE
 
         detail_rows.append([
-            Paragraph(row.get('period', ''), ParagraphStyle('DR', fontSize=8.5, fontName='Helvetica', textColor=COL_INK)),
-            Paragraph(fmt_cur(row.get('charges', 0)), ParagraphStyle('DR', fontSize=8.5, fontName='Helvetica', textColor=COL_INK, alignment=TA_RIGHT)),
-            Paragraph(fmt_cur(row.get('paid', 0)), ParagraphStyle('DR', fontSize=8.5, fontName='Helvetica', textColor=COL_GREEN_OK, alignment=TA_RIGHT)),
-            Paragraph(fmt_cur(bal_val), ParagraphStyle('DR', fontSize=8.5, fontName='Helvetica', textColor=bal_color, alignment=TA_RIGHT)),
-            Paragraph(st_label, ParagraphStyle('DS', fontSize=8.5, fontName='Helvetica-Bold', textColor=st_col, alignment=TA_CENTER)),
+            Paragraph(row.get('period', ''), pdf_style('DR', fontSize=8.5, fontName='Helvetica', textColor=COL_INK, alignment=TA_LEFT)),
+            Paragraph(fmt_cur(row.get('charges', 0)), pdf_style('DR', fontSize=8.5, fontName='Helvetica', textColor=COL_INK, alignment=TA_RIGHT)),
+            Paragraph(fmt_cur(row.get('paid', 0)), pdf_style('DR', fontSize=8.5, fontName='Helvetica', textColor=COL_GREEN_OK, alignment=TA_RIGHT)),
+            Paragraph(fmt_cur(bal_val), pdf_style('DR', fontSize=8.5, fontName='Helvetica', textColor=bal_color, alignment=TA_RIGHT)),
+            Paragraph(st_label, pdf_style('DS', fontSize=8.5, fontName='Helvetica-Bold', textColor=st_col, alignment=TA_CENTER)),
         ])
         row_styles.append(('BACKGROUND', (0, i+1), (-1, i+1), bg))
 
@@ -5703,13 +6504,112 @@ def _generate_unit_statement_pdf(tenant, unit, rows, total_charges, total_paid,
     story.append(Spacer(1, 0.15*cm))
     story.append(Paragraph(
         f'Generado el {now_str} · Homly — La administración que tu hogar se merece',
-        ParagraphStyle('FT', fontSize=7.5, fontName='Helvetica', textColor=COL_INK_LIGHT, alignment=TA_CENTER),
+        pdf_style('FT', fontSize=7.5, fontName='Helvetica', textColor=COL_INK_LIGHT, alignment=TA_CENTER),
     ))
 
     doc.build(story)
     return buffer.getvalue()
 
 
+def _unit_statement_email_rows(tenant, unit, start_period, cutoff):
+    """
+    Estado de cuenta de una unidad en el formato de filas que usan el correo y
+    el PDF individual. Devuelve (rows, total_charges, total_paid, adj_balance).
+    """
+    return _unit_statement_rows(unit, _compute_statement(tenant, str(unit.id), start_period, cutoff))
+
+
+def _unit_statement_rows(unit, statement):
+    """Convierte una tupla de _compute_statement al formato (rows, total_charges, total_paid, adj_balance)."""
+    rows, total_charges, total_paid, balance, prev_debt_adeudo, active_plan = statement
+    prev_debt  = float(unit.previous_debt  or 0)
+    credit_bal = float(unit.credit_balance or 0)
+    if active_plan:
+        adj_balance = balance - credit_bal
+    else:
+        adj_balance = balance + prev_debt - float(prev_debt_adeudo) - credit_bal
+
+    email_rows = [
+        {
+            'period':  _period_label_es(r.get('period', '')),
+            'charges': r.get('charge', 0),
+            'paid':    r.get('paid', 0),
+            'balance': r.get('saldo_accum', 0),
+            'status':  r.get('status', 'pendiente'),
+        }
+        for r in (rows or [])
+    ]
+    return email_rows, total_charges, total_paid, adj_balance
+
+
+def _build_unit_statement_pdf(tenant, unit, start_period, cutoff):
+    """PDF del estado de cuenta de una unidad; None si reportlab no está instalado."""
+    email_rows, total_charges, total_paid, adj_balance = _unit_statement_email_rows(
+        tenant, unit, start_period, cutoff
+    )
+    return _generate_unit_statement_pdf(
+        tenant=tenant,
+        unit=unit,
+        rows=email_rows,
+        total_charges=total_charges,
+        total_paid=total_paid,
+        adj_balance=adj_balance,
+        from_period=start_period,
+        to_period=cutoff,
+    )
+
+
+def _send_vecino_statement_email(tenant, unit, email, start_period, to_period, job=None):
+    """
+    Envía a `email` el estado de cuenta de la unidad con el PDF adjunto. Devuelve True si se envió.
+    job: ReportJob en curso; justo antes de enviar se confirma que sigue siendo de este worker.
+    """
+    email_rows, total_charges, total_paid, adj_balance = _unit_statement_email_rows(
+        tenant, unit, start_period, to_period
+    )
+
+    # Generate PDF for this unit
+    pdf_bytes = _generate_unit_statement_pdf(
+        tenant=tenant,
+        unit=unit,
+        rows=email_rows,
+        total_charges=total_charges,
+        total_paid=total_paid,
+        adj_balance=adj_balance,
+        from_period=start_period,
+        to_period=to_period,
+    )
+
+    pdf_attachment = None
+    if pdf_bytes:
+        safe_code = ''.join(c if c.isalnum() or c in '-_' else '_' for c in (unit.unit_id_code or 'unidad'))
+        pdf_attachment = (
+            f'estado_cuenta_{safe_code}.pdf',
+            pdf_bytes,
+            'application/pdf',
+        )
+
+    if job is not None:
+        from .jobs import heartbeat
+        heartbeat(job, force=True)
+
+    from .email_service import send_unit_statement_email
+    return send_unit_statement_email(
+        emails=[email],
+        tenant_name=getattr(tenant, 'razon_social', '') or tenant.name or '',
+        unit_code=unit.unit_id_code or '',
+        unit_name=unit.unit_name or '',
+        responsible=unit.responsible_name or '',
+        period_from=_period_label_es(start_period),
+        period_to=_period_label_es(to_period),
+        rows=email_rows,
+        total_charges=total_charges,
+        total_paid=total_paid,
+        balance=adj_balance,
+        pdf_attachment=pdf_attachment,
+    )
+
+
 class SendVecinoStatementEmailView(APIView):
     """POST /api/tenants/{tenant_id}/send-vecino-statement-email/
        Allows a vecino (resident) to send their own unit estado de cuenta
@@ -5760,64 +6660,13 @@ class SendVecinoStatementEmailView(APIView):
         tenant = Tenant.objects.get(id=tenant_id)
         start_period = from_period or tenant.operation_start_date or '2024-01'
 
-        rows, total_charges, total_paid, balance, prev_debt_adeudo, _stmt_active_plan2 = _compute_statement(
-            tenant, str(unit.id), start_period, to_period
-        )
-        prev_debt  = float(unit.previous_debt  or 0)
-        credit_bal = float(unit.credit_balance or 0)
-        if _stmt_active_plan2:
-            adj_balance = balance - credit_bal
-        else:
-            adj_balance = balance + prev_debt - float(prev_debt_adeudo) - credit_bal
-
-        # Build email rows
-        email_rows = [
-            {
-                'period':  _period_label_es(r.get('period', '')),
-                'charges': r.get('charge', 0),
-                'paid':    r.get('paid', 0),
-                'balance': r.get('saldo_accum', 0),
-                'status':  r.get('status', 'pendiente'),
-            }
-            for r in (rows or [])
-        ]
-
-        # Generate PDF for this unit
-        pdf_bytes = _generate_unit_statement_pdf(
-            tenant=tenant,
-            unit=unit,
-            rows=email_rows,
-            total_charges=total_charges,
-            total_paid=total_paid,
-            adj_balance=adj_balance,
-            from_period=start_period,
-            to_period=to_period,
-        )
-
-        pdf_attachment = None
-        if pdf_bytes:
-            safe_code = ''.join(c if c.isalnum() or c in '-_' else '_' for c in (unit.unit_id_code or 'unidad'))
-            pdf_attachment = (
-                f'estado_cuenta_{safe_code}.pdf',
-                pdf_bytes,
-                'application/pdf',
-            )
+        if _wants_async(request):
+            return _submit_report_job(request, tenant, 'vecino_statement_email', {
+                'unit_id': str(unit.id), 'email': user_email,
+                'from_period': start_period, 'to_period': to_period,
+            })
 
-        from .email_service import send_unit_statement_email
-        ok = send_unit_statement_email(
-            emails=[user_email],
-            tenant_name=getattr(tenant, 'razon_social', '') or tenant.name or '',
-            unit_code=unit.unit_id_code or '',
-            unit_name=unit.unit_name or '',
-            responsible=unit.responsible_name or '',
-            period_from=_period_label_es(start_period),
-            period_to=_period_label_es(to_period),
-            rows=email_rows,
-            total_charges=total_charges,
-            total_paid=total_paid,
-            balance=adj_balance,
-            pdf_attachment=pdf_attachment,
-        )
+        ok = _send_vecino_statement_email(tenant, unit, user_email, start_period, to_period)
 
         if ok:
             return Response({'detail': f'Estado de cuenta enviado a {user_email}'})
@@ -5831,6 +6680,58 @@ class SendVecinoStatementEmailView(APIView):
 #  EMAIL — ESTADO GENERAL DE CUENTA
 # ═══════════════════════════════════════════════════════════
 
+def _send_general_statement_email(tenant, emails, cutoff, job=None):
+    """
+    Envía el resumen general de estados de cuenta a `emails`. Devuelve True si se envió.
+    job: ReportJob en curso; justo antes de enviar se confirma que sigue siendo de este worker.
+    """
+    start_period = tenant.operation_start_date or '2024-01'
+
+    units = Unit.objects.filter(tenant_id=tenant.id).order_by('unit_id_code')
+    units_data = []
+    total_cargo = 0.0
+    total_abono = 0.0
+    total_deuda = 0.0
+
+    statements = _compute_tenant_statements(tenant, start_period, cutoff)
+
+    for unit in units:
+        rows, tc, tp, bal, pda, _u_ap = statements[str(unit.id)]
+        prev_debt = float(unit.previous_debt or 0)
+        credit_bal = float(unit.credit_balance or 0)
+        if _u_ap:
+            adj_bal = bal - credit_bal
+        else:
+            adj_bal = bal + prev_debt - float(pda) - credit_bal
+        deuda = max(0.0, adj_bal)
+        total_cargo += tc
+        total_abono += tp
+        total_deuda += deuda
+        units_data.append({
+            'unit_code': unit.unit_id_code or '',
+            'unit_name': unit.unit_name or '',
+            'responsible': unit.responsible_name or '',
+            'total_charges': tc,
+            'total_paid': tp,
+            'balance': adj_bal,
+        })
+
+    if job is not None:
+        from .jobs import heartbeat
+        heartbeat(job, force=True)
+
+    from .email_service import send_general_statement_email
+    return send_general_statement_email(
+        emails=emails,
+        tenant_name=getattr(tenant, 'razon_social', '') or tenant.name or '',
+        cutoff_str=_period_label_es(cutoff),
+        units_data=units_data,
+        total_cargo=total_cargo,
+        total_abono=total_abono,
+        total_deuda=total_deuda,
+    )
+
+
 class SendGeneralStatementEmailView(APIView):
     """POST /api/tenants/{tenant_id}/send-statement-email/
        Sends the general estado de cuenta summary by email to a list of recipients."""
@@ -5849,54 +6750,13 @@ class SendGeneralStatementEmailView(APIView):
             return Response({'detail': 'No hay correos válidos.'}, status=status.HTTP_400_BAD_REQUEST)
 
         tenant = Tenant.objects.get(id=tenant_id)
-        start_period = tenant.operation_start_date or '2024-01'
 
-        units = Unit.objects.filter(tenant_id=tenant_id).order_by('unit_id_code')
-        units_data = []
-        total_cargo = 0.0
-        total_abono = 0.0
-        total_deuda = 0.0
-
-        # Pre-fetch planes activos una sola vez para evitar N+1 queries en _compute_statement
-        _sge_unit_plans = {
-            str(_p.unit_id): _p
-            for _p in PaymentPlan.objects.filter(tenant_id=tenant_id, status='accepted')
-        }
-
-        for unit in units:
-            rows, tc, tp, bal, pda, _u_ap = _compute_statement(
-                tenant, str(unit.id), start_period, cutoff,
-                _prefetched_plan=_sge_unit_plans.get(str(unit.id)),
-            )
-            prev_debt = float(unit.previous_debt or 0)
-            credit_bal = float(unit.credit_balance or 0)
-            if _u_ap:
-                adj_bal = bal - credit_bal
-            else:
-                adj_bal = bal + prev_debt - float(pda) - credit_bal
-            deuda = max(0.0, adj_bal)
-            total_cargo += tc
-            total_abono += tp
-            total_deuda += deuda
-            units_data.append({
-                'unit_code': unit.unit_id_code or '',
-                'unit_name': unit.unit_name or '',
-                'responsible': unit.responsible_name or '',
-                'total_charges': tc,
-                'total_paid': tp,
-                'balance': adj_bal,
+        if _wants_async(request):
+            return _submit_report_job(request, tenant, 'general_statement_email', {
+                'emails': emails, 'cutoff': cutoff,
             })
 
-        from .email_service import send_general_statement_email
-        ok = send_general_statement_email(
-            emails=emails,
-            tenant_name=getattr(tenant, 'razon_social', '') or tenant.name or '',
-            cutoff_str=_period_label_es(cutoff),
-            units_data=units_data,
-            total_cargo=total_cargo,
-            total_abono=total_abono,
-            total_deuda=total_deuda,
-        )
+        ok = _send_general_statement_email(tenant, emails, cutoff)
 
         if ok:
             return Response({'detail': f'Estado general enviado a {", ".join(emails)}'})
@@ -5907,374 +6767,408 @@ class SendGeneralStatementEmailView(APIView):
 #  ESTADO POR UNIDAD — PDF EXPORT
 # ═══════════════════════════════════════════════════════════
 
-class EstadoPorUnidadPDFView(APIView):
-    """GET /api/tenants/{tenant_id}/estado-cuenta-pdf/?cutoff=YYYY-MM
-       Generates a downloadable PDF of the unit list with tenant header."""
-    permission_classes = [IsTenantMember]
+# Unidades por consulta de estados de cuenta y filas por tabla del PDF
+ESTADO_PDF_UNIT_CHUNK = 200
+ESTADO_PDF_ROWS_PER_TABLE = 40
 
-    def get(self, request, tenant_id):
-        import io
-        import base64
-        from datetime import date
-        from django.http import HttpResponse
-        try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.lib import colors
-            from reportlab.lib.units import cm
-            from reportlab.platypus import (
-                SimpleDocTemplate, Table, TableStyle, Paragraph,
-                Spacer, HRFlowable, Image,
-            )
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-            from reportlab.lib.enums import TA_CENTER, TA_RIGHT
-            from reportlab.platypus import KeepTogether  # noqa: F401
-        except ImportError:
-            return Response(
-                {'error': 'reportlab no instalado. Ejecuta: docker-compose up -d --build backend'},
-                status=503
-            )
 
-        cutoff_param = request.query_params.get('cutoff', '')
-        cutoff = cutoff_param or _today_period()
-        unit_id_param = request.query_params.get('unit_id', '')
-        from_period_param = request.query_params.get('from_period', '')
+def _iter_unit_statement_chunks(tenant, start_period, cutoff, use_ledger=True):
+    """
+    Estados de cuenta de todas las unidades (ordenadas por código) en bloques
+    de ESTADO_PDF_UNIT_CHUNK: genera (units, statements) con el formato de
+    _compute_tenant_statements. Con use_ledger lee el ledger si cubre el rango;
+    si no, calcula cada bloque por separado, así las filas de períodos de un
+    bloque se descartan antes de pasar al siguiente.
+    """
+    units = (
+        Unit.objects.lean().filter(tenant_id=tenant.id)
+        .order_by('unit_id_code')
+    )
+    ledger = _read_ledger_statements(tenant, start_period, cutoff) if use_ledger else None
 
-        tenant = Tenant.objects.get(id=tenant_id)
-        start_period = from_period_param or tenant.operation_start_date or '2024-01'
+    def _statements(chunk):
+        if ledger is not None:
+            return ledger
+        return _compute_tenant_statements(tenant, start_period, cutoff, unit_ids=[u.id for u in chunk])
 
-        # ── PER-UNIT statement PDF ────────────────────────────────────────────
-        if unit_id_param:
-            return self._generate_unit_statement_pdf_view(
-                request, tenant, unit_id_param, start_period, cutoff
-            )
+    chunk = []
+    for unit in units.iterator(chunk_size=ESTADO_PDF_UNIT_CHUNK):
+        chunk.append(unit)
+        if len(chunk) == ESTADO_PDF_UNIT_CHUNK:
+            yield chunk, _statements(chunk)
+            chunk = []
+    if chunk:
+        yield chunk, _statements(chunk)
 
-        # Build unit data
-        units = Unit.objects.filter(tenant_id=tenant_id).order_by('unit_id_code')
-        unit_rows = []
-        total_cargo_all = Decimal('0')
-        total_abono_all = Decimal('0')
-        total_deuda_all = Decimal('0')
-        con_adeudo = 0
-
-        # Pre-fetch planes activos una sola vez para evitar N+1 queries en _compute_statement
-        _gsp_unit_plans = {
-            str(_p.unit_id): _p
-            for _p in PaymentPlan.objects.filter(tenant_id=tenant_id, status='accepted')
-        }
 
+def _iter_estado_por_unidad_rows(tenant, start_period, cutoff, progress=None):
+    """
+    Filas del PDF "Estado por Unidad" ordenadas por código, una por unidad.
+    progress: se llama tras cada bloque de unidades (heartbeat del ReportJob).
+    """
+    exemptions = ExemptionCalendar.for_tenant(tenant)
+    for units, statements in _iter_unit_statement_chunks(tenant, start_period, cutoff):
+        if progress is not None:
+            progress()
         for unit in units:
-            rows, tc, tp, bal, pda, _u_ap2 = _compute_statement(
-                tenant, str(unit.id), start_period, cutoff,
-                _prefetched_plan=_gsp_unit_plans.get(str(unit.id)),
-            )
+            rows, tc, tp, bal, pda, _u_ap2 = statements[str(unit.id)]
             prev_debt = float(unit.previous_debt or 0)
             credit_bal = float(unit.credit_balance or 0)
             if _u_ap2:
                 adj_bal = bal - credit_bal
             else:
                 adj_bal = bal + prev_debt - float(pda) - credit_bal
-            total_cargo_all += Decimal(str(tc))
-            total_abono_all += Decimal(str(tp))
-            deuda = max(0, adj_bal)
-            if deuda > 0.01:
-                con_adeudo += 1
-            total_deuda_all += Decimal(str(max(0, adj_bal)))
             resp = unit.responsible_name or f'{unit.owner_first_name or ""} {unit.owner_last_name or ""}'.strip()
-            unit_rows.append({
+            yield {
                 'code': unit.unit_id_code or '',
                 'name': unit.unit_name or '',
                 'responsible': resp or '—',
                 'total_charge': tc,
                 'total_paid': tp,
                 'balance': adj_bal,
-                'exempt': unit.admin_exempt,
-            })
+                'exempt': exemptions.is_exempt(unit.id, cutoff),
+            }
 
-        # Currency formatter
-        currency = tenant.currency or 'MXN'
-        def fmt_cur(n):
-            try:
-                return f'${float(n):,.0f}'
-            except Exception:
-                return '$0'
-
-        # Period label helper
-        MONTHS_ES = ['', 'Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun',
-                     'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic']
-        MONTHS_FULL = ['', 'Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
-                       'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
-        def period_label(p):
-            try:
-                y, m = p.split('-')
-                return f'{MONTHS_FULL[int(m)]} {y}'
-            except Exception:
-                return p or ''
-
-        # Build PDF in memory
-        buffer = io.BytesIO()
-        page_w, page_h = A4
-        margin = 1.8 * cm
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            leftMargin=margin,
-            rightMargin=margin,
-            topMargin=1.4 * cm,
-            bottomMargin=1.6 * cm,
-        )
 
-        styles = getSampleStyleSheet()
-        # Colour palette
-        COL_TEAL = colors.HexColor('#0d7c6e')
-        COL_TEAL_LIGHT = colors.HexColor('#e6f4f2')
-        COL_CORAL = colors.HexColor('#e84040')
-        COL_CORAL_LIGHT = colors.HexColor('#fff1f0')
-        COL_AMBER = colors.HexColor('#d97706')
-        COL_AMBER_LIGHT = colors.HexColor('#fffbeb')
-        COL_INK = colors.HexColor('#1a1a2e')
-        COL_INK_LIGHT = colors.HexColor('#64748b')
-        COL_SAND = colors.HexColor('#f8f6f1')
-        COL_SAND_BORDER = colors.HexColor('#e5e0d5')
-        COL_WHITE = colors.white
-        COL_HEADER_BG = colors.HexColor('#1a1a2e')
-
-        st_title = ParagraphStyle('DocTitle', fontSize=18, fontName='Helvetica-Bold',
-                                   textColor=COL_INK, spaceAfter=2, leading=22)
-        st_subtitle = ParagraphStyle('DocSub', fontSize=10, fontName='Helvetica',
-                                      textColor=COL_INK_LIGHT, spaceAfter=1)
-        st_tenant = ParagraphStyle('TenantName', fontSize=13, fontName='Helvetica-Bold',
-                                    textColor=COL_INK, spaceAfter=2, leading=16)
-        st_info = ParagraphStyle('Info', fontSize=8.5, fontName='Helvetica',
-                                  textColor=COL_INK_LIGHT, spaceAfter=1, leading=11)
-        st_kpi_val = ParagraphStyle('KpiVal', fontSize=14, fontName='Helvetica-Bold',
-                                     textColor=COL_INK, leading=17, spaceAfter=0)
-        st_kpi_label = ParagraphStyle('KpiLabel', fontSize=7.5, fontName='Helvetica',
-                                       textColor=COL_INK_LIGHT, leading=9, spaceAfter=0)
-        st_footer = ParagraphStyle('Footer', fontSize=7.5, fontName='Helvetica',
-                                    textColor=COL_INK_LIGHT, alignment=TA_CENTER)
-        st_cell = ParagraphStyle('Cell', fontSize=8, fontName='Helvetica',
-                                  textColor=COL_INK, leading=10)
-        st_cell_bold = ParagraphStyle('CellBold', fontSize=8, fontName='Helvetica-Bold',
-                                       textColor=COL_INK, leading=10)
-        st_cell_right = ParagraphStyle('CellRight', fontSize=8, fontName='Helvetica',
-                                        textColor=COL_INK, leading=10, alignment=TA_RIGHT)
-        st_cell_right_bold = ParagraphStyle('CellRightBold', fontSize=8.5, fontName='Helvetica-Bold',
-                                             textColor=COL_INK, leading=10, alignment=TA_RIGHT)
-
-        story = []
-
-        # ── HEADER: logo + tenant info ───────────────────────────────
-        logo_img = None
-        if tenant.logo:
-            try:
-                # logo may be stored as plain base64 or data-URL
-                b64 = tenant.logo
-                if ',' in b64:
-                    b64 = b64.split(',', 1)[1]
-                logo_bytes = base64.b64decode(b64)
-                logo_io = io.BytesIO(logo_bytes)
-                max_logo_h = 1.6 * cm
-                max_logo_w = 4.5 * cm
-                logo_img = Image(logo_io, width=max_logo_w, height=max_logo_h, kind='proportional')
-            except Exception:
-                logo_img = None
-
-        # Build address string
-        def _addr(*parts):
-            return ', '.join(p for p in parts if p and p.strip())
-
-        fiscal_addr = _addr(
-            tenant.info_calle,
-            tenant.info_num_externo,
-            tenant.info_colonia,
-            tenant.info_delegacion,
-            tenant.info_ciudad,
-            tenant.info_codigo_postal,
-        )
-        phys_addr = _addr(
-            tenant.addr_calle,
-            tenant.addr_num_externo,
-            tenant.addr_colonia,
-            tenant.addr_delegacion,
-            tenant.addr_ciudad,
-            tenant.addr_codigo_postal,
+def _build_estado_por_unidad_pdf(tenant, start_period, cutoff, progress=None):
+    """PDF "Estado por Unidad" en bytes (job 'estado_por_unidad_pdf'); None si reportlab no está instalado."""
+    import io
+    buffer = io.BytesIO()
+    if not _write_estado_por_unidad_pdf(tenant, start_period, cutoff, buffer, progress):
+        return None
+    return buffer.getvalue()
+
+
+def _write_estado_por_unidad_pdf(tenant, start_period, cutoff, out, progress=None):
+    """
+    Escribe en `out` (archivo binario) el PDF "Estado por Unidad": todas las
+    unidades con encabezado del condominio. Devuelve False si reportlab no
+    está instalado. progress (opcional) se llama entre bloques de unidades
+    y de tablas, para que un ReportJob largo renueve su heartbeat.
+
+    La tabla de unidades se arma en bloques de ESTADO_PDF_ROWS_PER_TABLE filas
+    que se generan justo antes de dibujarse (filterFlowables), en lugar de una
+    sola tabla con todos los Paragraph en memoria; reportlab además parte
+    tablas largas en tiempo cuadrático.
+    """
+    import io
+    from datetime import date
+    try:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib import colors
+        from reportlab.lib.units import cm
+        from reportlab.platypus import (
+            SimpleDocTemplate, Table, TableStyle, Paragraph,
+            Spacer, HRFlowable, Image,
         )
-        display_addr = fiscal_addr or phys_addr
+        from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+        from reportlab.platypus import KeepTogether  # noqa: F401
+    except ImportError:
+        return False
 
-        tenant_name_str = tenant.razon_social or tenant.name
-        rfc_str = f'RFC: {tenant.rfc}' if tenant.rfc else ''
-        addr_str = display_addr
-        gen_date = date.today().strftime('%d/%m/%Y')
+    # Build unit data (solo totales por unidad; las filas por período no se conservan)
+    unit_rows = []
+    total_cargo_all = Decimal('0')
+    total_abono_all = Decimal('0')
+    total_deuda_all = Decimal('0')
+    con_adeudo = 0
+
+    for row in _iter_estado_por_unidad_rows(tenant, start_period, cutoff, progress):
+        total_cargo_all += Decimal(str(row['total_charge']))
+        total_abono_all += Decimal(str(row['total_paid']))
+        deuda = max(0, row['balance'])
+        if deuda > 0.01:
+            con_adeudo += 1
+        total_deuda_all += Decimal(str(deuda))
+        unit_rows.append(row)
+
+    # Currency formatter
+    currency = tenant.currency or 'MXN'
+    def fmt_cur(n):
+        try:
+            return f'${float(n):,.0f}'
+        except Exception:
+            return '$0'
 
-        # Info column paragraphs
-        info_lines = [
-            Paragraph(tenant_name_str, st_tenant),
-        ]
-        if tenant.name and tenant.razon_social and tenant.name != tenant.razon_social:
-            info_lines.append(Paragraph(tenant.name, st_info))
-        if rfc_str:
-            info_lines.append(Paragraph(rfc_str, st_info))
-        if addr_str:
-            info_lines.append(Paragraph(addr_str, st_info))
-
-        title_lines = [
-            Paragraph('Estado por Unidad', st_title),
-            Paragraph(f'Corte al período: <b>{period_label(cutoff)}</b>', st_subtitle),
-            Paragraph(f'Desde: {period_label(start_period)}  ·  Generado: {gen_date}', st_info),
-        ]
+    # Period label helper
+    MONTHS_ES = ['', 'Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun',
+                 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic']
+    MONTHS_FULL = ['', 'Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+                   'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
+    def period_label(p):
+        try:
+            y, m = p.split('-')
+            return f'{MONTHS_FULL[int(m)]} {y}'
+        except Exception:
+            return p or ''
 
-        # Combine logo + info + title in a 3-column header table
-        if logo_img:
-            header_data = [[logo_img, info_lines, title_lines]]
-            col_widths = [4.6 * cm, 8.2 * cm, None]
-        else:
-            header_data = [[info_lines, title_lines]]
-            col_widths = [10 * cm, None]
+    class _ChunkedDocTemplate(SimpleDocTemplate):
+        """Pide el siguiente bloque de flowables cuando queda uno por dibujar."""
+        pending = iter(())
 
-        avail_w = page_w - 2 * margin
-        if logo_img:
-            col_widths[-1] = avail_w - col_widths[0] - col_widths[1]
-        else:
-            col_widths[-1] = avail_w - col_widths[0]
+        def filterFlowables(self, flowables):
+            if len(flowables) <= 1:
+                if progress is not None:
+                    progress()
+                flowables.extend(next(self.pending, []))
 
-        header_table = Table(header_data, colWidths=col_widths)
-        header_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 0),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-        ]))
-        story.append(header_table)
-        story.append(HRFlowable(width='100%', thickness=1.5, color=COL_TEAL, spaceAfter=8))
-
-        # ── KPI STRIP ───────────────────────────────────────────────
-        kpi_data = [[
-            [Paragraph(fmt_cur(total_cargo_all), st_kpi_val), Paragraph('Total Cargos', st_kpi_label)],
-            [Paragraph(fmt_cur(total_abono_all), st_kpi_val), Paragraph('Total Abonado', st_kpi_label)],
-            [Paragraph(fmt_cur(total_deuda_all), ParagraphStyle('KpiValDebt', fontSize=14, fontName='Helvetica-Bold', textColor=COL_CORAL, leading=17)), Paragraph('Deuda Total', st_kpi_label)],
-            [Paragraph(str(con_adeudo), st_kpi_val), Paragraph('Unidades con adeudo', st_kpi_label)],
-            [Paragraph(str(len(unit_rows)), st_kpi_val), Paragraph('Total unidades', st_kpi_label)],
-        ]]
-        kpi_col_w = avail_w / 5
-        kpi_table = Table(kpi_data, colWidths=[kpi_col_w] * 5, rowHeights=[1.4 * cm])
-        kpi_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), COL_SAND),
-            ('BACKGROUND', (2, 0), (2, 0), COL_CORAL_LIGHT),
-            ('BOX', (0, 0), (-1, -1), 0.5, COL_SAND_BORDER),
-            ('INNERGRID', (0, 0), (-1, -1), 0.5, COL_SAND_BORDER),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('LEFTPADDING', (0, 0), (-1, -1), 6),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-            ('ROUNDEDCORNERS', [4]),
-        ]))
-        story.append(kpi_table)
-        story.append(Spacer(1, 10))
-
-        # ── UNIT TABLE ──────────────────────────────────────────────
-        # Column widths: # | Código | Nombre | Responsable | Cargos | Abonado | Saldo | Estado
-        cw = [0.8*cm, 2.0*cm, 4.8*cm, 4.2*cm, 2.4*cm, 2.4*cm, 2.4*cm, 2.2*cm]
-        # Adjust proportionally to avail_w
-        total_cw = sum(cw)
-        cw = [c * avail_w / total_cw for c in cw]
-
-        th_style = ParagraphStyle('TH', fontSize=7.5, fontName='Helvetica-Bold',
-                                   textColor=COL_WHITE, leading=9, alignment=TA_CENTER)
-        th_right = ParagraphStyle('THR', fontSize=7.5, fontName='Helvetica-Bold',
-                                   textColor=COL_WHITE, leading=9, alignment=TA_RIGHT)
-
-        table_data = [[
-            Paragraph('#', th_style),
-            Paragraph('Código', th_style),
-            Paragraph('Nombre / Unidad', th_style),
-            Paragraph('Responsable', th_style),
-            Paragraph('Cargos', th_right),
-            Paragraph('Abonado', th_right),
-            Paragraph('Saldo', th_right),
-            Paragraph('Estado', th_style),
-        ]]
-
-        for idx, u in enumerate(unit_rows):
-            bal = u['balance']
-            has_debt = bal > 0.01
-            has_favor = bal < -0.01
-
-            if has_debt:
-                bal_str = f'-{fmt_cur(abs(bal))}'
-                bal_color = COL_CORAL
-                status_str = 'Con adeudo'
-                row_bg = COL_CORAL_LIGHT if has_debt else COL_WHITE
-            elif has_favor:
-                bal_str = f'+{fmt_cur(abs(bal))}'
-                bal_color = COL_TEAL
-                status_str = 'A favor'
-                row_bg = COL_TEAL_LIGHT
-            else:
-                bal_str = '$0'
-                bal_color = COL_INK_LIGHT
-                status_str = 'Al corriente'
-                row_bg = COL_WHITE
-
-            if u.get('exempt'):
-                status_str = 'Exento'
-                bal_color = colors.HexColor('#0891b2')
-
-            num_style = ParagraphStyle('Num', fontSize=7.5, fontName='Helvetica',
-                                        textColor=COL_INK_LIGHT, leading=9, alignment=TA_CENTER)
-            code_style = ParagraphStyle('Code', fontSize=7.5, fontName='Helvetica-Bold',
-                                         textColor=COL_TEAL, leading=9, alignment=TA_CENTER,
-                                         backColor=COL_TEAL_LIGHT)
-            name_style = ParagraphStyle('Name', fontSize=8, fontName='Helvetica-Bold',
-                                         textColor=COL_INK, leading=10)
-            resp_style = ParagraphStyle('Resp', fontSize=7.5, fontName='Helvetica',
-                                         textColor=COL_INK_LIGHT, leading=9)
-            bal_style = ParagraphStyle('Bal', fontSize=8.5, fontName='Helvetica-Bold',
-                                        textColor=bal_color, leading=10, alignment=TA_RIGHT)
-            stat_style = ParagraphStyle('Stat', fontSize=7.5, fontName='Helvetica-Bold',
-                                         textColor=bal_color, leading=9, alignment=TA_CENTER)
-
-            row = [
-                Paragraph(str(idx + 1), num_style),
-                Paragraph(u['code'], code_style),
-                Paragraph(u['name'] or '—', name_style),
-                Paragraph(u['responsible'], resp_style),
-                Paragraph(fmt_cur(u['total_charge']), st_cell_right),
-                Paragraph(fmt_cur(u['total_paid']), st_cell_right),
-                Paragraph(bal_str, bal_style),
-                Paragraph(status_str, stat_style),
-            ]
-            table_data.append(row)
+    page_w, page_h = A4
+    margin = 1.8 * cm
+    doc = _ChunkedDocTemplate(
+        out,
+        pagesize=A4,
+        leftMargin=margin,
+        rightMargin=margin,
+        topMargin=1.4 * cm,
+        bottomMargin=1.6 * cm,
+    )
+
+    # Colour palette
+    COL_TEAL = colors.HexColor('#0d7c6e')
+    COL_TEAL_LIGHT = colors.HexColor('#e6f4f2')
+    COL_CORAL = colors.HexColor('#e84040')
+    COL_CORAL_LIGHT = colors.HexColor('#fff1f0')
+    COL_AMBER = colors.HexColor('#d97706')
+    COL_AMBER_LIGHT = colors.HexColor('#fffbeb')
+    COL_INK = colors.HexColor('#1a1a2e')
+    COL_INK_LIGHT = colors.HexColor('#64748b')
+    COL_SAND = colors.HexColor('#f8f6f1')
+    COL_SAND_BORDER = colors.HexColor('#e5e0d5')
+    COL_WHITE = colors.white
+    COL_HEADER_BG = colors.HexColor('#1a1a2e')
+
+    st_title = pdf_style('DocTitle', fontSize=18, fontName='Helvetica-Bold',
+                               textColor=COL_INK, spaceAfter=2, leading=22)
+    st_subtitle = pdf_style('DocSub', fontSize=10, fontName='Helvetica',
+                                  textColor=COL_INK_LIGHT, spaceAfter=1)
+    st_tenant = pdf_style('TenantName', fontSize=13, fontName='Helvetica-Bold',
+                                textColor=COL_INK, spaceAfter=2, leading=16)
+    st_info = pdf_style('Info', fontSize=8.5, fontName='Helvetica',
+                              textColor=COL_INK_LIGHT, spaceAfter=1, leading=11)
+    st_kpi_val = pdf_style('KpiVal', fontSize=14, fontName='Helvetica-Bold',
+                                 textColor=COL_INK, leading=17, spaceAfter=0)
+    st_kpi_label = pdf_style('KpiLabel', fontSize=7.5, fontName='Helvetica',
+                                   textColor=COL_INK_LIGHT, leading=9, spaceAfter=0)
+    st_footer = pdf_style('Footer', fontSize=7.5, fontName='Helvetica',
+                                textColor=COL_INK_LIGHT, alignment=TA_CENTER)
+    st_cell = pdf_style('Cell', fontSize=8, fontName='Helvetica',
+                              textColor=COL_INK, leading=10)
+    st_cell_bold = pdf_style('CellBold', fontSize=8, fontName='Helvetica-Bold',
+                                   textColor=COL_INK, leading=10)
+    st_cell_right = pdf_style('CellRight', fontSize=8, fontName='Helvetica',
+                                    textColor=COL_INK, leading=10, alignment=TA_RIGHT)
+    st_cell_right_bold = pdf_style('CellRightBold', fontSize=8.5, fontName='Helvetica-Bold',
+                                         textColor=COL_INK, leading=10, alignment=TA_RIGHT)
+
+    story = []
+
+    # ── HEADER: logo + tenant info ───────────────────────────────
+    logo_img = None
+    logo_bytes = tenant_logo(tenant)
+    if logo_bytes:
+        try:
+            logo_io = io.BytesIO(logo_bytes)
+            max_logo_h = 1.6 * cm
+            max_logo_w = 4.5 * cm
+            logo_img = Image(logo_io, width=max_logo_w, height=max_logo_h, kind='proportional')
+        except Exception:
+            logo_img = None
+
+    # Build address string
+    def _addr(*parts):
+        return ', '.join(p for p in parts if p and p.strip())
+
+    fiscal_addr = _addr(
+        tenant.info_calle,
+        tenant.info_num_externo,
+        tenant.info_colonia,
+        tenant.info_delegacion,
+        tenant.info_ciudad,
+        tenant.info_codigo_postal,
+    )
+    phys_addr = _addr(
+        tenant.addr_calle,
+        tenant.addr_num_externo,
+        tenant.addr_colonia,
+        tenant.addr_delegacion,
+        tenant.addr_ciudad,
+        tenant.addr_codigo_postal,
+    )
+    display_addr = fiscal_addr or phys_addr
+
+    tenant_name_str = tenant.razon_social or tenant.name
+    rfc_str = f'RFC: {tenant.rfc}' if tenant.rfc else ''
+    addr_str = display_addr
+    gen_date = date.today().strftime('%d/%m/%Y')
+
+    # Info column paragraphs
+    info_lines = [
+        Paragraph(tenant_name_str, st_tenant),
+    ]
+    if tenant.name and tenant.razon_social and tenant.name != tenant.razon_social:
+        info_lines.append(Paragraph(tenant.name, st_info))
+    if rfc_str:
+        info_lines.append(Paragraph(rfc_str, st_info))
+    if addr_str:
+        info_lines.append(Paragraph(addr_str, st_info))
+
+    title_lines = [
+        Paragraph('Estado por Unidad', st_title),
+        Paragraph(f'Corte al período: <b>{period_label(cutoff)}</b>', st_subtitle),
+        Paragraph(f'Desde: {period_label(start_period)}  ·  Generado: {gen_date}', st_info),
+    ]
+
+    # Combine logo + info + title in a 3-column header table
+    if logo_img:
+        header_data = [[logo_img, info_lines, title_lines]]
+        col_widths = [4.6 * cm, 8.2 * cm, None]
+    else:
+        header_data = [[info_lines, title_lines]]
+        col_widths = [10 * cm, None]
+
+    avail_w = page_w - 2 * margin
+    if logo_img:
+        col_widths[-1] = avail_w - col_widths[0] - col_widths[1]
+    else:
+        col_widths[-1] = avail_w - col_widths[0]
 
-        # Totals row
-        total_row = [
+    header_table = Table(header_data, colWidths=col_widths)
+    header_table.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 0),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 0), (-1, -1), 0),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+    ]))
+    story.append(header_table)
+    story.append(HRFlowable(width='100%', thickness=1.5, color=COL_TEAL, spaceAfter=8))
+
+    # ── KPI STRIP ───────────────────────────────────────────────
+    kpi_data = [[
+        [Paragraph(fmt_cur(total_cargo_all), st_kpi_val), Paragraph('Total Cargos', st_kpi_label)],
+        [Paragraph(fmt_cur(total_abono_all), st_kpi_val), Paragraph('Total Abonado', st_kpi_label)],
+        [Paragraph(fmt_cur(total_deuda_all), pdf_style('KpiValDebt', fontSize=14, fontName='Helvetica-Bold', textColor=COL_CORAL, leading=17)), Paragraph('Deuda Total', st_kpi_label)],
+        [Paragraph(str(con_adeudo), st_kpi_val), Paragraph('Unidades con adeudo', st_kpi_label)],
+        [Paragraph(str(len(unit_rows)), st_kpi_val), Paragraph('Total unidades', st_kpi_label)],
+    ]]
+    kpi_col_w = avail_w / 5
+    kpi_table = Table(kpi_data, colWidths=[kpi_col_w] * 5, rowHeights=[1.4 * cm])
+    kpi_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), COL_SAND),
+        ('BACKGROUND', (2, 0), (2, 0), COL_CORAL_LIGHT),
+        ('BOX', (0, 0), (-1, -1), 0.5, COL_SAND_BORDER),
+        ('INNERGRID', (0, 0), (-1, -1), 0.5, COL_SAND_BORDER),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ('ROUNDEDCORNERS', [4]),
+    ]))
+    story.append(kpi_table)
+    story.append(Spacer(1, 10))
+
+    # ── UNIT TABLE ──────────────────────────────────────────────
+    # Column widths: # | Código | Nombre | Responsable | Cargos | Abonado | Saldo | Estado
+    cw = [0.8*cm, 2.0*cm, 4.8*cm, 4.2*cm, 2.4*cm, 2.4*cm, 2.4*cm, 2.2*cm]
+    # Adjust proportionally to avail_w
+    total_cw = sum(cw)
+    cw = [c * avail_w / total_cw for c in cw]
+
+    th_style = pdf_style('TH', fontSize=7.5, fontName='Helvetica-Bold',
+                               textColor=COL_WHITE, leading=9, alignment=TA_CENTER)
+    th_right = pdf_style('THR', fontSize=7.5, fontName='Helvetica-Bold',
+                               textColor=COL_WHITE, leading=9, alignment=TA_RIGHT)
+
+    header_row = [
+        Paragraph('#', th_style),
+        Paragraph('Código', th_style),
+        Paragraph('Nombre / Unidad', th_style),
+        Paragraph('Responsable', th_style),
+        Paragraph('Cargos', th_right),
+        Paragraph('Abonado', th_right),
+        Paragraph('Saldo', th_right),
+        Paragraph('Estado', th_style),
+    ]
+
+    num_style = pdf_style('Num', fontSize=7.5, fontName='Helvetica',
+                                textColor=COL_INK_LIGHT, leading=9, alignment=TA_CENTER)
+    code_style = pdf_style('Code', fontSize=7.5, fontName='Helvetica-Bold',
+                                 textColor=COL_TEAL, leading=9, alignment=TA_CENTER,
+                                 backColor=COL_TEAL_LIGHT)
+    name_style = pdf_style('Name', fontSize=8, fontName='Helvetica-Bold',
+                                 textColor=COL_INK, leading=10)
+    resp_style = pdf_style('Resp', fontSize=7.5, fontName='Helvetica',
+                                 textColor=COL_INK_LIGHT, leading=9)
+
+    def unit_row(idx, u):
+        bal = u['balance']
+        has_debt = bal > 0.01
+        has_favor = bal < -0.01
+
+        if has_debt:
+            bal_str = f'-{fmt_cur(abs(bal))}'
+            bal_color = COL_CORAL
+            status_str = 'Con adeudo'
+        elif has_favor:
+            bal_str = f'+{fmt_cur(abs(bal))}'
+            bal_color = COL_TEAL
+            status_str = 'A favor'
+        else:
+            bal_str = '$0'
+            bal_color = COL_INK_LIGHT
+            status_str = 'Al corriente'
+
+        if u.get('exempt'):
+            status_str = 'Exento'
+            bal_color = colors.HexColor('#0891b2')
+
+        bal_style = pdf_style('Bal', fontSize=8.5, fontName='Helvetica-Bold',
+                                   textColor=bal_color, leading=10, alignment=TA_RIGHT)
+        stat_style = pdf_style('Stat', fontSize=7.5, fontName='Helvetica-Bold',
+                                    textColor=bal_color, leading=9, alignment=TA_CENTER)
+        return [
+            Paragraph(str(idx + 1), num_style),
+            Paragraph(u['code'], code_style),
+            Paragraph(u['name'] or '—', name_style),
+            Paragraph(u['responsible'], resp_style),
+            Paragraph(fmt_cur(u['total_charge']), st_cell_right),
+            Paragraph(fmt_cur(u['total_paid']), st_cell_right),
+            Paragraph(bal_str, bal_style),
+            Paragraph(status_str, stat_style),
+        ]
+
+    def totals_row():
+        return [
             Paragraph('', th_style),
             Paragraph('', th_style),
-            Paragraph('TOTALES', ParagraphStyle('Tot', fontSize=8, fontName='Helvetica-Bold',
+            Paragraph('TOTALES', pdf_style('Tot', fontSize=8, fontName='Helvetica-Bold',
                                                   textColor=COL_WHITE, leading=10)),
             Paragraph('', th_style),
-            Paragraph(fmt_cur(total_cargo_all), ParagraphStyle('TotV', fontSize=8, fontName='Helvetica-Bold',
+            Paragraph(fmt_cur(total_cargo_all), pdf_style('TotV', fontSize=8, fontName='Helvetica-Bold',
                                                                   textColor=COL_WHITE, leading=10, alignment=TA_RIGHT)),
-            Paragraph(fmt_cur(total_abono_all), ParagraphStyle('TotV2', fontSize=8, fontName='Helvetica-Bold',
+            Paragraph(fmt_cur(total_abono_all), pdf_style('TotV2', fontSize=8, fontName='Helvetica-Bold',
                                                                   textColor=COL_WHITE, leading=10, alignment=TA_RIGHT)),
             Paragraph(fmt_cur(total_deuda_all) if float(total_deuda_all) > 0 else '$0',
-                      ParagraphStyle('TotBal', fontSize=8, fontName='Helvetica-Bold',
+                      pdf_style('TotBal', fontSize=8, fontName='Helvetica-Bold',
                                      textColor=colors.HexColor('#fca5a5'), leading=10, alignment=TA_RIGHT)),
             Paragraph('', th_style),
         ]
-        table_data.append(total_row)
 
-        unit_table = Table(table_data, colWidths=cw, repeatRows=1)
+    def table_block(start):
+        """Tabla con el encabezado y las filas [start, start + ESTADO_PDF_ROWS_PER_TABLE)."""
+        block = unit_rows[start:start + ESTADO_PDF_ROWS_PER_TABLE]
+        is_last = start + ESTADO_PDF_ROWS_PER_TABLE >= len(unit_rows)
+        table_data = [header_row] + [unit_row(start + i, u) for i, u in enumerate(block)]
+        if is_last:
+            table_data.append(totals_row())
 
         # Build row-level background styles
         ts_cmds = [
             # Header
             ('BACKGROUND', (0, 0), (-1, 0), COL_HEADER_BG),
             ('TEXTCOLOR', (0, 0), (-1, 0), COL_WHITE),
-            # Totals row
-            ('BACKGROUND', (0, -1), (-1, -1), COL_TEAL),
             # Grid
             ('GRID', (0, 0), (-1, -1), 0.4, COL_SAND_BORDER),
             ('LINEBELOW', (0, 0), (-1, 0), 1, COL_TEAL),
@@ -6286,39 +7180,94 @@ class EstadoPorUnidadPDFView(APIView):
             # Vertical alignment
             ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
         ]
+        if is_last:
+            # Totals row
+            ts_cmds.append(('BACKGROUND', (0, -1), (-1, -1), COL_TEAL))
 
-        # Alternating row backgrounds + debt/favor highlights
-        for row_idx, u in enumerate(unit_rows, start=1):
+        # Alternating row backgrounds + debt/favor highlights (índice global de la unidad)
+        for row_idx, u in enumerate(block, start=1):
             bal = u['balance']
-            has_debt = bal > 0.01
-            has_favor = bal < -0.01
-            if has_debt:
+            if bal > 0.01:
                 ts_cmds.append(('BACKGROUND', (0, row_idx), (-1, row_idx), COL_CORAL_LIGHT))
-            elif has_favor:
+            elif bal < -0.01:
                 ts_cmds.append(('BACKGROUND', (0, row_idx), (-1, row_idx), COL_TEAL_LIGHT))
-            elif row_idx % 2 == 0:
+            elif (start + row_idx) % 2 == 0:
                 ts_cmds.append(('BACKGROUND', (0, row_idx), (-1, row_idx), COL_SAND))
 
+        unit_table = Table(table_data, colWidths=cw, repeatRows=1)
         unit_table.setStyle(TableStyle(ts_cmds))
+        return unit_table
+
+    def remaining_blocks():
+        for start in range(0, len(unit_rows), ESTADO_PDF_ROWS_PER_TABLE):
+            yield [table_block(start)]
+        if not unit_rows:
+            table = Table([header_row, totals_row()], colWidths=cw, repeatRows=1)
+            table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), COL_HEADER_BG),
+                ('BACKGROUND', (0, -1), (-1, -1), COL_TEAL),
+                ('GRID', (0, 0), (-1, -1), 0.4, COL_SAND_BORDER),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ]))
+            yield [table]
+        # ── FOOTER NOTE ──────────────────────────────────────────────
+        yield [
+            Spacer(1, 8),
+            HRFlowable(width='100%', thickness=0.5, color=COL_SAND_BORDER, spaceBefore=4),
+            Paragraph(
+                f'Homly · {tenant.name} · Corte: {period_label(cutoff)} · Generado el {gen_date}',
+                st_footer
+            ),
+        ]
 
-        story.append(unit_table)
-        story.append(Spacer(1, 8))
+    # Build PDF
+    doc.pending = remaining_blocks()
+    doc.build(story)
+    return True
 
-        # ── FOOTER NOTE ──────────────────────────────────────────────
-        story.append(HRFlowable(width='100%', thickness=0.5, color=COL_SAND_BORDER, spaceBefore=4))
-        story.append(Paragraph(
-            f'Homly · {tenant.name} · Corte: {period_label(cutoff)} · Generado el {gen_date}',
-            st_footer
-        ))
 
-        # Build PDF
-        doc.build(story)
-        buffer.seek(0)
+class EstadoPorUnidadPDFView(APIView):
+    """GET /api/tenants/{tenant_id}/estado-cuenta-pdf/?cutoff=YYYY-MM
+       Generates a downloadable PDF of the unit list with tenant header."""
+    permission_classes = [IsTenantMember]
+
+    def get(self, request, tenant_id):
+        cutoff_param = request.query_params.get('cutoff', '')
+        cutoff = cutoff_param or _today_period()
+        unit_id_param = request.query_params.get('unit_id', '')
+        from_period_param = request.query_params.get('from_period', '')
+
+        tenant = Tenant.objects.get(id=tenant_id)
+        start_period = from_period_param or tenant.operation_start_date or '2024-01'
+
+        # ── PER-UNIT statement PDF ────────────────────────────────────────────
+        if unit_id_param:
+            return self._generate_unit_statement_pdf_view(
+                request, tenant, unit_id_param, start_period, cutoff
+            )
+
+        if _wants_async(request):
+            return _submit_report_job(request, tenant, 'estado_por_unidad_pdf', {
+                'from_period': start_period, 'cutoff': cutoff,
+            })
+
+        # El PDF se escribe a un archivo temporal y se envía por bloques:
+        # con cientos de unidades no se mantiene una copia completa en memoria.
+        import tempfile
+        from django.http import FileResponse
+        pdf_file = tempfile.TemporaryFile()
+        if not _write_estado_por_unidad_pdf(tenant, start_period, cutoff, pdf_file):
+            pdf_file.close()
+            return Response(
+                {'error': 'reportlab no instalado. Ejecuta: docker-compose up -d --build backend'},
+                status=503
+            )
+        pdf_file.seek(0)
 
         filename = f'estado_por_unidad_{cutoff}.pdf'
-        response = HttpResponse(buffer.read(), content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        return response
+        return FileResponse(
+            pdf_file, as_attachment=True, filename=filename, content_type='application/pdf',
+        )
 
     def _generate_unit_statement_pdf_view(self, request, tenant, unit_id, start_period, cutoff):
         """Generate and return a per-unit estado de cuenta PDF using the shared helper."""
@@ -6329,42 +7278,16 @@ class EstadoPorUnidadPDFView(APIView):
             return Response({'detail': 'Unidad no encontrada.'}, status=404)
 
         # Vecino authorization: can only download their own unit
-        tu = TenantUser.objects.filter(tenant_id=tenant.id, user=request.user).first()
-        if tu and tu.role == 'vecino' and str(tu.unit_id) != str(unit.id):
+        tu = membership.for_request(request).get(tenant.id)
+        if tu and tu.role == 'vecino' and tu.unit_id != str(unit.id):
             return Response({'detail': 'No autorizado.'}, status=403)
 
-        rows, total_charges, total_paid, balance, prev_debt_adeudo, _pdf_active_plan = _compute_statement(
-            tenant, str(unit.id), start_period, cutoff
-        )
-        prev_debt   = float(unit.previous_debt  or 0)
-        credit_bal  = float(unit.credit_balance or 0)
-        if _pdf_active_plan:
-            adj_balance = balance - credit_bal
-        else:
-            adj_balance = balance + prev_debt - float(prev_debt_adeudo) - credit_bal
-
-        # Convert rows to the format expected by the shared PDF helper
-        email_rows = [
-            {
-                'period':  _period_label_es(r.get('period', '')),
-                'charges': r.get('charge', 0),
-                'paid':    r.get('paid', 0),
-                'balance': r.get('saldo_accum', 0),
-                'status':  r.get('status', 'pendiente'),
-            }
-            for r in (rows or [])
-        ]
+        if _wants_async(request):
+            return _submit_report_job(request, tenant, 'unit_statement_pdf', {
+                'unit_id': str(unit.id), 'from_period': start_period, 'cutoff': cutoff,
+            })
 
-        pdf_bytes = _generate_unit_statement_pdf(
-            tenant=tenant,
-            unit=unit,
-            rows=email_rows,
-            total_charges=total_charges,
-            total_paid=total_paid,
-            adj_balance=adj_balance,
-            from_period=start_period,
-            to_period=cutoff,
-        )
+        pdf_bytes = _build_unit_statement_pdf(tenant, unit, start_period, cutoff)
 
         if pdf_bytes is None:
             return Response(
@@ -6372,13 +7295,300 @@ class EstadoPorUnidadPDFView(APIView):
                 status=503,
             )
 
-        safe_code = ''.join(c if c.isalnum() or c in '-_' else '_' for c in (unit.unit_id_code or 'unidad'))
-        filename = f'estado_cuenta_{safe_code}_{cutoff}.pdf'
+        filename = _unit_statement_pdf_filename(unit, cutoff)
         response = HttpResponse(pdf_bytes, content_type='application/pdf')
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
         return response
 
 
+# ═══════════════════════════════════════════════════════════
+#  ESTADOS DE CUENTA MASIVOS (ZIP con un PDF por unidad)
+# ═══════════════════════════════════════════════════════════
+
+def _unit_statement_pdf_filename(unit, cutoff):
+    safe_code = ''.join(c if c.isalnum() or c in '-_' else '_' for c in (unit.unit_id_code or 'unidad'))
+    return f'estado_cuenta_{safe_code}_{cutoff}.pdf'
+
+
+def _iter_unit_statement_pdfs(tenant, start_period, cutoff, workers=1):
+    """
+    Genera (unit, pdf_bytes) para cada unidad, en orden de código.
+
+    Los estados de cuenta se calculan por bloques con _compute_tenant_statements
+    (mismo cálculo que el PDF individual). Con workers > 1 (solo desde
+    core/jobs.py) los PDFs se renderizan en los procesos de core/pdf_pool.py
+    y el bloque siguiente se calcula mientras renderizan el actual; si no, en
+    el propio proceso.
+    """
+    if workers <= 1:
+        for units, statements in _iter_unit_statement_chunks(tenant, start_period, cutoff, use_ledger=False):
+            for unit in units:
+                rows, tc, tp, adj = _unit_statement_rows(unit, statements[str(unit.id)])
+                yield unit, _generate_unit_statement_pdf(tenant, unit, rows, tc, tp, adj, start_period, cutoff)
+        return
+
+    executor = pdf_pool.start(tenant, workers)
+    try:
+        pending = []
+        for units, statements in _iter_unit_statement_chunks(tenant, start_period, cutoff, use_ledger=False):
+            submitted = [
+                (unit, executor.submit(
+                    pdf_pool.render_statement,
+                    (unit, *_unit_statement_rows(unit, statements[str(unit.id)]), start_period, cutoff),
+                ))
+                for unit in units
+            ]
+            for unit, future in pending:
+                yield unit, future.result()
+            pending = submitted
+        for unit, future in pending:
+            yield unit, future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+class _ZipStreamBuffer:
+    """Destino de ZipFile sin seek(): guarda lo escrito hasta que el generador lo entrega."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _iter_pdf_zip(files):
+    """
+    ZIP generado por partes a partir de (nombre, pdf_bytes, sufijo): cada PDF
+    se entrega en cuanto se agrega al archivo. El sufijo desambigua nombres
+    repetidos (códigos de unidad que solo difieren en caracteres no válidos
+    para archivo). Los PDFs ya van comprimidos, por eso se guardan sin
+    deflate (ZIP_STORED).
+    """
+    import zipfile
+    buf = _ZipStreamBuffer()
+    names = set()
+    with zipfile.ZipFile(buf, 'w', compression=zipfile.ZIP_STORED) as zf:
+        for name, pdf_bytes, suffix in files:
+            if name in names:
+                name = name[:-4] + f'_{suffix}.pdf'
+            names.add(name)
+            zf.writestr(name, pdf_bytes)
+            yield buf.pop()
+    yield buf.pop()
+
+
+def _iter_statements_zip(tenant, start_period, cutoff, workers=1):
+    """ZIP con el estado de cuenta PDF de cada unidad."""
+    return _iter_pdf_zip(
+        (_unit_statement_pdf_filename(unit, cutoff), pdf_bytes, str(unit.id)[:8])
+        for unit, pdf_bytes in _iter_unit_statement_pdfs(tenant, start_period, cutoff, workers)
+    )
+
+
+def _statements_zip_filename(tenant, cutoff):
+    safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in (tenant.name or 'condominio'))
+    return f'estados_cuenta_{safe_name}_{cutoff}.zip'
+
+
+class EstadoCuentaZipView(APIView):
+    """
+    GET /api/tenants/{tenant_id}/estado-cuenta-zip/?cutoff=YYYY-MM&from_period=YYYY-MM
+    ZIP con el estado de cuenta PDF de cada unidad (cierre de año, auditorías),
+    en lugar de descargar uno por uno con estado-cuenta-pdf/?unit_id=.
+    La respuesta se envía por partes mientras se generan los PDFs; con ?async=1
+    se encola un ReportJob (recomendado para condominios grandes: el worker
+    de gunicorn tiene timeout de 120 s).
+    """
+    permission_classes = [IsAdminOrTesOrAuditor]
+
+    def get(self, request, tenant_id):
+        tenant = Tenant.objects.get(id=tenant_id)
+        cutoff = request.query_params.get('cutoff', '') or _today_period()
+        start_period = request.query_params.get('from_period', '') or tenant.operation_start_date or '2024-01'
+
+        try:
+            import reportlab  # noqa: F401
+        except ImportError:
+            return Response(
+                {'error': 'reportlab no instalado. Ejecuta: docker-compose up -d --build backend'},
+                status=503
+            )
+
+        if _wants_async(request):
+            return _submit_report_job(request, tenant, 'statements_zip', {
+                'from_period': start_period, 'cutoff': cutoff,
+            })
+
+        from django.http import StreamingHttpResponse
+        response = StreamingHttpResponse(
+            _iter_statements_zip(tenant, start_period, cutoff),
+            content_type='application/zip',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{_statements_zip_filename(tenant, cutoff)}"'
+        return response
+
+
+# ═══════════════════════════════════════════════════════════
+#  RECIBOS DEL PERÍODO (receipts-batch: ZIP o un solo PDF)
+# ═══════════════════════════════════════════════════════════
+
+RECEIPT_BATCH_CHUNK = 50
+
+
+def _receipt_plan_ids(payment):
+    """Ids de los planes de pago cuyas cuotas cubre *payment* (campos plan_<uuid>)."""
+    plan_ids = set()
+    for fp in payment.field_payments.all():
+        if fp.field_key.startswith('plan_'):
+            try:
+                plan_ids.add(str(uuid.UUID(fp.field_key[5:])))
+            except ValueError:
+                pass
+    return plan_ids
+
+
+def _load_period_receipts(tenant, period):
+    """
+    Pagos del período en orden de unidad, con todo lo que necesita cada recibo
+    cargado en pocas consultas (pagos + unidades, field_payments, campos extra,
+    exenciones y planes de pago) en lugar de las de _compute_receipt_email_data
+    por pago. Devuelve ([(payment, exempt, cache_name)], receipt_data) donde
+    receipt_data(payment) calcula las filas del recibo sin consultar la base.
+    """
+    payments = list(
+        Payment.objects.lean().filter(tenant_id=tenant.id, period=period)
+        .select_related('unit')
+        .prefetch_related('field_payments')
+        .order_by('unit__unit_id_code')
+    )
+    extra_fields = list(ExtraField.objects.filter(tenant_id=tenant.id, enabled=True))
+    exemptions = ExemptionCalendar.for_tenant(tenant, units=[p.unit for p in payments])
+
+    payment_plan_ids = {payment.id: _receipt_plan_ids(payment) for payment in payments}
+    plan_ids = set().union(*payment_plan_ids.values())
+    plans = {
+        str(plan.id): plan
+        for plan in PaymentPlan.objects.filter(tenant_id=tenant.id).filter(
+            Q(id__in=plan_ids) | Q(status='accepted', unit_id__in={p.unit_id for p in payments})
+        )
+    } if payments else {}
+
+    receipts = []
+    for payment in payments:
+        exempt = exemptions.is_exempt(payment.unit.id, period)
+        receipt_plans = [
+            plan for plan_id, plan in plans.items()
+            if str(plan.unit_id) == str(payment.unit_id)
+            and (plan.status == 'accepted' or plan_id in payment_plan_ids[payment.id])
+        ]
+        name = receipt_cache.receipt_name(tenant, payment.unit, payment, extra_fields, exempt, receipt_plans)
+        receipts.append((payment, exempt, name))
+
+    def receipt_data(payment):
+        return _compute_receipt_email_data(
+            payment, payment.unit, tenant, extra_fields, exemptions=exemptions, plans=plans,
+        )
+
+    return receipts, receipt_data
+
+
+def _iter_period_receipt_pdfs(tenant, period, workers=1):
+    """
+    Genera (payment, pdf_bytes) de cada pago del período. Los recibos ya
+    guardados para la versión actual del pago (core/receipt_cache.py) se leen
+    de media; el resto se renderiza por bloques de RECEIPT_BATCH_CHUNK (con
+    workers > 1, en los procesos de core/pdf_pool.py, armando el bloque
+    siguiente mientras se renderiza el actual) y se guarda para la próxima
+    descarga.
+    """
+    receipts, receipt_data = _load_period_receipts(tenant, period)
+    cached = [receipt_cache.exists(name) for _payment, _exempt, name in receipts]
+    executor = None
+    if workers > 1 and not all(cached):
+        executor = pdf_pool.start(tenant, workers)
+
+    def _submit(payment, exempt):
+        task = (payment.unit, payment, receipt_data(payment), exempt)
+        if executor is None:
+            return _generate_receipt_pdf(tenant, *task)
+        return executor.submit(pdf_pool.render_receipt, task)
+
+    def _collect(batch):
+        for payment, name, rendered in batch:
+            if rendered is None:
+                yield payment, receipt_cache.read(name)
+                continue
+            pdf_bytes = rendered if executor is None else rendered.result()
+            receipt_cache.store(name, pdf_bytes)
+            yield payment, pdf_bytes
+
+    try:
+        pending = []
+        for start in range(0, len(receipts), RECEIPT_BATCH_CHUNK):
+            submitted = [
+                (payment, name, None if hit else _submit(payment, exempt))
+                for (payment, exempt, name), hit in zip(
+                    receipts[start:start + RECEIPT_BATCH_CHUNK],
+                    cached[start:start + RECEIPT_BATCH_CHUNK],
+                )
+            ]
+            yield from _collect(pending)
+            pending = submitted
+        yield from _collect(pending)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _iter_period_receipts_zip(tenant, period, workers=1):
+    """ZIP con el recibo PDF de cada pago del período."""
+    return _iter_pdf_zip(
+        (_receipt_pdf_filename(payment), pdf_bytes, str(payment.id)[:8])
+        for payment, pdf_bytes in _iter_period_receipt_pdfs(tenant, period, workers)
+    )
+
+
+def _write_period_receipts_pdf(tenant, period, out, progress=None):
+    """
+    Escribe en `out` un solo PDF con el recibo de cada pago del período, una
+    página por recibo. Los flowables de cada recibo se arman justo antes de
+    dibujarse (filterFlowables), igual que _write_estado_por_unidad_pdf.
+    progress (opcional) se llama antes de cada recibo.
+    Devuelve False si reportlab no está instalado.
+    """
+    try:
+        from reportlab.platypus import PageBreak
+    except ImportError:
+        return False
+    receipts, receipt_data = _load_period_receipts(tenant, period)
+
+    def _blocks():
+        for i, (payment, exempt, _name) in enumerate(receipts):
+            if progress is not None:
+                progress()
+            story = _receipt_pdf_story(tenant, payment.unit, payment, receipt_data(payment), exempt)
+            yield ([PageBreak()] if i else []) + story
+
+    pending = _blocks()
+    _receipt_pdf_template(out, pending=pending).build(next(pending, []))
+    return True
+
+
+def _period_receipts_filename(tenant, period, ext):
+    safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in (tenant.name or 'condominio'))
+    return f'recibos_{safe_name}_{period.replace("-", "")}.{ext}'
+
+
 # ═══════════════════════════════════════════════════════════
 #  CONDOMINIO REQUEST (Landing page — public endpoint)
 # ═══════════════════════════════════════════════════════════
@@ -0,0 +1,13 @@
+"""
+Homly — Configuración de Gunicorn
+=================================
+Gunicorn carga ./gunicorn.conf.py del directorio de trabajo (cwd: ./backend
+en ecosystem.config.cjs); los argumentos de la línea de comandos tienen
+prioridad sobre lo que se defina aquí.
+"""
+
+
+def worker_exit(server, worker):
+    # Registros de auditoría que quedan en el buffer del worker (core/audit.py)
+    from core.audit import audit_buffer
+    audit_buffer.flush()
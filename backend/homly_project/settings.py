@@ -83,6 +83,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.MembershipMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -261,6 +262,55 @@ else:
         }
     }
 
+# ─── Cache de resultados financieros (core/result_cache.py) ──
+# Dashboard y reportes se invalidan por versión de datos del tenant (en la BD);
+# el TTL solo acota la memoria ocupada por resultados abiertos. Los sellados
+# no expiran: los desaloja el cache (MAX_ENTRIES en LocMem, maxmemory en Redis).
+RESULT_CACHE_TIMEOUT = config('RESULT_CACHE_TIMEOUT', default=300, cast=int)
+
+# ─── Trabajos pesados en segundo plano (core/jobs.py) ──
+# Worker: python manage.py run_report_jobs
+REPORT_JOB_MAX_ATTEMPTS = config('REPORT_JOB_MAX_ATTEMPTS', default=3, cast=int)
+# Un trabajo 'running' más antiguo que esto se considera huérfano (worker caído)
+REPORT_JOB_STALE_SECONDS = config('REPORT_JOB_STALE_SECONDS', default=900, cast=int)
+# Los trabajos largos renuevan started_at (heartbeat) como mucho cada tantos segundos
+REPORT_JOB_HEARTBEAT_SECONDS = config('REPORT_JOB_HEARTBEAT_SECONDS', default=60, cast=int)
+REPORT_JOB_RETENTION_DAYS = config('REPORT_JOB_RETENTION_DAYS', default=7, cast=int)
+
+# ─── Cola de correos salientes (core/email_queue.py) ──
+# Worker: python manage.py send_outbound_emails
+OUTBOUND_EMAIL_BATCH_SIZE = config('OUTBOUND_EMAIL_BATCH_SIZE', default=50, cast=int)
+OUTBOUND_EMAIL_MAX_ATTEMPTS = config('OUTBOUND_EMAIL_MAX_ATTEMPTS', default=5, cast=int)
+# Espera antes del primer reintento; se duplica en cada intento (máx. 1 h)
+OUTBOUND_EMAIL_BACKOFF_SECONDS = config('OUTBOUND_EMAIL_BACKOFF_SECONDS', default=60, cast=int)
+OUTBOUND_EMAIL_RETENTION_DAYS = config('OUTBOUND_EMAIL_RETENTION_DAYS', default=30, cast=int)
+
+# ─── Estados de cuenta masivos (ZIP y envío por correo) ──
+# Procesos que renderizan los PDFs en paralelo en los trabajos de run_report_jobs
+# (core/pdf_pool.py); 1 = en el propio proceso. Las descargas HTTP no los usan.
+STATEMENT_PDF_WORKERS = config('STATEMENT_PDF_WORKERS', default=min(4, os.cpu_count() or 1), cast=int)
+# Envío a todas las unidades (send-statements-all): correos por lote y pausa entre lotes
+STATEMENT_EMAIL_BATCH_SIZE = config('STATEMENT_EMAIL_BATCH_SIZE', default=20, cast=int)
+STATEMENT_EMAIL_BATCH_PAUSE = config('STATEMENT_EMAIL_BATCH_PAUSE', default=1.0, cast=float)
+
+# ─── Motor de estados de cuenta (core/statement_sql.py) ───
+# Reportes y dashboard leen el ledger; cuando no cubre el rango (otro inicio,
+# corte futuro) 'python' calcula en memoria y 'sql' en una sola consulta
+STATEMENT_ENGINE = config('STATEMENT_ENGINE', default='python')
+# Filas faltantes del ledger (unidad nueva, cambio de mes): hasta tantas unidades
+# se completan en el request; más se encargan a run_report_jobs
+UNIT_LEDGER_INLINE_UNITS = config('UNIT_LEDGER_INLINE_UNITS', default=20, cast=int)
+
+# ─── Subida multipart de evidencias (core/uploads.py) ────
+# Límite por archivo (se corta al recibirlo) y archivos por subida de evidencias
+UPLOAD_MAX_FILE_BYTES = config('UPLOAD_MAX_FILE_BYTES', default=10 * 1024 * 1024, cast=int)
+UPLOAD_MAX_FILES = config('UPLOAD_MAX_FILES', default=10, cast=int)
+
+# ─── Buffer de AuditLog (core/audit.py) ──────────────────
+# Los registros se escriben con bulk_create al juntar N o tras N segundos
+AUDIT_LOG_BUFFER_SIZE = config('AUDIT_LOG_BUFFER_SIZE', default=50, cast=int)
+AUDIT_LOG_FLUSH_SECONDS = config('AUDIT_LOG_FLUSH_SECONDS', default=2.0, cast=float)
+
 # ─── Defaults ──────────────────────────────────────────
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
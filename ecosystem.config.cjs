@@ -20,6 +20,29 @@ module.exports = {
       autorestart: true,
       watch: false,
     },
+    {
+      // Worker de PDFs y correos encolados (ReportJob) — ver core/jobs.py
+      name: 'homly-worker',
+      cwd: './backend',
+      script: './venv/bin/python',
+      args: 'manage.py run_report_jobs',
+      interpreter: 'none',
+      env: { DJANGO_SETTINGS_MODULE: 'homly_project.settings' },
+      autorestart: true,
+      watch: false,
+      kill_timeout: 130000,
+    },
+    {
+      // Cola de correos de notificaciones (OutboundEmail) — ver core/email_queue.py
+      name: 'homly-mailer',
+      cwd: './backend',
+      script: './venv/bin/python',
+      args: 'manage.py send_outbound_emails',
+      interpreter: 'none',
+      env: { DJANGO_SETTINGS_MODULE: 'homly_project.settings' },
+      autorestart: true,
+      watch: false,
+    },
     {
       name: 'homly-frontend',
       cwd: './frontend',
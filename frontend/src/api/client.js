@@ -151,6 +151,7 @@ export const paymentsAPI = {
   clear: (tenantId, id) => api.delete(`/tenants/${tenantId}/payments/${id}/clear/`),
   sendReceipt: (tenantId, paymentId, data) => api.post(`/tenants/${tenantId}/payments/${paymentId}/send-receipt/`, data),
   receiptPDF: (tenantId, paymentId) => api.get(`/tenants/${tenantId}/payments/${paymentId}/receipt-pdf/`, { responseType: 'blob' }),
+  exemptUnits: (tenantId, period) => api.get(`/tenants/${tenantId}/payments/exempt-units/`, { params: { period } }),
 };
 
 // ─── Extra Fields ───────────────────────────────
@@ -207,7 +208,17 @@ export const periodsAPI = {
 // ─── Bank Statements ────────────────────────────
 export const bankAPI = {
   list:            (tenantId)     => api.get(`/tenants/${tenantId}/bank-statements/`),
+  get:             (tenantId, id) => api.get(`/tenants/${tenantId}/bank-statements/${id}/`),
   upload:          (tenantId, data) => api.post(`/tenants/${tenantId}/bank-statements/`, data),
+  // multipart: period + file (PDF), sin Base64
+  uploadFile:      (tenantId, period, file) => {
+    const form = new FormData();
+    form.append('period', period);
+    form.append('file', file);
+    return api.post(`/tenants/${tenantId}/bank-statements/upload/`, form, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+    });
+  },
   deleteStatement: (tenantId, id) => api.delete(`/tenants/${tenantId}/bank-statements/${id}/`),
 };
 
@@ -114,7 +114,8 @@ export default function PaymentReceiptModal({ pay, unit, tc, extraFields = [], r
   const [showEmailModal, setShowEmailModal] = useState(false);
 
   // ── Computed receipt values ──
-  const isReceiptExempt = !!unit?.admin_exempt;
+  // Exención del período calculada por el backend (PaymentSerializer.maintenance_exempt)
+  const isReceiptExempt = !!pay?.maintenance_exempt;
   const maintCharge = isReceiptExempt ? 0 : (parseFloat(tc?.maintenance_fee) || 0);
   const reqEFs = extraFields.filter(ef => ef.required);
   const effTotals = getEffectiveFieldTotals(pay);
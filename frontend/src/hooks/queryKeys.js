@@ -20,6 +20,7 @@
  *   ['closed-periods', tenantId]               → períodos cerrados
  *   ['payments',     tenantId, period]         → cobranza por período
  *   ['unrecognized', tenantId, period]         → ingresos no reconocidos
+ *   ['exempt-units', tenantId, period]         → unidades exentas del período
  *   ['active-plans', tenantId]                 → planes de pago aceptados
  *   ['gastos',       tenantId, period]         → gastos por período
  *   ['caja-chica',   tenantId, period]         → caja chica por período
@@ -41,6 +42,7 @@ export const queryKeys = {
   // ── Cobranza / Pagos ──────────────────────────────────────────────────────
   payments:       (tenantId, period) => ['payments',       tenantId, period],
   unrecognized:   (tenantId, period) => ['unrecognized',   tenantId, period],
+  exemptUnits:    (tenantId, period) => ['exempt-units',   tenantId, period],
   activePlans:    (tenantId)         => ['active-plans',   tenantId],
 
   // ── Gastos ────────────────────────────────────────────────────────────────
@@ -7,6 +7,7 @@
  *  - useExtraFields            → campos de cobro adicionales
  *  - useTenantData             → datos del tenant
  *  - unrecognizedIncomeAPI     → ingresos no reconocidos del período
+ *  - paymentsAPI.exemptUnits   → unidades exentas del período (cálculo del backend)
  *  - useClosedPeriods          → períodos cerrados
  *  - paymentPlansAPI.list      → planes de pago aceptados (para el mapa unit→plan)
  *
@@ -57,6 +58,16 @@ export function usePaymentsData(tenantId, period) {
     placeholderData: [],
   });
 
+  // Exención por cargo de mesa directiva: la calcula el backend, no Unit.admin_exempt
+  const exemptUnitsQuery = useQuery({
+    queryKey:  queryKeys.exemptUnits(tenantId, period),
+    queryFn:   () =>
+      paymentsAPI.exemptUnits(tenantId, period).then(r => r.data?.unit_ids ?? []),
+    enabled:   !!tenantId && !!period,
+    staleTime,
+    placeholderData: [],
+  });
+
   const activePlansQuery = useQuery({
     queryKey:  queryKeys.activePlans(tenantId),
     queryFn:   () =>
@@ -81,6 +92,11 @@ export function usePaymentsData(tenantId, period) {
     f => f.enabled && (!f.field_type || f.field_type === 'normal')
   );
 
+  const exemptUnitIds = useMemo(
+    () => new Set((exemptUnitsQuery.data ?? []).map(String)),
+    [exemptUnitsQuery.data],
+  );
+
   // Mapa unit_id → plan aceptado
   const activePlansMap = useMemo(() => {
     const map = {};
@@ -98,6 +114,7 @@ export function usePaymentsData(tenantId, period) {
     unrecognizedIncome: unrecognizedQuery.data  ?? [],
     closedPeriods:    closedPeriodsHook.closedPeriods,
     activePlansMap,
+    exemptUnitIds,
     isPeriodClosed:   isClosed,
 
     isLoading:
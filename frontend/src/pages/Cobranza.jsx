@@ -147,8 +147,10 @@ export default function Cobranza() {
   const {
     payments, units, extraFields, addlExtraFields, allNormalFields,
     tenantData, unrecognizedIncome, closedPeriods, activePlansMap,
-    isPeriodClosed,
+    exemptUnitIds, isPeriodClosed,
   } = usePaymentsData(tenantId, period);
+  // Exención del período calculada por el backend (cargo vigente de mesa directiva)
+  const unitExempt = (unitId) => exemptUnitIds.has(String(unitId));
 
   // Load approved reservations with charge when receipt opens
   useEffect(() => {
@@ -205,8 +207,8 @@ export default function Cobranza() {
     let paid = 0, partial = 0, pending = 0, recaudo = 0;
     units.forEach(u => {
       const p = paymentMap[u.id];
-      // Unidades exentas (admin_exempt) se cuentan como exentas en KPI
-      const isExempt = !!u.admin_exempt;
+      // Unidades exentas en el período se cuentan como exentas en KPI
+      const isExempt = unitExempt(u.id);
       const st = isExempt ? 'exento' : (p?.status || 'pendiente');
       if (st === 'pagado' || st === 'exento') paid++;
       else if (st === 'parcial') partial++;
@@ -218,7 +220,7 @@ export default function Cobranza() {
     recaudo += unrecognizedIncome.reduce((s, r) => s + parseFloat(r.amount || 0), 0);
     const paidPct = total > 0 ? (paid / total) * 100 : 0;
     return { total, paid, partial, pending, recaudo, paidPct };
-  }, [units, paymentMap, unrecognizedIncome]);
+  }, [units, paymentMap, unrecognizedIncome, exemptUnitIds]);
 
   const maintenanceFee = parseFloat(tenantData?.maintenance_fee) || 0;
   // Currency-aware formatters (shadow module-level _fmt/_fmtDec)
@@ -286,7 +288,7 @@ export default function Cobranza() {
     setCaptureForm({
       unit_id: unit.id,
       period,
-      payment_type: existing?.payment_type || (!!unit.admin_exempt ? 'excento' : ''),
+      payment_type: existing?.payment_type || (unitExempt(unit.id) ? 'excento' : ''),
       payment_date: existing?.payment_date || new Date().toISOString().slice(0, 10),
       notes: existing?.notes || '',
       folio: existing?.folio || '',
@@ -434,7 +436,7 @@ export default function Cobranza() {
   const handleCapture = async () => {
     const fp2 = captureForm.field_payments || {};
     const hasOtherPmts = extraFields.some(ef => (parseFloat(fp2[String(ef.id)]?.received) || 0) > 0);
-    const isExemptUnit = !!units.find(u => u.id === captureForm.unit_id)?.admin_exempt;
+    const isExemptUnit = unitExempt(captureForm.unit_id);
     const needsRealType = isExemptUnit && hasOtherPmts;
     if (!captureForm.payment_type || (needsRealType && captureForm.payment_type === 'excento')) {
       toast.error('La forma de pago es obligatoria'); return;
@@ -588,7 +590,7 @@ export default function Cobranza() {
               {paged.map(u => {
                 const pay = paymentMap[u.id];
                 // Exentas siempre aparecen como exentas
-                const st = u.admin_exempt ? 'exento' : (pay?.status || 'pendiente');
+                const st = unitExempt(u.id) ? 'exento' : (pay?.status || 'pendiente');
                 const effTotals = getEffectiveFieldTotals(pay);
                 // Total físicamente cobrado (received + adelantos + adeudos + adicionales)
                 const totalRec = getUnitRecaudo(pay);
@@ -613,7 +615,7 @@ export default function Cobranza() {
                     </td>
                     <td style={{ fontSize: 13, color: 'var(--ink-500)' }}>{u.responsible_name || '—'}</td>
                     <td style={{ textAlign: 'right', fontWeight: 600, fontSize: 13 }}>
-                      {u.admin_exempt ? '—' : fmtDec(maintenanceFee)}
+                      {unitExempt(u.id) ? '—' : fmtDec(maintenanceFee)}
                     </td>
                     {extraFields.filter(f => f.required).map(ef => {
                       const amt = effTotals[ef.id] || 0;
@@ -1206,7 +1208,7 @@ export default function Cobranza() {
         const reqEFs = extraFields.filter(ef => ef.required);
         const optEFs = extraFields.filter(ef => !ef.required);
         const allEFs = [...reqEFs, ...optEFs];
-        const isUnitExempt = !!showCapture.admin_exempt;
+        const isUnitExempt = unitExempt(showCapture.id);
         // Para unidades exentas: el cargo de mantenimiento es 0
         const maintCharge = isUnitExempt ? 0 : maintenanceFee;
         const maintAbono = isUnitExempt ? 0 : Math.min(parseFloat(captureForm.field_payments?.maintenance?.received) || 0, maintenanceFee);
@@ -1287,7 +1289,7 @@ export default function Cobranza() {
                   </div>
                   {/* Mantenimiento */}
                   {(() => {
-                    const isExempt = !!showCapture.admin_exempt;
+                    const isExempt = unitExempt(showCapture.id);
                     return (
                     <div style={{ display: 'grid', gridTemplateColumns: '1fr 100px 120px 85px', gap: 0, alignItems: 'center', padding: '11px 16px', borderBottom: '1px solid var(--sand-50)', background: isExempt ? 'var(--teal-50)' : undefined }}>
                       <div>
@@ -1447,6 +1447,20 @@ function EstadoGeneralView({ tenantId, tenantData, generalData, genLoading, cuto
     return m;
   }, [bankStatements]);
 
+  // El listado no incluye el PDF (file_data): se pide al abrirlo
+  const openBankStatement = async (stmt) => {
+    try {
+      const res = await bankAPI.get(tenantId, stmt.id);
+      setBankStmtViewer({
+        period: stmt.period,
+        dataUrl: `data:application/pdf;base64,${res.data.file_data}`,
+        uploadedAt: stmt.uploaded_at,
+      });
+    } catch {
+      toast.error('Error al cargar el estado bancario');
+    }
+  };
+
   const handleBankFileSelect = async (e, period) => {
     const file = e.target.files?.[0];
     e.target.value = '';
@@ -1457,18 +1471,12 @@ function EstadoGeneralView({ tenantId, tenantData, generalData, genLoading, cuto
     }
     setBankUploading(period);
     try {
-      const base64 = await new Promise((resolve, reject) => {
-        const reader = new FileReader();
-        reader.onload = ev => resolve(ev.target.result.split(',')[1]);
-        reader.onerror = reject;
-        reader.readAsDataURL(file);
-      });
       // El backend hace upsert: crea o reemplaza el estado del período automáticamente
-      const res = await bankAPI.upload(tenantId, { period, file_data: base64 });
+      const res = await bankAPI.uploadFile(tenantId, period, file);
       setBankStatements(prev => [...prev.filter(s => s.period !== period), res.data]);
       toast.success(`Estado bancario de ${periodLabel(period)} guardado`);
-    } catch {
-      toast.error('Error al subir el estado bancario');
+    } catch (err) {
+      toast.error(err.response?.data?.detail || 'Error al subir el estado bancario');
     } finally {
       setBankUploading(null);
     }
@@ -1955,11 +1963,7 @@ function EstadoGeneralView({ tenantId, tenantData, generalData, genLoading, cuto
                             {bankStmtMap[row.period] && (
                               <button
                                 title="Ver estado bancario"
-                                onClick={() => setBankStmtViewer({
-                                  period: row.period,
-                                  dataUrl: `data:application/pdf;base64,${bankStmtMap[row.period].file_data}`,
-                                  uploadedAt: bankStmtMap[row.period].uploaded_at,
-                                })}
+                                onClick={() => openBankStatement(bankStmtMap[row.period])}
                                 style={{
                                   display: 'inline-flex', alignItems: 'center', justifyContent: 'center',
                                   width: 28, height: 28, border: 'none', borderRadius: 6,